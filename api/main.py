@@ -11,14 +11,14 @@ from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
 
-from api.routers import auth, projects, tasks, payments, calculations, design_bases, structural_calcs, subscription, inspections
+from api.routers import auth, projects, tasks, payments, calculations, design_bases, structural_calcs, subscription, inspections, media
 from payments_webhook.flow_webhook import router as flow_router
+from services.media_service import BASE_UPLOAD_DIR
 
 app = FastAPI(title="StructApp API", version="0.1.0")
 
-UPLOADS_DIR = Path("uploads")
-UPLOADS_DIR.mkdir(exist_ok=True)
-app.mount("/uploads", StaticFiles(directory=str(UPLOADS_DIR.resolve())), name="uploads")
+BASE_UPLOAD_DIR.mkdir(parents=True, exist_ok=True)
+app.mount("/uploads", StaticFiles(directory=str(BASE_UPLOAD_DIR.resolve())), name="uploads")
 
 
 app.add_middleware(
@@ -38,6 +38,7 @@ app.include_router(design_bases.router, prefix="/design-bases", tags=["design-ba
 app.include_router(subscription.router, prefix="/subscription", tags=["subscription"])
 app.include_router(structural_calcs.router, prefix="/structural-calcs", tags=["structural-calcs"])
 app.include_router(inspections.router, tags=["inspections"])
+app.include_router(media.router, prefix="/media", tags=["media"])
 app.include_router(flow_router, prefix="/payments-webhook", tags=["payments-webhook"])
 
 
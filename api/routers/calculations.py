@@ -1,8 +1,13 @@
+import os
+import tempfile
 from datetime import datetime
-from typing import List
+from typing import List, Literal, Optional
 
-from fastapi import APIRouter, HTTPException, Response, status
+from fastapi import APIRouter, HTTPException, Query, Response, status
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import FileResponse
 from pydantic import BaseModel, Field
+from starlette.background import BackgroundTask
 
 from api.dependencies import UserIdDep
 from api.schemas.calculations import CalculationResponse, CalculationRun, RCBeamPayload
@@ -15,6 +20,7 @@ from services.design_bases_service import (
     get_live_load,
 )
 from services.docs_service import export_rc_beam_pdf
+from services.runs_export import export_runs
 from services.runs_service import fetch_run, get_critical_elements, list_runs, save_run, set_critical_element, unset_critical_element
 from supa.client import supa
 
@@ -55,8 +61,12 @@ class UpdateSnowPayload(BaseModel):
 
 
 class UpdateSeismicStory(BaseModel):
+    model_config = {"populate_by_name": True}
+
     height: float = Field(..., gt=0)
     weight: float = Field(..., gt=0)
+    stiffness_x: Optional[float] = Field(None, alias="stiffnessX", gt=0)
+    stiffness_y: Optional[float] = Field(None, alias="stiffnessY", gt=0)
 
 
 class UpdateSeismicPayload(BaseModel):
@@ -65,10 +75,11 @@ class UpdateSeismicPayload(BaseModel):
     soil: str
     rs: float = Field(..., gt=0)
     ps: float = Field(..., gt=0)
-    tx: float = Field(..., gt=0)
-    ty: float = Field(..., gt=0)
+    tx: Optional[float] = Field(None, gt=0)
+    ty: Optional[float] = Field(None, gt=0)
     r0: float = Field(..., gt=0)
     stories: List[UpdateSeismicStory] = Field(..., min_length=1)
+    modal_combination: Literal["CQC", "SRSS"] = Field("CQC", alias="modalCombination")
 
 
 class UpdateReductionPayload(BaseModel):
@@ -122,6 +133,36 @@ async def list_project_runs(project_id: str):
     return runs or []
 
 
+@router.get("/runs/{project_id}/export")
+async def export_project_runs(
+    project_id: str,
+    since: Optional[datetime] = Query(None, description="Marca de agua de la exportación anterior"),
+    element_type: Optional[str] = Query(None, alias="elementType"),
+    export_format: Literal["parquet", "arrow", "csv"] = Query("parquet", alias="format"),
+):
+    """ZIP con los cálculos aplanados por tipo de elemento; la nueva marca de agua va en X-Export-Watermark."""
+    handle, path = tempfile.mkstemp(suffix=".zip")
+    os.close(handle)
+    try:
+        summary = await run_in_threadpool(
+            export_runs, project_id, path, since.isoformat() if since else None, element_type, export_format
+        )
+    except ValueError as exc:
+        os.unlink(path)
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(exc))
+    except Exception as exc:
+        os.unlink(path)
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(exc))
+    headers = {"X-Export-Rows": str(sum(summary["rows"].values())), "X-Export-Watermark": summary["watermark"]}
+    return FileResponse(
+        path,
+        media_type="application/zip",
+        filename=f"calc_runs_{project_id}.zip",
+        headers=headers,
+        background=BackgroundTask(os.unlink, path),
+    )
+
+
 @router.get("/runs/detail/{run_id}", response_model=CalculationRun)
 async def get_run_detail(run_id: str):
     run = fetch_run(run_id)
@@ -218,6 +259,17 @@ async def update_calculation_run(run_id: str, payload: dict, user_id: UserIdDep)
                 r0=data.r0,
                 story_heights=story_heights,
                 story_weights=story_weights,
+                story_stiffnesses_x=(
+                    [story.stiffness_x for story in data.stories]
+                    if all(story.stiffness_x for story in data.stories)
+                    else None
+                ),
+                story_stiffnesses_y=(
+                    [story.stiffness_y for story in data.stories]
+                    if all(story.stiffness_y for story in data.stories)
+                    else None
+                ),
+                modal_combination=data.modal_combination,
             )
         except (KeyError, ValueError) as exc:
             raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(exc)) from exc
@@ -230,7 +282,11 @@ async def update_calculation_run(run_id: str, payload: dict, user_id: UserIdDep)
             "tx": data.tx,
             "ty": data.ty,
             "r0": data.r0,
-            "stories": [{"height": story.height, "weight": story.weight} for story in data.stories],
+            "stories": [
+                {"height": story.height, "weight": story.weight, "stiffnessX": story.stiffness_x, "stiffnessY": story.stiffness_y}
+                for story in data.stories
+            ],
+            "modalCombination": data.modal_combination,
         }
     elif element_type in {"reduction", "live_load_reduction"}:
         data = UpdateReductionPayload(**payload)
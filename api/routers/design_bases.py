@@ -231,6 +231,17 @@ async def seismic_base(payload: SeismicRequest):
             r0=payload.r0,
             story_heights=[story.height for story in payload.stories],
             story_weights=[story.weight for story in payload.stories],
+            story_stiffnesses_x=(
+                [story.stiffness_x for story in payload.stories]
+                if all(story.stiffness_x for story in payload.stories)
+                else None
+            ),
+            story_stiffnesses_y=(
+                [story.stiffness_y for story in payload.stories]
+                if all(story.stiffness_y for story in payload.stories)
+                else None
+            ),
+            modal_combination=payload.modal_combination,
         )
     except (KeyError, ValueError) as exc:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(exc)) from exc
@@ -246,7 +257,11 @@ async def seismic_base(payload: SeismicRequest):
             "tx": payload.tx,
             "ty": payload.ty,
             "r0": payload.r0,
-            "stories": [{"height": s.height, "weight": s.weight} for s in payload.stories],
+            "stories": [
+                {"height": s.height, "weight": s.weight, "stiffnessX": s.stiffness_x, "stiffnessY": s.stiffness_y}
+                for s in payload.stories
+            ],
+            "modalCombination": payload.modal_combination,
         }
         record = save_run(payload.project_id, payload.user_id, "seismic", inputs, result)
         return {"results": result, "run_id": record["id"]}
@@ -1,8 +1,13 @@
-from fastapi import APIRouter, Depends, File, Form, HTTPException, UploadFile, status
-from fastapi.responses import FileResponse
+import hashlib
+from pathlib import Path
+
+from fastapi import APIRouter, Depends, File, Form, HTTPException, Query, Request, Response, UploadFile, status
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import FileResponse, StreamingResponse
 
 from api.dependencies import UserIdDep
 from api.schemas.inspections import (
+    BulkPhotoUploadResponse,
     DamageCreate,
     DamagePhotoResponse,
     DamagePhotoUpdate,
@@ -12,19 +17,28 @@ from api.schemas.inspections import (
     DocumentResponse,
     DocumentUpdate,
     InspectionCreate,
+    InspectionFullResponse,
     InspectionResponse,
     InspectionScoreResponse,
+    PhotoJobResponse,
+    PhotoJobsProgressResponse,
     PhotoUploadResponse,
+    ProjectInspectionAnalyticsResponse,
+    ProjectInspectionRiskResponse,
+    SyncChangeset,
+    SyncResponse,
     TestCreate,
     TestResponse,
     TestUpdate,
 )
-from services.inspection_archive_service import create_inspection_archive, generate_inspection_pdf
+from services.inspection_archive_service import generate_inspection_pdf, prepare_inspection_archive
 from services.inspection_scoring import calculate_inspection_deterministic_score, evaluate_inspection_with_llm
+from services.inspection_sync import sync_inspection_changes
 from services.inspections_service import (
     create_project_inspection,
     create_project_inspection_damage,
     create_project_inspection_damage_photo,
+    create_project_inspection_damage_photos,
     create_project_inspection_document,
     create_project_inspection_test,
     delete_project_inspection,
@@ -33,17 +47,22 @@ from services.inspections_service import (
     delete_project_inspection_document,
     delete_project_inspection_test,
     get_project_inspection_damage,
+    get_project_inspection_tree,
+    get_project_inspection_updated_at,
+    list_project_critical_damages,
     list_project_inspection_damage_photos,
     list_project_inspection_damages,
     list_project_inspection_documents,
     list_project_inspection_tests,
     list_project_inspections,
+    project_inspection_analytics,
+    rank_project_inspection_risk,
     update_project_inspection_test,
     update_project_inspection_damage,
     update_project_inspection_document,
     update_project_inspection_damage_photo,
 )
-from services.media_service import compress_and_store_inspection_photo
+from services.photo_pipeline import photo_pipeline, stage_multipart_files
 
 router = APIRouter()
 
@@ -56,6 +75,41 @@ async def get_project_inspections(project_id: str, user_id: UserIdDep):
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(exc))
 
 
+@router.get("/projects/{project_id}/inspection-risk", response_model=ProjectInspectionRiskResponse)
+async def get_project_inspection_risk(
+    project_id: str,
+    user_id: UserIdDep,
+    top_damages: int = Query(default=20, ge=1, le=500),
+):
+    try:
+        return rank_project_inspection_risk(project_id, top_damages)
+    except Exception as exc:
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(exc))
+
+
+@router.get("/projects/{project_id}/inspection-analytics", response_model=ProjectInspectionAnalyticsResponse)
+async def get_project_inspection_analytics(
+    project_id: str,
+    user_id: UserIdDep,
+    refresh: bool = Query(default=False),
+):
+    try:
+        return await run_in_threadpool(project_inspection_analytics, project_id, refresh)
+    except Exception as exc:
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(exc))
+
+
+@router.post("/projects/{project_id}/inspections/sync", response_model=SyncResponse)
+async def sync_project_inspections(project_id: str, payload: SyncChangeset, user_id: UserIdDep):
+    changes = [change.model_dump() for change in payload.changes]
+    try:
+        return await run_in_threadpool(sync_inspection_changes, project_id, payload.client_id, changes)
+    except ValueError as exc:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(exc))
+    except Exception as exc:
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(exc))
+
+
 @router.post("/inspections", response_model=InspectionResponse, status_code=status.HTTP_201_CREATED)
 async def create_inspection(payload: InspectionCreate, user_id: UserIdDep):
     try:
@@ -65,6 +119,39 @@ async def create_inspection(payload: InspectionCreate, user_id: UserIdDep):
     return inspection
 
 
+def _inspection_etag(inspection_id: str, updated_at) -> str:
+    digest = hashlib.sha1(f"{inspection_id}:{updated_at}".encode()).hexdigest()[:20]
+    return f'W/"{digest}"'
+
+
+def _etag_matches(if_none_match: str | None, etag: str) -> bool:
+    if not if_none_match:
+        return False
+    candidates = {value.strip().removeprefix("W/") for value in if_none_match.split(",")}
+    return "*" in candidates or etag.removeprefix("W/") in candidates
+
+
+@router.get("/inspections/{inspection_id}/full", response_model=InspectionFullResponse)
+async def get_inspection_full(inspection_id: str, request: Request, response: Response, user_id: UserIdDep):
+    if_none_match = request.headers.get("if-none-match")
+    headers = {"Cache-Control": "private, no-cache"}
+    try:
+        if if_none_match:
+            # Cheap probe first: a matching ETag skips fetching the whole tree.
+            updated_at = get_project_inspection_updated_at(inspection_id)
+            if updated_at is not None and _etag_matches(if_none_match, _inspection_etag(inspection_id, updated_at)):
+                headers["ETag"] = _inspection_etag(inspection_id, updated_at)
+                return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+        inspection = get_project_inspection_tree(inspection_id)
+    except Exception as exc:
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(exc))
+    if not inspection:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Inspección no encontrada")
+    headers["ETag"] = _inspection_etag(inspection_id, inspection.get("updated_at"))
+    response.headers.update(headers)
+    return inspection
+
+
 @router.get("/projects/{project_id}/inspection-damages", response_model=list[DamageResponse])
 async def get_project_damages(project_id: str, user_id: UserIdDep, inspection_id: str | None = None):
     try:
@@ -73,6 +160,19 @@ async def get_project_damages(project_id: str, user_id: UserIdDep, inspection_id
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(exc))
 
 
+@router.get("/projects/{project_id}/critical-damages", response_model=list[DamageResponse])
+async def get_project_critical_damages(
+    project_id: str,
+    user_id: UserIdDep,
+    limit: int = Query(default=20, ge=1, le=500),
+    inspection_id: str | None = None,
+):
+    try:
+        return list_project_critical_damages(project_id, limit, inspection_id)
+    except Exception as exc:
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(exc))
+
+
 @router.post("/inspection-damages", response_model=DamageResponse, status_code=status.HTTP_201_CREATED)
 async def create_damage(payload: DamageCreate, user_id: UserIdDep):
     try:
@@ -101,18 +201,71 @@ async def upload_damage_photo(
     if not damage:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Daño no encontrado")
     try:
-        url = compress_and_store_inspection_photo(file, damage["project_id"], damage["inspection_id"])
+        job = await photo_pipeline.submit(file)
         photo = create_project_inspection_damage_photo(
             {
                 "project_id": damage.get("project_id"),
                 "inspection_id": damage.get("inspection_id"),
                 "damage_id": damage_id,
-                "photo_url": url,
+                "photo_url": job["url"],
             }
         )
     except Exception as exc:
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(exc))
-    return photo
+    # The row points at the final URL before processing ends; drop it if the photo never gets there.
+    photo_pipeline.on_failure(job["job_id"], lambda _job: delete_project_inspection_damage_photo(photo["id"]))
+    job = photo_pipeline.get_job(job["job_id"]) or job
+    return {**photo, "job_id": job["job_id"], "status": job["status"]}
+
+
+@router.post("/inspection-damages/{damage_id}/photos/bulk", response_model=BulkPhotoUploadResponse)
+async def upload_damage_photos_bulk(damage_id: str, request: Request, user_id: UserIdDep):
+    damage = get_project_inspection_damage(damage_id)
+    if not damage:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Daño no encontrado")
+    try:
+        staged = await stage_multipart_files(request.stream(), request.headers.get("content-type", ""))
+    except ValueError as exc:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(exc))
+
+    jobs: dict[int, dict] = {}
+    try:
+        for index, part in enumerate(staged):
+            if part["path"] is None:
+                continue
+            jobs[index] = await photo_pipeline.submit_path(part["path"], part["digest"])
+    except Exception as exc:
+        for index, part in enumerate(staged):
+            if index not in jobs and part["path"] is not None:
+                Path(part["path"]).unlink(missing_ok=True)
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(exc))
+    finished = dict(zip(jobs, await photo_pipeline.wait_for([job["job_id"] for job in jobs.values()])))
+
+    results = []
+    rows = []
+    for index, part in enumerate(staged):
+        job = finished.get(index) or {}
+        if part["error"] is None and job.get("status") != "done":
+            part["error"] = job.get("error") or "No se pudo procesar la foto"
+        results.append({"filename": part["filename"], "status": "error" if part["error"] else "ok", "error": part["error"]})
+        if part["error"] is None:
+            rows.append(
+                {
+                    "project_id": damage.get("project_id"),
+                    "inspection_id": damage.get("inspection_id"),
+                    "damage_id": damage_id,
+                    "photo_url": job["url"],
+                }
+            )
+    try:
+        photos = iter(create_project_inspection_damage_photos(rows))
+    except Exception as exc:
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(exc))
+    for result in results:
+        if result["status"] == "ok":
+            result["photo"] = next(photos, None)
+    uploaded = sum(1 for result in results if result["status"] == "ok")
+    return {"damage_id": damage_id, "uploaded": uploaded, "failed": len(results) - uploaded, "results": results}
 
 
 @router.delete("/inspection-damages/{damage_id}/photos/{photo_id}", status_code=status.HTTP_204_NO_CONTENT)
@@ -187,10 +340,23 @@ async def upload_inspection_photo(
     file: UploadFile = File(...),
 ):
     try:
-        url = compress_and_store_inspection_photo(file, project_id, inspection_id)
+        job = await photo_pipeline.submit(file)
     except Exception as exc:
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(exc))
-    return PhotoUploadResponse(url=url)
+    return PhotoUploadResponse(url=job["url"], job_id=job["job_id"], status=job["status"])
+
+
+@router.get("/inspection-photos/jobs", response_model=PhotoJobsProgressResponse)
+async def get_photo_jobs_progress(user_id: UserIdDep, job_ids: list[str] = Query(...)):
+    return photo_pipeline.progress(job_ids)
+
+
+@router.get("/inspection-photos/jobs/{job_id}", response_model=PhotoJobResponse)
+async def get_photo_job(job_id: str, user_id: UserIdDep):
+    job = photo_pipeline.get_job(job_id)
+    if not job:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Trabajo no encontrado")
+    return job
 
 
 @router.delete("/inspections/{inspection_id}", status_code=status.HTTP_204_NO_CONTENT)
@@ -208,7 +374,9 @@ async def get_inspection_scores(inspection_id: str, user_id: UserIdDep):
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Inspección no encontrada")
     project_id = inspection["project_id"]
     damages = list_project_inspection_damages(project_id, inspection_id)
-    deterministic = calculate_inspection_deterministic_score(damages)
+    deterministic = inspection.get("deterministic_score")
+    if deterministic is None:
+        deterministic = calculate_inspection_deterministic_score(damages)
     llm_result = evaluate_inspection_with_llm(inspection, damages)
     return InspectionScoreResponse(
         inspection_id=inspection_id,
@@ -281,9 +449,15 @@ async def inspection_report(inspection_id: str, user_id: UserIdDep):
 @router.get("/inspections/{inspection_id}/archive")
 async def inspection_archive(inspection_id: str, user_id: UserIdDep):
     try:
-        zip_path = create_inspection_archive(inspection_id)
+        zip_path, stream = prepare_inspection_archive(inspection_id)
     except ValueError as exc:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(exc))
     except Exception as exc:
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(exc))
-    return FileResponse(str(zip_path), media_type="application/zip", filename=f"{inspection_id}.zip")
+    if stream is None:
+        return FileResponse(str(zip_path), media_type="application/zip", filename=f"{inspection_id}.zip")
+    return StreamingResponse(
+        stream,
+        media_type="application/zip",
+        headers={"Content-Disposition": f'attachment; filename="{inspection_id}.zip"'},
+    )
@@ -0,0 +1,44 @@
+from fastapi import APIRouter, HTTPException, Query, Request, Response, status
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import FileResponse
+
+from services.photo_derivatives import (
+    FORMATS,
+    VARIANTS,
+    get_derivative,
+    negotiate_format,
+    resolve_upload_path,
+    supported_formats,
+)
+
+router = APIRouter()
+
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+
+
+@router.get("/{path:path}")
+async def get_media_variant(
+    path: str,
+    request: Request,
+    variant: str = Query(default="full"),
+    format: str | None = Query(default=None),
+):
+    if variant not in VARIANTS:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"Variante inválida: {variant}")
+    try:
+        source = await run_in_threadpool(resolve_upload_path, path)
+    except FileNotFoundError:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Archivo no encontrado")
+    fmt = format if format in supported_formats() else negotiate_format(request.headers.get("accept"))
+    try:
+        target, digest = await run_in_threadpool(get_derivative, source, variant, fmt)
+    except Exception as exc:
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(exc))
+    headers = {
+        "Cache-Control": IMMUTABLE_CACHE_CONTROL,
+        "ETag": f'"{digest}-{variant}.{FORMATS[fmt]["ext"]}"',
+        "Vary": "Accept",
+    }
+    if request.headers.get("if-none-match") == headers["ETag"]:
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    return FileResponse(str(target), media_type=FORMATS[fmt]["media_type"], headers=headers)
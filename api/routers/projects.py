@@ -7,9 +7,18 @@ from api.schemas.projects import (
     ProjectCreate,
     ProjectDetailResponse,
     ProjectResponse,
+    ProjectSummaryPage,
     ProjectUpdate,
 )
-from services.projects_service import create_project, delete_project, fetch_project_detail, fetch_projects, update_project
+from services.projects_service import (
+    create_project,
+    delete_project,
+    fetch_project_detail,
+    fetch_project_summaries,
+    fetch_projects,
+    invalidate_project_summaries,
+    update_project,
+)
 
 router = APIRouter()
 
@@ -23,12 +32,26 @@ async def list_projects(user_id: UserIdDep, archived: Optional[bool] = Query(def
     return projects
 
 
+@router.get("/summary", response_model=ProjectSummaryPage)
+async def list_project_summaries(
+    user_id: UserIdDep,
+    archived: Optional[bool] = Query(default=None),
+    limit: int = Query(default=50, ge=1, le=200),
+    offset: int = Query(default=0, ge=0),
+):
+    try:
+        return fetch_project_summaries(user_id, archived=archived, limit=limit, offset=offset)
+    except Exception as exc:
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(exc))
+
+
 @router.post("/", response_model=ProjectResponse, status_code=status.HTTP_201_CREATED)
 async def create_new_project(user_id: UserIdDep, payload: ProjectCreate):
     try:
         project = create_project(user_id, payload.name, payload.model_dump())
     except Exception as exc:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(exc))
+    invalidate_project_summaries(user_id)
     return project
 
 
@@ -38,6 +61,7 @@ async def update_existing_project(project_id: str, user_id: UserIdDep, payload:
         project = update_project(project_id, payload.model_dump(exclude_unset=True))
     except Exception as exc:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(exc))
+    invalidate_project_summaries(user_id)
     return project
 
 
@@ -58,4 +82,5 @@ async def remove_project(project_id: str, user_id: UserIdDep):
         delete_project(project_id)
     except Exception as exc:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(exc))
+    invalidate_project_summaries(user_id)
     return Response(status_code=status.HTTP_204_NO_CONTENT)
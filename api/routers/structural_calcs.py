@@ -2,28 +2,48 @@
 Endpoints para cálculos de elementos estructurales.
 Incluye pilares y vigas de hormigón, acero y madera, así como zapatas.
 """
-from fastapi import APIRouter, HTTPException, status
+from typing import Literal, Optional
+
+from fastapi import APIRouter, BackgroundTasks, File, Form, HTTPException, UploadFile, status
+from fastapi.concurrency import run_in_threadpool
 
 from api.schemas.structural_calcs import (
+    ColumnInteractionRequest,
+    ColumnInteractionResponse,
     ConcreteBeamRequest,
     ConcreteBeamResponse,
     ConcreteColumnRequest,
     ConcreteColumnResponse,
+    ContinuousBeamRequest,
     FootingRequest,
+    FrameAnalysisRequest,
     FootingResponse,
+    FootingScheduleRequest,
+    LoadCombinationRequest,
+    SteelBeamBatchRequest,
     SteelBeamRequest,
     SteelBeamResponse,
+    SteelColumnBatchRequest,
     SteelColumnRequest,
     SteelColumnResponse,
+    WoodBeamBatchRequest,
     WoodBeamRequest,
     WoodBeamResponse,
+    WoodColumnBatchRequest,
     WoodColumnRequest,
     WoodColumnResponse,
 )
+from services.structural_beam_analysis import analyze_continuous_beam, design_continuous_beam
+from services.structural_combinations import design_with_combinations
 from services.structural_concrete import calculate_concrete_beam, calculate_concrete_column
-from services.structural_footings import calculate_footing
+from services.structural_footings import calculate_footing, design_footing_schedule
+from services.structural_frame_analysis import analyze_frame, design_frame
+from services.structural_import import import_jobs, run_import_job, stage_upload
+from services.structural_interaction import check_column_interaction
 from services.structural_steel import calculate_steel_beam, calculate_steel_column
+from services.structural_steel_tables import check_steel_beams, check_steel_columns, result_rows
 from services.structural_wood import calculate_wood_beam, calculate_wood_column
+from services.structural_wood_tables import design_wood_beams, design_wood_columns
 from services.runs_service import save_run
 
 router = APIRouter()
@@ -70,6 +90,25 @@ async def concrete_column_design(payload: ConcreteColumnRequest):
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(exc)) from exc
 
 
+@router.post("/concrete/column/interaction", response_model=ColumnInteractionResponse)
+async def concrete_column_interaction(payload: ColumnInteractionRequest):
+    """Verifica un lote de solicitaciones contra la superficie P–Mx–My de la sección (en caché por sección)."""
+    try:
+        return await run_in_threadpool(
+            check_column_interaction,
+            payload.loads,
+            payload.width,
+            payload.depth,
+            payload.fc,
+            payload.fy,
+            payload.num_bars,
+            payload.bar_diameter,
+            payload.cover,
+        )
+    except (ValueError, ZeroDivisionError) as exc:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(exc)) from exc
+
+
 @router.post("/concrete/beam")
 async def concrete_beam_design(payload: ConcreteBeamRequest):
     """Diseña una viga de hormigón armado según ACI318 y guarda en historial."""
@@ -177,6 +216,48 @@ async def steel_beam_design(payload: SteelBeamRequest):
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(exc)) from exc
 
 
+@router.post("/steel/column/batch")
+async def steel_column_batch_check(payload: SteelColumnBatchRequest):
+    """Verifica un lote de pilares de acero del catálogo con las tablas de capacidad precalculadas."""
+    members = payload.members
+    try:
+        results = await run_in_threadpool(
+            check_steel_columns,
+            [member.profile_name for member in members],
+            [member.axial_load for member in members],
+            [member.moment_x for member in members],
+            [member.moment_y for member in members],
+            [member.length for member in members],
+            payload.fy,
+            payload.E,
+            [member.kx for member in members],
+            [member.ky for member in members],
+        )
+    except (ValueError, ZeroDivisionError) as exc:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(exc)) from exc
+    return {"results": result_rows(results, [member.id for member in members])}
+
+
+@router.post("/steel/beam/batch")
+async def steel_beam_batch_check(payload: SteelBeamBatchRequest):
+    """Verifica un lote de vigas de acero del catálogo con las tablas de capacidad precalculadas."""
+    members = payload.members
+    try:
+        results = await run_in_threadpool(
+            check_steel_beams,
+            [member.profile_name for member in members],
+            [member.moment for member in members],
+            [member.shear for member in members],
+            [member.span for member in members],
+            payload.fy,
+            payload.E,
+            [member.lb if member.lb is not None else member.span for member in members],
+        )
+    except (ValueError, ZeroDivisionError) as exc:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(exc)) from exc
+    return {"results": result_rows(results, [member.id for member in members])}
+
+
 # MADERA (NCh1198)
 
 
@@ -246,6 +327,58 @@ async def wood_beam_design(payload: WoodBeamRequest):
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(exc)) from exc
 
 
+@router.post("/wood/column/batch")
+async def wood_column_batch_design(payload: WoodColumnBatchRequest):
+    """Diseña un lote de pilares de madera; los elementos repetidos se calculan una sola vez."""
+    elements = [
+        {
+            "axial_load": member.axial_load,
+            "width": member.width,
+            "depth": member.depth,
+            "length": member.length,
+            "wood_type": member.wood_type,
+            "custom_fc": member.fc,
+            "custom_E": member.E,
+            "moisture_factor": member.moisture_factor,
+            "duration_factor": member.duration_factor,
+            "Kx": member.k_factor,
+            "Ky": member.k_factor,
+        }
+        for member in payload.members
+    ]
+    try:
+        results = await run_in_threadpool(design_wood_columns, elements)
+    except (ValueError, ZeroDivisionError) as exc:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(exc)) from exc
+    return {"results": [{"id": member.id, **result} for member, result in zip(payload.members, results)]}
+
+
+@router.post("/wood/beam/batch")
+async def wood_beam_batch_design(payload: WoodBeamBatchRequest):
+    """Diseña un lote de vigas de madera; los elementos repetidos se calculan una sola vez."""
+    elements = [
+        {
+            "moment": member.moment,
+            "shear": member.shear,
+            "width": member.width,
+            "height": member.height,
+            "span": member.span,
+            "wood_type": member.wood_type,
+            "custom_fm": member.fm,
+            "custom_fv": member.fv,
+            "custom_E": member.E,
+            "moisture_factor": member.moisture_factor,
+            "duration_factor": member.duration_factor,
+        }
+        for member in payload.members
+    ]
+    try:
+        results = await run_in_threadpool(design_wood_beams, elements)
+    except (ValueError, ZeroDivisionError) as exc:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(exc)) from exc
+    return {"results": [{"id": member.id, **result} for member, result in zip(payload.members, results)]}
+
+
 # ZAPATAS (ACI318)
 
 
@@ -291,3 +424,121 @@ async def footing_design(payload: FootingRequest):
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(exc)) from exc
 
 
+@router.post("/footing/schedule")
+async def footing_schedule_design(payload: FootingScheduleRequest):
+    """Dimensiona las zapatas de una tabla de reacciones y las agrupa en familias de tamaño estándar."""
+    reactions = [
+        {
+            "id": reaction.id if reaction.id is not None else str(index + 1),
+            "axial_load": reaction.axial_load,
+            "moment": reaction.moment,
+            "column_width": reaction.column_width,
+            "column_depth": reaction.column_depth,
+        }
+        for index, reaction in enumerate(payload.reactions)
+    ]
+    try:
+        return await run_in_threadpool(
+            design_footing_schedule,
+            reactions,
+            payload.soil_bearing_capacity,
+            payload.fc,
+            payload.fy,
+            payload.footing_type,
+            payload.footing_depth,
+            payload.cover,
+            payload.size_step,
+        )
+    except (ValueError, ZeroDivisionError) as exc:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(exc)) from exc
+
+
+# COMBINACIONES DE CARGA (NCh3171)
+
+
+@router.post("/combinations")
+async def load_combinations_design(payload: LoadCombinationRequest):
+    """Expande las combinaciones NCh3171 de un lote de elementos y los diseña con sus casos gobernantes."""
+    elements = [
+        {
+            "id": element.id,
+            "loads": {case: forces.model_dump() for case, forces in element.loads.items()},
+            "params": element.params,
+        }
+        for element in payload.elements
+    ]
+    try:
+        return await run_in_threadpool(
+            design_with_combinations, elements, payload.element_type, payload.combinations
+        )
+    except (ValueError, TypeError, ZeroDivisionError) as exc:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(exc)) from exc
+
+
+# VIGAS CONTINUAS
+
+
+@router.post("/beam/continuous")
+async def continuous_beam_analysis(payload: ContinuousBeamRequest):
+    """Envolventes de una viga continua con alternancia de sobrecarga y diseño opcional de cada tramo."""
+    spans = [span.model_dump() for span in payload.spans]
+    options = (payload.supports, payload.dead_factor, payload.live_factor, payload.stations)
+    try:
+        if payload.element_type is None:
+            return await run_in_threadpool(analyze_continuous_beam, spans, *options)
+        return await run_in_threadpool(design_continuous_beam, spans, payload.element_type, payload.params, *options)
+    except (ValueError, TypeError, ZeroDivisionError) as exc:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(exc)) from exc
+
+
+# MARCOS PLANOS
+
+
+@router.post("/frame")
+async def frame_analysis(payload: FrameAnalysisRequest):
+    """Analiza un marco plano (factorización reutilizada por geometría) y diseña en lote las barras con tipo."""
+    nodes = [node.model_dump() for node in payload.nodes]
+    members = [member.model_dump() for member in payload.members]
+    load_cases = {name: case.model_dump() for name, case in payload.load_cases.items()}
+    try:
+        if any(member.type is not None for member in payload.members):
+            return await run_in_threadpool(
+                design_frame, nodes, members, payload.supports, load_cases, payload.combinations, payload.stations
+            )
+        return await run_in_threadpool(analyze_frame, nodes, members, payload.supports, load_cases, payload.stations)
+    except (ValueError, TypeError, ZeroDivisionError) as exc:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(exc)) from exc
+
+
+# IMPORTACIÓN DE TABLAS (CSV/XLSX)
+
+
+@router.post("/import")
+async def import_element_table_upload(
+    background_tasks: BackgroundTasks,
+    project_id: str = Form(..., alias="projectId"),
+    user_id: str = Form(..., alias="userId"),
+    element_type: Literal["steel_column", "steel_beam", "wood_column", "wood_beam"] = Form(..., alias="elementType"),
+    fy: Optional[float] = Form(None, gt=0),
+    E: Optional[float] = Form(None, gt=0),
+    file: UploadFile = File(...),
+):
+    """Importa una tabla de elementos en segundo plano; el avance se consulta en ``/import/{job_id}``."""
+    try:
+        path = await stage_upload(file)
+    except ValueError as exc:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(exc)) from exc
+    filename = file.filename or "import.csv"
+    options = {name: value for name, value in (("fy", fy), ("E", E)) if value is not None}
+    job = import_jobs.create(element_type, filename, path.stat().st_size)
+    background_tasks.add_task(run_import_job, job["job_id"], path, filename, element_type, project_id, user_id, options)
+    return job
+
+
+@router.get("/import/{job_id}")
+async def import_progress(job_id: str):
+    """Avance de una importación: bytes y filas procesadas, filas guardadas y errores por fila."""
+    job = import_jobs.get(job_id)
+    if not job:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Importación no encontrada")
+    return job
@@ -23,6 +23,7 @@ class CalculationRun(BaseModel):
     project_id: str
     element_type: str
     created_at: Optional[datetime] = None
+    updated_at: Optional[datetime] = None
     input_json: Dict[str, Any]
     result_json: Dict[str, Any]
     is_critical: Optional[bool] = False  # Flag para elemento crítico en reportes
@@ -1,4 +1,4 @@
-from typing import List, Optional
+from typing import List, Literal, Optional
 
 from pydantic import BaseModel, Field, field_validator
 from api.schemas.structural_calcs import (
@@ -87,8 +87,12 @@ class SnowResponse(BaseModel):
 
 
 class SeismicStory(BaseModel):
+    model_config = {"populate_by_name": True}
+
     height: float = Field(..., gt=0)
     weight: float = Field(..., gt=0)
+    stiffness_x: Optional[float] = Field(None, alias="stiffnessX", gt=0, description="Rigidez de entrepiso X (kN/m)")
+    stiffness_y: Optional[float] = Field(None, alias="stiffnessY", gt=0, description="Rigidez de entrepiso Y (kN/m)")
 
 
 class SeismicRequest(BaseModel):
@@ -99,10 +103,11 @@ class SeismicRequest(BaseModel):
     soil: str
     rs: float = Field(..., gt=0)
     ps: float = Field(..., gt=0)
-    tx: float = Field(..., gt=0)
-    ty: float = Field(..., gt=0)
+    tx: Optional[float] = Field(None, gt=0, description="Periodo X (s); si se omite, del análisis modal")
+    ty: Optional[float] = Field(None, gt=0, description="Periodo Y (s); si se omite, del análisis modal")
     r0: float = Field(..., gt=0)
     stories: List[SeismicStory]
+    modal_combination: Literal["CQC", "SRSS"] = Field("CQC", alias="modalCombination")
 
     @field_validator("stories")
     @classmethod
@@ -140,6 +145,9 @@ class SeismicResponse(BaseModel):
     Qbasy: float
     spectrum: List[SeismicSpectrumPoint]
     floor_forces: List[SeismicFloorForce] = Field(..., alias="floorForces")
+    tx: Optional[float] = None
+    ty: Optional[float] = None
+    modal: Optional[dict] = None
 
 
 class LiveLoadExport(BaseModel):
@@ -44,8 +44,81 @@ class InspectionScoreResponse(BaseModel):
     model_config = ConfigDict(extra="allow")
 
 
+class InspectionRiskRow(BaseModel):
+    rank: int
+    id: str
+    structure_name: str | None = None
+    location: str | None = None
+    inspection_date: date | None = None
+    overall_condition: str | None = None
+    damage_count: int
+    high_severity_count: int
+    max_damage_score: float
+    deterministic_score: float
+
+
+class DamageRiskRow(BaseModel):
+    id: str
+    inspection_id: str | None = None
+    structure: str | None = None
+    location: str | None = None
+    damage_type: str | None = None
+    damage_cause: str | None = None
+    severity: str | None = None
+    extent: str | None = None
+    deterministic_score: float
+
+
+class ProjectInspectionRiskResponse(BaseModel):
+    project_id: str
+    inspections: list[InspectionRiskRow]
+    damages: list[DamageRiskRow]
+
+
+class HeatmapMatrix(BaseModel):
+    rows: list[str]
+    columns: list[str]
+    values: list[list[int]]
+
+
+class DamageTimeSeries(BaseModel):
+    periods: list[str]
+    series: dict[str, list[int]]
+    total: list[int]
+
+
+class ProjectInspectionAnalyticsResponse(BaseModel):
+    project_id: str
+    inspection_count: int
+    total_damages: int
+    heatmaps: dict[str, HeatmapMatrix]
+    time_series: DamageTimeSeries
+    breakdowns: dict[str, dict[str, int]]
+    refreshed_at: float
+
+
 class PhotoUploadResponse(BaseModel):
     url: str
+    job_id: str | None = None
+    status: Literal["pending", "done", "error"] = "done"
+
+
+class PhotoJobResponse(BaseModel):
+    job_id: str
+    url: str
+    status: Literal["pending", "done", "error"]
+    error: str | None = None
+    width: int | None = None
+    height: int | None = None
+    submitted_at: float | None = None
+    finished_at: float | None = None
+
+
+class PhotoJobsProgressResponse(BaseModel):
+    total: int
+    finished: int
+    failed: int
+    jobs: list[PhotoJobResponse]
 
 
 class DamageBase(BaseModel):
@@ -88,6 +161,34 @@ class DamagePhotoResponse(BaseModel):
     model_config = ConfigDict(extra="allow")
 
 
+class BulkPhotoResult(BaseModel):
+    filename: str
+    status: Literal["ok", "error"]
+    photo: DamagePhotoResponse | None = None
+    error: str | None = None
+
+
+class BulkPhotoUploadResponse(BaseModel):
+    damage_id: str
+    uploaded: int
+    failed: int
+    results: list[BulkPhotoResult]
+
+
+class DamageWithPhotosResponse(DamageResponse):
+    photos: list[DamagePhotoResponse] = []
+
+
+class DamagePhotoCreate(BaseModel):
+    project_id: str
+    inspection_id: str
+    damage_id: str
+    photo_url: str
+    comments: str | None = None
+
+    model_config = ConfigDict(extra="allow")
+
+
 class DamagePhotoUpdate(BaseModel):
     comments: str | None = None
 
@@ -177,3 +278,49 @@ class DocumentUpdate(BaseModel):
     notes: str | None = None
 
     model_config = ConfigDict(extra="allow")
+
+
+class InspectionFullResponse(InspectionResponse):
+    damages: list[DamageWithPhotosResponse] = []
+    tests: list[TestResponse] = []
+    documents: list[DocumentResponse] = []
+
+
+SyncEntityLiteral = Literal["inspection", "damage", "damage_photo", "test", "document"]
+
+
+class SyncChange(BaseModel):
+    entity: SyncEntityLiteral
+    op: Literal["create", "update", "delete"]
+    id: str
+    version: dict[str, int]
+    data: dict[str, Any] = Field(default_factory=dict)
+
+
+class SyncChangeset(BaseModel):
+    client_id: str
+    changes: list[SyncChange]
+
+
+class SyncApplied(BaseModel):
+    entity: SyncEntityLiteral
+    id: str
+    op: Literal["create", "update", "delete"]
+    version: dict[str, int]
+
+
+class SyncConflict(BaseModel):
+    entity: SyncEntityLiteral
+    id: str
+    op: Literal["create", "update", "delete"]
+    reason: Literal["concurrent", "missing", "missing_parent", "invalid"]
+    detail: str | None = None
+    server_version: dict[str, int] | None = None
+    server_record: dict[str, Any] | None = None
+
+
+class SyncResponse(BaseModel):
+    applied: list[SyncApplied]
+    skipped: list[SyncApplied]
+    conflicts: list[SyncConflict]
+    affected_inspections: list[str]
@@ -64,3 +64,33 @@ class ProjectDetailResponse(BaseModel):
     payments: list[PaymentResponse]
     metrics: ProjectMetrics
     important_dates: ProjectImportantDates
+
+
+class ProjectSummary(BaseModel):
+    project_id: str
+    name: str
+    status: Optional[str] = None
+    is_archived: bool = False
+    budget: float = 0
+    start_date: Optional[str] = None
+    end_date: Optional[str] = None
+    updated_at: Optional[str] = None
+    total_tasks: int = 0
+    completed_tasks: int = 0
+    pending_tasks: int = 0
+    overdue_tasks: int = 0
+    completion_pct: float = 0
+    next_task_start: Optional[str] = None
+    next_task_due: Optional[str] = None
+    payments_facturado: float = 0
+    payments_pagado: float = 0
+    payments_saldo: float = 0
+
+    model_config = ConfigDict(from_attributes=True)
+
+
+class ProjectSummaryPage(BaseModel):
+    items: list[ProjectSummary]
+    total: int
+    limit: int
+    offset: int
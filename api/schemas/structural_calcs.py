@@ -5,7 +5,7 @@ Schemas para cálculos estructurales de elementos:
 - Pilares y vigas de madera (NCh1198)
 - Zapatas de hormigón (ACI318)
 """
-from typing import Optional
+from typing import Any, Dict, List, Literal, Optional
 from pydantic import BaseModel, Field
 
 
@@ -61,6 +61,7 @@ class ConcreteColumnResponse(BaseModel):
     # Capacidad
     axial_capacity: float = Field(..., alias="axialCapacity", description="Capacidad axial (kN)")
     axial_capacity_ratio: float = Field(..., alias="axialCapacityRatio", description="Ratio de capacidad axial")
+    interaction_ratio: Optional[float] = Field(None, alias="interactionRatio", description="Ratio de interacción biaxial P–Mx–My")
 
     # Diseño de refuerzo
     longitudinal_steel: LongitudinalSteel = Field(..., alias="longitudinalSteel")
@@ -76,6 +77,34 @@ class ConcreteColumnResponse(BaseModel):
     is_slender: bool = Field(..., alias="isSlender", description="¿Es columna esbelta?")
 
 
+class ColumnInteractionRequest(BaseModel):
+    """Verificación de un lote de solicitaciones contra la superficie P–Mx–My de una sección."""
+    model_config = {"populate_by_name": True}
+
+    width: float = Field(..., gt=0, description="Ancho de la sección (cm)")
+    depth: float = Field(..., gt=0, description="Largo de la sección (cm)")
+    cover: float = Field(4.0, gt=0, description="Recubrimiento (cm)")
+    fc: float = Field(..., gt=0, description="Resistencia del hormigón (MPa)")
+    fy: float = Field(..., gt=0, description="Límite de fluencia del acero (MPa)")
+    num_bars: int = Field(..., alias="numBars", ge=4, description="Número de barras en el perímetro")
+    bar_diameter: float = Field(20, alias="barDiameter", gt=0, description="Diámetro de barras (mm)")
+    loads: List[List[float]] = Field(
+        ..., min_length=1, max_length=100000, description="Solicitaciones [P (kN), Mx (kN·m), My (kN·m)]"
+    )
+
+
+class ColumnInteractionResponse(BaseModel):
+    """Razones demanda/capacidad sobre la superficie de interacción."""
+    model_config = {"populate_by_name": True}
+
+    ratios: List[float] = Field(..., description="Razón demanda/capacidad por solicitación")
+    max_ratio: float = Field(..., alias="maxRatio", description="Razón máxima")
+    governing_index: int = Field(..., alias="governingIndex", description="Índice de la solicitación gobernante")
+    phi_pn_max: float = Field(..., alias="phiPnMax", description="Compresión máxima de diseño (kN)")
+    phi_pn_tension: float = Field(..., alias="phiPnTension", description="Tracción de diseño (kN, negativa)")
+    passes: bool = Field(..., description="¿Todas las solicitaciones dentro de la superficie?")
+
+
 # ============================================================================
 # VIGAS DE HORMIGÓN ARMADO (ACI318)
 # ============================================================================
@@ -258,6 +287,50 @@ class SteelBeamResponse(BaseModel):
     check_status: str = Field(..., alias="checkStatus", description="Estado de verificación")
 
 
+# ============================================================================
+# VERIFICACIÓN MASIVA DE ACERO (TABLAS DE CAPACIDAD)
+# ============================================================================
+
+class SteelColumnMember(BaseModel):
+    """Pilar de acero con perfil del catálogo."""
+    model_config = {"populate_by_name": True}
+
+    id: Optional[str] = Field(None, description="Identificador del elemento")
+    profile_name: str = Field(..., alias="profileName", description="Nombre del perfil")
+    axial_load: float = Field(..., alias="axialLoad", description="Carga axial (kN)")
+    moment_x: float = Field(0.0, alias="momentX", description="Momento flector X (kN·m)")
+    moment_y: float = Field(0.0, alias="momentY", description="Momento flector Y (kN·m)")
+    length: float = Field(..., gt=0, description="Altura del pilar (m)")
+    kx: float = Field(1.0, ge=0.5, le=2.0, description="Factor K eje X")
+    ky: float = Field(1.0, ge=0.5, le=2.0, description="Factor K eje Y")
+
+
+class SteelColumnBatchRequest(BaseModel):
+    """Lote de pilares de acero verificados con las tablas de capacidad."""
+    fy: float = Field(250.0, gt=0, description="Límite de fluencia (MPa)")
+    E: float = Field(200000.0, gt=0, description="Módulo de elasticidad (MPa)")
+    members: List[SteelColumnMember] = Field(..., min_length=1, max_length=50000)
+
+
+class SteelBeamMember(BaseModel):
+    """Viga de acero con perfil del catálogo."""
+    model_config = {"populate_by_name": True}
+
+    id: Optional[str] = Field(None, description="Identificador del elemento")
+    profile_name: str = Field(..., alias="profileName", description="Nombre del perfil")
+    moment: float = Field(..., description="Momento máximo (kN·m)")
+    shear: float = Field(..., description="Cortante máximo (kN)")
+    span: float = Field(..., gt=0, description="Luz de la viga (m)")
+    lb: Optional[float] = Field(None, alias="Lb", gt=0, description="Longitud no arriostrada (m)")
+
+
+class SteelBeamBatchRequest(BaseModel):
+    """Lote de vigas de acero verificadas con las tablas de capacidad."""
+    fy: float = Field(250.0, gt=0, description="Límite de fluencia (MPa)")
+    E: float = Field(200000.0, gt=0, description="Módulo de elasticidad (MPa)")
+    members: List[SteelBeamMember] = Field(..., min_length=1, max_length=50000)
+
+
 # ============================================================================
 # PILARES DE MADERA (NCh1198)
 # ============================================================================
@@ -365,6 +438,55 @@ class WoodBeamResponse(BaseModel):
     check_status: str = Field(..., alias="checkStatus", description="Estado de verificación")
 
 
+# ============================================================================
+# DISEÑO MASIVO DE MADERA (NCh1198)
+# ============================================================================
+
+class WoodColumnMember(BaseModel):
+    """Pilar de madera de un lote."""
+    model_config = {"populate_by_name": True}
+
+    id: Optional[str] = Field(None, description="Identificador del elemento")
+    axial_load: float = Field(..., alias="axialLoad", description="Carga axial (kN)")
+    width: float = Field(..., gt=0, description="Ancho (cm)")
+    depth: float = Field(..., gt=0, description="Profundidad (cm)")
+    length: float = Field(..., gt=0, description="Altura (m)")
+    wood_type: Optional[str] = Field(None, alias="woodType", description="Tipo de madera")
+    fc: Optional[float] = Field(None, description="Resistencia a compresión paralela (MPa)")
+    E: Optional[float] = Field(None, description="Módulo de elasticidad (MPa)")
+    moisture_factor: float = Field(1.0, alias="moistureFactor", ge=0.5, le=1.0, description="Factor de humedad")
+    duration_factor: float = Field(1.0, alias="durationFactor", ge=0.5, le=1.5, description="Factor de duración")
+    k_factor: float = Field(1.0, alias="kFactor", ge=0.5, le=2.0, description="Factor de longitud efectiva")
+
+
+class WoodColumnBatchRequest(BaseModel):
+    """Lote de pilares de madera; los elementos idénticos se calculan una vez."""
+    members: List[WoodColumnMember] = Field(..., min_length=1, max_length=50000)
+
+
+class WoodBeamMember(BaseModel):
+    """Viga de madera de un lote."""
+    model_config = {"populate_by_name": True}
+
+    id: Optional[str] = Field(None, description="Identificador del elemento")
+    moment: float = Field(..., description="Momento máximo (kN·m)")
+    shear: float = Field(..., description="Cortante máximo (kN)")
+    width: float = Field(..., gt=0, description="Ancho (cm)")
+    height: float = Field(..., gt=0, description="Altura (cm)")
+    span: float = Field(..., gt=0, description="Luz (m)")
+    wood_type: Optional[str] = Field(None, alias="woodType", description="Tipo de madera")
+    fm: Optional[float] = Field(None, description="Resistencia a flexión (MPa)")
+    fv: Optional[float] = Field(None, description="Resistencia al corte (MPa)")
+    E: Optional[float] = Field(None, description="Módulo de elasticidad (MPa)")
+    moisture_factor: float = Field(1.0, alias="moistureFactor", ge=0.5, le=1.0)
+    duration_factor: float = Field(1.0, alias="durationFactor", ge=0.5, le=1.5)
+
+
+class WoodBeamBatchRequest(BaseModel):
+    """Lote de vigas de madera; los elementos idénticos se calculan una vez."""
+    members: List[WoodBeamMember] = Field(..., min_length=1, max_length=50000)
+
+
 # ============================================================================
 # ZAPATAS DE HORMIGÓN (ACI318)
 # ============================================================================
@@ -431,4 +553,164 @@ class FootingResponse(BaseModel):
     punching_shear_ratio: float = Field(..., alias="punchingShearRatio", description="Ratio punzonamiento")
     beam_shear_ratio: float = Field(..., alias="beamShearRatio", description="Ratio cortante viga")
 
-    passes: bool = Field(..., description="¿Cumple el diseño?")
\ No newline at end of file
+    passes: bool = Field(..., description="¿Cumple el diseño?")
+
+
+class FootingReaction(BaseModel):
+    """Reacción de servicio de una columna para el cuadro de zapatas."""
+    model_config = {"populate_by_name": True}
+
+    id: Optional[str] = Field(None, description="Identificador de la columna")
+    axial_load: float = Field(..., alias="axialLoad", gt=0, description="Carga axial (kN)")
+    moment: float = Field(0.0, description="Momento (kN·m)")
+    column_width: float = Field(..., alias="columnWidth", gt=0, description="Ancho columna/muro (cm)")
+    column_depth: Optional[float] = Field(None, alias="columnDepth", gt=0, description="Profundidad columna (cm)")
+
+
+class FootingScheduleRequest(BaseModel):
+    """Tabla de reacciones para diseñar y agrupar zapatas en familias de tamaño."""
+    model_config = {"populate_by_name": True}
+
+    footing_type: str = Field("isolated", alias="footingType", description="Tipo: isolated o continuous")
+    reactions: List[FootingReaction] = Field(..., min_length=1, max_length=50000)
+    soil_bearing_capacity: float = Field(..., alias="soilBearingCapacity", gt=0, description="Capacidad portante (kPa)")
+    fc: float = Field(..., gt=0, description="Resistencia hormigón (MPa)")
+    fy: float = Field(..., gt=0, description="Fluencia acero (MPa)")
+    footing_depth: float = Field(60.0, alias="footingDepth", gt=0, description="Altura de las zapatas (cm)")
+    cover: float = Field(7.5, gt=0, description="Recubrimiento (cm)")
+    size_step: float = Field(0.25, alias="sizeStep", gt=0, description="Módulo de las familias de tamaño (m)")
+
+# ============================================================================
+# COMBINACIONES DE CARGA (NCh3171)
+# ============================================================================
+
+class ServiceForces(BaseModel):
+    """Esfuerzos de un estado de carga de servicio."""
+    model_config = {"populate_by_name": True}
+
+    axial_load: float = Field(0.0, alias="axialLoad", description="Carga axial (kN)")
+    moment_x: float = Field(0.0, alias="momentX", description="Momento flector eje X (kN·m)")
+    moment_y: float = Field(0.0, alias="momentY", description="Momento flector eje Y (kN·m)")
+    shear_x: float = Field(0.0, alias="shearX", description="Cortante eje X (kN)")
+    shear_y: float = Field(0.0, alias="shearY", description="Cortante eje Y (kN)")
+
+
+class LoadCombinationElement(BaseModel):
+    """Elemento con sus esfuerzos por estado de carga (D, L, Lr, S, Wx, Wy, Ex, Ey)."""
+    id: str = Field(..., description="Identificador del elemento")
+    loads: Dict[str, ServiceForces] = Field(..., description="Esfuerzos de servicio por estado de carga")
+    params: Dict[str, Any] = Field(default_factory=dict, description="Geometría y materiales (argumentos del calculador)")
+
+
+class LoadCombinationRequest(BaseModel):
+    """Envolventes NCh3171 de un lote de elementos y, opcionalmente, su diseño con los casos gobernantes."""
+    model_config = {"populate_by_name": True}
+
+    element_type: Optional[
+        Literal["rc_column", "rc_beam", "steel_column", "steel_beam", "wood_column", "wood_beam"]
+    ] = Field(None, alias="elementType", description="Tipo de elemento a diseñar (omitir para solo envolventes)")
+    combinations: Optional[Dict[str, Dict[str, float]]] = Field(
+        None, description="Combinaciones propias {nombre: {estado: factor}}; por defecto NCh3171"
+    )
+    elements: List[LoadCombinationElement] = Field(..., min_length=1, max_length=20000)
+
+
+# ============================================================================
+# ANÁLISIS DE VIGAS CONTINUAS
+# ============================================================================
+
+class BeamPointLoad(BaseModel):
+    """Carga puntual de servicio sobre un tramo."""
+    position: float = Field(..., ge=0, description="Distancia desde el apoyo izquierdo del tramo (m)")
+    dead: float = Field(0.0, description="Carga muerta (kN, hacia abajo)")
+    live: float = Field(0.0, description="Sobrecarga (kN, hacia abajo)")
+
+
+class ContinuousBeamSpan(BaseModel):
+    """Tramo de viga continua con sus cargas de servicio."""
+    model_config = {"populate_by_name": True}
+
+    length: float = Field(..., gt=0, description="Luz del tramo (m)")
+    dead_load: float = Field(0.0, alias="deadLoad", description="Carga muerta uniforme (kN/m)")
+    live_load: float = Field(0.0, alias="liveLoad", description="Sobrecarga uniforme (kN/m)")
+    point_loads: List[BeamPointLoad] = Field(default_factory=list, alias="pointLoads")
+    inertia: float = Field(1.0, gt=0, description="Inercia relativa del tramo")
+    params: Dict[str, Any] = Field(default_factory=dict, description="Sección propia del tramo (sobrescribe la común)")
+
+
+class ContinuousBeamRequest(BaseModel):
+    """Viga continua a analizar con alternancia de sobrecarga y, opcionalmente, diseñar por tramo."""
+    model_config = {"populate_by_name": True}
+
+    spans: List[ContinuousBeamSpan] = Field(..., min_length=1, max_length=500)
+    supports: Optional[List[Literal["pinned", "roller", "fixed", "free"]]] = Field(
+        None, description="Apoyo en cada nudo (tramos + 1); por defecto simplemente apoyados"
+    )
+    dead_factor: float = Field(1.2, alias="deadFactor", gt=0, description="Factor de carga muerta")
+    live_factor: float = Field(1.6, alias="liveFactor", ge=0, description="Factor de sobrecarga")
+    stations: int = Field(21, ge=2, le=201, description="Estaciones de cálculo por tramo")
+    element_type: Optional[Literal["rc_beam", "steel_beam", "wood_beam"]] = Field(
+        None, alias="elementType", description="Tipo de viga a diseñar (omitir para solo envolventes)"
+    )
+    params: Dict[str, Any] = Field(default_factory=dict, description="Sección y materiales (argumentos del calculador)")
+
+
+# ============================================================================
+# ANÁLISIS DE MARCOS PLANOS
+# ============================================================================
+
+class FrameNode(BaseModel):
+    """Nudo del marco."""
+    id: str = Field(..., description="Identificador del nudo")
+    x: float = Field(..., description="Coordenada horizontal (m)")
+    y: float = Field(..., description="Coordenada vertical (m)")
+
+
+class FrameMember(BaseModel):
+    """Barra del marco con su sección y, opcionalmente, su tipo de diseño."""
+    model_config = {"populate_by_name": True}
+
+    id: str = Field(..., description="Identificador de la barra")
+    start: str = Field(..., description="Nudo inicial")
+    end: str = Field(..., description="Nudo final")
+    E: Optional[float] = Field(None, gt=0, description="Módulo de elasticidad (MPa)")
+    area: Optional[float] = Field(None, gt=0, description="Área (cm²); si se omite se usa la sección de params")
+    inertia: Optional[float] = Field(None, gt=0, description="Inercia en el plano (cm⁴)")
+    type: Optional[
+        Literal["rc_column", "rc_beam", "steel_column", "steel_beam", "wood_column", "wood_beam"]
+    ] = Field(None, description="Tipo de elemento a diseñar")
+    params: Dict[str, Any] = Field(default_factory=dict, description="Sección y materiales (argumentos del calculador)")
+
+
+class FrameNodalLoad(BaseModel):
+    """Carga aplicada en un nudo (ejes globales)."""
+    node: str = Field(..., description="Nudo cargado")
+    fx: float = Field(0.0, description="Fuerza horizontal (kN)")
+    fy: float = Field(0.0, description="Fuerza vertical (kN)")
+    mz: float = Field(0.0, description="Momento (kN·m, antihorario)")
+
+
+class FrameMemberLoad(BaseModel):
+    """Carga uniforme transversal sobre una barra (hacia -y local)."""
+    member: str = Field(..., description="Barra cargada")
+    w: float = Field(..., description="Carga uniforme (kN/m)")
+
+
+class FrameLoadCase(BaseModel):
+    """Cargas de servicio de un estado de carga."""
+    nodal: List[FrameNodalLoad] = Field(default_factory=list)
+    members: List[FrameMemberLoad] = Field(default_factory=list)
+
+
+class FrameAnalysisRequest(BaseModel):
+    """Marco plano a analizar y, si sus barras tienen tipo, a diseñar con las combinaciones de carga."""
+    model_config = {"populate_by_name": True}
+
+    nodes: List[FrameNode] = Field(..., min_length=2, max_length=20000)
+    members: List[FrameMember] = Field(..., min_length=1, max_length=40000)
+    supports: Dict[str, Literal["fixed", "pinned", "roller"]] = Field(..., description="Apoyo por nudo")
+    load_cases: Dict[str, FrameLoadCase] = Field(..., alias="loadCases", description="Cargas por estado (D, L, Ex, ...)")
+    combinations: Optional[Dict[str, Dict[str, float]]] = Field(
+        None, description="Combinaciones propias {nombre: {estado: factor}}; por defecto NCh3171"
+    )
+    stations: int = Field(11, ge=2, le=101, description="Estaciones de cálculo por barra")
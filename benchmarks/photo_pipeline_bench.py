@@ -0,0 +1,84 @@
+"""Mide el throughput (imágenes/s) del procesamiento de fotos de inspección.
+
+Uso: python -m benchmarks.photo_pipeline_bench [cantidad] [workers]
+
+Compara el camino anterior (decodificación completa + LANCZOS en el request) con
+``render_photo`` (``draft`` + EXIF) en serie y con ``PhotoPipeline`` sobre un pool de procesos.
+"""
+from __future__ import annotations
+
+import asyncio
+import shutil
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from PIL import Image
+
+from services.media_service import render_photo
+from services.photo_pipeline import PhotoPipeline
+from services.storage import LocalDiskStorage
+
+
+def _sample_jpeg(path: Path, size=(4000, 3000)) -> None:
+    # Gradient noise keeps the JPEG close to a real photo in decode cost.
+    image = Image.effect_noise(size, 64).convert("RGB")
+    image.save(path, format="JPEG", quality=90)
+
+
+def _legacy(source: Path, target: Path) -> None:
+    image = Image.open(source)
+    image = image.convert("RGB")
+    image.thumbnail((1024, 768), Image.LANCZOS)
+    image.save(target, format="JPEG", quality=78, optimize=True)
+
+
+def main(count: int = 24, workers: int | None = None) -> None:
+    workdir = Path(tempfile.mkdtemp(prefix="photo-bench-"))
+    try:
+        source = workdir / "source.jpg"
+        _sample_jpeg(source)
+        out_dir = workdir / "out"
+        out_dir.mkdir()
+
+        start = time.perf_counter()
+        for index in range(count):
+            _legacy(source, out_dir / f"legacy-{index}.jpg")
+        legacy = count / (time.perf_counter() - start)
+
+        start = time.perf_counter()
+        for index in range(count):
+            render_photo(source, out_dir / f"draft-{index}.jpg")
+        serial = count / (time.perf_counter() - start)
+
+        storage = LocalDiskStorage(workdir / "store")
+        pipeline = PhotoPipeline(max_workers=workers, storage=storage) if workers else PhotoPipeline(storage=storage)
+        staged = []
+        for index in range(count):
+            staging = workdir / f"staging-{index}"
+            shutil.copyfile(source, staging)
+            staged.append(staging)
+
+        async def run_pool() -> list[dict]:
+            # Distinct digests so content deduplication does not skip any render.
+            jobs = [await pipeline.submit_path(staging, f"bench-{index}") for index, staging in enumerate(staged)]
+            return await pipeline.wait_for([job["job_id"] for job in jobs])
+
+        start = time.perf_counter()
+        jobs = asyncio.run(run_pool())
+        pooled = count / (time.perf_counter() - start)
+        pipeline.shutdown(wait=True)
+        failed = sum(1 for job in jobs if job and job["status"] == "error")
+
+        print(f"imagenes: {count} (12 MP JPEG), workers: {pipeline.max_workers}, fallidas: {failed}")
+        print(f"legacy (decodificación completa):  {legacy:8.2f} img/s")
+        print(f"render_photo en serie (draft):     {serial:8.2f} img/s")
+        print(f"PhotoPipeline (pool de procesos):  {pooled:8.2f} img/s")
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    args = [int(value) for value in sys.argv[1:3]]
+    main(*args)
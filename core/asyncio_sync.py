@@ -0,0 +1,15 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from typing import Awaitable, TypeVar
+
+T = TypeVar("T")
+
+
+def run_coroutine_sync(coro: Awaitable[T]) -> T:
+    """Ejecuta una corrutina desde código síncrono, incluso si el hilo actual ya tiene un event loop."""
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return asyncio.run(coro)
+    with ThreadPoolExecutor(max_workers=1) as pool:
+        return pool.submit(asyncio.run, coro).result()
@@ -11,3 +11,12 @@ PAYPAL_CLIENT_SECRET = os.getenv("PAYPAL_CLIENT_SECRET","")
 PAYPAL_WEBHOOK_ID = os.getenv("PAYPAL_WEBHOOK_ID","")
 PAYPAL_ENV = os.getenv("PAYPAL_ENV","sandbox")
 SUPABASE_SERVICE_KEY = os.getenv("SUPABASE_SERVICE_KEY","")
+PROJECT_SUMMARY_CACHE_TTL = float(os.getenv("PROJECT_SUMMARY_CACHE_TTL","15"))
+UPLOADS_DIR = os.getenv("UPLOADS_DIR","uploads")
+STORAGE_BACKEND = os.getenv("STORAGE_BACKEND","local")
+S3_ENDPOINT_URL = os.getenv("S3_ENDPOINT_URL","")
+S3_BUCKET = os.getenv("S3_BUCKET","")
+S3_ACCESS_KEY = os.getenv("S3_ACCESS_KEY","")
+S3_SECRET_KEY = os.getenv("S3_SECRET_KEY","")
+S3_REGION = os.getenv("S3_REGION","us-east-1")
+S3_PUBLIC_URL = os.getenv("S3_PUBLIC_URL","")
@@ -23,4 +23,11 @@ apiClient.interceptors.response.use((response) => response, (error) => {
     }
     return Promise.reject(error);
 });
+export const mediaVariantUrl = (url, variant) => {
+    if (!url)
+        return "";
+    if (!url.startsWith("/uploads/"))
+        return url;
+    return `/media${url.slice("/uploads".length)}?variant=${variant}`;
+};
 export default apiClient;
@@ -31,4 +31,12 @@ apiClient.interceptors.response.use(
   }
 );
 
+export type MediaVariant = "thumb" | "medium" | "full";
+
+export const mediaVariantUrl = (url: string | null | undefined, variant: MediaVariant) => {
+  if (!url) return "";
+  if (!url.startsWith("/uploads/")) return url;
+  return `/media${url.slice("/uploads".length)}?variant=${variant}`;
+};
+
 export default apiClient;
@@ -72,7 +72,13 @@ export interface ProjectInspectionTest {
     result_summary: string;
     attachment_url?: string | null;
 }
+export interface ProjectInspectionFull extends ProjectInspection {
+    damages: ProjectInspectionDamage[];
+    tests: ProjectInspectionTest[];
+    documents: InspectionDocument[];
+}
 export declare const useProjectInspections: (projectId?: string) => import("@tanstack/react-query").UseQueryResult<ProjectInspection[], Error>;
 export declare const useProjectInspectionDamages: (projectId?: string, inspectionId?: string) => import("@tanstack/react-query").UseQueryResult<ProjectInspectionDamage[], Error>;
 export declare const useProjectInspectionTests: (projectId?: string, inspectionId?: string) => import("@tanstack/react-query").UseQueryResult<ProjectInspectionTest[], Error>;
 export declare const useProjectInspectionDocuments: (projectId?: string, inspectionId?: string) => import("@tanstack/react-query").UseQueryResult<InspectionDocument[], Error>;
+export declare const useInspectionFull: (inspectionId?: string) => import("@tanstack/react-query").UseQueryResult<ProjectInspectionFull, Error>;
@@ -42,3 +42,11 @@ export const useProjectInspectionDocuments = (projectId, inspectionId) => useQue
         return data;
     },
 });
+export const useInspectionFull = (inspectionId) => useQuery({
+    queryKey: ["inspection-full", inspectionId],
+    enabled: Boolean(inspectionId),
+    queryFn: async () => {
+        const { data } = await apiClient.get(`/inspections/${inspectionId}/full`);
+        return data;
+    },
+});
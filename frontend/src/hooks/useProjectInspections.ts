@@ -69,6 +69,12 @@ export interface ProjectInspectionTest {
   attachment_url?: string | null;
 }
 
+export interface ProjectInspectionFull extends ProjectInspection {
+  damages: ProjectInspectionDamage[];
+  tests: ProjectInspectionTest[];
+  documents: InspectionDocument[];
+}
+
 export const useProjectInspections = (projectId?: string) =>
   useQuery<ProjectInspection[]>({
     queryKey: ["project-inspections", projectId],
@@ -124,3 +130,13 @@ export const useProjectInspectionDocuments = (projectId?: string, inspectionId?:
       return data;
     },
   });
+
+export const useInspectionFull = (inspectionId?: string) =>
+  useQuery<ProjectInspectionFull>({
+    queryKey: ["inspection-full", inspectionId],
+    enabled: Boolean(inspectionId),
+    queryFn: async () => {
+      const { data } = await apiClient.get<ProjectInspectionFull>(`/inspections/${inspectionId}/full`);
+      return data;
+    },
+  });
@@ -23,6 +23,7 @@ export interface ConcreteColumnRequest {
 export interface ConcreteColumnResponse {
   axialCapacity: number;
   axialCapacityRatio: number;
+  interactionRatio: number;
   longitudinalSteel: {
     numBars: number;
     barDiameter: number;
@@ -9,9 +9,9 @@ import VisibilityIcon from "@mui/icons-material/Visibility";
 import { Link as RouterLink, useParams } from "react-router-dom";
 import dayjs from "dayjs";
 import { useMutation, useQueryClient } from "@tanstack/react-query";
-import { useProjectInspectionDamages, useProjectInspectionDocuments, useProjectInspectionTests, useProjectInspections, } from "../hooks/useProjectInspections";
+import { useInspectionFull, } from "../hooks/useProjectInspections";
 import { DAMAGE_CAUSES, DAMAGE_SEVERITIES, DAMAGE_TYPES } from "../constants/inspectionCatalog";
-import apiClient from "../api/client";
+import apiClient, { mediaVariantUrl } from "../api/client";
 const defaultDamageForm = {
     structure: "",
     location: "",
@@ -88,16 +88,17 @@ const InspectionDetailPage = () => {
         const { data } = await apiClient.post("/inspection-photos", form);
         return data.url;
     };
-    const { data: inspections = [], isLoading: inspectionsLoading } = useProjectInspections(projectId);
-    const inspection = useMemo(() => inspections.find((item) => item.id === inspectionId), [inspections, inspectionId]);
-    const { data: damages = [] } = useProjectInspectionDamages(projectId, inspectionId);
-    const { data: tests = [] } = useProjectInspectionTests(projectId, inspectionId);
-    const { data: documents = [] } = useProjectInspectionDocuments(projectId, inspectionId);
+    // One request for the whole tree; the browser revalidates it with the ETag (304 when unchanged).
+    const { data: inspection, isLoading: inspectionsLoading } = useInspectionFull(inspectionId);
+    const damages = useMemo(() => inspection?.damages ?? [], [inspection]);
+    const tests = useMemo(() => inspection?.tests ?? [], [inspection]);
+    const documents = useMemo(() => inspection?.documents ?? [], [inspection]);
     const invalidateDetailQueries = () => {
         if (!projectId)
             return;
         queryClient.invalidateQueries({ queryKey: ["project-inspections", projectId] });
         if (inspectionId) {
+            queryClient.invalidateQueries({ queryKey: ["inspection-full", inspectionId] });
             queryClient.invalidateQueries({ queryKey: ["project-inspections-damages", projectId, inspectionId] });
             queryClient.invalidateQueries({ queryKey: ["project-inspections-tests", projectId, inspectionId] });
             queryClient.invalidateQueries({ queryKey: ["project-inspections-documents", projectId, inspectionId] });
@@ -388,7 +389,7 @@ const InspectionDetailPage = () => {
                                             overflow: "hidden",
                                             border: "1px solid",
                                             borderColor: "divider",
-                                        }, children: [_jsx(Box, { component: "img", src: photo.photo_url ?? "", alt: "Foto de da\u00F1o", sx: { width: "100%", height: "100%", objectFit: "cover" } }), options?.showDelete && photoId && (_jsx(IconButton, { size: "small", sx: {
+                                        }, children: [_jsx(Box, { component: "img", src: mediaVariantUrl(photo.photo_url, "thumb"), alt: "Foto de da\u00F1o", sx: { width: "100%", height: "100%", objectFit: "cover" } }), options?.showDelete && photoId && (_jsx(IconButton, { size: "small", sx: {
                                                     position: "absolute",
                                                     top: 4,
                                                     right: 4,
@@ -36,16 +36,13 @@ import dayjs from "dayjs";
 import { useMutation, useQueryClient } from "@tanstack/react-query";
 
 import {
-  useProjectInspectionDamages,
-  useProjectInspectionDocuments,
-  useProjectInspectionTests,
-  useProjectInspections,
+  useInspectionFull,
   ProjectInspectionDamage,
   ProjectInspectionTest,
   InspectionDocument,
 } from "../hooks/useProjectInspections";
 import { DAMAGE_CAUSES, DAMAGE_SEVERITIES, DAMAGE_TYPES } from "../constants/inspectionCatalog";
-import apiClient from "../api/client";
+import apiClient, { mediaVariantUrl } from "../api/client";
 
 type DamageFormState = {
   structure: string;
@@ -181,20 +178,17 @@ const InspectionDetailPage = () => {
     return data.url;
   };
 
-  const { data: inspections = [], isLoading: inspectionsLoading } = useProjectInspections(projectId);
-  const inspection = useMemo(
-    () => inspections.find((item) => item.id === inspectionId),
-    [inspections, inspectionId]
-  );
-
-  const { data: damages = [] } = useProjectInspectionDamages(projectId, inspectionId);
-  const { data: tests = [] } = useProjectInspectionTests(projectId, inspectionId);
-  const { data: documents = [] } = useProjectInspectionDocuments(projectId, inspectionId);
+  // One request for the whole tree; the browser revalidates it with the ETag (304 when unchanged).
+  const { data: inspection, isLoading: inspectionsLoading } = useInspectionFull(inspectionId);
+  const damages = useMemo(() => inspection?.damages ?? [], [inspection]);
+  const tests = useMemo(() => inspection?.tests ?? [], [inspection]);
+  const documents = useMemo(() => inspection?.documents ?? [], [inspection]);
 
   const invalidateDetailQueries = () => {
     if (!projectId) return;
     queryClient.invalidateQueries({ queryKey: ["project-inspections", projectId] });
     if (inspectionId) {
+      queryClient.invalidateQueries({ queryKey: ["inspection-full", inspectionId] });
       queryClient.invalidateQueries({ queryKey: ["project-inspections-damages", projectId, inspectionId] });
       queryClient.invalidateQueries({ queryKey: ["project-inspections-tests", projectId, inspectionId] });
       queryClient.invalidateQueries({ queryKey: ["project-inspections-documents", projectId, inspectionId] });
@@ -531,7 +525,7 @@ const InspectionDetailPage = () => {
                     >
                       <Box
                         component="img"
-                        src={photo.photo_url ?? ""}
+                        src={mediaVariantUrl(photo.photo_url, "thumb")}
                         alt="Foto de daño"
                         sx={{ width: "100%", height: "100%", objectFit: "cover" }}
                       />
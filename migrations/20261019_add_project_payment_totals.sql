@@ -0,0 +1,113 @@
+-- Migration: Incrementally maintained payment totals per project
+-- Description: Keeps one row per project with the running sum of each payment kind so that
+-- project listings read O(projects) rows instead of every project_payments row.
+
+create table if not exists public.project_payment_totals (
+    project_id uuid primary key references public.projects(id) on delete cascade,
+    invoice numeric(14,2) not null default 0,
+    advance numeric(14,2) not null default 0,
+    payment numeric(14,2) not null default 0,
+    credit_note numeric(14,2) not null default 0,
+    refund numeric(14,2) not null default 0,
+    facturado numeric(14,2) generated always as (greatest(invoice - credit_note, 0)) stored,
+    pagado numeric(14,2) generated always as (greatest(payment + advance - refund, 0)) stored,
+    saldo numeric(14,2) generated always as (
+        greatest(greatest(invoice - credit_note, 0) - greatest(payment + advance - refund, 0), 0)
+    ) stored,
+    updated_at timestamptz not null default now()
+);
+
+alter table public.project_payment_totals enable row level security;
+
+create policy "payment_totals_select"
+  on public.project_payment_totals
+  for select
+  using (exists (select 1 from public.projects p where p.id = project_payment_totals.project_id and p.created_by = (select auth.uid())));
+
+-- Applies a signed amount of a given kind to the project's running totals.
+create or replace function public.apply_project_payment_delta(p_project_id uuid, p_kind text, p_amount numeric)
+returns void
+language plpgsql
+security definer
+set search_path = public
+as $$
+begin
+    -- Payments removed by "on delete cascade" from projects must not recreate the totals row.
+    if not exists (select 1 from public.projects where id = p_project_id) then
+        return;
+    end if;
+    insert into public.project_payment_totals as t (project_id, invoice, advance, payment, credit_note, refund)
+    values (
+        p_project_id,
+        case when p_kind = 'invoice' then p_amount else 0 end,
+        case when p_kind = 'advance' then p_amount else 0 end,
+        case when p_kind = 'payment' then p_amount else 0 end,
+        case when p_kind = 'credit_note' then p_amount else 0 end,
+        case when p_kind = 'refund' then p_amount else 0 end
+    )
+    on conflict (project_id) do update set
+        invoice = t.invoice + excluded.invoice,
+        advance = t.advance + excluded.advance,
+        payment = t.payment + excluded.payment,
+        credit_note = t.credit_note + excluded.credit_note,
+        refund = t.refund + excluded.refund,
+        updated_at = now();
+end;
+$$;
+
+create or replace function public.project_payments_totals_trigger()
+returns trigger
+language plpgsql
+security definer
+set search_path = public
+as $$
+begin
+    if tg_op in ('UPDATE', 'DELETE') then
+        perform public.apply_project_payment_delta(old.project_id, old.kind, -old.amount);
+    end if;
+    if tg_op in ('INSERT', 'UPDATE') then
+        perform public.apply_project_payment_delta(new.project_id, new.kind, new.amount);
+    end if;
+    return null;
+end;
+$$;
+
+drop trigger if exists trg_project_payments_totals on public.project_payments;
+create trigger trg_project_payments_totals
+    after insert or delete or update of project_id, kind, amount on public.project_payments
+    for each row execute function public.project_payments_totals_trigger();
+
+-- Recomputes totals from scratch. Used for the initial backfill and to repair drift;
+-- pass a project id to rebuild a single project.
+create or replace function public.refresh_project_payment_totals(p_project_id uuid default null)
+returns void
+language plpgsql
+security definer
+set search_path = public
+as $$
+begin
+    insert into public.project_payment_totals (project_id, invoice, advance, payment, credit_note, refund, updated_at)
+    select
+        p.id,
+        coalesce(sum(pp.amount) filter (where pp.kind = 'invoice'), 0),
+        coalesce(sum(pp.amount) filter (where pp.kind = 'advance'), 0),
+        coalesce(sum(pp.amount) filter (where pp.kind = 'payment'), 0),
+        coalesce(sum(pp.amount) filter (where pp.kind = 'credit_note'), 0),
+        coalesce(sum(pp.amount) filter (where pp.kind = 'refund'), 0),
+        now()
+    from public.projects p
+    left join public.project_payments pp on pp.project_id = p.id
+    where p_project_id is null or p.id = p_project_id
+    group by p.id
+    on conflict (project_id) do update set
+        invoice = excluded.invoice,
+        advance = excluded.advance,
+        payment = excluded.payment,
+        credit_note = excluded.credit_note,
+        refund = excluded.refund,
+        updated_at = excluded.updated_at;
+end;
+$$;
+
+-- Backfill existing projects.
+select public.refresh_project_payment_totals();
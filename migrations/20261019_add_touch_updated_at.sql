@@ -0,0 +1,12 @@
+-- Shared BEFORE UPDATE trigger function that stamps updated_at with the statement's wall-clock time.
+-- Owned here only; migrations that need it just attach their triggers (this file sorts before them).
+
+create or replace function public.touch_updated_at()
+returns trigger
+language plpgsql
+as $$
+begin
+    new.updated_at := clock_timestamp();
+    return new;
+end;
+$$;
@@ -0,0 +1,24 @@
+-- Writes the LLM scores of a batch of damages in one statement. Only the score columns are touched:
+-- the rows were read before the (slow) LLM call, so writing anything else could revert edits made
+-- meanwhile. Damages deleted in the meantime are simply not matched.
+
+create or replace function public.apply_damage_llm_scores(p_scores jsonb)
+returns void
+language sql
+set search_path = public
+as $$
+    update public.project_inspection_damages as d
+    set
+        llm_score = s.llm_score,
+        llm_reason = s.llm_reason,
+        llm_payload = s.llm_payload,
+        score_updated_at = s.score_updated_at
+    from jsonb_to_recordset(p_scores) as s(
+        id uuid,
+        llm_score numeric,
+        llm_reason text,
+        llm_payload jsonb,
+        score_updated_at timestamptz
+    )
+    where d.id = s.id;
+$$;
@@ -0,0 +1,27 @@
+-- calc_runs carries updated_at so analytics exports can pull only the runs created or edited since
+-- the watermark of the previous export (/calculations/runs/{project_id}/export?since=...). Pages are
+-- read in (updated_at, id) order, which the index below serves directly. Exports stop a safety lag
+-- behind now(), so rows stamped at transaction start but committed later are still picked up.
+
+-- The trigger goes first and the backfill only runs when the column is new, so re-running this
+-- migration never rewrites updated_at of runs edited since. touch_updated_at() is defined in
+-- 20261019_add_touch_updated_at.sql.
+drop trigger if exists trg_calc_runs_touch on public.calc_runs;
+
+do $$
+begin
+    if not exists (
+        select 1 from information_schema.columns
+        where table_schema = 'public' and table_name = 'calc_runs' and column_name = 'updated_at'
+    ) then
+        alter table public.calc_runs add column updated_at timestamptz not null default now();
+        update public.calc_runs set updated_at = created_at;
+    end if;
+end;
+$$;
+
+create trigger trg_calc_runs_touch
+    before update on public.calc_runs
+    for each row execute function public.touch_updated_at();
+
+create index if not exists idx_runs_project_updated on public.calc_runs(project_id, updated_at, id);
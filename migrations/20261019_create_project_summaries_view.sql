@@ -0,0 +1,78 @@
+-- Migration: Per-project dashboard summary view
+-- Description: Aggregates task counts, completion, next dates and payment totals per project
+-- in a single query. security_invoker keeps the RLS policies of the underlying tables.
+
+create index if not exists idx_tasks_proj_end on public.project_tasks(project_id, end_date);
+
+create or replace view public.project_summaries
+with (security_invoker = true) as
+select
+    p.id as project_id,
+    p.name,
+    p.status,
+    p.created_by,
+    p.is_archived,
+    coalesce(p.budget, 0) as budget,
+    p.start_date,
+    p.end_date,
+    p.updated_at,
+    coalesce(t.total_tasks, 0) as total_tasks,
+    coalesce(t.completed_tasks, 0) as completed_tasks,
+    coalesce(t.pending_tasks, 0) as pending_tasks,
+    coalesce(t.overdue_tasks, 0) as overdue_tasks,
+    case
+        when coalesce(t.total_tasks, 0) > 0 then round(100.0 * t.completed_tasks / t.total_tasks, 1)
+        else 0
+    end as completion_pct,
+    t.next_task_start,
+    t.next_task_due,
+    coalesce(pt.facturado, 0) as payments_facturado,
+    coalesce(pt.pagado, 0) as payments_pagado,
+    coalesce(pt.saldo, 0) as payments_saldo,
+    coalesce(pt.invoice, 0) as payments_invoice,
+    coalesce(pt.advance, 0) as payments_advance,
+    coalesce(pt.payment, 0) as payments_payment,
+    coalesce(pt.credit_note, 0) as payments_credit_note,
+    coalesce(pt.refund, 0) as payments_refund
+from public.projects p
+left join (
+    select
+        project_id,
+        count(*) as total_tasks,
+        count(*) filter (where status = 'done') as completed_tasks,
+        count(*) filter (where status <> 'done') as pending_tasks,
+        count(*) filter (where status <> 'done' and end_date < current_date) as overdue_tasks,
+        min(start_date) as next_task_start,
+        min(end_date) as next_task_due
+    from public.project_tasks
+    group by project_id
+) t on t.project_id = p.id
+left join public.project_payment_totals pt on pt.project_id = p.id;
+
+-- Dashboard totals across all of a user's projects in one aggregate, so the metrics do not depend
+-- on how many project rows the page lists. Facturado counts advances as invoiced and Pagado is
+-- payments minus refunds, as the dashboard always showed them.
+create or replace function public.project_dashboard_totals(p_user_id uuid, p_archived boolean default false)
+returns table (
+    project_count bigint,
+    budget numeric,
+    invoiced numeric,
+    paid numeric,
+    pending_tasks bigint,
+    overdue_tasks bigint
+)
+language sql
+stable
+security invoker
+set search_path = public
+as $$
+    select
+        count(*),
+        coalesce(sum(budget), 0),
+        coalesce(sum(payments_invoice + payments_advance - payments_credit_note), 0),
+        coalesce(sum(payments_payment - payments_refund), 0),
+        coalesce(sum(pending_tasks), 0),
+        coalesce(sum(overdue_tasks), 0)
+    from public.project_summaries
+    where created_by = p_user_id and is_archived = p_archived;
+$$;
@@ -0,0 +1,50 @@
+-- Writes that do not come from the offline sync (the regular POST/PUT endpoints, the web app) bump the
+-- "server" entry of version_vector, so a changeset built on an older copy is reported as a conflict
+-- instead of silently overwriting them. The sync endpoint always sends a new vector, which is kept as is;
+-- derived columns (scores, severity_rank, updated_at) are written by the server itself and do not count
+-- as edits.
+
+create or replace function public.bump_server_version()
+returns trigger
+language plpgsql
+as $$
+declare
+    derived constant text[] := array[
+        'version_vector', 'updated_at', 'deterministic_score', 'severity_rank',
+        'llm_score', 'llm_reason', 'llm_payload', 'score_updated_at'
+    ];
+begin
+    if tg_op = 'INSERT' then
+        if new.version_vector is null or new.version_vector = '{}'::jsonb then
+            new.version_vector := jsonb_build_object('server', 1);
+        end if;
+    elsif new.version_vector is not distinct from old.version_vector
+          and (to_jsonb(new) - derived) is distinct from (to_jsonb(old) - derived) then
+        new.version_vector := coalesce(old.version_vector, '{}'::jsonb)
+            || jsonb_build_object('server', coalesce((old.version_vector ->> 'server')::bigint, 0) + 1);
+    end if;
+    return new;
+end;
+$$;
+
+do $$
+declare
+    target text;
+begin
+    foreach target in array array[
+        'project_inspections',
+        'project_inspection_damages',
+        'project_inspection_damage_photos',
+        'project_inspection_tests',
+        'project_inspection_documents'
+    ]
+    loop
+        execute format('drop trigger if exists trg_%1$s_server_version on public.%1$I', target);
+        execute format(
+            'create trigger trg_%1$s_server_version before insert or update on public.%1$I '
+            'for each row execute function public.bump_server_version()',
+            target
+        );
+    end loop;
+end;
+$$;
@@ -0,0 +1,8 @@
+-- Version vectors for offline sync: {"<client id>": <counter>, ...} per row. The sync endpoint applies a
+-- change only when its vector dominates the stored one and reports concurrent edits as conflicts.
+
+alter table public.project_inspections add column if not exists version_vector jsonb not null default '{}'::jsonb;
+alter table public.project_inspection_damages add column if not exists version_vector jsonb not null default '{}'::jsonb;
+alter table public.project_inspection_damage_photos add column if not exists version_vector jsonb not null default '{}'::jsonb;
+alter table public.project_inspection_tests add column if not exists version_vector jsonb not null default '{}'::jsonb;
+alter table public.project_inspection_documents add column if not exists version_vector jsonb not null default '{}'::jsonb;
@@ -0,0 +1,59 @@
+-- Every row in an inspection tree carries updated_at, and any change to a damage, photo, test or
+-- document bumps project_inspections.updated_at. The API derives the ETag of /inspections/{id}/full
+-- from that single column, so a conditional GET needs just one indexed lookup.
+
+alter table public.project_inspection_damages add column if not exists updated_at timestamptz not null default now();
+alter table public.project_inspection_damage_photos add column if not exists updated_at timestamptz not null default now();
+alter table public.project_inspection_tests add column if not exists updated_at timestamptz not null default now();
+alter table public.project_inspection_documents add column if not exists updated_at timestamptz not null default now();
+
+create or replace function public.touch_parent_inspection()
+returns trigger
+language plpgsql
+security definer
+set search_path = public
+as $$
+begin
+    if tg_op = 'INSERT' then
+        update public.project_inspections set updated_at = clock_timestamp() where id = new.inspection_id;
+    elsif tg_op = 'DELETE' then
+        update public.project_inspections set updated_at = clock_timestamp() where id = old.inspection_id;
+    else
+        update public.project_inspections
+           set updated_at = clock_timestamp()
+         where id in (old.inspection_id, new.inspection_id);
+    end if;
+    return null;
+end;
+$$;
+
+drop trigger if exists trg_project_inspections_touch on public.project_inspections;
+create trigger trg_project_inspections_touch
+    before update on public.project_inspections
+    for each row execute function public.touch_updated_at();
+
+do $$
+declare
+    child text;
+begin
+    foreach child in array array[
+        'project_inspection_damages',
+        'project_inspection_damage_photos',
+        'project_inspection_tests',
+        'project_inspection_documents'
+    ]
+    loop
+        execute format('drop trigger if exists trg_%1$s_touch on public.%1$I', child);
+        execute format(
+            'create trigger trg_%1$s_touch before update on public.%1$I for each row execute function public.touch_updated_at()',
+            child
+        );
+        execute format('drop trigger if exists trg_%1$s_touch_inspection on public.%1$I', child);
+        execute format(
+            'create trigger trg_%1$s_touch_inspection after insert or update or delete on public.%1$I '
+            'for each row execute function public.touch_parent_inspection()',
+            child
+        );
+    end loop;
+end;
+$$;
@@ -0,0 +1,204 @@
+-- Deterministic scores are computed in the database instead of in Python after each fetch.
+-- A BEFORE trigger keeps project_inspection_damages.deterministic_score and severity_rank current,
+-- and a statement-level trigger refreshes project_inspections.deterministic_score for every inspection
+-- touched by a (multi-row) insert, update or delete. Both columns are indexed per project, so
+-- "most critical damages" and severity ordering become index scans instead of client-side sorts.
+--
+-- The formula mirrors services/inspection_scoring.py (_score_damage and
+-- calculate_inspection_deterministic_score); the weights below must match DEFAULT_WEIGHTS.
+
+create table if not exists public.inspection_scoring_weights (
+    kind text not null check (kind in ('severity', 'cause', 'damage_type')),
+    keyword text not null,
+    weight numeric not null,
+    position smallint not null,
+    primary key (kind, keyword)
+);
+
+alter table public.inspection_scoring_weights enable row level security;
+
+drop policy if exists "inspection_scoring_weights_read" on public.inspection_scoring_weights;
+create policy "inspection_scoring_weights_read"
+  on public.inspection_scoring_weights
+  for select
+  using ((select auth.uid()) is not null);
+
+-- position keeps the dictionary order: the first keyword contained in the text wins, as in Python.
+insert into public.inspection_scoring_weights (kind, keyword, weight, position) values
+    ('severity', 'Leve', 1.0, 1),
+    ('severity', 'Media', 2.0, 2),
+    ('severity', 'Alta', 3.0, 3),
+    ('severity', 'Muy Alta', 4.0, 4),
+    ('cause', 'estructural', 1.5, 1),
+    ('cause', 'deformacion', 1.3, 2),
+    ('cause', 'corrosion', 1.4, 3),
+    ('cause', 'filtracion', 1.2, 4),
+    ('cause', 'electrico', 1.2, 5),
+    ('cause', 'estetico', 1.0, 6),
+    ('cause', 'mantenimiento', 1.1, 7),
+    ('damage_type', 'fisura', 1.3, 1),
+    ('damage_type', 'desprendimiento', 1.4, 2),
+    ('damage_type', 'asentamiento', 1.5, 3),
+    ('damage_type', 'corrosion', 1.4, 4),
+    ('damage_type', 'desgaste', 1.1, 5),
+    ('damage_type', 'golpes', 1.0, 6),
+    ('damage_type', 'otro', 1.0, 7)
+on conflict (kind, keyword) do update set weight = excluded.weight, position = excluded.position;
+
+create or replace function public.damage_extent_factor(p_extent text)
+returns double precision
+language sql
+immutable
+as $$
+    select case
+        when value ~ '^\s*[-+]?(\d+(\.\d*)?|\.\d+)([eE][-+]?\d+)?\s*$'
+            then least(1.0, greatest(0.0, value::double precision / 100))
+        else 0.0
+    end
+    from (select replace(btrim(coalesce(p_extent, '')), '%', '') as value) as extent;
+$$;
+
+create or replace function public.damage_base_score(
+    p_severity text,
+    p_cause text,
+    p_damage_type text,
+    p_extent text
+)
+returns double precision
+language sql
+stable
+as $$
+    select
+        coalesce((select weight from public.inspection_scoring_weights
+                   where kind = 'severity' and keyword = p_severity), 1.0)::double precision
+      * coalesce((select weight from public.inspection_scoring_weights
+                   where kind = 'cause' and strpos(lower(coalesce(p_cause, '')), keyword) > 0
+                   order by position limit 1), 1.0)::double precision
+      * coalesce((select weight from public.inspection_scoring_weights
+                   where kind = 'damage_type' and strpos(lower(coalesce(p_damage_type, '')), keyword) > 0
+                   order by position limit 1), 1.0)::double precision
+      * (1 + public.damage_extent_factor(p_extent));
+$$;
+
+create or replace function public.damage_max_base_score()
+returns double precision
+language sql
+stable
+as $$
+    select (max(weight) filter (where kind = 'severity')
+          * max(weight) filter (where kind = 'cause')
+          * max(weight) filter (where kind = 'damage_type')
+          * 2)::double precision
+    from public.inspection_scoring_weights;
+$$;
+
+alter table public.project_inspection_damages add column if not exists severity_rank smallint;
+
+create or replace function public.set_damage_scores()
+returns trigger
+language plpgsql
+as $$
+begin
+    new.severity_rank := array_position(array['Leve', 'Media', 'Alta', 'Muy Alta'], new.severity);
+    new.deterministic_score := round(
+        public.damage_base_score(new.severity, new.damage_cause, new.damage_type, new.extent)::numeric, 2
+    );
+    return new;
+end;
+$$;
+
+drop trigger if exists trg_project_inspection_damages_scores on public.project_inspection_damages;
+create trigger trg_project_inspection_damages_scores
+    before insert or update of severity, damage_cause, damage_type, extent, deterministic_score, severity_rank
+    on public.project_inspection_damages
+    for each row execute function public.set_damage_scores();
+
+-- Same normalisation as calculate_inspection_deterministic_score: the count multiplier cancels out,
+-- leaving the mean base score over the maximum possible per damage.
+create or replace function public.refresh_inspection_deterministic_scores(p_inspection_ids uuid[])
+returns void
+language sql
+security definer
+set search_path = public
+as $$
+    update public.project_inspections i
+       set deterministic_score = coalesce(scores.score, 0)
+      from (
+            select ids.id,
+                   least(100, round((avg(public.damage_base_score(d.severity, d.damage_cause, d.damage_type, d.extent))
+                                     / nullif(public.damage_max_base_score(), 0) * 100)::numeric, 2)) as score
+              from unnest(p_inspection_ids) as ids(id)
+              left join public.project_inspection_damages d on d.inspection_id = ids.id
+             group by ids.id
+           ) as scores
+     where i.id = scores.id
+       and i.deterministic_score is distinct from coalesce(scores.score, 0);
+$$;
+
+create or replace function public.refresh_scores_after_damage_insert()
+returns trigger
+language plpgsql
+as $$
+begin
+    perform public.refresh_inspection_deterministic_scores(array(select distinct inspection_id from new_rows));
+    return null;
+end;
+$$;
+
+create or replace function public.refresh_scores_after_damage_update()
+returns trigger
+language plpgsql
+as $$
+begin
+    perform public.refresh_inspection_deterministic_scores(array(
+        select inspection_id from new_rows
+        union
+        select inspection_id from old_rows
+    ));
+    return null;
+end;
+$$;
+
+create or replace function public.refresh_scores_after_damage_delete()
+returns trigger
+language plpgsql
+as $$
+begin
+    perform public.refresh_inspection_deterministic_scores(array(select distinct inspection_id from old_rows));
+    return null;
+end;
+$$;
+
+drop trigger if exists trg_project_inspection_damages_inspection_score_ins on public.project_inspection_damages;
+create trigger trg_project_inspection_damages_inspection_score_ins
+    after insert on public.project_inspection_damages
+    referencing new table as new_rows
+    for each statement execute function public.refresh_scores_after_damage_insert();
+
+drop trigger if exists trg_project_inspection_damages_inspection_score_upd on public.project_inspection_damages;
+create trigger trg_project_inspection_damages_inspection_score_upd
+    after update on public.project_inspection_damages
+    referencing new table as new_rows old table as old_rows
+    for each statement execute function public.refresh_scores_after_damage_update();
+
+drop trigger if exists trg_project_inspection_damages_inspection_score_del on public.project_inspection_damages;
+create trigger trg_project_inspection_damages_inspection_score_del
+    after delete on public.project_inspection_damages
+    referencing old table as old_rows
+    for each statement execute function public.refresh_scores_after_damage_delete();
+
+-- Backfill existing rows (the BEFORE trigger fills both columns), then every inspection.
+update public.project_inspection_damages set severity_rank = null;
+select public.refresh_inspection_deterministic_scores(array(select id from public.project_inspections));
+
+alter table public.project_inspection_damages alter column severity_rank set not null;
+
+drop index if exists public.idx_project_inspection_damages_project;
+create index if not exists idx_project_inspection_damages_project
+    on public.project_inspection_damages(project_id, severity_rank desc, deterministic_score desc);
+create index if not exists idx_project_inspection_damages_project_score
+    on public.project_inspection_damages(project_id, deterministic_score desc nulls last);
+create index if not exists idx_project_inspection_damages_inspection_rank
+    on public.project_inspection_damages(inspection_id, severity_rank desc, deterministic_score desc);
+create index if not exists idx_project_inspections_project_score
+    on public.project_inspections(project_id, deterministic_score desc nulls last);
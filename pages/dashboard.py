@@ -1,6 +1,5 @@
-from collections import defaultdict
 from datetime import date, datetime, timedelta
-from typing import Dict, List, Optional
+from typing import List, Optional
 
 try:
     from streamlit_calendar import calendar
@@ -10,7 +9,7 @@ except ImportError:  # pragma: no cover - optional dependency
 import pandas as pd
 import streamlit as st
 
-from services.projects_service import fetch_projects
+from services.projects_service import fetch_dashboard_totals, fetch_project_summaries
 from supa.client import supa
 from utils.format import clp, to_int
 
@@ -37,6 +36,10 @@ def _parse_date(value: Optional[str]) -> Optional[date]:
         return None
 
 
+def _payments(project: dict, kind: str) -> int:
+    return to_int(project.get(f"payments_{kind}")) or 0
+
+
 def _build_task_events(projects: List[dict], tasks: List[dict]) -> List[dict]:
     events: List[dict] = []
     today_iso = date.today().isoformat()
@@ -79,69 +82,86 @@ if not user:
     st.info("Inicia sesion para ver tus indicadores.")
     st.stop()
 
-projects = fetch_projects(archived=False)
+summaries = fetch_project_summaries(user["id"], archived=False, limit=200)
+projects = summaries["items"]
+for project in projects:
+    project["id"] = project["project_id"]
 project_ids = [p["id"] for p in projects]
-total_budget = sum(to_int(p.get("budget")) or 0 for p in projects)
-
-payments_data = (
-    supa()
-    .table("project_payments")
-    .select("project_id, kind, amount")
-    .execute()
-    .data
-)
-payments_by_project: Dict[str, Dict[str, int]] = defaultdict(lambda: defaultdict(int))
-for row in payments_data:
-    payments_by_project[row["project_id"]][row["kind"]] += to_int(row.get("amount")) or 0
-
-global_totals = defaultdict(int)
-for proj_totals in payments_by_project.values():
-    for kind, amount in proj_totals.items():
-        global_totals[kind] += amount
-
-total_invoiced = global_totals["invoice"] + global_totals["advance"] - global_totals["credit_note"]
-total_paid = global_totals["payment"] - global_totals["refund"]
+project_names = {p["id"]: p["name"] for p in projects}
+totals = fetch_dashboard_totals(user["id"], archived=False)
+total_budget = to_int(totals["budget"]) or 0
+total_invoiced = to_int(totals["invoiced"]) or 0
+total_paid = to_int(totals["paid"]) or 0
+pending_count = totals["pending_tasks"]
+overdue_count = totals["overdue_tasks"]
 
 calc_response = supa().table("calc_runs").select("id", count="exact").execute()
 calc_count = calc_response.count or 0
 
-tasks_response = (
-    supa()
-    .table("project_tasks")
-    .select("project_id, title, end_date, status")
-    .order("end_date")
-    .limit(200)
-    .execute()
-    .data
-)
-
 today = date.today()
-pending_tasks = [t for t in tasks_response if t.get("status") != "done"]
-overdue_tasks = [
-    t for t in pending_tasks
-    if _parse_date(t.get("end_date")) and _parse_date(t.get("end_date")) < today
-]
+
+
+def _pending_tasks_query(columns: str):
+    return (
+        supa()
+        .table("project_tasks")
+        .select(columns)
+        .in_("project_id", project_ids)
+        .neq("status", "done")
+        .order("end_date")
+    )
+
+
+upcoming_response = []
+overdue_tasks = []
+tasks_response = []
+if project_ids:
+    upcoming_response = (
+        _pending_tasks_query("project_id, title, end_date, status")
+        .gte("end_date", today.isoformat())
+        .limit(10)
+        .execute()
+        .data
+    )
+    overdue_tasks = (
+        _pending_tasks_query("project_id, title, end_date, status")
+        .lt("end_date", today.isoformat())
+        .limit(50)
+        .execute()
+        .data
+    )
+    tasks_response = (
+        supa()
+        .table("project_tasks")
+        .select("id, project_id, title, start_date, end_date, status, assignee, progress")
+        .in_("project_id", project_ids)
+        .gte("end_date", (today - timedelta(days=60)).isoformat())
+        .order("end_date")
+        .limit(500)
+        .execute()
+        .data
+    )
+
 upcoming_tasks = [
     {
-        "Proyecto": next((p["name"] for p in projects if p["id"] == task["project_id"]), "-"),
+        "Proyecto": project_names.get(task["project_id"], "-"),
         "Tarea": task["title"],
         "Estado": TASK_STATUS_LABELS.get(task.get("status"), task.get("status") or "-"),
         "Entrega": task.get("end_date") or "-",
     }
-    for task in pending_tasks
-    if _parse_date(task.get("end_date")) and _parse_date(task.get("end_date")) >= today
-][:10]
+    for task in upcoming_response
+]
 
 metrics = st.columns(4)
-metrics[0].metric("Proyectos activos", len(projects))
+metrics[0].metric("Proyectos activos", totals["project_count"])
 metrics[1].metric("Presupuesto total (CLP)", f"CLP {clp(total_budget)}")
 metrics[2].metric("Facturado (CLP)", f"CLP {clp(total_invoiced)}")
 metrics[3].metric("Pagado (CLP)", f"CLP {clp(total_paid)}")
 
 secondary_metrics = st.columns(3)
 secondary_metrics[0].metric("Calculos guardados", calc_count)
-secondary_metrics[1].metric("Tareas pendientes", len(pending_tasks))
-secondary_metrics[2].metric("Tareas atrasadas", len(overdue_tasks))
+secondary_metrics[1].metric("Tareas pendientes", pending_count)
+secondary_metrics[2].metric("Tareas atrasadas", overdue_count)
 
 st.divider()
 
@@ -150,9 +170,8 @@ if not projects:
 else:
     project_rows = []
     for project in projects:
-        totals = payments_by_project[project["id"]]
-        invoiced = totals["invoice"] + totals["advance"] - totals["credit_note"]
-        paid = totals["payment"] - totals["refund"]
+        invoiced = _payments(project, "invoice") + _payments(project, "advance") - _payments(project, "credit_note")
+        paid = _payments(project, "payment") - _payments(project, "refund")
         budget = to_int(project.get("budget")) or 0
         balance = budget - paid
         project_rows.append(
@@ -161,6 +180,7 @@ else:
                 "Estado": PROJECT_STATUS_LABELS.get(project.get("status"), project.get("status") or "-"),
                 "Inicio": project.get("start_date") or "-",
                 "Termino": project.get("end_date") or "-",
+                "Avance tareas": f"{project.get('completion_pct') or 0}%",
                 "Presupuesto CLP": clp(budget),
                 "Facturado CLP": clp(invoiced),
                 "Pagado CLP": clp(paid),
@@ -174,6 +194,8 @@ else:
         use_container_width=True,
         hide_index=False,
     )
+    if summaries["total"] > len(projects):
+        st.caption(f"Mostrando {len(projects)} de {summaries['total']} proyectos activos.")
 
 st.subheader("Proximas entregas")
 if not upcoming_tasks:
@@ -188,7 +210,7 @@ else:
     overdue_table = pd.DataFrame(
         [
             {
-                "Proyecto": next((p["name"] for p in projects if p["id"] == task["project_id"]), "-"),
+                "Proyecto": project_names.get(task["project_id"], "-"),
                 "Tarea": task["title"],
                 "Entrega": task.get("end_date") or "-",
                 "Estado": TASK_STATUS_LABELS.get(task.get("status"), task.get("status") or "-"),
@@ -135,8 +135,8 @@ def _build_context(data: Dict[str, Any], project_name: str) -> Dict[str, Any]:
             "seismic.params.soil": params.get("soil", ""),
             "seismic.params.rs": _format_value(params.get("rs")),
             "seismic.params.ps": _format_value(params.get("ps")),
-            "seismic.params.tx": _format_value(params.get("tx"), 3),
-            "seismic.params.ty": _format_value(params.get("ty"), 3),
+            "seismic.params.tx": _format_value(params.get("tx") or result.get("tx"), 3),
+            "seismic.params.ty": _format_value(params.get("ty") or result.get("ty"), 3),
             "seismic.params.r0": _format_value(params.get("r0")),
 
             # Resultados
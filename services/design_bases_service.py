@@ -11,6 +11,7 @@ from reportlab.lib.pagesizes import letter
 from reportlab.pdfgen import canvas
 
 from api.schemas.design_bases import DesignBaseExportPayload
+from services.seismic_modal import modal_spectrum_response, shear_building_modes
 
 DATA_DIR = Path(__file__).resolve().parent.parent / "api" / "data"
 with (DATA_DIR / "live_loads.json").open(encoding="utf-8") as fp:
@@ -255,12 +256,29 @@ def calculate_seismic_base(
     soil: str,
     rs_value: float,
     ps_value: float,
-    tx: float,
-    ty: float,
+    tx: Optional[float],
+    ty: Optional[float],
     r0: float,
     story_heights: Iterable[float],
     story_weights: Iterable[float],
+    story_stiffnesses_x: Optional[Iterable[float]] = None,
+    story_stiffnesses_y: Optional[Iterable[float]] = None,
+    modal_combination: str = "CQC",
 ) -> Dict[str, object]:
+    story_weights = [float(w) for w in story_weights]
+    stiffnesses = {"x": story_stiffnesses_x, "y": story_stiffnesses_y}
+    # Modos del edificio de corte por dirección; sin periodo ingresado se usa el fundamental
+    modes = {
+        direction: shear_building_modes(story_weights, values)
+        for direction, values in stiffnesses.items()
+        if values is not None
+    }
+    if tx is None and "x" in modes:
+        tx = float(modes["x"]["periods"][0])
+    if ty is None and "y" in modes:
+        ty = float(modes["y"]["periods"][0])
+    if tx is None or ty is None:
+        raise ValueError("Debe indicar los periodos Tx y Ty o las rigideces de entrepiso en cada dirección.")
     if rs_value <= 0 or ps_value <= 0 or tx <= 0 or ty <= 0 or r0 <= 0:
         raise ValueError("Los parámetros sísmicos deben ser mayores que cero.")
 
@@ -380,7 +398,22 @@ def calculate_seismic_base(
         Fky = Ak * weights[idx - 1] * Qbasy / Ak_pks
         floor_forces.append({"level": idx, "Fkx": round(Fkx, 3), "Fky": round(Fky, 3)})
 
+    # Análisis modal espectral contra el espectro de diseño de cada dirección
+    modal = {}
+    spectrum_periods = [point["period"] for point in spectrum]
+    for direction, key in (("x", "SaX"), ("y", "SaY")):
+        if stiffnesses[direction] is not None:
+            modal[direction] = modal_spectrum_response(
+                weights,
+                stiffnesses[direction],
+                spectrum_periods,
+                [point[key] for point in spectrum],
+                method=modal_combination,
+            )
+
     return {
+        "tx": round(tx, 4),
+        "ty": round(ty, 4),
         "intensityFactor": I_s,
         "zoneFactor": A_0,
         "soil": soil_params,
@@ -394,6 +427,7 @@ def calculate_seismic_base(
         "Qbasy": round(Qbasy, 4),
         "spectrum": spectrum,
         "floorForces": floor_forces,
+        "modal": modal or None,
     }
 
 
@@ -494,8 +528,8 @@ def _export_csv(payload: DesignBaseExportPayload) -> Tuple[bytes, str, str]:
         writer.writerow(["Suelo", payload.seismic.params.soil])
         writer.writerow(["R", payload.seismic.params.rs])
         writer.writerow(["Peso sísmico (kN)", payload.seismic.params.ps])
-        writer.writerow(["Tx (s)", payload.seismic.params.tx])
-        writer.writerow(["Ty (s)", payload.seismic.params.ty])
+        writer.writerow(["Tx (s)", payload.seismic.params.tx if payload.seismic.params.tx is not None else payload.seismic.result.tx])
+        writer.writerow(["Ty (s)", payload.seismic.params.ty if payload.seismic.params.ty is not None else payload.seismic.result.ty])
         writer.writerow(["R0", payload.seismic.params.r0])
         writer.writerow(["I_s", payload.seismic.result.intensity_factor or payload.seismic.result.intensityFactor])
         writer.writerow(["A0", payload.seismic.result.zone_factor or payload.seismic.result.zoneFactor])
@@ -605,8 +639,8 @@ def _export_docx(payload: DesignBaseExportPayload) -> Tuple[bytes, str, str]:
             ("Tipo de suelo", payload.seismic.params.soil),
             ("R", payload.seismic.params.rs),
             ("Peso sísmico (kN)", payload.seismic.params.ps),
-            ("Tx (s)", payload.seismic.params.tx),
-            ("Ty (s)", payload.seismic.params.ty),
+            ("Tx (s)", payload.seismic.params.tx if payload.seismic.params.tx is not None else payload.seismic.result.tx),
+            ("Ty (s)", payload.seismic.params.ty if payload.seismic.params.ty is not None else payload.seismic.result.ty),
             ("R0", payload.seismic.params.r0),
         ]
         for idx, (label, value) in enumerate(rows):
@@ -734,8 +768,8 @@ def _export_pdf(payload: DesignBaseExportPayload) -> Tuple[bytes, str, str]:
             ("Tipo de suelo", payload.seismic.params.soil),
             ("R", payload.seismic.params.rs),
             ("Peso sísmico (kN)", payload.seismic.params.ps),
-            ("Tx (s)", payload.seismic.params.tx),
-            ("Ty (s)", payload.seismic.params.ty),
+            ("Tx (s)", payload.seismic.params.tx if payload.seismic.params.tx is not None else payload.seismic.result.tx),
+            ("Ty (s)", payload.seismic.params.ty if payload.seismic.params.ty is not None else payload.seismic.result.ty),
             ("R0", payload.seismic.params.r0),
             ("I_s", payload.seismic.result.intensity_factor or payload.seismic.result.intensityFactor),
             ("A0", payload.seismic.result.zone_factor or payload.seismic.result.zoneFactor),
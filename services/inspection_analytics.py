@@ -0,0 +1,145 @@
+from __future__ import annotations
+
+import threading
+import time
+from typing import Any, Iterable
+
+import pandas as pd
+
+DIMENSIONS = ("structure", "location", "damage_type", "damage_cause", "severity")
+SEVERITY_ORDER = ("Leve", "Media", "Alta", "Muy Alta")
+MISSING_LABEL = "Sin especificar"
+MISSING_PERIOD = "Sin fecha"
+
+HEATMAPS: dict[str, tuple[str, str]] = {
+    "structure_severity": ("structure", "severity"),
+    "location_severity": ("location", "severity"),
+    "damage_type_cause": ("damage_type", "damage_cause"),
+    "structure_damage_type": ("structure", "damage_type"),
+}
+
+_CUBE_LEVELS = ["period", *DIMENSIONS]
+_FACT_COLUMNS = ["id", "inspection_id", *_CUBE_LEVELS]
+
+
+def _empty_cube() -> pd.Series:
+    index = pd.MultiIndex.from_arrays([[] for _ in _CUBE_LEVELS], names=_CUBE_LEVELS)
+    return pd.Series([], index=index, dtype="int64")
+
+
+def _period(value: Any) -> str:
+    if not value:
+        return MISSING_PERIOD
+    return str(value)[:7]
+
+
+def _facts_frame(damages: Iterable[dict[str, Any]], inspection_dates: dict[str, Any]) -> pd.DataFrame:
+    frame = pd.DataFrame.from_records(list(damages), columns=["id", "inspection_id", *DIMENSIONS])
+    dimensions = frame[list(DIMENSIONS)].astype(object)
+    frame[list(DIMENSIONS)] = dimensions.where(dimensions.notna() & (dimensions != ""), MISSING_LABEL)
+    frame["period"] = frame["inspection_id"].map(lambda inspection_id: _period(inspection_dates.get(inspection_id)))
+    return frame[_FACT_COLUMNS]
+
+
+def _cube_of(facts: pd.DataFrame) -> pd.Series:
+    if facts.empty:
+        return _empty_cube()
+    return facts.groupby(_CUBE_LEVELS, sort=False).size().astype("int64")
+
+
+def _ordered_labels(dimension: str, totals: pd.Series) -> list[str]:
+    if dimension == "severity":
+        present = set(totals.index)
+        return [label for label in SEVERITY_ORDER if label in present] + sorted(present - set(SEVERITY_ORDER))
+    return totals.sort_values(ascending=False, kind="stable").index.tolist()
+
+
+class ProjectDamageAnalytics:
+    """Cubo de conteos de daños (período × estructura × ubicación × tipo × causa × gravedad) de un proyecto.
+
+    El cubo se actualiza por inspección: al cambiar una inspección (``updated_at`` distinto, que los
+    triggers suben ante cualquier cambio en sus daños) se restan sus conteos anteriores y se suman los
+    nuevos; las matrices y series se derivan del cubo, mucho más pequeño que la tabla de daños.
+    """
+
+    def __init__(self, project_id: str):
+        self.project_id = project_id
+        self.versions: dict[str, Any] = {}
+        self.facts = pd.DataFrame(columns=_FACT_COLUMNS)
+        self.cube = _empty_cube()
+        self.refreshed_at = 0.0
+        self.lock = threading.Lock()
+        self._result: dict[str, Any] | None = None
+
+    def changed_inspections(self, inspections: list[dict[str, Any]]) -> tuple[set[str], set[str]]:
+        """(inspecciones nuevas o modificadas, inspecciones eliminadas) respecto del último refresco."""
+        current = {row["id"]: row.get("updated_at") for row in inspections}
+        changed = {
+            inspection_id for inspection_id, version in current.items() if self.versions.get(inspection_id) != version
+        }
+        removed = set(self.versions) - set(current)
+        return changed, removed
+
+    def apply(
+        self,
+        inspections: list[dict[str, Any]],
+        damages: Iterable[dict[str, Any]],
+        changed: set[str],
+        removed: set[str],
+    ) -> None:
+        """Reemplaza los daños de las inspecciones ``changed`` por ``damages`` y quita los de ``removed``."""
+        self.refreshed_at = time.time()
+        if not changed and not removed:
+            return
+        touched = changed | removed
+        stale = self.facts[self.facts["inspection_id"].isin(touched)]
+        dates = {row["id"]: row.get("inspection_date") for row in inspections}
+        fresh = _facts_frame(damages, dates)
+        fresh = fresh[fresh["inspection_id"].isin(changed)]
+
+        cube = self.cube.sub(_cube_of(stale), fill_value=0).add(_cube_of(fresh), fill_value=0)
+        self.cube = cube[cube > 0].astype("int64")
+        kept = self.facts[~self.facts["inspection_id"].isin(touched)]
+        self.facts = pd.concat([kept, fresh], ignore_index=True) if not fresh.empty else kept.reset_index(drop=True)
+        self.versions = {row["id"]: row.get("updated_at") for row in inspections}
+        self._result = None
+
+    def heatmap(self, rows: str, columns: str) -> dict[str, Any]:
+        if self.cube.empty:
+            return {"rows": [], "columns": [], "values": []}
+        matrix = self.cube.groupby(level=[rows, columns]).sum().unstack(fill_value=0)
+        row_labels = _ordered_labels(rows, matrix.sum(axis=1))
+        column_labels = _ordered_labels(columns, matrix.sum(axis=0))
+        matrix = matrix.reindex(index=row_labels, columns=column_labels, fill_value=0)
+        return {"rows": row_labels, "columns": column_labels, "values": matrix.astype("int64").values.tolist()}
+
+    def time_series(self) -> dict[str, Any]:
+        if self.cube.empty:
+            return {"periods": [], "series": {}, "total": []}
+        table = self.cube.groupby(level=["period", "severity"]).sum().unstack(fill_value=0)
+        periods = sorted(table.index, key=lambda period: (period == MISSING_PERIOD, period))
+        table = table.reindex(index=periods, columns=_ordered_labels("severity", table.sum(axis=0)), fill_value=0)
+        return {
+            "periods": periods,
+            "series": {severity: table[severity].astype("int64").tolist() for severity in table.columns},
+            "total": table.sum(axis=1).astype("int64").tolist(),
+        }
+
+    def breakdowns(self) -> dict[str, dict[str, int]]:
+        result = {}
+        for dimension in DIMENSIONS:
+            totals = self.cube.groupby(level=dimension).sum() if not self.cube.empty else pd.Series(dtype="int64")
+            result[dimension] = {label: int(totals[label]) for label in _ordered_labels(dimension, totals)}
+        return result
+
+    def result(self) -> dict[str, Any]:
+        if self._result is None:
+            self._result = {
+                "project_id": self.project_id,
+                "inspection_count": len(self.versions),
+                "total_damages": int(self.cube.sum()),
+                "heatmaps": {name: self.heatmap(rows, columns) for name, (rows, columns) in HEATMAPS.items()},
+                "time_series": self.time_series(),
+                "breakdowns": self.breakdowns(),
+            }
+        return {**self._result, "refreshed_at": self.refreshed_at}
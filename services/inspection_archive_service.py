@@ -1,248 +1,215 @@
 from __future__ import annotations
 
+import hashlib
 import io
 import json
+import os
+import time
 import uuid
 import zipfile
 from datetime import date, datetime
 from pathlib import Path
-from typing import Any, Iterable
-
-from reportlab.lib.pagesizes import letter
-from reportlab.pdfgen import canvas
+from typing import Any, BinaryIO, Iterator
 
+from services.inspection_report import render_inspection_report
 from services.inspections_service import (
     get_project_inspection,
     list_project_inspection_damages,
     list_project_inspection_documents,
     list_project_inspection_tests,
 )
-from services.media_service import INSPECTIONS_DIR
-
+from services.media_service import BASE_UPLOAD_DIR, INSPECTIONS_DIR
+from services.photo_derivatives import resolve_upload_path
 
-def _ensure_dirs(project_id: str, inspection_id: str) -> Path:
-    base = INSPECTIONS_DIR / project_id / inspection_id
-    base.mkdir(parents=True, exist_ok=True)
-    return base
+ARCHIVE_CACHE_DIR = BASE_UPLOAD_DIR / "_archives"
+ARCHIVE_CACHE_MAX_AGE = float(os.environ.get("ARCHIVE_CACHE_MAX_AGE_SECONDS", str(7 * 24 * 3600)))
+ARCHIVE_CHUNK_SIZE = 256 * 1024
+ARCHIVE_FORMAT_VERSION = "2"
+_STORED_SUFFIXES = {".jpg", ".jpeg", ".png"}
+_TMP_MAX_AGE = 3600
 
 
-def generate_inspection_pdf(inspection_id: str) -> Path:
+def load_inspection_bundle(inspection_id: str) -> dict[str, Any]:
     inspection = get_project_inspection(inspection_id)
     if not inspection:
         raise ValueError("Inspección no encontrada")
     project_id = inspection["project_id"]
-    base = _ensure_dirs(project_id, inspection_id)
-    report_dir = base / "reports"
-    report_dir.mkdir(exist_ok=True)
-    pdf_path = report_dir / f"{inspection_id}.pdf"
-
-    damages = list_project_inspection_damages(project_id, inspection_id)
-    tests = list_project_inspection_tests(project_id, inspection_id)
-    documents = list_project_inspection_documents(project_id, inspection_id)
-
-    c = canvas.Canvas(str(pdf_path), pagesize=letter)
-    width, height = letter
-    margin = 40
-    y = height - margin
-
-    c.setFont("Helvetica-Bold", 16)
-    c.drawString(margin, y, f"Informe de inspección: {inspection.get('structure_name')}")
-    y -= 30
-
-    c.setFont("Helvetica", 10)
-    c.drawString(margin, y, f"Proyecto: {inspection.get('project_id')}")
-    y -= 15
-    c.drawString(margin, y, f"Fecha: {inspection.get('inspection_date')}")
-    y -= 15
-    c.drawString(margin, y, f"Inspector: {inspection.get('inspector')}")
-    y -= 25
-
-    c.setFont("Helvetica-Bold", 12)
-    c.drawString(margin, y, "Resumen")
-    y -= 15
-    c.setFont("Helvetica", 10)
-    text = c.beginText(margin, y)
-    text.textLines(inspection.get("summary", "Sin resumen"))
-    c.drawText(text)
-    y = text.getY() - 20
-
-    def _ensure_space(min_space: int = 60):
-        nonlocal y
-        if y < margin + min_space:
-            c.showPage()
-            y = height - margin
-
-    def _format_date(value: Any) -> str:
+    return {
+        "inspection": inspection,
+        "damages": list_project_inspection_damages(project_id, inspection_id),
+        "tests": list_project_inspection_tests(project_id, inspection_id),
+        "documents": list_project_inspection_documents(project_id, inspection_id),
+    }
+
+
+def generate_inspection_pdf(inspection_id: str) -> Path:
+    return render_inspection_report(load_inspection_bundle(inspection_id))
+
+
+def _serialize_record(record: dict[str, Any]) -> dict[str, Any]:
+    serialized: dict[str, Any] = {}
+    for key, value in record.items():
         if isinstance(value, (datetime, date)):
-            return value.strftime("%d/%m/%Y")
-        if isinstance(value, str):
-            try:
-                return datetime.fromisoformat(value).strftime("%d/%m/%Y")
-            except ValueError:
-                return value
-        return str(value)
-
-    def _draw_damage_section(title: str, items: Iterable[dict[str, Any]]):
-        nonlocal y
-        c.setFont("Helvetica-Bold", 12)
-        c.drawString(margin, y, title)
-        y -= 15
-        c.setFont("Helvetica", 10)
-        if not items:
-            c.drawString(margin, y, "Sin registros.")
-            y -= 15
-            return
-        for item in items:
-            _ensure_space()
-            structure = item.get("structure") or "Elemento no indicado"
-            location = item.get("location") or "Ubicación no indicada"
-            c.drawString(margin, y, f"- Estructura: {structure} · Ubicación: {location}")
-            y -= 12
-            for field, label in (
-                ("damage_type", "Tipo"),
-                ("damage_cause", "Causa"),
-                ("severity", "Gravedad"),
-                ("extent", "Extensión"),
-                ("comments", "Comentarios"),
-            ):
-                value = item.get(field)
-                if value:
-                    _ensure_space()
-                    c.drawString(margin + 20, y, f"{label}: {value}")
-                    y -= 12
-            damage_date = item.get("damage_date")
-            if damage_date:
-                _ensure_space()
-                c.drawString(margin + 20, y, f"Registrado: {_format_date(damage_date)}")
-                y -= 12
-            y -= 6
-
-    def _draw_tests_section(title: str, items: Iterable[dict[str, Any]]):
-        nonlocal y
-        c.setFont("Helvetica-Bold", 12)
-        c.drawString(margin, y, title)
-        y -= 15
-        c.setFont("Helvetica", 10)
-        if not items:
-            c.drawString(margin, y, "Sin registros.")
-            y -= 15
-            return
-        for test in items:
-            _ensure_space()
-            c.drawString(margin, y, f"- {test.get('test_type', 'Ensayo sin nombre')}")
-            y -= 12
-            for field, label in (
-                ("method", "Método"),
-                ("standard", "Norma"),
-                ("laboratory", "Laboratorio"),
-            ):
-                value = test.get(field)
-                if value:
-                    _ensure_space()
-                    c.drawString(margin + 20, y, f"{label}: {value}")
-                    y -= 12
-            result_summary = test.get("result_summary")
-            if result_summary:
-                _ensure_space()
-                text = c.beginText(margin + 20, y)
-                text.textLines(f"Resultados: {result_summary}")
-                c.drawText(text)
-                y = text.getY()
-            executed_at = test.get("executed_at")
-            if executed_at:
-                _ensure_space()
-                c.drawString(margin + 20, y, f"Fecha: {_format_date(executed_at)}")
-                y -= 12
-            attachment = test.get("attachment_url")
-            if attachment:
-                _ensure_space()
-                c.drawString(margin + 20, y, f"Adjunto: {attachment}")
-                y -= 12
-            y -= 6
-
-    _draw_damage_section("Daños registrados", damages)
-    _draw_tests_section("Ensayos y pruebas", tests)
-
-    def _draw_documents_section(title: str, items: Iterable[dict[str, Any]]):
-        nonlocal y
-        c.setFont("Helvetica-Bold", 12)
-        c.drawString(margin, y, title)
-        y -= 15
-        c.setFont("Helvetica", 10)
-        if not items:
-            c.drawString(margin, y, "Sin documentos.")
-            y -= 15
-            return
-        for doc in items:
-            _ensure_space()
-            doc_title = doc.get("title") or "Documento sin título"
-            category = doc.get("category") or "Categoría no indicada"
-            issued_at = doc.get("issued_at")
-            issued_at_label = _format_date(issued_at) if issued_at else "Fecha no indicada"
-            issued_by = doc.get("issued_by") or "Autor no indicado"
-            c.drawString(margin, y, f"- {doc_title} ({category})")
-            y -= 12
-            c.drawString(margin + 20, y, f"Emitido por: {issued_by} · Fecha: {issued_at_label}")
-            y -= 12
-            notes = doc.get("notes")
-            if notes:
-                _ensure_space()
-                text = c.beginText(margin + 20, y)
-                text.textLines(f"Notas: {notes}")
-                c.drawText(text)
-                y = text.getY()
-            url = doc.get("url")
-            if url:
-                _ensure_space()
-                c.drawString(margin + 20, y, f"URL: {url}")
-                y -= 12
-            y -= 6
-
-    _draw_documents_section("Documentación relacionada", documents)
-
-    c.save()
-    return pdf_path
+            serialized[key] = value.isoformat()
+        else:
+            serialized[key] = value
+    return serialized
+
+
+def _archive_photos(bundle: dict[str, Any]) -> list[tuple[Path, str]]:
+    """Fotos de la inspección y de sus daños, con su nombre dentro del zip.
+
+    ``resolve_upload_path`` decide qué URLs son nuestras (disco local o backend remoto); las ajenas o
+    inexistentes se omiten.
+    """
+    entries: list[tuple[str, str]] = [
+        (url, f"photos/{Path(url).name}") for url in bundle["inspection"].get("photos") or [] if isinstance(url, str)
+    ]
+    for damage in bundle["damages"]:
+        for photo in damage.get("photos") or []:
+            url = photo.get("photo_url")
+            if isinstance(url, str):
+                entries.append((url, f"damages/{damage.get('id')}/{Path(url).name}"))
+    photos = []
+    for url, arcname in entries:
+        try:
+            photos.append((resolve_upload_path(url), arcname))
+        except FileNotFoundError:
+            continue
+    return photos
+
+
+def inspection_content_hash(bundle: dict[str, Any], photos: list[tuple[Path, str]]) -> str:
+    """Hash de los registros de la inspección y de los archivos incluidos (ruta, tamaño y mtime)."""
+    digest = hashlib.sha256(ARCHIVE_FORMAT_VERSION.encode())
+    records = {key: bundle[key] for key in ("inspection", "damages", "tests", "documents")}
+    digest.update(json.dumps(records, sort_keys=True, default=str).encode())
+    for path, arcname in photos:
+        stat = path.stat()
+        digest.update(f"{arcname}:{stat.st_size}:{stat.st_mtime_ns}".encode())
+    return digest.hexdigest()[:32]
+
+
+class _ChunkSink(io.RawIOBase):
+    """Destino sin ``seek`` para ``ZipFile``: acumula lo escrito hasta que el generador lo entrega."""
+
+    def __init__(self, tee: BinaryIO):
+        self._chunks: list[bytes] = []
+        self._tee = tee
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        data = bytes(data)
+        self._chunks.append(data)
+        self._tee.write(data)
+        return len(data)
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+def _zip_info(arcname: str, compress_type: int, source: Path | None = None) -> zipfile.ZipInfo:
+    if source is not None:
+        info = zipfile.ZipInfo.from_file(source, arcname)
+    else:
+        info = zipfile.ZipInfo(arcname, date_time=datetime.now().timetuple()[:6])
+    info.compress_type = compress_type
+    return info
+
+
+def _stream_archive(bundle: dict[str, Any], photos: list[tuple[Path, str]], cache_path: Path) -> Iterator[bytes]:
+    tmp_path = cache_path.with_name(f".{cache_path.name}.{uuid.uuid4().hex}.tmp")
+    completed = False
+    try:
+        with open(tmp_path, "wb") as tee:
+            sink = _ChunkSink(tee)
+            with zipfile.ZipFile(sink, "w") as archive:
+                pdf_path = render_inspection_report(bundle)
+                with open(pdf_path, "rb") as source, archive.open(
+                    _zip_info("inspection.pdf", zipfile.ZIP_DEFLATED, pdf_path), "w"
+                ) as entry:
+                    while chunk := source.read(ARCHIVE_CHUNK_SIZE):
+                        entry.write(chunk)
+                        yield sink.drain()
+                metadata = {
+                    "inspection": _serialize_record(bundle["inspection"]),
+                    "damages": [_serialize_record(dmg) for dmg in bundle["damages"]],
+                    "tests": [_serialize_record(test) for test in bundle["tests"]],
+                    "documents": [_serialize_record(doc) for doc in bundle["documents"]],
+                    "timestamp": datetime.utcnow().isoformat(),
+                }
+                archive.writestr(
+                    _zip_info("metadata.json", zipfile.ZIP_DEFLATED),
+                    json.dumps(metadata, ensure_ascii=False, indent=2, default=str),
+                )
+                for path, arcname in photos:
+                    # JPEG/PNG are already compressed: STORED avoids burning CPU for ~0% gain.
+                    compress_type = zipfile.ZIP_STORED if path.suffix.lower() in _STORED_SUFFIXES else zipfile.ZIP_DEFLATED
+                    with open(path, "rb") as source, archive.open(_zip_info(arcname, compress_type, path), "w") as entry:
+                        while chunk := source.read(ARCHIVE_CHUNK_SIZE):
+                            entry.write(chunk)
+                            yield sink.drain()
+            yield sink.drain()
+        os.replace(tmp_path, cache_path)
+        completed = True
+        cleanup_stale_archives(keep=cache_path)
+    finally:
+        if not completed:
+            tmp_path.unlink(missing_ok=True)
+
+
+def cleanup_stale_archives(keep: Path | None = None, max_age: float = ARCHIVE_CACHE_MAX_AGE) -> int:
+    """Borra zips de versiones anteriores de la misma inspección, los más antiguos que ``max_age`` y temporales huérfanos."""
+    if not ARCHIVE_CACHE_DIR.exists():
+        return 0
+    now = time.time()
+    prefix = keep.name.rsplit("-", 1)[0] + "-" if keep is not None else None
+    removed = 0
+    for path in ARCHIVE_CACHE_DIR.iterdir():
+        if path == keep:
+            continue
+        try:
+            age = now - path.stat().st_mtime
+        except FileNotFoundError:
+            continue
+        is_tmp = path.name.endswith(".tmp")
+        superseded = prefix is not None and not is_tmp and path.name.startswith(prefix)
+        if superseded or age > (_TMP_MAX_AGE if is_tmp else max_age):
+            path.unlink(missing_ok=True)
+            removed += 1
+    if keep is not None:
+        # Archives written by the previous implementation (one uuid ZIP per download).
+        for legacy in INSPECTIONS_DIR.glob(f"*/{prefix[:-1]}/archives/*.zip"):
+            legacy.unlink(missing_ok=True)
+            removed += 1
+    return removed
+
+
+def prepare_inspection_archive(inspection_id: str) -> tuple[Path, Iterator[bytes] | None]:
+    """Devuelve ``(ruta_en_cache, stream)``.
+
+    Si ya existe un zip para el contenido actual de la inspección ``stream`` es ``None`` y basta servir
+    la ruta. Si no, ``stream`` genera el zip por bloques (para enviarlo directo en la respuesta) y al
+    terminar lo deja en la ruta indicada.
+    """
+    bundle = load_inspection_bundle(inspection_id)
+    photos = _archive_photos(bundle)
+    digest = inspection_content_hash(bundle, photos)
+    ARCHIVE_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+    cache_path = ARCHIVE_CACHE_DIR / f"{inspection_id}-{digest}.zip"
+    if cache_path.exists():
+        os.utime(cache_path)
+        return cache_path, None
+    return cache_path, _stream_archive(bundle, photos, cache_path)
 
 
 def create_inspection_archive(inspection_id: str) -> Path:
-    inspection = get_project_inspection(inspection_id)
-    if not inspection:
-        raise ValueError("Inspección no encontrada")
-    project_id = inspection["project_id"]
-    base = _ensure_dirs(project_id, inspection_id)
-    archives_dir = base / "archives"
-    archives_dir.mkdir(exist_ok=True)
-    pdf_path = generate_inspection_pdf(inspection_id)
-    zip_path = archives_dir / f"{inspection_id}-{uuid.uuid4().hex}.zip"
-
-    def _serialize_record(record: dict[str, Any]) -> dict[str, Any]:
-        serialized: dict[str, Any] = {}
-        for key, value in record.items():
-            if isinstance(value, (datetime, date)):
-                serialized[key] = value.isoformat()
-            else:
-                serialized[key] = value
-        return serialized
-
-    metadata = {
-        "inspection": _serialize_record(inspection),
-        "damages": [_serialize_record(dmg) for dmg in damages],
-        "tests": [_serialize_record(test) for test in tests],
-        "documents": [_serialize_record(doc) for doc in documents],
-        "timestamp": datetime.utcnow().isoformat(),
-    }
-
-    with zipfile.ZipFile(zip_path, "w", compression=zipfile.ZIP_DEFLATED) as archive:
-        archive.write(pdf_path, arcname="inspection.pdf")
-        archive.writestr("metadata.json", json.dumps(metadata, ensure_ascii=False, indent=2))
-        for photo_url in inspection.get("photos") or []:
-            if not isinstance(photo_url, str):
-                continue
-            if not photo_url.startswith("/uploads/"):
-                continue
-            relative = photo_url.lstrip("/")
-            photo_path = Path(relative)
-            if photo_path.exists():
-                archive.write(photo_path, arcname=f"photos/{photo_path.name}")
-
-    return zip_path
+    cache_path, stream = prepare_inspection_archive(inspection_id)
+    if stream is not None:
+        for _ in stream:
+            pass
+    return cache_path
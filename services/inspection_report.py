@@ -0,0 +1,280 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import os
+import time
+import uuid
+from datetime import date, datetime
+from pathlib import Path
+from typing import Any, Callable
+from xml.sax.saxutils import escape
+
+from reportlab.lib.pagesizes import letter
+from reportlab.lib.styles import ParagraphStyle, getSampleStyleSheet
+from reportlab.lib.units import inch
+from reportlab.platypus import Flowable, Image, KeepTogether, Paragraph, SimpleDocTemplate, Spacer, Table
+
+from core.cache import TTLCache
+from services.media_service import BASE_UPLOAD_DIR
+from services.photo_derivatives import report_photo_path, resolve_upload_path
+
+logger = logging.getLogger(__name__)
+
+REPORT_CACHE_DIR = BASE_UPLOAD_DIR / "_reports"
+REPORT_SECTION_CACHE_TTL = float(os.environ.get("REPORT_SECTION_CACHE_TTL_SECONDS", "3600"))
+REPORT_CACHE_MAX_AGE = float(os.environ.get("REPORT_CACHE_MAX_AGE_SECONDS", str(7 * 24 * 3600)))
+REPORT_FORMAT_VERSION = "1"
+
+MARGIN = 40
+PHOTO_BOX = (2.3 * inch, 1.75 * inch)
+PHOTOS_PER_ROW = 3
+_TMP_MAX_AGE = 3600
+
+_styles = getSampleStyleSheet()
+STYLES = {
+    "title": ParagraphStyle("ReportTitle", parent=_styles["Heading1"], fontName="Helvetica-Bold", fontSize=16),
+    "heading": ParagraphStyle("ReportHeading", parent=_styles["Heading2"], fontName="Helvetica-Bold", fontSize=12),
+    "body": ParagraphStyle("ReportBody", parent=_styles["BodyText"], fontName="Helvetica", fontSize=10, leading=13),
+    "item": ParagraphStyle("ReportItem", parent=_styles["BodyText"], fontName="Helvetica-Bold", fontSize=10, leading=13),
+    "detail": ParagraphStyle(
+        "ReportDetail", parent=_styles["BodyText"], fontName="Helvetica", fontSize=9.5, leading=12, leftIndent=20
+    ),
+}
+
+# Sections are cached as immutable specs: ("p", markup, style), ("space", height), ("keep", specs) and
+# ("photos", paths). Each build turns them into fresh flowables, since reportlab mutates those while laying out.
+Spec = tuple
+_section_cache = TTLCache(ttl=REPORT_SECTION_CACHE_TTL, maxsize=512)
+
+
+def _text(value: Any) -> str:
+    return escape(str(value)).replace("\n", "<br/>")
+
+
+def _format_date(value: Any) -> str:
+    if isinstance(value, (datetime, date)):
+        return value.strftime("%d/%m/%Y")
+    if isinstance(value, str):
+        try:
+            return datetime.fromisoformat(value).strftime("%d/%m/%Y")
+        except ValueError:
+            return value
+    return str(value)
+
+
+def section_hash(name: str, data: Any) -> str:
+    payload = json.dumps([REPORT_FORMAT_VERSION, name, data], sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode()).hexdigest()[:32]
+
+
+def _details(item: dict[str, Any], fields: tuple[tuple[str, str], ...]) -> list[Spec]:
+    return [("p", f"{label}: {_text(item[field])}", "detail") for field, label in fields if item.get(field)]
+
+
+def _photo_urls(damage: dict[str, Any]) -> list[str]:
+    return [photo["photo_url"] for photo in damage.get("photos") or [] if photo.get("photo_url")]
+
+
+def _photo_grid(urls: list[str]) -> list[Spec]:
+    paths = []
+    for url in urls:
+        try:
+            paths.append(str(report_photo_path(url, *PHOTO_BOX)))
+        except (FileNotFoundError, OSError, ValueError) as exc:
+            logger.info("Photo %s skipped in report: %s", url, exc)
+    return [("photos", tuple(paths))] if paths else []
+
+
+def _photo_state(url: str) -> list[Any]:
+    """Ruta y mtime con que se resolvería la foto, o "missing": entra al hash de la sección de daños."""
+    try:
+        path = resolve_upload_path(url)
+        return [url, str(path), path.stat().st_mtime_ns]
+    except (FileNotFoundError, OSError, ValueError):
+        return [url, "missing"]
+
+
+def _header_section(inspection: dict[str, Any]) -> list[Spec]:
+    return [
+        ("p", f"Informe de inspección: {_text(inspection.get('structure_name'))}", "title"),
+        ("p", f"Proyecto: {_text(inspection.get('project_id'))}", "body"),
+        ("p", f"Fecha: {_text(inspection.get('inspection_date'))}", "body"),
+        ("p", f"Inspector: {_text(inspection.get('inspector'))}", "body"),
+        ("space", 12),
+        ("p", "Resumen", "heading"),
+        ("p", _text(inspection.get("summary") or "Sin resumen"), "body"),
+    ]
+
+
+def _damages_section(damages: list[dict[str, Any]]) -> list[Spec]:
+    specs: list[Spec] = [("p", "Daños registrados", "heading")]
+    if not damages:
+        return specs + [("p", "Sin registros.", "body")]
+    for damage in damages:
+        structure = damage.get("structure") or "Elemento no indicado"
+        location = damage.get("location") or "Ubicación no indicada"
+        block = [("p", f"- Estructura: {_text(structure)} · Ubicación: {_text(location)}", "item")]
+        block += _details(
+            damage,
+            (
+                ("damage_type", "Tipo"),
+                ("damage_cause", "Causa"),
+                ("severity", "Gravedad"),
+                ("extent", "Extensión"),
+                ("comments", "Comentarios"),
+            ),
+        )
+        if damage.get("damage_date"):
+            block.append(("p", f"Registrado: {_format_date(damage['damage_date'])}", "detail"))
+        specs.append(("keep", tuple(block)))
+        specs += _photo_grid(_photo_urls(damage))
+        specs.append(("space", 6))
+    return specs
+
+
+def _tests_section(tests: list[dict[str, Any]]) -> list[Spec]:
+    specs: list[Spec] = [("p", "Ensayos y pruebas", "heading")]
+    if not tests:
+        return specs + [("p", "Sin registros.", "body")]
+    for test in tests:
+        block = [("p", f"- {_text(test.get('test_type', 'Ensayo sin nombre'))}", "item")]
+        block += _details(
+            test,
+            (
+                ("method", "Método"),
+                ("standard", "Norma"),
+                ("laboratory", "Laboratorio"),
+                ("result_summary", "Resultados"),
+            ),
+        )
+        if test.get("executed_at"):
+            block.append(("p", f"Fecha: {_format_date(test['executed_at'])}", "detail"))
+        block += _details(test, (("attachment_url", "Adjunto"),))
+        specs += [("keep", tuple(block)), ("space", 6)]
+    return specs
+
+
+def _documents_section(documents: list[dict[str, Any]]) -> list[Spec]:
+    specs: list[Spec] = [("p", "Documentación relacionada", "heading")]
+    if not documents:
+        return specs + [("p", "Sin documentos.", "body")]
+    for doc in documents:
+        title = doc.get("title") or "Documento sin título"
+        category = doc.get("category") or "Categoría no indicada"
+        issued_at = _format_date(doc["issued_at"]) if doc.get("issued_at") else "Fecha no indicada"
+        issued_by = doc.get("issued_by") or "Autor no indicado"
+        block = [
+            ("p", f"- {_text(title)} ({_text(category)})", "item"),
+            ("p", f"Emitido por: {_text(issued_by)} · Fecha: {_text(issued_at)}", "detail"),
+        ]
+        block += _details(doc, (("notes", "Notas"), ("url", "URL")))
+        specs += [("keep", tuple(block)), ("space", 6)]
+    return specs
+
+
+def _flowables(specs: tuple[Spec, ...]) -> list[Flowable]:
+    """Flowables nuevos para un documento a partir de los specs de una sección."""
+    flowables: list[Flowable] = []
+    for spec in specs:
+        kind = spec[0]
+        if kind == "p":
+            flowables.append(Paragraph(spec[1], STYLES[spec[2]]))
+        elif kind == "space":
+            flowables.append(Spacer(1, spec[1]))
+        elif kind == "keep":
+            flowables.append(KeepTogether(_flowables(spec[1])))
+        elif kind == "photos":
+            cells = [Image(path, width=PHOTO_BOX[0], height=PHOTO_BOX[1], kind="proportional") for path in spec[1]]
+            rows = [cells[index:index + PHOTOS_PER_ROW] for index in range(0, len(cells), PHOTOS_PER_ROW)]
+            rows[-1] = rows[-1] + [""] * (PHOTOS_PER_ROW - len(rows[-1]))
+            flowables += [Spacer(1, 4), Table(rows, colWidths=[PHOTO_BOX[0] + 6] * PHOTOS_PER_ROW, hAlign="LEFT")]
+    return flowables
+
+
+SECTIONS: tuple[tuple[str, str, Callable[[Any], list[Spec]]], ...] = (
+    ("header", "inspection", _header_section),
+    ("damages", "damages", _damages_section),
+    ("tests", "tests", _tests_section),
+    ("documents", "documents", _documents_section),
+)
+
+
+def _section_specs(name: str, digest: str, builder: Callable[[Any], list[Spec]], data: Any) -> tuple[Spec, ...]:
+    return _section_cache.get_or_set((name, digest), lambda: tuple(builder(data)))
+
+
+def _hash_input(name: str, data: Any) -> Any:
+    if name != "damages":
+        return data
+    # Photos that cannot be read yet (still being processed) are left out of the PDF: the hash has to change
+    # once they appear, or the report without them would stay cached.
+    return {"records": data, "photos": [_photo_state(url) for damage in data for url in _photo_urls(damage)]}
+
+
+def report_hash(bundle: dict[str, Any]) -> tuple[str, list[tuple[str, str]]]:
+    """Hash del informe completo y el hash de cada sección, en orden (la de daños incluye el estado de sus fotos)."""
+    sections = [(name, section_hash(name, _hash_input(name, bundle[key] or []))) for name, key, _ in SECTIONS]
+    combined = hashlib.sha256("".join(digest for _, digest in sections).encode()).hexdigest()[:32]
+    return combined, sections
+
+
+def render_inspection_report(bundle: dict[str, Any]) -> Path:
+    """Devuelve el PDF del informe, generándolo solo si cambió el contenido de la inspección.
+
+    Cada sección se guarda en caché, por el hash de sus datos, como specs inmutables que se convierten en
+    flowables nuevos en cada documento, así que los informes se generan en paralelo sin compartir estado; el PDF final se
+    escribe en un temporal y se renombra, así que solicitudes concurrentes nunca ven un archivo a medias.
+    """
+    inspection_id = bundle["inspection"]["id"]
+    digest, sections = report_hash(bundle)
+    REPORT_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+    target = REPORT_CACHE_DIR / f"{inspection_id}-{digest}.pdf"
+    if target.exists():
+        os.utime(target)
+        return target
+
+    tmp_path = target.with_name(f".{target.name}.{uuid.uuid4().hex}.tmp")
+    try:
+        story: list[Flowable] = []
+        for (name, key, builder), (_, section_digest) in zip(SECTIONS, sections):
+            story += _flowables(_section_specs(name, section_digest, builder, bundle[key] or []))
+            story.append(Spacer(1, 14))
+        doc = SimpleDocTemplate(
+            str(tmp_path),
+            pagesize=letter,
+            leftMargin=MARGIN,
+            rightMargin=MARGIN,
+            topMargin=MARGIN,
+            bottomMargin=MARGIN,
+            title=f"Informe de inspección {inspection_id}",
+        )
+        doc.build(story)
+        os.replace(tmp_path, target)
+    finally:
+        tmp_path.unlink(missing_ok=True)
+    cleanup_stale_reports(keep=target)
+    return target
+
+
+def cleanup_stale_reports(keep: Path | None = None, max_age: float = REPORT_CACHE_MAX_AGE) -> int:
+    """Borra informes reemplazados de la misma inspección, los más antiguos que ``max_age`` y temporales huérfanos."""
+    if not REPORT_CACHE_DIR.exists():
+        return 0
+    now = time.time()
+    prefix = keep.name.rsplit("-", 1)[0] + "-" if keep is not None else None
+    removed = 0
+    for path in REPORT_CACHE_DIR.iterdir():
+        if path == keep:
+            continue
+        try:
+            age = now - path.stat().st_mtime
+        except FileNotFoundError:
+            continue
+        is_tmp = path.name.endswith(".tmp")
+        superseded = prefix is not None and not is_tmp and path.name.startswith(prefix)
+        if superseded or age > (_TMP_MAX_AGE if is_tmp else max_age):
+            path.unlink(missing_ok=True)
+            removed += 1
+    return removed
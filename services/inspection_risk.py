@@ -0,0 +1,142 @@
+from __future__ import annotations
+
+import re
+from typing import Any, Callable, Iterable
+
+import numpy as np
+import pandas as pd
+
+from services.inspection_scoring import DEFAULT_WEIGHTS, ScoringWeights, _extent_factor
+
+HIGH_SEVERITIES = ("Alta", "Muy Alta")
+
+
+class KeywordMatcher:
+    """Reemplaza ``next(value for key in weights if key in text)`` por una sola regex precompilada.
+
+    La regex usa un lookahead para encontrar coincidencias en cada posición (incluidas las
+    superpuestas); gana la clave que aparece primero en el diccionario, igual que el recorrido original.
+    """
+
+    def __init__(self, table: dict[str, float], default: float = 1.0):
+        keys = list(table)
+        self.default = default
+        self._values = [table[key] for key in keys]
+        self._order = {key: index for index, key in enumerate(keys)}
+        self._pattern = (
+            re.compile("(?=(" + "|".join(re.escape(key) for key in keys) + "))") if keys else None
+        )
+
+    def factor(self, text: str) -> float:
+        if self._pattern is None:
+            return self.default
+        hits = [self._order[match.group(1)] for match in self._pattern.finditer(text)]
+        return self._values[min(hits)] if hits else self.default
+
+
+class CompiledScoringWeights:
+    def __init__(self, weights: ScoringWeights = DEFAULT_WEIGHTS):
+        self.weights = weights
+        self.cause = KeywordMatcher(weights.cause)
+        self.damage_type = KeywordMatcher(weights.damage_type)
+        self.max_possible_per_damage = (
+            max(weights.severity.values()) * max(weights.cause.values()) * max(weights.damage_type.values()) * 2
+        )
+
+
+_DEFAULT_COMPILED = CompiledScoringWeights(DEFAULT_WEIGHTS)
+
+
+def _map_unique(values: pd.Series, fn: Callable[[Any], float], missing: Any) -> np.ndarray:
+    """Evalúa ``fn`` una vez por valor distinto y lo expande a toda la columna."""
+    codes, uniques = pd.factorize(values, use_na_sentinel=True)
+    mapped = np.array([fn(value) for value in uniques] + [fn(missing)], dtype=float)
+    return mapped[codes]
+
+
+def score_damages_frame(damages: pd.DataFrame, compiled: CompiledScoringWeights = _DEFAULT_COMPILED) -> np.ndarray:
+    """Puntaje base de cada daño (equivalente a ``_score_damage``) para toda la tabla en una pasada."""
+    if damages.empty:
+        return np.zeros(0)
+    weights = compiled.weights
+    severity = _map_unique(damages["severity"], lambda value: weights.severity.get(value, 1.0), None)
+    cause = _map_unique(damages["damage_cause"], lambda value: compiled.cause.factor((value or "").lower()), None)
+    damage_type = _map_unique(
+        damages["damage_type"], lambda value: compiled.damage_type.factor((value or "").lower()), None
+    )
+    extent = _map_unique(damages["extent"], _extent_factor, None)
+    return severity * cause * damage_type * (1 + extent)
+
+
+def _round_unique(values: np.ndarray, digits: int = 2) -> np.ndarray:
+    """``round`` de Python (no ``np.round``) aplicado una vez por valor distinto, para resultados idénticos."""
+    uniques, inverse = np.unique(values, return_inverse=True)
+    return np.array([round(value, digits) for value in uniques.tolist()], dtype=float)[inverse]
+
+
+def _damages_frame(damages: Iterable[dict[str, Any]]) -> pd.DataFrame:
+    columns = ["id", "inspection_id", "structure", "location", "damage_type", "damage_cause", "severity", "extent"]
+    frame = pd.DataFrame.from_records(list(damages), columns=columns)
+    return frame.astype(object)
+
+
+def rank_project_inspections(
+    inspections: Iterable[dict[str, Any]],
+    damages: Iterable[dict[str, Any]],
+    weights: ScoringWeights = DEFAULT_WEIGHTS,
+) -> tuple[pd.DataFrame, pd.DataFrame]:
+    """Puntúa todos los daños de todas las inspecciones de un proyecto y devuelve dos tablas ordenadas.
+
+    Returns:
+        (inspections_table, damages_table). ``deterministic_score`` de cada inspección coincide con
+        ``calculate_inspection_deterministic_score`` y el de cada daño con ``score_damage_deterministic``.
+    """
+    compiled = _DEFAULT_COMPILED if weights is DEFAULT_WEIGHTS else CompiledScoringWeights(weights)
+    inspection_frame = pd.DataFrame.from_records(
+        list(inspections), columns=["id", "structure_name", "location", "inspection_date", "overall_condition"]
+    )
+    damage_frame = _damages_frame(damages)
+    base_scores = score_damages_frame(damage_frame, compiled)
+
+    damage_frame["base_score"] = base_scores
+    damage_frame["deterministic_score"] = _round_unique(base_scores)
+    damage_frame["is_high_severity"] = damage_frame["severity"].isin(HIGH_SEVERITIES)
+
+    inspection_ids = inspection_frame["id"].tolist()
+    position = {inspection_id: index for index, inspection_id in enumerate(inspection_ids)}
+    codes = damage_frame["inspection_id"].map(position).fillna(-1).to_numpy(dtype=np.int64)
+    known = codes >= 0
+    size = len(inspection_ids)
+    # bincount accumulates in input order, matching the sequential sum of the per-inspection function.
+    totals = np.bincount(codes[known], weights=base_scores[known], minlength=size)
+    counts = np.bincount(codes[known], minlength=size)
+    high_counts = np.bincount(codes[known], weights=damage_frame["is_high_severity"].to_numpy(dtype=float)[known], minlength=size)
+    max_scores = np.zeros(size)
+    if known.any():
+        np.maximum.at(max_scores, codes[known], base_scores[known])
+
+    count_multiplier = 1.0 + np.minimum(0.5, counts / 10)
+    raw_scores = totals * count_multiplier
+    max_totals = compiled.max_possible_per_damage * counts * count_multiplier
+    with np.errstate(divide="ignore", invalid="ignore"):
+        normalized = np.where(max_totals > 0, (raw_scores / max_totals) * 100, 0.0)
+    inspection_frame["damage_count"] = counts
+    inspection_frame["high_severity_count"] = high_counts.astype(np.int64)
+    inspection_frame["max_damage_score"] = [round(value, 2) for value in max_scores.tolist()]
+    inspection_frame["deterministic_score"] = [
+        min(100.0, round(value, 2)) if count else 0.0 for value, count in zip(normalized.tolist(), counts.tolist())
+    ]
+
+    inspection_frame = inspection_frame.sort_values(
+        ["deterministic_score", "high_severity_count", "damage_count"], ascending=False, kind="stable"
+    ).reset_index(drop=True)
+    inspection_frame["rank"] = np.arange(1, len(inspection_frame) + 1)
+
+    damage_frame = damage_frame.drop(columns=["base_score", "is_high_severity"])
+    damage_frame = damage_frame.sort_values("deterministic_score", ascending=False, kind="stable").reset_index(drop=True)
+    return inspection_frame, damage_frame
+
+
+def frame_to_records(frame: pd.DataFrame) -> list[dict[str, Any]]:
+    """Convierte un DataFrame a registros con tipos nativos de Python (sin NaN ni escalares NumPy)."""
+    return frame.astype(object).where(frame.notna(), None).to_dict(orient="records")
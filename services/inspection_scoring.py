@@ -3,6 +3,7 @@ from __future__ import annotations
 import json
 import os
 from dataclasses import dataclass
+from pathlib import Path
 from typing import Any, Iterable
 
 try:
@@ -10,6 +11,9 @@ try:
 except ImportError:  # placeholder if package missing
     OpenAI = None
 
+from core.config import UPLOADS_DIR
+from services.llm_cache import LLMScoreCache, make_cache_key
+from services.llm_client import AsyncOpenAI, BoundedAsyncLLMClient
 
 
 @dataclass
@@ -45,8 +49,33 @@ DEFAULT_WEIGHTS = ScoringWeights(
 )
 
 OPENAI_API_KEY = os.environ.get("OPENAI_API_KEY")
+OPENAI_BASE_URL = os.environ.get("OPENAI_BASE_URL") or None
 LLM_MODEL = os.environ.get("LLM_MODEL", "gpt-4o-mini")
-_llm_client = OpenAI(api_key=OPENAI_API_KEY) if (OPENAI_API_KEY and OpenAI) else None
+LLM_TIMEOUT_SECONDS = float(os.environ.get("LLM_TIMEOUT_SECONDS", "30"))
+LLM_MAX_RETRIES = int(os.environ.get("LLM_MAX_RETRIES", "2"))
+LLM_MAX_CONCURRENCY = int(os.environ.get("LLM_MAX_CONCURRENCY", "4"))
+LLM_BATCH_SIZE = int(os.environ.get("LLM_BATCH_SIZE", "20"))
+LLM_CACHE_PATH = os.environ.get("LLM_CACHE_PATH") or Path(UPLOADS_DIR) / "_cache" / "llm_scores.sqlite3"
+LLM_CACHE_TTL_SECONDS = float(os.environ.get("LLM_CACHE_TTL_SECONDS", str(7 * 24 * 3600)))
+
+_llm_client = (
+    OpenAI(api_key=OPENAI_API_KEY, base_url=OPENAI_BASE_URL, timeout=LLM_TIMEOUT_SECONDS, max_retries=LLM_MAX_RETRIES)
+    if (OPENAI_API_KEY and OpenAI)
+    else None
+)
+_async_llm_client = (
+    BoundedAsyncLLMClient(
+        OPENAI_API_KEY,
+        LLM_MODEL,
+        base_url=OPENAI_BASE_URL,
+        max_concurrency=LLM_MAX_CONCURRENCY,
+        timeout=LLM_TIMEOUT_SECONDS,
+        max_retries=LLM_MAX_RETRIES,
+    )
+    if (OPENAI_API_KEY and AsyncOpenAI)
+    else None
+)
+_score_cache = LLMScoreCache(LLM_CACHE_PATH, LLM_CACHE_TTL_SECONDS)
 
 
 def _parse_llm_response(text: str) -> dict[str, Any]:
@@ -74,6 +103,17 @@ def _call_llm(messages: list[dict[str, str]]) -> dict[str, Any]:
     return _parse_llm_response(content)
 
 
+def _call_llm_cached(kind: str, payload: Any, messages: list[dict[str, str]]) -> dict[str, Any]:
+    key = make_cache_key(kind, payload, LLM_MODEL)
+    cached = _score_cache.get(key)
+    if cached is not None:
+        return cached
+    result = _call_llm(messages)
+    if result["llm_score"] is not None:
+        _score_cache.set(key, result)
+    return result
+
+
 def _extent_factor(value: Any) -> float:
     try:
         if isinstance(value, str):
@@ -151,7 +191,7 @@ def evaluate_damage_with_llm(damage: dict[str, Any]) -> dict[str, Any]:
             ),
         },
     ]
-    llm_response = _call_llm(messages)
+    llm_response = _call_llm_cached("damage", payload, messages)
     return {
         "llm_score": llm_response["llm_score"],
         "reason": llm_response["reason"],
@@ -160,8 +200,12 @@ def evaluate_damage_with_llm(damage: dict[str, Any]) -> dict[str, Any]:
     }
 
 
+def score_damage_deterministic(damage: dict[str, Any], weights: ScoringWeights = DEFAULT_WEIGHTS) -> float:
+    return round(_score_damage(damage, weights), 2)
+
+
 def score_damage_record(damage: dict[str, Any], weights: ScoringWeights = DEFAULT_WEIGHTS) -> dict[str, Any]:
-    deterministic = round(_score_damage(damage, weights), 2)
+    deterministic = score_damage_deterministic(damage, weights)
     llm_result = evaluate_damage_with_llm(damage)
     return {
         "deterministic_score": deterministic,
@@ -171,6 +215,105 @@ def score_damage_record(damage: dict[str, Any], weights: ScoringWeights = DEFAUL
     }
 
 
+def _coerce_score(value: Any) -> float | None:
+    try:
+        return float(value) if value is not None else None
+    except (TypeError, ValueError):
+        return None
+
+
+def _damages_batch_messages(payloads: dict[str, dict[str, Any]]) -> list[dict[str, str]]:
+    return [
+        {
+            "role": "system",
+            "content": (
+                "Eres un asistente que evalúa la crítica estructural de daños y responde con JSON."
+                " Mantén cada score entre 0 y 100."
+            ),
+        },
+        {
+            "role": "user",
+            "content": (
+                "Evalúa cada uno de estos daños de forma independiente:\n"
+                f"{json.dumps([{'id': damage_id, **payload} for damage_id, payload in payloads.items()], ensure_ascii=False)}\n\n"
+                "Devuelve solo JSON con el campo \"results\": una lista de objetos con \"id\","
+                " \"score\" (número 0-100) y \"reason\" (explicación corta)."
+            ),
+        },
+    ]
+
+
+def _split_batch_response(payloads: dict[str, dict[str, Any]], llm_response: dict[str, Any]) -> dict[str, dict[str, Any]]:
+    raw = llm_response.get("raw")
+    items = raw.get("results") if isinstance(raw, dict) else None
+    by_id = {str(item.get("id")): item for item in items or [] if isinstance(item, dict)}
+    results: dict[str, dict[str, Any]] = {}
+    for damage_id in payloads:
+        item = by_id.get(damage_id)
+        results[damage_id] = {
+            "llm_score": _coerce_score(item.get("score")) if item else None,
+            "reason": (item.get("reason") if item else None) or llm_response["reason"],
+            "raw": item,
+        }
+    return results
+
+
+def evaluate_damages_with_llm(damages: Iterable[dict[str, Any]]) -> dict[str, dict[str, Any]]:
+    """Evalúa varios daños por lotes y devuelve los resultados por id de daño.
+
+    Los daños cuyo payload ya fue evaluado con el mismo modelo se leen de la caché; el resto se
+    agrupa en lotes de ``LLM_BATCH_SIZE`` que se envían en paralelo con concurrencia acotada.
+    """
+    payloads = {str(damage["id"]): _build_damage_payload(damage) for damage in damages if damage.get("id")}
+    if not payloads:
+        return {}
+    if not _llm_client:
+        return {
+            damage_id: {"llm_score": None, "reason": "OpenAI key not configured", "payload": payload}
+            for damage_id, payload in payloads.items()
+        }
+
+    responses: dict[str, dict[str, Any]] = {}
+    misses: dict[str, dict[str, Any]] = {}
+    for damage_id, payload in payloads.items():
+        cached = _score_cache.get(make_cache_key("damage", payload, LLM_MODEL))
+        if cached is not None:
+            responses[damage_id] = cached
+        else:
+            misses[damage_id] = payload
+
+    miss_ids = list(misses)
+    chunks = [
+        {damage_id: misses[damage_id] for damage_id in miss_ids[start:start + LLM_BATCH_SIZE]}
+        for start in range(0, len(miss_ids), LLM_BATCH_SIZE)
+    ]
+    if chunks and _async_llm_client:
+        outputs = _async_llm_client.complete_many_sync([_damages_batch_messages(chunk) for chunk in chunks])
+        chunk_responses = [
+            {"llm_score": None, "reason": f"LLM request failed: {output}", "raw": None}
+            if isinstance(output, Exception)
+            else _parse_llm_response(output)
+            for output in outputs
+        ]
+    else:
+        chunk_responses = [_call_llm(_damages_batch_messages(chunk)) for chunk in chunks]
+
+    for chunk, llm_response in zip(chunks, chunk_responses):
+        for damage_id, result in _split_batch_response(chunk, llm_response).items():
+            responses[damage_id] = result
+            if result["llm_score"] is not None:
+                _score_cache.set(make_cache_key("damage", chunk[damage_id], LLM_MODEL), result)
+
+    return {
+        damage_id: {
+            "llm_score": responses[damage_id]["llm_score"],
+            "reason": responses[damage_id]["reason"],
+            "payload": payload,
+        }
+        for damage_id, payload in payloads.items()
+    }
+
+
 def evaluate_inspection_with_llm(
     inspection: dict[str, Any], damages: Iterable[dict[str, Any]]
 ) -> dict[str, Any]:
@@ -214,7 +357,7 @@ def evaluate_inspection_with_llm(
             ),
         },
     ]
-    llm_response = _call_llm(messages)
+    llm_response = _call_llm_cached("inspection", payload, messages)
     return {
         "llm_score": llm_response["llm_score"],
         "reason": llm_response["reason"],
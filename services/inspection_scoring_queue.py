@@ -0,0 +1,96 @@
+from __future__ import annotations
+
+import logging
+import os
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Callable, Iterable
+
+logger = logging.getLogger(__name__)
+
+SCORING_DEBOUNCE_SECONDS = float(os.environ.get("SCORING_DEBOUNCE_SECONDS", "2.0"))
+SCORING_MAX_DELAY_SECONDS = float(os.environ.get("SCORING_MAX_DELAY_SECONDS", "10.0"))
+
+ScoringProcessor = Callable[[str, set[str]], None]
+
+
+@dataclass
+class _PendingInspection:
+    first_seen: float
+    deadline: float
+    damage_ids: set[str] = field(default_factory=set)
+
+
+class InspectionScoringQueue:
+    """Cola con debounce que agrupa los recálculos de puntaje por inspección.
+
+    Cada cambio reinicia la ventana de la inspección (hasta ``max_delay`` desde el primer cambio),
+    de modo que una carga masiva de daños produce un solo recálculo en segundo plano.
+    """
+
+    def __init__(
+        self,
+        processor: ScoringProcessor,
+        window: float = SCORING_DEBOUNCE_SECONDS,
+        max_delay: float = SCORING_MAX_DELAY_SECONDS,
+    ):
+        self.processor = processor
+        self.window = window
+        self.max_delay = max(max_delay, window)
+        self._pending: dict[str, _PendingInspection] = {}
+        self._cond = threading.Condition()
+        self._worker: threading.Thread | None = None
+
+    def schedule(self, inspection_id: str, damage_ids: Iterable[str] = ()) -> None:
+        if not inspection_id:
+            return
+        now = time.monotonic()
+        with self._cond:
+            entry = self._pending.get(inspection_id)
+            if entry is None:
+                entry = _PendingInspection(first_seen=now, deadline=now + self.window)
+                self._pending[inspection_id] = entry
+            entry.damage_ids.update(damage_id for damage_id in damage_ids if damage_id)
+            entry.deadline = min(now + self.window, entry.first_seen + self.max_delay)
+            self._ensure_worker()
+            self._cond.notify()
+
+    def pending(self) -> dict[str, set[str]]:
+        with self._cond:
+            return {key: set(entry.damage_ids) for key, entry in self._pending.items()}
+
+    def flush(self) -> None:
+        """Procesa de inmediato todo lo pendiente en el hilo actual."""
+        with self._cond:
+            due = [(key, entry.damage_ids) for key, entry in self._pending.items()]
+            self._pending.clear()
+        self._process(due)
+
+    def _ensure_worker(self) -> None:
+        if self._worker is None or not self._worker.is_alive():
+            self._worker = threading.Thread(target=self._run, name="inspection-scoring", daemon=True)
+            self._worker.start()
+
+    def _take_due(self, now: float) -> list[tuple[str, set[str]]]:
+        due = [key for key, entry in self._pending.items() if entry.deadline <= now]
+        return [(key, self._pending.pop(key).damage_ids) for key in due]
+
+    def _run(self) -> None:
+        while True:
+            with self._cond:
+                while True:
+                    now = time.monotonic()
+                    due = self._take_due(now)
+                    if due:
+                        break
+                    timeout = min((entry.deadline for entry in self._pending.values()), default=None)
+                    self._cond.wait(None if timeout is None else max(0.0, timeout - now))
+            self._process(due)
+
+    def _process(self, due: list[tuple[str, set[str]]]) -> None:
+        for inspection_id, damage_ids in due:
+            try:
+                self.processor(inspection_id, damage_ids)
+            except Exception:
+                logger.exception("Score recompute failed for inspection %s", inspection_id)
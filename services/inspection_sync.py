@@ -0,0 +1,268 @@
+from __future__ import annotations
+
+import logging
+import os
+from dataclasses import dataclass, field
+from typing import Any, Iterable
+
+from pydantic import BaseModel, ValidationError
+
+from api.schemas.inspections import DamageCreate, DamagePhotoCreate, DocumentCreate, InspectionCreate, TestCreate
+from services.inspections_service import scoring_queue
+from supa.client import supa
+
+logger = logging.getLogger(__name__)
+
+MAX_SYNC_CHANGES = int(os.environ.get("MAX_SYNC_CHANGES", "500"))
+# Entrada del vector que incrementa la base de datos en cada escritura fuera de la sincronización
+# (trigger bump_server_version); ningún cliente puede usarla como su id.
+SERVER_REPLICA = "server"
+_IN_CHUNK = 100
+# Columnas que mantiene el servidor: si un cliente las reenvía se ignoran, nunca se escriben desde la sincronización.
+SERVER_COLUMNS = frozenset(
+    {
+        "id",
+        "created_at",
+        "updated_at",
+        "version_vector",
+        "deterministic_score",
+        "severity_rank",
+        "llm_score",
+        "llm_reason",
+        "llm_payload",
+        "score_updated_at",
+    }
+)
+
+
+@dataclass(frozen=True)
+class SyncEntity:
+    table: str
+    schema: type[BaseModel]
+    parent: tuple[str, str] | None = None  # (entidad padre, columna FK)
+
+    @property
+    def columns(self) -> tuple[str, ...]:
+        """Columnas editables por el cliente: los campos declarados del schema (incluye las FK)."""
+        return tuple(self.schema.model_fields)
+
+
+# Parents first: upserts run in this order and deletes in the reverse one.
+SYNC_ENTITIES: dict[str, SyncEntity] = {
+    "inspection": SyncEntity("project_inspections", InspectionCreate),
+    "damage": SyncEntity("project_inspection_damages", DamageCreate, ("inspection", "inspection_id")),
+    "damage_photo": SyncEntity("project_inspection_damage_photos", DamagePhotoCreate, ("damage", "damage_id")),
+    "test": SyncEntity("project_inspection_tests", TestCreate, ("inspection", "inspection_id")),
+    "document": SyncEntity("project_inspection_documents", DocumentCreate, ("inspection", "inspection_id")),
+}
+
+
+def compare_versions(local: dict[str, int], remote: dict[str, int]) -> str:
+    """Relación del vector ``local`` con ``remote``: ``equal``, ``before``, ``after`` o ``concurrent``."""
+    replicas = set(local) | set(remote)
+    ahead = any(local.get(replica, 0) > remote.get(replica, 0) for replica in replicas)
+    behind = any(local.get(replica, 0) < remote.get(replica, 0) for replica in replicas)
+    if ahead and behind:
+        return "concurrent"
+    if ahead:
+        return "after"
+    if behind:
+        return "before"
+    return "equal"
+
+
+@dataclass
+class SyncPlan:
+    upserts: dict[str, dict[str, dict[str, Any]]] = field(default_factory=dict)
+    deletes: dict[str, list[str]] = field(default_factory=dict)
+    applied: list[dict[str, Any]] = field(default_factory=list)
+    skipped: list[dict[str, Any]] = field(default_factory=list)
+    conflicts: list[dict[str, Any]] = field(default_factory=list)
+    scoring: dict[str, set[str]] = field(default_factory=dict)
+
+    def conflict(self, change: dict[str, Any], reason: str, detail: str | None = None, current=None) -> None:
+        self.conflicts.append(
+            {
+                "entity": change["entity"],
+                "id": change["id"],
+                "op": change["op"],
+                "reason": reason,
+                "detail": detail,
+                "server_version": current.get("version_vector") if current else None,
+                "server_record": current,
+            }
+        )
+
+
+def _outcome(change: dict[str, Any], version: dict[str, int]) -> dict[str, Any]:
+    return {"entity": change["entity"], "id": change["id"], "op": change["op"], "version": version}
+
+
+def _validation_detail(exc: ValidationError) -> str:
+    error = exc.errors()[0]
+    return f"{'.'.join(str(part) for part in error['loc'])}: {error['msg']}"
+
+
+def plan_changeset(
+    project_id: str,
+    client_id: str,
+    changes: Iterable[dict[str, Any]],
+    existing: dict[str, dict[str, dict[str, Any]]],
+) -> SyncPlan:
+    """Decide qué cambios aplicar, en orden, contra el estado del servidor (``existing``: entidad → id → fila).
+
+    Un cambio se aplica si su vector de versión domina al del servidor; si el servidor ya lo incluye (un
+    reenvío) se omite, y si ambos avanzaron por separado se devuelve como conflicto junto a la fila actual.
+    Los cambios posteriores del lote ven el resultado de los anteriores.
+    """
+    plan = SyncPlan()
+    state = {entity: dict(existing.get(entity) or {}) for entity in SYNC_ENTITIES}
+    for change in changes:
+        entity = SYNC_ENTITIES[change["entity"]]
+        rows = state[change["entity"]]
+        current = rows.get(change["id"])
+        if current is not None and str(current.get("project_id")) != project_id:
+            plan.conflict(change, "missing", "El registro pertenece a otro proyecto")
+            continue
+        version = {replica: int(counter) for replica, counter in (change.get("version") or {}).items()}
+        if version.get(client_id, 0) <= 0:
+            plan.conflict(change, "invalid", "El vector de versión no incluye al cliente", current)
+            continue
+        server_version = (current or {}).get("version_vector") or {}
+
+        if change["op"] == "delete":
+            if current is None:
+                plan.skipped.append(_outcome(change, version))
+            elif compare_versions(version, server_version) in ("after", "equal"):
+                rows[change["id"]] = None
+                plan.upserts.get(change["entity"], {}).pop(change["id"], None)
+                plan.deletes.setdefault(change["entity"], []).append(change["id"])
+                plan.applied.append(_outcome(change, version))
+                _track_scoring(plan, change["entity"], current, deleted=True)
+            else:
+                plan.conflict(change, "concurrent", None, current)
+            continue
+
+        if current is None and change["op"] == "update":
+            plan.conflict(change, "missing", "El registro no existe o fue eliminado")
+            continue
+        if current is not None:
+            relation = compare_versions(version, server_version)
+            if relation in ("equal", "before"):
+                plan.skipped.append(_outcome(change, version))
+                continue
+            if relation == "concurrent":
+                plan.conflict(change, "concurrent", None, current)
+                continue
+
+        data = change.get("data") or {}
+        unknown = sorted(set(data) - set(entity.columns) - SERVER_COLUMNS)
+        if unknown:
+            plan.conflict(change, "invalid", f"Columnas no editables: {', '.join(unknown)}", current)
+            continue
+        client_data = {column: value for column, value in data.items() if column in entity.columns}
+        merged = {**(current or {}), **client_data, "id": change["id"], "project_id": project_id}
+        if entity.parent is not None:
+            parent_entity, column = entity.parent
+            parent = state[parent_entity].get(str(merged.get(column)))
+            if parent is None:
+                plan.conflict(change, "missing_parent", f"No existe {parent_entity} {merged.get(column)}", current)
+                continue
+            if "inspection_id" in parent:
+                merged["inspection_id"] = parent["inspection_id"]
+        try:
+            validated = entity.schema.model_validate(merged).model_dump(mode="json")
+        except ValidationError as exc:
+            plan.conflict(change, "invalid", _validation_detail(exc), current)
+            continue
+        # Only client-editable columns are written: server-side columns read at plan time (scores,
+        # timestamps) could be stale by the time the upsert runs.
+        row = {column: validated[column] for column in entity.columns if column in validated}
+        row.update(id=change["id"], version_vector=version)
+        rows[change["id"]] = {**(current or {}), **row}
+        if change["id"] in plan.deletes.get(change["entity"], []):
+            plan.deletes[change["entity"]].remove(change["id"])
+        plan.upserts.setdefault(change["entity"], {})[change["id"]] = row
+        plan.applied.append(_outcome(change, version))
+        _track_scoring(plan, change["entity"], row)
+
+    for inspection_id, row in state["inspection"].items():
+        if row is None:
+            plan.scoring.pop(inspection_id, None)
+    return plan
+
+
+def _track_scoring(plan: SyncPlan, entity: str, row: dict[str, Any], deleted: bool = False) -> None:
+    if entity == "inspection" and not deleted:
+        plan.scoring.setdefault(str(row["id"]), set())
+    elif entity == "damage":
+        damage_ids = plan.scoring.setdefault(str(row["inspection_id"]), set())
+        if not deleted:
+            damage_ids.add(str(row["id"]))
+
+
+def _fetch_rows(table: str, ids: Iterable[str]) -> list[dict[str, Any]]:
+    ids = sorted(set(ids))
+    rows: list[dict[str, Any]] = []
+    for start in range(0, len(ids), _IN_CHUNK):
+        rows += supa().table(table).select("*").in_("id", ids[start:start + _IN_CHUNK]).execute().data or []
+    return rows
+
+
+def load_sync_state(changes: list[dict[str, Any]]) -> dict[str, dict[str, dict[str, Any]]]:
+    """Filas actuales de los registros tocados y de sus padres: una consulta por tabla (más una para padres faltantes)."""
+    wanted: dict[str, set[str]] = {entity: set() for entity in SYNC_ENTITIES}
+    for change in changes:
+        wanted[change["entity"]].add(change["id"])
+    state = {
+        entity: {str(row["id"]): row for row in _fetch_rows(SYNC_ENTITIES[entity].table, ids)} if ids else {}
+        for entity, ids in wanted.items()
+    }
+
+    parents: dict[str, set[str]] = {entity: set() for entity in SYNC_ENTITIES}
+    in_batch = {(change["entity"], change["id"]) for change in changes if change["op"] != "delete"}
+    for change in changes:
+        spec = SYNC_ENTITIES[change["entity"]]
+        if spec.parent is None or change["op"] == "delete":
+            continue
+        parent_entity, column = spec.parent
+        parent_id = (change.get("data") or {}).get(column) or (state[change["entity"]].get(change["id"]) or {}).get(column)
+        if parent_id and str(parent_id) not in state[parent_entity] and (parent_entity, str(parent_id)) not in in_batch:
+            parents[parent_entity].add(str(parent_id))
+    for entity, ids in parents.items():
+        if ids:
+            state[entity].update({str(row["id"]): row for row in _fetch_rows(SYNC_ENTITIES[entity].table, ids)})
+    return state
+
+
+def apply_sync_plan(plan: SyncPlan) -> None:
+    """Un upsert multi-fila por tabla (padres primero) y un delete por tabla (hijos primero)."""
+    client = supa()
+    for entity, spec in SYNC_ENTITIES.items():
+        rows = list(plan.upserts.get(entity, {}).values())
+        if rows:
+            client.table(spec.table).upsert(rows, default_to_null=False).execute()
+    for entity, spec in reversed(SYNC_ENTITIES.items()):
+        ids = plan.deletes.get(entity) or []
+        for start in range(0, len(ids), _IN_CHUNK):
+            client.table(spec.table).delete().in_("id", ids[start:start + _IN_CHUNK]).execute()
+
+
+def sync_inspection_changes(project_id: str, client_id: str, changes: list[dict[str, Any]]) -> dict[str, Any]:
+    """Aplica un lote de cambios hechos sin conexión y agenda un solo recálculo de puntajes por inspección."""
+    if len(changes) > MAX_SYNC_CHANGES:
+        raise ValueError(f"Se permiten a lo más {MAX_SYNC_CHANGES} cambios por sincronización")
+    if client_id == SERVER_REPLICA:
+        raise ValueError(f"El id de cliente '{SERVER_REPLICA}' está reservado")
+    plan = plan_changeset(project_id, client_id, changes, load_sync_state(changes))
+    apply_sync_plan(plan)
+    for inspection_id, damage_ids in plan.scoring.items():
+        scoring_queue.schedule(inspection_id, damage_ids)
+    if plan.conflicts:
+        logger.info("Sync for project %s from %s: %d conflicts", project_id, client_id, len(plan.conflicts))
+    return {
+        "applied": plan.applied,
+        "skipped": plan.skipped,
+        "conflicts": plan.conflicts,
+        "affected_inspections": sorted(plan.scoring),
+    }
@@ -1,15 +1,17 @@
 from datetime import date, datetime
 import logging
+import os
+import time
 from typing import Any, Mapping
 
 from core.config import SUPABASE_SERVICE_KEY
 from supa.client import supa, supa_service
 
-from services.inspection_scoring import (
-    calculate_inspection_deterministic_score,
-    evaluate_inspection_with_llm,
-    score_damage_record,
-)
+from services.inspection_scoring import evaluate_damages_with_llm, evaluate_inspection_with_llm
+from core.cache import TTLCache
+from services.inspection_analytics import ProjectDamageAnalytics
+from services.inspection_risk import frame_to_records, rank_project_inspections
+from services.inspection_scoring_queue import InspectionScoringQueue
 
 
 def _serialize_payload(payload: Mapping[str, Any]) -> dict:
@@ -46,7 +48,7 @@ def create_project_inspection(payload: dict):
         .execute()
         .data[0]
     )
-    _update_inspection_scores(result["id"])
+    scoring_queue.schedule(result["id"])
     return result
 
 
@@ -62,13 +64,51 @@ def get_project_inspection(inspection_id: str):
     return result.data
 
 
+INSPECTION_TREE_SELECT = (
+    "*, damages:project_inspection_damages(*, photos:project_inspection_damage_photos(*)), "
+    "tests:project_inspection_tests(*), documents:project_inspection_documents(*)"
+)
+
+
+def get_project_inspection_tree(inspection_id: str):
+    """Inspección con daños (y sus fotos), ensayos y documentos en una sola consulta con recursos embebidos."""
+    result = (
+        supa()
+        .table("project_inspections")
+        .select(INSPECTION_TREE_SELECT)
+        .eq("id", inspection_id)
+        .order("severity_rank", desc=True, foreign_table="damages")
+        .order("deterministic_score", desc=True, foreign_table="damages")
+        .order("created_at", foreign_table="damages.photos")
+        .order("executed_at", desc=True, foreign_table="tests")
+        .order("issued_at", desc=True, foreign_table="documents")
+        .maybe_single()
+        .execute()
+    )
+    return result.data if result else None
+
+
+def get_project_inspection_updated_at(inspection_id: str) -> str | None:
+    """Solo ``updated_at``, que los triggers mantienen al día ante cualquier cambio en el árbol de la inspección."""
+    result = (
+        supa()
+        .table("project_inspections")
+        .select("id, updated_at")
+        .eq("id", inspection_id)
+        .maybe_single()
+        .execute()
+    )
+    return result.data.get("updated_at") if result and result.data else None
+
+
 def list_project_inspection_damages(project_id: str, inspection_id: str | None = None):
     query = (
         supa()
         .table("project_inspection_damages")
         .select("*")
         .eq("project_id", project_id)
-        .order("severity", desc=True)
+        .order("severity_rank", desc=True)
+        .order("deterministic_score", desc=True)
     )
     if inspection_id:
         query = query.eq("inspection_id", inspection_id)
@@ -99,6 +139,96 @@ def list_project_inspection_damages(project_id: str, inspection_id: str | None =
     return damages
 
 
+def list_project_critical_damages(project_id: str, limit: int = 20, inspection_id: str | None = None):
+    """Los ``limit`` daños de mayor puntaje del proyecto, leídos en orden desde el índice de puntajes."""
+    query = (
+        supa()
+        .table("project_inspection_damages")
+        .select("*")
+        .eq("project_id", project_id)
+    )
+    if inspection_id:
+        query = query.eq("inspection_id", inspection_id)
+    return (
+        query.order("deterministic_score", desc=True, nullsfirst=False)
+        .order("severity_rank", desc=True)
+        .limit(limit)
+        .execute()
+        .data
+    )
+
+
+def rank_project_inspection_risk(project_id: str, top_damages: int = 20) -> dict:
+    inspections = (
+        supa()
+        .table("project_inspections")
+        .select("id, structure_name, location, inspection_date, overall_condition")
+        .eq("project_id", project_id)
+        .execute()
+        .data
+    )
+    damages = (
+        supa()
+        .table("project_inspection_damages")
+        .select("id, inspection_id, structure, location, damage_type, damage_cause, severity, extent")
+        .eq("project_id", project_id)
+        .execute()
+        .data
+    )
+    inspection_table, damage_table = rank_project_inspections(inspections or [], damages or [])
+    return {
+        "project_id": project_id,
+        "inspections": frame_to_records(inspection_table),
+        "damages": frame_to_records(damage_table.head(top_damages)),
+    }
+
+
+_ANALYTICS_DAMAGE_COLUMNS = "id, inspection_id, structure, location, damage_type, damage_cause, severity"
+_ANALYTICS_IN_CHUNK = 100
+INSPECTION_ANALYTICS_REFRESH_SECONDS = float(os.environ.get("INSPECTION_ANALYTICS_REFRESH_SECONDS", "30"))
+_analytics_states = TTLCache(ttl=6 * 3600, maxsize=128)
+
+
+def project_inspection_analytics(project_id: str, refresh: bool = False) -> dict:
+    """Mapas de calor y series de daños del proyecto, actualizados solo con las inspecciones que cambiaron."""
+    state: ProjectDamageAnalytics = _analytics_states.get_or_set(project_id, lambda: ProjectDamageAnalytics(project_id))
+    with state.lock:
+        if not refresh and time.time() - state.refreshed_at < INSPECTION_ANALYTICS_REFRESH_SECONDS:
+            return state.result()
+        inspections = (
+            supa()
+            .table("project_inspections")
+            .select("id, inspection_date, updated_at")
+            .eq("project_id", project_id)
+            .execute()
+            .data
+        ) or []
+        changed, removed = state.changed_inspections(inspections)
+        damages: list[dict] = []
+        if changed and not state.versions:
+            damages = (
+                supa()
+                .table("project_inspection_damages")
+                .select(_ANALYTICS_DAMAGE_COLUMNS)
+                .eq("project_id", project_id)
+                .execute()
+                .data
+            ) or []
+        elif changed:
+            changed_ids = sorted(changed)
+            for start in range(0, len(changed_ids), _ANALYTICS_IN_CHUNK):
+                damages += (
+                    supa()
+                    .table("project_inspection_damages")
+                    .select(_ANALYTICS_DAMAGE_COLUMNS)
+                    .in_("inspection_id", changed_ids[start:start + _ANALYTICS_IN_CHUNK])
+                    .execute()
+                    .data
+                ) or []
+        state.apply(inspections, damages, changed, removed)
+        return state.result()
+
+
 def create_project_inspection_damage(payload: dict):
     result = (
         supa()
@@ -107,7 +237,7 @@ def create_project_inspection_damage(payload: dict):
         .execute()
         .data[0]
     )
-    _update_damage_and_inspection_scores(result["id"])
+    scoring_queue.schedule(result["inspection_id"], [result["id"]])
     return result
 
 
@@ -166,7 +296,7 @@ def delete_project_inspection_damage(damage_id: str):
     if not damage:
         return
     supa().table("project_inspection_damages").delete().eq("id", damage_id).execute()
-    _update_inspection_scores(damage["inspection_id"])
+    scoring_queue.schedule(damage["inspection_id"])
 
 
 def delete_project_inspection_test(test_id: str):
@@ -186,7 +316,7 @@ def update_project_inspection_damage(damage_id: str, payload: dict):
         .execute()
         .data[0]
     )
-    _update_damage_and_inspection_scores(damage_id)
+    scoring_queue.schedule(updated["inspection_id"], [damage_id])
     return updated
 
 
@@ -244,6 +374,19 @@ def create_project_inspection_damage_photo(payload: dict):
     )
 
 
+def create_project_inspection_damage_photos(payloads: list[dict]):
+    """Inserta varias fotos de daño en una sola sentencia (insert multi-fila)."""
+    if not payloads:
+        return []
+    return (
+        supa()
+        .table("project_inspection_damage_photos")
+        .insert([_serialize_payload(payload) for payload in payloads])
+        .execute()
+        .data
+    )
+
+
 def delete_project_inspection_damage_photo(photo_id: str):
     supa().table("project_inspection_damage_photos").delete().eq("id", photo_id).execute()
 
@@ -274,41 +417,52 @@ def _format_timestamp(value: datetime | None) -> str | None:
     return value.isoformat() if value else None
 
 
-def _update_damage_and_inspection_scores(damage_id: str):
-    damage = get_project_inspection_damage(damage_id)
-    if not damage:
-        return
-    scoring = score_damage_record(damage)
-    _safe_update(
-        "project_inspection_damages",
-        {
-            "deterministic_score": scoring["deterministic_score"],
-            "llm_score": scoring["llm_score"],
-            "llm_reason": scoring["llm_reason"],
-            "llm_payload": scoring["llm_payload"],
-            "score_updated_at": _format_timestamp(datetime.utcnow()),
-        },
-        {"id": damage_id},
-    )
-    _update_inspection_scores(damage["inspection_id"])
+def _recompute_inspection_scores(inspection_id: str, damage_ids: set[str]):
+    """Recalcula en lote los puntajes LLM de una inspección: uno por lote de daños y otro para la inspección.
 
-
-def _update_inspection_scores(inspection_id: str):
-    inspection = get_project_inspection(inspection_id)
-    if not inspection:
+    Los puntajes deterministas los mantienen los triggers de la base de datos.
+    """
+    client = supa_service() if SUPABASE_SERVICE_KEY else supa()
+    inspections = client.table("project_inspections").select("*").eq("id", inspection_id).limit(1).execute().data
+    if not inspections:
         return
-    project_id = inspection["project_id"]
-    damages = list_project_inspection_damages(project_id, inspection_id)
-    deterministic = calculate_inspection_deterministic_score(damages)
+    inspection = inspections[0]
+    damages = client.table("project_inspection_damages").select("*").eq("inspection_id", inspection_id).execute().data or []
+    scored_at = _format_timestamp(datetime.utcnow())
+
+    changed = [damage for damage in damages if damage.get("id") in damage_ids]
+    if changed:
+        llm_results = evaluate_damages_with_llm(changed)
+        # Only the score columns are written, in one statement: the rows were read before the (slow) LLM
+        # call, and writing them back whole would revert any edit or sync that landed in the meantime.
+        scores = []
+        for damage in changed:
+            llm_result = llm_results.get(str(damage["id"]), {})
+            scores.append(
+                {
+                    "id": damage["id"],
+                    "llm_score": llm_result.get("llm_score"),
+                    "llm_reason": llm_result.get("reason"),
+                    "llm_payload": llm_result.get("payload"),
+                    "score_updated_at": scored_at,
+                }
+            )
+        try:
+            client.rpc("apply_damage_llm_scores", {"p_scores": scores}).execute()
+        except Exception as exc:
+            logging.getLogger(__name__).warning("Score update failed for project_inspection_damages: %s", exc)
+
     llm_result = evaluate_inspection_with_llm(inspection, damages)
     _safe_update(
         "project_inspections",
         {
-            "deterministic_score": deterministic,
             "llm_score": llm_result.get("llm_score"),
             "llm_reason": llm_result.get("reason"),
             "llm_payload": llm_result.get("payload"),
-            "score_updated_at": _format_timestamp(datetime.utcnow()),
+            "score_updated_at": scored_at,
         },
         {"id": inspection_id},
     )
+
+
+scoring_queue = InspectionScoringQueue(_recompute_inspection_scores)
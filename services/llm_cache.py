@@ -0,0 +1,65 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any
+
+
+def make_cache_key(kind: str, payload: Any, model: str) -> str:
+    """Hash estable del payload enviado al LLM: cambios en campos no evaluados no invalidan la entrada."""
+    body = json.dumps({"kind": kind, "model": model, "payload": payload}, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(body.encode("utf-8")).hexdigest()
+
+
+class LLMScoreCache:
+    """Caché persistente (SQLite) de respuestas del LLM con expiración por TTL."""
+
+    def __init__(self, path: str | Path, ttl: float):
+        self.path = Path(path)
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._conn: sqlite3.Connection | None = None
+
+    def _connection(self) -> sqlite3.Connection:
+        if self._conn is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(str(self.path), check_same_thread=False, timeout=5)
+            conn.execute("pragma journal_mode=wal")
+            conn.execute(
+                "create table if not exists llm_scores ("
+                " key text primary key, value text not null, expires_at real not null)"
+            )
+            self._conn = conn
+        return self._conn
+
+    def get(self, key: str) -> dict[str, Any] | None:
+        with self._lock:
+            conn = self._connection()
+            row = conn.execute("select value, expires_at from llm_scores where key = ?", (key,)).fetchone()
+            if row is None:
+                return None
+            if row[1] < time.time():
+                conn.execute("delete from llm_scores where key = ?", (key,))
+                conn.commit()
+                return None
+            return json.loads(row[0])
+
+    def set(self, key: str, value: dict[str, Any]) -> None:
+        with self._lock:
+            conn = self._connection()
+            conn.execute(
+                "insert or replace into llm_scores (key, value, expires_at) values (?, ?, ?)",
+                (key, json.dumps(value, ensure_ascii=False, default=str), time.time() + self.ttl),
+            )
+            conn.commit()
+
+    def purge_expired(self) -> int:
+        with self._lock:
+            conn = self._connection()
+            deleted = conn.execute("delete from llm_scores where expires_at < ?", (time.time(),)).rowcount
+            conn.commit()
+            return deleted
@@ -0,0 +1,115 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import threading
+from typing import Any
+
+try:
+    from openai import APIConnectionError, APIStatusError, APITimeoutError, AsyncOpenAI
+except ImportError:  # placeholder if package missing
+    AsyncOpenAI = None
+
+logger = logging.getLogger(__name__)
+
+
+def _is_retryable(exc: Exception) -> bool:
+    if isinstance(exc, (asyncio.TimeoutError, APITimeoutError, APIConnectionError)):
+        return True
+    if isinstance(exc, APIStatusError):
+        return exc.status_code == 429 or exc.status_code >= 500
+    return False
+
+
+class BoundedAsyncLLMClient:
+    """Cliente asíncrono de chat completions con concurrencia acotada, timeout y reintentos.
+
+    El límite de concurrencia es de la instancia, no de cada llamada: todas las solicitudes corren en un
+    event loop propio (un hilo en segundo plano) con un solo semáforo y un solo ``AsyncOpenAI``, así que
+    llamadas en paralelo comparten los ``max_concurrency`` cupos y reutilizan las conexiones.
+    """
+
+    def __init__(
+        self,
+        api_key: str,
+        model: str,
+        base_url: str | None = None,
+        max_concurrency: int = 4,
+        timeout: float = 30.0,
+        max_retries: int = 2,
+        backoff: float = 0.5,
+        temperature: float = 0.2,
+    ):
+        if AsyncOpenAI is None:
+            raise RuntimeError("El paquete openai no está instalado")
+        self.api_key = api_key
+        self.model = model
+        self.base_url = base_url
+        self.max_concurrency = max(1, max_concurrency)
+        self.timeout = timeout
+        self.max_retries = max(0, max_retries)
+        self.backoff = backoff
+        self.temperature = temperature
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._client: Any = None
+        self._semaphore: asyncio.Semaphore | None = None
+        self._lock = threading.Lock()
+
+    def _ensure_loop(self) -> asyncio.AbstractEventLoop:
+        with self._lock:
+            if self._loop is None:
+                loop = asyncio.new_event_loop()
+                threading.Thread(target=loop.run_forever, name="llm-client", daemon=True).start()
+                self._loop = loop
+            return self._loop
+
+    async def _complete(self, client: Any, semaphore: asyncio.Semaphore, messages: list[dict[str, str]]) -> str:
+        attempt = 0
+        while True:
+            try:
+                async with semaphore:
+                    resp = await asyncio.wait_for(
+                        client.chat.completions.create(
+                            model=self.model,
+                            messages=messages,
+                            temperature=self.temperature,
+                        ),
+                        timeout=self.timeout,
+                    )
+                return resp.choices[0].message.content or ""
+            except Exception as exc:
+                if attempt >= self.max_retries or not _is_retryable(exc):
+                    raise
+                attempt += 1
+                logger.info("LLM request failed (%s), retry %s/%s", exc, attempt, self.max_retries)
+                await asyncio.sleep(self.backoff * 2 ** (attempt - 1))
+
+    async def _complete_all(self, message_batches: list[list[dict[str, str]]]) -> list[str | Exception]:
+        # Runs only on the client's own loop, so the lazy setup below needs no lock.
+        if self._client is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+            # The SDK's own retries are disabled so the semaphore also bounds retried requests.
+            self._client = AsyncOpenAI(api_key=self.api_key, base_url=self.base_url, timeout=self.timeout, max_retries=0)
+        return await asyncio.gather(
+            *(self._complete(self._client, self._semaphore, messages) for messages in message_batches),
+            return_exceptions=True,
+        )
+
+    async def complete_many(self, message_batches: list[list[dict[str, str]]]) -> list[str | Exception]:
+        """Ejecuta todas las solicitudes con a lo más ``max_concurrency`` en vuelo; los errores se devuelven por posición."""
+        future = asyncio.run_coroutine_threadsafe(self._complete_all(message_batches), self._ensure_loop())
+        return await asyncio.wrap_future(future)
+
+    def complete_many_sync(self, message_batches: list[list[dict[str, str]]]) -> list[str | Exception]:
+        return asyncio.run_coroutine_threadsafe(self._complete_all(message_batches), self._ensure_loop()).result()
+
+    def close(self) -> None:
+        """Cierra el cliente HTTP y detiene el event loop de la instancia."""
+        with self._lock:
+            loop, self._loop = self._loop, None
+        if loop is None:
+            return
+        if self._client is not None:
+            asyncio.run_coroutine_threadsafe(self._client.close(), loop).result()
+            self._client = self._semaphore = None
+        loop.call_soon_threadsafe(loop.stop)
@@ -1,40 +1,46 @@
 from __future__ import annotations
 
 import os
-import uuid
 from pathlib import Path
+from typing import BinaryIO
 
-from PIL import Image
-from fastapi import UploadFile
+from PIL import Image, ImageOps
 
-BASE_UPLOAD_DIR = Path("uploads")
+from core.config import UPLOADS_DIR
+
+BASE_UPLOAD_DIR = Path(UPLOADS_DIR)
 INSPECTIONS_DIR = BASE_UPLOAD_DIR / "inspections"
+STAGING_DIR = BASE_UPLOAD_DIR / "_staging"
+
+_EXIF_ORIENTATION = 0x0112
+_ROTATED_ORIENTATIONS = {5, 6, 7, 8}
 
 def ensure_upload_dirs() -> None:
     BASE_UPLOAD_DIR.mkdir(exist_ok=True)
     INSPECTIONS_DIR.mkdir(exist_ok=True)
 
-def compress_and_store_inspection_photo(
-    file: UploadFile,
-    project_id: str,
-    inspection_id: str,
+def render_photo(
+    source: str | Path | BinaryIO,
+    target_path: str | Path,
     max_width: int = 1024,
     max_height: int = 768,
     quality: int = 78,
-) -> str:
-    ensure_upload_dirs()
-    dest_dir = INSPECTIONS_DIR / project_id / inspection_id
-    dest_dir.mkdir(parents=True, exist_ok=True)
-    file_ext = Path(file.filename or "photo").suffix.lower()
-    if file_ext not in {".jpg", ".jpeg", ".png"}:
-        file_ext = ".jpg"
-    target_name = f"{uuid.uuid4().hex}{file_ext}"
-    target_path = dest_dir / target_name
-
-    file.file.seek(0)
-    image = Image.open(file.file)
-    image = image.convert("RGB")
-    image.thumbnail((max_width, max_height), Image.LANCZOS)
-    image.save(target_path, format="JPEG", quality=quality, optimize=True)
-
-    return f"/uploads/inspections/{project_id}/{inspection_id}/{target_name}"
+) -> tuple[int, int]:
+    """Reduce, orienta según EXIF y guarda la foto como JPEG. Devuelve el tamaño final.
+
+    Para JPEG se usa ``Image.draft`` para que el decodificador escale por 1/2, 1/4 u 1/8 al leer,
+    evitando decodificar los 12 MP completos. La escritura es atómica (archivo temporal + rename).
+    """
+    target_path = Path(target_path)
+    with Image.open(source) as image:
+        orientation = image.getexif().get(_EXIF_ORIENTATION)
+        box = (max_height, max_width) if orientation in _ROTATED_ORIENTATIONS else (max_width, max_height)
+        if image.format == "JPEG":
+            image.draft("RGB", box)
+        image = ImageOps.exif_transpose(image)
+        image = image.convert("RGB")
+        image.thumbnail((max_width, max_height), Image.LANCZOS)
+        tmp_path = target_path.with_name(f".{target_path.name}.tmp")
+        image.save(tmp_path, format="JPEG", quality=quality, optimize=True)
+        os.replace(tmp_path, target_path)
+        return image.size
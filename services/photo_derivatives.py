@@ -0,0 +1,131 @@
+from __future__ import annotations
+
+import hashlib
+import os
+import threading
+from functools import lru_cache
+from pathlib import Path
+
+from PIL import Image
+
+try:  # AVIF support comes from an optional Pillow plugin
+    import pillow_avif  # noqa: F401
+except ImportError:  # pragma: no cover - optional dependency
+    pillow_avif = None
+
+from services.media_service import BASE_UPLOAD_DIR
+from services.storage import local_media_path
+
+DERIVATIVES_DIR = BASE_UPLOAD_DIR / "_derivatives"
+
+# Bounding boxes in pixels, smallest first.
+VARIANTS: dict[str, tuple[int, int]] = {
+    "thumb": (320, 240),
+    "medium": (640, 480),
+    "full": (1024, 768),
+}
+
+FORMATS: dict[str, dict] = {
+    "avif": {"pil": "AVIF", "ext": "avif", "media_type": "image/avif", "options": {"quality": 60}},
+    "webp": {"pil": "WEBP", "ext": "webp", "media_type": "image/webp", "options": {"quality": 78, "method": 4}},
+    "jpeg": {"pil": "JPEG", "ext": "jpg", "media_type": "image/jpeg", "options": {"quality": 78, "optimize": True}},
+}
+
+_generation_locks: dict[str, threading.Lock] = {}
+_locks_guard = threading.Lock()
+
+
+def supported_formats() -> list[str]:
+    Image.init()
+    return [fmt for fmt in ("avif", "webp") if FORMATS[fmt]["pil"] in Image.SAVE] + ["jpeg"]
+
+
+def negotiate_format(accept: str | None) -> str:
+    """Elige AVIF, WebP o JPEG según el header Accept y el soporte de Pillow instalado."""
+    accepted = {part.split(";")[0].strip().lower() for part in (accept or "").split(",")}
+    for fmt in supported_formats():
+        if fmt == "jpeg" or FORMATS[fmt]["media_type"] in accepted:
+            return fmt
+    return "jpeg"
+
+
+def select_variant(width: float, height: float) -> str:
+    """Variante más pequeña que cubre un área de ``width`` x ``height`` píxeles."""
+    for name, (max_width, max_height) in VARIANTS.items():
+        if width <= max_width and height <= max_height:
+            return name
+    return "full"
+
+
+def resolve_upload_path(url_or_path: str) -> Path:
+    """Convierte ``/uploads/...`` a una ruta dentro de BASE_UPLOAD_DIR, rechazando rutas fuera de ella.
+
+    Las URLs de un backend remoto (S3) se resuelven a una copia local descargada la primera vez.
+    """
+    remote = local_media_path(url_or_path)
+    if remote is not None:
+        return remote
+    relative = url_or_path.split("?", 1)[0].lstrip("/")
+    if relative.startswith(f"{BASE_UPLOAD_DIR.name}/"):
+        relative = relative[len(BASE_UPLOAD_DIR.name) + 1:]
+    base = BASE_UPLOAD_DIR.resolve()
+    path = (base / relative).resolve()
+    if base not in path.parents or not path.is_file():
+        raise FileNotFoundError(url_or_path)
+    return path
+
+
+@lru_cache(maxsize=4096)
+def _content_hash(path: str, mtime_ns: int, size: int) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as handle:
+        for chunk in iter(lambda: handle.read(1024 * 1024), b""):
+            digest.update(chunk)
+    return digest.hexdigest()[:32]
+
+
+def content_hash(path: Path) -> str:
+    stat = path.stat()
+    return _content_hash(str(path), stat.st_mtime_ns, stat.st_size)
+
+
+def _lock_for(key: str) -> threading.Lock:
+    with _locks_guard:
+        return _generation_locks.setdefault(key, threading.Lock())
+
+
+def get_derivative(source: Path, variant: str, fmt: str = "jpeg") -> tuple[Path, str]:
+    """Devuelve (ruta, hash) de la derivada, generándola la primera vez que se pide.
+
+    Las derivadas se nombran por el hash del contenido original, así dos fotos idénticas comparten
+    archivos y una derivada existente nunca cambia.
+    """
+    if variant not in VARIANTS:
+        raise ValueError(f"Variante desconocida: {variant}")
+    spec = FORMATS[fmt]
+    digest = content_hash(source)
+    target = DERIVATIVES_DIR / digest[:2] / f"{digest}-{variant}.{spec['ext']}"
+    if target.exists():
+        return target, digest
+    with _lock_for(str(target)):
+        if target.exists():
+            return target, digest
+        target.parent.mkdir(parents=True, exist_ok=True)
+        with Image.open(source) as image:
+            if image.format == "JPEG":
+                image.draft("RGB", VARIANTS[variant])
+            image = image.convert("RGB")
+            image.thumbnail(VARIANTS[variant], Image.LANCZOS)
+            tmp_path = target.with_name(f".{target.name}.tmp")
+            image.save(tmp_path, format=spec["pil"], **spec["options"])
+            os.replace(tmp_path, target)
+    with _locks_guard:
+        _generation_locks.pop(str(target), None)
+    return target, digest
+
+
+def report_photo_path(url: str, width_pt: float, height_pt: float, dpi: int = 150) -> Path:
+    """Derivada JPEG justo suficiente para imprimir la foto en un recuadro de ``width_pt`` x ``height_pt`` puntos."""
+    source = resolve_upload_path(url)
+    variant = select_variant(width_pt / 72 * dpi, height_pt / 72 * dpi)
+    return get_derivative(source, variant, "jpeg")[0]
@@ -0,0 +1,369 @@
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import logging
+import os
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import Executor, Future, ProcessPoolExecutor, ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, AsyncIterator, Callable
+
+from fastapi import UploadFile
+from multipart.multipart import MultipartParser, parse_options_header
+
+from core.asyncio_sync import run_coroutine_sync
+from services.media_service import STAGING_DIR, render_photo
+from services.storage import StorageBackend, content_key, get_storage
+
+logger = logging.getLogger(__name__)
+
+PHOTO_PIPELINE_WORKERS = int(os.environ.get("PHOTO_PIPELINE_WORKERS", str(max(1, (os.cpu_count() or 2) - 1))))
+UPLOAD_CHUNK_SIZE = 1024 * 1024
+MAX_TRACKED_JOBS = 2000
+MAX_BULK_FILE_SIZE = int(os.environ.get("MAX_BULK_FILE_SIZE", str(30 * 1024 * 1024)))
+MAX_BULK_FILES = int(os.environ.get("MAX_BULK_FILES", "60"))
+
+
+def _process_job(staging_path: str, target_path: str, max_width: int, max_height: int, quality: int) -> tuple[int, int]:
+    try:
+        return render_photo(staging_path, target_path, max_width, max_height, quality)
+    finally:
+        Path(staging_path).unlink(missing_ok=True)
+
+
+def photo_key(upload_digest: str, max_width: int, max_height: int, quality: int) -> str:
+    """Clave del JPEG procesado: depende del archivo original y de los parámetros de reducción."""
+    digest = hashlib.sha256(f"{upload_digest}:{max_width}x{max_height}:q{quality}".encode()).hexdigest()
+    return content_key(digest, ".jpg")
+
+
+class PhotoPipeline:
+    """Procesa las fotos subidas en un pool de procesos, fuera del event loop.
+
+    ``submit`` solo copia el archivo a staging por bloques (calculando su hash) y encola el trabajo; la
+    URL devuelta queda disponible cuando el estado del trabajo pasa a ``done``. Las fotos se guardan en el
+    backend de almacenamiento bajo una clave derivada del contenido: subir de nuevo una foto idéntica no
+    la vuelve a procesar ni a guardar.
+    """
+
+    def __init__(
+        self,
+        max_workers: int = PHOTO_PIPELINE_WORKERS,
+        executor: Executor | None = None,
+        storage: StorageBackend | None = None,
+    ):
+        self.max_workers = max_workers
+        self._executor = executor
+        self._storage = storage
+        self._publisher: ThreadPoolExecutor | None = None
+        self._jobs: OrderedDict[str, dict[str, Any]] = OrderedDict()
+        self._futures: dict[str, Future] = {}
+        self._failure_callbacks: dict[str, list[Callable[[dict[str, Any]], None]]] = {}
+        self._lock = threading.Lock()
+
+    @property
+    def storage(self) -> StorageBackend:
+        return self._storage or get_storage()
+
+    def _pool(self) -> Executor:
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(max_workers=self.max_workers)
+        return self._executor
+
+    def _publish_pool(self) -> ThreadPoolExecutor:
+        with self._lock:
+            if self._publisher is None:
+                self._publisher = ThreadPoolExecutor(max_workers=4, thread_name_prefix="photo-publish")
+            return self._publisher
+
+    async def submit(
+        self,
+        file: UploadFile,
+        max_width: int = 1024,
+        max_height: int = 768,
+        quality: int = 78,
+    ) -> dict[str, Any]:
+        STAGING_DIR.mkdir(parents=True, exist_ok=True)
+        staging_path = STAGING_DIR / uuid.uuid4().hex
+        digest = hashlib.sha256()
+        try:
+            with open(staging_path, "wb") as staging:
+                while chunk := await file.read(UPLOAD_CHUNK_SIZE):
+                    digest.update(chunk)
+                    staging.write(chunk)
+        except BaseException:
+            staging_path.unlink(missing_ok=True)
+            raise
+        return await self.submit_path(staging_path, digest.hexdigest(), max_width, max_height, quality)
+
+    async def submit_path(
+        self,
+        staging_path: Path,
+        upload_digest: str,
+        max_width: int = 1024,
+        max_height: int = 768,
+        quality: int = 78,
+    ) -> dict[str, Any]:
+        key = photo_key(upload_digest, max_width, max_height, quality)
+        job_id = uuid.uuid4().hex
+        job = {
+            "job_id": job_id,
+            "url": self.storage.url(key),
+            "status": "pending",
+            "error": None,
+            "deduplicated": False,
+            "submitted_at": time.time(),
+        }
+        with self._lock:
+            self._jobs[job_id] = job
+            while len(self._jobs) > MAX_TRACKED_JOBS:
+                self._jobs.popitem(last=False)
+            self._futures[job_id] = Future()
+        try:
+            if await self.storage.exists(key):
+                Path(staging_path).unlink(missing_ok=True)
+                self._complete(job_id, deduplicated=True)
+                return self.get_job(job_id) or dict(job)
+            STAGING_DIR.mkdir(parents=True, exist_ok=True)
+            rendered_path = STAGING_DIR / f"{job_id}.jpg"
+            future = self._pool().submit(
+                _process_job, str(staging_path), str(rendered_path), max_width, max_height, quality
+            )
+        except Exception as exc:
+            Path(staging_path).unlink(missing_ok=True)
+            self._complete(job_id, error=exc)
+            raise
+        future.add_done_callback(lambda done: self._rendered(job_id, key, rendered_path, done))
+        return dict(job)
+
+    def _rendered(self, job_id: str, key: str, rendered_path: Path, future: Future) -> None:
+        exc = future.exception()
+        if exc is not None:
+            rendered_path.unlink(missing_ok=True)
+            self._complete(job_id, error=exc)
+            return
+        # Uploading to the backend may be slow (S3); keep it off the executor's callback thread.
+        self._publish_pool().submit(self._publish, job_id, key, rendered_path, future.result())
+
+    def _publish(self, job_id: str, key: str, rendered_path: Path, size: tuple[int, int]) -> None:
+        try:
+            created = run_coroutine_sync(self.storage.put_file(rendered_path, key, "image/jpeg"))
+        except Exception as exc:
+            rendered_path.unlink(missing_ok=True)
+            self._complete(job_id, error=exc)
+            return
+        self._complete(job_id, size=size, deduplicated=not created)
+
+    def _complete(
+        self,
+        job_id: str,
+        error: BaseException | None = None,
+        size: tuple[int, int] | None = None,
+        deduplicated: bool = False,
+    ) -> None:
+        with self._lock:
+            done = self._futures.pop(job_id, None)
+            callbacks = self._failure_callbacks.pop(job_id, [])
+            job = self._jobs.get(job_id)
+            if job is not None:
+                job["finished_at"] = time.time()
+                if error is not None:
+                    logger.warning("Photo processing failed for %s: %s", job["url"], error)
+                    job["status"] = "error"
+                    job["error"] = str(error)
+                else:
+                    job["status"] = "done"
+                    job["deduplicated"] = deduplicated
+                    if size is not None:
+                        job["width"], job["height"] = size
+            snapshot = dict(job) if job is not None else {"job_id": job_id, "status": "error"}
+        if error is not None:
+            for callback in callbacks:
+                self._run_failure_callback(callback, snapshot)
+        if done is not None:
+            done.set_result(None)
+
+    def on_failure(self, job_id: str, callback: Callable[[dict[str, Any]], None]) -> None:
+        """Llama ``callback(job)`` si el trabajo termina con error; de inmediato si ya falló.
+
+        Permite deshacer lo que se guardó con la URL del trabajo antes de que terminara (p. ej. la fila
+        de la foto), sin carreras con trabajos que fallan antes de registrar el callback.
+        """
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None or job["status"] == "done":
+                return
+            if job["status"] == "pending":
+                self._failure_callbacks.setdefault(job_id, []).append(callback)
+                return
+            snapshot = dict(job)
+        self._run_failure_callback(callback, snapshot)
+
+    @staticmethod
+    def _run_failure_callback(callback: Callable[[dict[str, Any]], None], job: dict[str, Any]) -> None:
+        try:
+            callback(job)
+        except Exception:
+            logger.exception("Photo failure callback raised for job %s", job.get("job_id"))
+
+    async def wait_for(self, job_ids: list[str]) -> list[dict[str, Any] | None]:
+        """Espera a que terminen los trabajos indicados y devuelve su estado final, en el mismo orden."""
+        with self._lock:
+            pending = [self._futures[job_id] for job_id in job_ids if job_id in self._futures]
+        if pending:
+            await asyncio.gather(*(asyncio.wrap_future(future) for future in pending))
+        return [self.get_job(job_id) for job_id in job_ids]
+
+    def get_job(self, job_id: str) -> dict[str, Any] | None:
+        with self._lock:
+            job = self._jobs.get(job_id)
+            return dict(job) if job else None
+
+    def progress(self, job_ids: list[str]) -> dict[str, Any]:
+        jobs = [job for job in (self.get_job(job_id) for job_id in job_ids) if job]
+        finished = sum(1 for job in jobs if job["status"] in {"done", "error"})
+        return {
+            "total": len(jobs),
+            "finished": finished,
+            "failed": sum(1 for job in jobs if job["status"] == "error"),
+            "jobs": jobs,
+        }
+
+    def shutdown(self, wait: bool = True) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=wait)
+            self._executor = None
+        if self._publisher is not None:
+            self._publisher.shutdown(wait=wait)
+            self._publisher = None
+
+
+async def stage_multipart_files(
+    chunks: AsyncIterator[bytes],
+    content_type: str,
+    max_file_size: int = MAX_BULK_FILE_SIZE,
+    max_files: int = MAX_BULK_FILES,
+) -> list[dict[str, Any]]:
+    """Escribe cada archivo de un cuerpo multipart en staging a medida que llegan los bloques.
+
+    A diferencia de ``request.form()``, nunca mantiene un archivo completo en memoria. Devuelve un
+    dict por archivo con ``filename``, ``path``, ``size``, ``digest`` (SHA-256) y ``error`` (archivos sobre el límite o
+    sobre ``max_files`` quedan con error y sin ruta).
+    """
+    _, params = parse_options_header(content_type)
+    boundary = params.get(b"boundary")
+    if not boundary:
+        raise ValueError("El cuerpo multipart no tiene boundary")
+    STAGING_DIR.mkdir(parents=True, exist_ok=True)
+    staged: list[dict[str, Any]] = []
+    state: dict[str, Any] = {
+        "header_name": b"",
+        "header_value": b"",
+        "disposition": b"",
+        "part": None,
+        "handle": None,
+        "hasher": None,
+    }
+
+    def on_part_begin() -> None:
+        state["disposition"] = b""
+        state["part"] = None
+
+    def on_header_field(data: bytes, start: int, end: int) -> None:
+        state["header_name"] += data[start:end]
+
+    def on_header_value(data: bytes, start: int, end: int) -> None:
+        state["header_value"] += data[start:end]
+
+    def on_header_end() -> None:
+        if state["header_name"].lower() == b"content-disposition":
+            state["disposition"] = state["header_value"]
+        state["header_name"] = state["header_value"] = b""
+
+    def on_headers_finished() -> None:
+        _, options = parse_options_header(state["disposition"])
+        if b"filename" not in options:
+            return  # plain form fields are ignored
+        part = {
+            "filename": options[b"filename"].decode("utf-8", "replace"),
+            "path": None,
+            "size": 0,
+            "digest": None,
+            "error": None,
+        }
+        staged.append(part)
+        if len(staged) > max_files:
+            part["error"] = f"Se permiten a lo más {max_files} archivos por solicitud"
+        else:
+            part["path"] = STAGING_DIR / uuid.uuid4().hex
+            state["handle"] = open(part["path"], "wb")
+            state["hasher"] = hashlib.sha256()
+        state["part"] = part
+
+    def on_part_data(data: bytes, start: int, end: int) -> None:
+        part = state["part"]
+        if part is None:
+            return
+        part["size"] += end - start
+        handle = state["handle"]
+        if handle is None:
+            return
+        if part["size"] > max_file_size:
+            _discard(part, handle, f"El archivo supera el máximo de {max_file_size // (1024 * 1024)} MB")
+            state["handle"] = None
+            return
+        handle.write(data[start:end])
+        state["hasher"].update(data[start:end])
+
+    def on_part_end() -> None:
+        if state["handle"] is not None:
+            state["handle"].close()
+            state["handle"] = None
+        part = state["part"]
+        if part is None or part["error"] is not None:
+            return
+        if part["size"] == 0:
+            _discard(part, None, "Archivo vacío")
+        else:
+            part["digest"] = state["hasher"].hexdigest()
+
+    parser = MultipartParser(
+        boundary,
+        {
+            "on_part_begin": on_part_begin,
+            "on_part_data": on_part_data,
+            "on_part_end": on_part_end,
+            "on_header_field": on_header_field,
+            "on_header_value": on_header_value,
+            "on_header_end": on_header_end,
+            "on_headers_finished": on_headers_finished,
+        },
+    )
+    try:
+        async for chunk in chunks:
+            parser.write(chunk)
+        parser.finalize()
+    except BaseException:
+        if state["handle"] is not None:
+            state["handle"].close()
+        for part in staged:
+            if part["path"] is not None:
+                Path(part["path"]).unlink(missing_ok=True)
+        raise
+    return staged
+
+
+def _discard(part: dict[str, Any], handle, error: str) -> None:
+    if handle is not None:
+        handle.close()
+    if part["path"] is not None:
+        Path(part["path"]).unlink(missing_ok=True)
+    part["path"] = None
+    part["error"] = error
+
+
+photo_pipeline = PhotoPipeline()
@@ -1,10 +1,14 @@
 from datetime import date, datetime
-from collections import defaultdict
 from typing import Any, Optional
 
+from core.cache import TTLCache
+from core.config import PROJECT_SUMMARY_CACHE_TTL
 from supa.client import supa
 from services.tasks_service import list_tasks
 
+_EMPTY_TOTALS = {"facturado": 0.0, "pagado": 0.0, "saldo": 0.0}
+_summary_cache = TTLCache(ttl=PROJECT_SUMMARY_CACHE_TTL)
+
 
 def _to_date_str(value: Any) -> Optional[str]:
     if value in (None, "", "null"):
@@ -16,6 +20,28 @@ def _to_date_str(value: Any) -> Optional[str]:
     return str(value)
 
 
+def _fetch_payment_totals(project_ids: list[str]) -> dict[str, dict[str, float]]:
+    """Lee los totales mantenidos por trigger en project_payment_totals (una fila por proyecto)."""
+    if not project_ids:
+        return {}
+    rows = (
+        supa()
+        .table("project_payment_totals")
+        .select("project_id, facturado, pagado, saldo")
+        .in_("project_id", project_ids)
+        .execute()
+        .data
+    )
+    return {
+        row["project_id"]: {
+            "facturado": float(row.get("facturado") or 0),
+            "pagado": float(row.get("pagado") or 0),
+            "saldo": float(row.get("saldo") or 0),
+        }
+        for row in rows or []
+    }
+
+
 def fetch_projects(archived: bool | None = None):
     query = supa().table("projects").select("*").order("updated_at", desc=True)
     if archived is True:
@@ -26,37 +52,9 @@ def fetch_projects(archived: bool | None = None):
     if not projects:
         return []
 
-    project_ids = [project["id"] for project in projects]
-    payments_query = (
-        supa()
-        .table("project_payments")
-        .select("project_id, kind, amount")
-        .in_("project_id", project_ids)
-    )
-    payments = payments_query.execute().data
-
-    payment_totals: dict[str, dict[str, float]] = defaultdict(lambda: {"facturado": 0.0, "pagado": 0.0, "saldo": 0.0})
-    if payments:
-        grouped: dict[str, dict[str, float]] = defaultdict(lambda: {"invoice": 0.0, "advance": 0.0, "payment": 0.0, "credit_note": 0.0, "refund": 0.0})
-        for payment in payments:
-            pid = payment["project_id"]
-            kind = payment["kind"]
-            amount = float(payment.get("amount") or 0)
-            grouped[pid][kind] = grouped[pid].get(kind, 0.0) + amount
-
-        for pid, sums in grouped.items():
-            invoice = sums.get("invoice", 0.0)
-            advance = sums.get("advance", 0.0)
-            payment_total = sums.get("payment", 0.0)
-            credit = sums.get("credit_note", 0.0)
-            refund = sums.get("refund", 0.0)
-            facturado = max(invoice - credit, 0.0)
-            pagado = max(payment_total + advance - refund, 0.0)
-            saldo = max(facturado - pagado, 0.0)
-            payment_totals[pid] = {"facturado": facturado, "pagado": pagado, "saldo": saldo}
-
+    payment_totals = _fetch_payment_totals([project["id"] for project in projects])
     for project in projects:
-        totals = payment_totals.get(project["id"], {"facturado": 0.0, "pagado": 0.0, "saldo": 0.0})
+        totals = payment_totals.get(project["id"], _EMPTY_TOTALS)
         project["payments_facturado"] = totals["facturado"]
         project["payments_pagado"] = totals["pagado"]
         project["payments_saldo"] = totals["saldo"]
@@ -64,6 +62,66 @@ def fetch_projects(archived: bool | None = None):
     return projects
 
 
+def _fetch_project_summary(project_id: str) -> dict:
+    rows = (
+        supa()
+        .table("project_summaries")
+        .select("*")
+        .eq("project_id", project_id)
+        .limit(1)
+        .execute()
+        .data
+    )
+    return rows[0] if rows else {}
+
+
+def fetch_project_summaries(user_id: str, archived: bool | None = None, limit: int = 50, offset: int = 0):
+    """Página de resúmenes por proyecto desde la vista project_summaries, cacheada por usuario."""
+
+    def _load():
+        query = (
+            supa()
+            .table("project_summaries")
+            .select("*", count="exact")
+            .eq("created_by", user_id)
+            .order("updated_at", desc=True)
+            .range(offset, offset + limit - 1)
+        )
+        if archived is not None:
+            query = query.eq("is_archived", archived)
+        response = query.execute()
+        return {
+            "items": response.data or [],
+            "total": response.count or 0,
+            "limit": limit,
+            "offset": offset,
+        }
+
+    return _summary_cache.get_or_set((user_id, archived, limit, offset), _load)
+
+
+def fetch_dashboard_totals(user_id: str, archived: bool = False) -> dict:
+    """Totales del dashboard sobre todos los proyectos del usuario, agregados en la base de datos."""
+
+    def _load():
+        rows = supa().rpc("project_dashboard_totals", {"p_user_id": user_id, "p_archived": archived}).execute().data
+        row = (rows[0] if isinstance(rows, list) else rows) if rows else {}
+        return {
+            "project_count": int(row.get("project_count") or 0),
+            "budget": float(row.get("budget") or 0),
+            "invoiced": float(row.get("invoiced") or 0),
+            "paid": float(row.get("paid") or 0),
+            "pending_tasks": int(row.get("pending_tasks") or 0),
+            "overdue_tasks": int(row.get("overdue_tasks") or 0),
+        }
+
+    return _summary_cache.get_or_set((user_id, "totals", archived), _load)
+
+
+def invalidate_project_summaries(user_id: str) -> None:
+    _summary_cache.invalidate(lambda key: key[0] == user_id)
+
+
 def fetch_project_detail(project_id: str):
     project_res = (
         supa()
@@ -87,43 +145,25 @@ def fetch_project_detail(project_id: str):
     )
     payments = payments_res.data or []
 
-    invoice = sum(float(item.get("amount") or 0) for item in payments if item.get("kind") == "invoice")
-    advance = sum(float(item.get("amount") or 0) for item in payments if item.get("kind") == "advance")
-    payment_total = sum(float(item.get("amount") or 0) for item in payments if item.get("kind") == "payment")
-    credit = sum(float(item.get("amount") or 0) for item in payments if item.get("kind") == "credit_note")
-    refund = sum(float(item.get("amount") or 0) for item in payments if item.get("kind") == "refund")
-
-    facturado = max(invoice - credit, 0.0)
-    pagado = max(payment_total + advance - refund, 0.0)
-    saldo = max(facturado - pagado, 0.0)
+    summary = _fetch_project_summary(project_id)
+    facturado = float(summary.get("payments_facturado") or 0)
+    pagado = float(summary.get("payments_pagado") or 0)
+    saldo = float(summary.get("payments_saldo") or 0)
 
     project["payments_facturado"] = facturado
     project["payments_pagado"] = pagado
     project["payments_saldo"] = saldo
 
-    tasks = list_tasks(project_id)
-    tasks = tasks or []
-    total_tasks = len(tasks)
-    completed_tasks = sum(1 for task in tasks if task.get("status") == "done")
+    tasks = list_tasks(project_id) or []
+    total_tasks = int(summary.get("total_tasks") or 0)
+    completed_tasks = int(summary.get("completed_tasks") or 0)
 
     important_dates = {
         "start_date": project.get("start_date"),
         "end_date": project.get("end_date"),
-        "next_task_start": None,
-        "next_task_due": None,
+        "next_task_start": summary.get("next_task_start"),
+        "next_task_due": summary.get("next_task_due"),
     }
-    future_tasks = sorted(
-        (task for task in tasks if task.get("start_date")),
-        key=lambda task: task.get("start_date"),
-    )
-    future_due = sorted(
-        (task for task in tasks if task.get("end_date")),
-        key=lambda task: task.get("end_date"),
-    )
-    if future_tasks:
-        important_dates["next_task_start"] = future_tasks[0].get("start_date")
-    if future_due:
-        important_dates["next_task_due"] = future_due[0].get("end_date")
 
     return {
         "project": project,
@@ -0,0 +1,190 @@
+"""
+Exportación columnar de ``calc_runs`` para análisis (Parquet/Arrow).
+
+``input_json`` y ``result_json`` se aplanan en columnas tipadas (``input.<campo>``, ``result.<campo>``;
+los dicts anidados se unen con ``.``), con un archivo por tipo de elemento y página de resultados, de modo
+que la memoria queda acotada por ``EXPORT_PAGE_SIZE``. La exportación incremental pide solo los cálculos
+con ``updated_at`` desde la marca de agua de la exportación anterior (intervalos semiabiertos
+``[since, until)``, sin huecos ni duplicados entre exportaciones).
+"""
+import io
+import json
+import os
+import zipfile
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+import pandas as pd
+import pyarrow as pa
+
+from services.runs_service import list_runs_page
+
+EXPORT_PAGE_SIZE = int(os.environ.get("EXPORT_PAGE_SIZE", "2000"))
+# Los inserts toman updated_at al inicio de su transacción: una fila puede aparecer con una marca anterior
+# a la de una exportación ya hecha. Cada exportación cubre solo hasta ``now() - EXPORT_SAFETY_LAG``.
+EXPORT_SAFETY_LAG = timedelta(seconds=int(os.environ.get("EXPORT_SAFETY_LAG_SECONDS", "300")))
+EXPORT_FORMATS = ("parquet", "arrow", "csv")
+BASE_COLUMNS = ("id", "project_id", "created_by", "element_type", "engine_version", "is_critical", "created_at", "updated_at")
+
+
+def _json_column(series: pd.Series) -> pd.Series:
+    """Tipo estable de una columna aplanada: los números JSON siempre como Float64 y lo mixto como texto."""
+    values = series.dropna()
+    if values.map(lambda value: isinstance(value, (list, dict))).any():
+        return series.map(lambda value: None if value is None or value is pd.NA else json.dumps(value)).astype("string")
+    if values.map(lambda value: isinstance(value, bool)).all():
+        return series.astype("boolean")
+    if values.map(lambda value: isinstance(value, (int, float)) and not isinstance(value, bool)).all():
+        return series.astype("Float64")
+    return series.map(lambda value: None if pd.isna(value) else str(value)).astype("string")
+
+
+def flatten_runs(runs: List[Dict[str, Any]]) -> pd.DataFrame:
+    """
+    Aplana los cálculos en un DataFrame con tipos de pandas nulables.
+
+    Args:
+        runs: Filas de ``calc_runs``
+
+    Returns:
+        DataFrame con las columnas base (fechas en UTC) y una columna por campo de entrada y resultado
+    """
+    base = pd.DataFrame([{name: run.get(name) for name in BASE_COLUMNS} for run in runs], columns=list(BASE_COLUMNS))
+    for name in ("created_at", "updated_at"):
+        base[name] = pd.to_datetime(base[name], utc=True, format="ISO8601")
+    base["is_critical"] = base["is_critical"].astype("boolean")
+    for name in ("id", "project_id", "created_by", "element_type", "engine_version"):
+        base[name] = base[name].astype("string")
+    parts = [base]
+    for prefix, key in (("input", "input_json"), ("result", "result_json")):
+        nested = pd.json_normalize([run.get(key) or {} for run in runs], sep=".")
+        nested = nested.astype(object).where(nested.notna(), None)
+        parts.append(pd.DataFrame({f"{prefix}.{name}": _json_column(nested[name]) for name in sorted(nested.columns)}))
+    return pd.concat(parts, axis=1)
+
+
+def _element_frame(group: pd.DataFrame) -> pd.DataFrame:
+    """Filas de un tipo de elemento sin las columnas de campos que solo tienen otros tipos."""
+    empty = [name for name in group.columns if name not in BASE_COLUMNS and group[name].isna().all()]
+    return group.drop(columns=empty).reset_index(drop=True)
+
+
+def export_watermark(now: Optional[datetime] = None) -> str:
+    """Límite superior de una exportación: ``now`` menos ``EXPORT_SAFETY_LAG`` (ISO 8601, UTC)."""
+    now = now or datetime.now(timezone.utc)
+    return (now - EXPORT_SAFETY_LAG).astimezone(timezone.utc).isoformat()
+
+
+def _timestamp(value: str) -> pd.Timestamp:
+    stamp = pd.Timestamp(value)
+    return stamp.tz_localize("UTC") if stamp.tzinfo is None else stamp
+
+
+def iter_run_pages(
+    project_id: str,
+    since: Optional[str] = None,
+    element_type: Optional[str] = None,
+    page_size: int = EXPORT_PAGE_SIZE,
+    until: Optional[str] = None,
+) -> Iterator[List[Dict[str, Any]]]:
+    """
+    Páginas de cálculos con ``since <= updated_at < until``, en orden de ``(updated_at, id)``.
+
+    Se pagina por clave (el último ``updated_at``/``id`` visto), así que un cálculo editado durante la
+    exportación no desplaza a los demás.
+    """
+    if since and until and _timestamp(since) >= _timestamp(until):
+        return
+    after: Optional[Tuple[str, str]] = None
+    while True:
+        runs = list_runs_page(project_id, since, after, element_type, page_size, until)
+        if not runs:
+            return
+        after = (runs[-1]["updated_at"], runs[-1]["id"])
+        yield runs
+        if len(runs) < page_size:
+            return
+
+
+def iter_record_batches(
+    project_id: str,
+    since: Optional[str] = None,
+    element_type: Optional[str] = None,
+    page_size: int = EXPORT_PAGE_SIZE,
+    until: Optional[str] = None,
+) -> Iterator[Tuple[str, Any]]:
+    """
+    Arrow ``RecordBatch`` por tipo de elemento y página, para consumirlas sin pasar por JSON.
+
+    Sin ``until`` se usa ``export_watermark()``, que debe guardarse como ``since`` de la siguiente lectura.
+
+    Yields:
+        (tipo de elemento, ``pyarrow.RecordBatch``)
+    """
+    until = until or export_watermark()
+    for runs in iter_run_pages(project_id, since, element_type, page_size, until):
+        frame = flatten_runs(runs)
+        for kind, group in frame.groupby("element_type", sort=True):
+            yield str(kind), pa.RecordBatch.from_pandas(_element_frame(group), preserve_index=False)
+
+
+def _write_part(frame: pd.DataFrame, export_format: str) -> bytes:
+    buffer = io.BytesIO()
+    if export_format == "parquet":
+        frame.to_parquet(buffer, engine="pyarrow", compression="zstd", index=False)
+    elif export_format == "arrow":
+        table = pa.Table.from_pandas(frame, preserve_index=False)
+        with pa.ipc.new_file(buffer, table.schema, options=pa.ipc.IpcWriteOptions(compression="zstd")) as writer:
+            writer.write_table(table)
+    else:
+        frame.to_csv(buffer, index=False, compression={"method": "gzip"})
+    return buffer.getvalue()
+
+
+def export_runs(
+    project_id: str,
+    target: Path,
+    since: Optional[str] = None,
+    element_type: Optional[str] = None,
+    export_format: str = "parquet",
+    page_size: int = EXPORT_PAGE_SIZE,
+    until: Optional[str] = None,
+) -> Dict[str, Any]:
+    """
+    Escribe en un ZIP los cálculos de un proyecto aplanados, un archivo por tipo de elemento y página.
+
+    Los archivos quedan como ``<tipo>/part-00000.parquet`` (``.arrow`` o ``.csv.gz``); las columnas de
+    un mismo tipo pueden variar entre páginas si cambian los campos guardados, algo que los lectores
+    de datasets Parquet/Arrow unifican por nombre.
+
+    Args:
+        project_id: Proyecto a exportar
+        target: Ruta del ZIP
+        since: Marca de agua de una exportación anterior (cálculos con ``updated_at`` desde ella)
+        element_type: Exporta solo ese tipo
+        export_format: "parquet", "arrow" (IPC con compresión zstd) o "csv" (gzip)
+        until: Límite superior exclusivo; por defecto ``export_watermark()``
+
+    Returns:
+        Dict con la nueva marca de agua (``until``, o ``since`` si es posterior), filas por tipo y archivos
+    """
+    if export_format not in EXPORT_FORMATS:
+        raise ValueError(f"Formato de exportación no soportado: {export_format}")
+    suffix = {"parquet": ".parquet", "arrow": ".arrow", "csv": ".csv.gz"}[export_format]
+    until = until or export_watermark()
+    watermark = since if since and _timestamp(since) > _timestamp(until) else until
+    rows: Dict[str, int] = {}
+    parts: Dict[str, int] = {}
+    files: List[str] = []
+    with zipfile.ZipFile(target, "w", compression=zipfile.ZIP_STORED) as archive:
+        for runs in iter_run_pages(project_id, since, element_type, page_size, until):
+            frame = flatten_runs(runs)
+            for kind, group in frame.groupby("element_type", sort=True):
+                kind = str(kind)
+                name = f"{kind}/part-{parts.get(kind, 0):05d}{suffix}"
+                archive.writestr(name, _write_part(_element_frame(group), export_format))
+                files.append(name)
+                parts[kind] = parts.get(kind, 0) + 1
+                rows[kind] = rows.get(kind, 0) + len(group)
+    return {"watermark": watermark, "format": export_format, "rows": rows, "files": files}
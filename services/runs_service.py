@@ -12,6 +12,28 @@ def save_run(project_id: str, user_id: str, element_type: str, inputs: dict, res
     return supa().table("calc_runs").insert(payload).execute().data[0]
 
 
+def save_runs(project_id: str, user_id: str, element_type: str, runs: list):
+    """
+    Guarda varios cálculos del mismo tipo con un solo insert.
+
+    Args:
+        runs: Pares (inputs, results) de cada cálculo
+    """
+    if not runs:
+        return []
+    payload = [
+        {
+            "project_id": project_id,
+            "created_by": user_id,
+            "element_type": element_type,
+            "input_json": inputs,
+            "result_json": results,
+        }
+        for inputs, results in runs
+    ]
+    return supa().table("calc_runs").insert(payload).execute().data
+
+
 def list_runs(project_id: str):
     return (
         supa()
@@ -24,6 +46,30 @@ def list_runs(project_id: str):
     )
 
 
+def list_runs_page(project_id: str, since=None, after=None, element_type=None, limit: int = 1000, until=None):
+    """
+    Página de cálculos de un proyecto en orden de (updated_at, id), para exportaciones incrementales.
+
+    Args:
+        since: Solo cálculos con updated_at desde esta marca de agua (ISO 8601, inclusive)
+        after: (updated_at, id) del último cálculo de la página anterior
+        element_type: Filtra por tipo de elemento
+        limit: Tamaño de la página
+        until: Solo cálculos con updated_at anterior a este límite (exclusivo)
+    """
+    query = supa().table("calc_runs").select("*").eq("project_id", project_id)
+    if element_type:
+        query = query.eq("element_type", element_type)
+    if since:
+        query = query.gte("updated_at", since)
+    if until:
+        query = query.lt("updated_at", until)
+    if after:
+        updated_at, run_id = after
+        query = query.or_(f'updated_at.gt."{updated_at}",and(updated_at.eq."{updated_at}",id.gt.{run_id})')
+    return query.order("updated_at").order("id").limit(limit).execute().data
+
+
 def fetch_run(run_id: str):
     try:
         response = supa().table("calc_runs").select("*").eq("id", run_id).single().execute()
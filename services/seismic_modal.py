@@ -0,0 +1,212 @@
+"""
+Análisis modal espectral de edificios de corte (masas concentradas por piso).
+Resuelve el problema de valores propios generalizado K·φ = ω²·M·φ en su forma tridiagonal simétrica
+(bisección de Sturm e iteración inversa, vectorizadas sobre los modos) y combina las respuestas modales
+con SRSS o CQC contra el espectro de diseño de ``calculate_seismic_base``.
+"""
+import math
+from typing import Any, Dict, Iterable, Optional, Sequence, Tuple
+
+import numpy as np
+
+GRAVITY = 9.81  # m/s²
+DAMPING = 0.05  # Razón de amortiguamiento para CQC
+BISECTION_STEPS = 64
+TARGET_PARTICIPATION = 0.90  # NCh433: masa equivalente acumulada mínima por dirección
+
+
+def _shear_building(story_weights: Iterable[float], story_stiffnesses: Iterable[float]) -> Tuple[np.ndarray, np.ndarray]:
+    masses = np.asarray(list(story_weights), dtype=float) / GRAVITY  # kN -> t
+    stiffnesses = np.asarray(list(story_stiffnesses), dtype=float)  # kN/m
+    if masses.size == 0 or masses.shape != stiffnesses.shape:
+        raise ValueError("Debe indicar un peso y una rigidez por cada nivel.")
+    if np.any(masses <= 0) or np.any(stiffnesses <= 0):
+        raise ValueError("Los pesos y las rigideces de entrepiso deben ser mayores que cero.")
+    return masses, stiffnesses
+
+
+def _symmetric_tridiagonal(masses: np.ndarray, stiffnesses: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Diagonal y subdiagonal de M^-1/2·K·M^-1/2 (niveles de abajo hacia arriba)."""
+    upper = np.append(stiffnesses[1:], 0.0)  # rigidez del entrepiso superior de cada nivel
+    diagonal = (stiffnesses + upper) / masses
+    off_diagonal = -stiffnesses[1:] / np.sqrt(masses[:-1] * masses[1:])
+    return diagonal, off_diagonal
+
+
+def _sturm_count(diagonal: np.ndarray, off_squared: np.ndarray, shifts: np.ndarray) -> np.ndarray:
+    """Número de valores propios menores que cada desplazamiento (secuencia de Sturm)."""
+    tiny = np.finfo(float).tiny
+    pivot = diagonal[0] - shifts
+    count = (pivot < 0).astype(int)
+    with np.errstate(over="ignore"):  # un pivote ~0 da ±inf, que la secuencia cuenta correctamente
+        for i in range(1, diagonal.size):
+            pivot = np.where(pivot == 0, tiny, pivot)
+            pivot = diagonal[i] - shifts - off_squared[i - 1] / pivot
+            count += pivot < 0
+    return count
+
+
+def tridiagonal_eigenvalues(diagonal: np.ndarray, off_diagonal: np.ndarray, count: Optional[int] = None) -> np.ndarray:
+    """
+    Menores ``count`` valores propios de una matriz tridiagonal simétrica por bisección (todos a la vez).
+
+    Args:
+        diagonal: Diagonal (n,)
+        off_diagonal: Subdiagonal (n - 1,)
+        count: Número de valores propios, por defecto todos
+
+    Returns:
+        Valores propios en orden creciente
+    """
+    n = diagonal.size
+    count = n if count is None else min(int(count), n)
+    radius = np.abs(np.append(off_diagonal, 0.0)) + np.abs(np.insert(off_diagonal, 0, 0.0))
+    low = np.full(count, float((diagonal - radius).min()))
+    high = np.full(count, float((diagonal + radius).max()))
+    index = np.arange(count)
+    off_squared = off_diagonal**2
+    for _ in range(BISECTION_STEPS):
+        middle = (low + high) / 2
+        below = _sturm_count(diagonal, off_squared, middle) > index
+        high = np.where(below, middle, high)
+        low = np.where(below, low, middle)
+    return (low + high) / 2
+
+
+def tridiagonal_eigenvectors(diagonal: np.ndarray, off_diagonal: np.ndarray, eigenvalues: np.ndarray) -> np.ndarray:
+    """
+    Vectores propios unitarios (n, modos) por iteración inversa, con Thomas vectorizado sobre los modos.
+    """
+    n = diagonal.size
+    scale = max(float(np.abs(eigenvalues).max()), 1.0)
+    shifts = eigenvalues + 1e-10 * scale  # desplazamiento mínimo para que el sistema no sea singular
+    vectors = np.ones((n, eigenvalues.size))
+    for _ in range(3):
+        # Eliminación hacia adelante de (T - λI)·y = x
+        c_prime = np.empty((max(n - 1, 0), eigenvalues.size))
+        d_prime = np.empty((n, eigenvalues.size))
+        pivot = diagonal[0] - shifts
+        if n > 1:
+            c_prime[0] = off_diagonal[0] / pivot
+        d_prime[0] = vectors[0] / pivot
+        for i in range(1, n):
+            pivot = diagonal[i] - shifts - off_diagonal[i - 1] * c_prime[i - 1]
+            if i < n - 1:
+                c_prime[i] = off_diagonal[i] / pivot
+            d_prime[i] = (vectors[i] - off_diagonal[i - 1] * d_prime[i - 1]) / pivot
+        for i in range(n - 2, -1, -1):
+            d_prime[i] -= c_prime[i] * d_prime[i + 1]
+        vectors = d_prime / np.linalg.norm(d_prime, axis=0)
+    return vectors
+
+
+def shear_building_modes(
+    story_weights: Iterable[float],
+    story_stiffnesses: Iterable[float],
+    n_modes: Optional[int] = None,
+) -> Dict[str, np.ndarray]:
+    """
+    Modos de un edificio de corte con masas concentradas en cada nivel.
+
+    Args:
+        story_weights: Peso sísmico por nivel (kN), de abajo hacia arriba
+        story_stiffnesses: Rigidez lateral de cada entrepiso (kN/m)
+        n_modes: Número de modos, por defecto todos
+
+    Returns:
+        Dict con periodos (s), formas modales normalizadas por masa (niveles × modos), factores de
+        participación y fracción de masa equivalente por modo
+    """
+    masses, stiffnesses = _shear_building(story_weights, story_stiffnesses)
+    diagonal, off_diagonal = _symmetric_tridiagonal(masses, stiffnesses)
+    eigenvalues = tridiagonal_eigenvalues(diagonal, off_diagonal, n_modes)
+    vectors = tridiagonal_eigenvectors(diagonal, off_diagonal, eigenvalues)
+    shapes = vectors / np.sqrt(masses)[:, None]  # φᵀ·M·φ = 1
+    participation = masses @ shapes
+    # Signo: el desplazamiento del nivel superior es positivo
+    sign = np.where(shapes[-1] < 0, -1.0, 1.0)
+    shapes, participation = shapes * sign, participation * sign
+    omega = np.sqrt(eigenvalues)
+    return {
+        "omega": omega,
+        "periods": 2 * math.pi / omega,
+        "shapes": shapes,
+        "participation": participation,
+        "massRatios": participation**2 / masses.sum(),
+        "masses": masses,
+    }
+
+
+def cqc_correlation(omega: np.ndarray, damping: float = DAMPING) -> np.ndarray:
+    """Coeficientes de correlación modal de Der Kiureghian (amortiguamiento igual en todos los modos)."""
+    ratio = omega[None, :] / omega[:, None]
+    numerator = 8 * damping**2 * (1 + ratio) * ratio**1.5
+    denominator = (1 - ratio**2) ** 2 + 4 * damping**2 * ratio * (1 + ratio) ** 2
+    return numerator / denominator
+
+
+def combine_modal(responses: np.ndarray, omega: np.ndarray, method: str = "CQC", damping: float = DAMPING) -> np.ndarray:
+    """
+    Combina respuestas modales (modos × cantidades) con SRSS o CQC.
+    """
+    if method == "SRSS":
+        return np.sqrt((responses**2).sum(axis=0))
+    if method == "CQC":
+        rho = cqc_correlation(omega, damping)
+        return np.sqrt(np.maximum(np.einsum("iq,ij,jq->q", responses, rho, responses), 0))
+    raise ValueError(f"Método de combinación no soportado: {method}")
+
+
+def modal_spectrum_response(
+    story_weights: Iterable[float],
+    story_stiffnesses: Iterable[float],
+    spectrum_periods: Sequence[float],
+    spectrum_sa: Sequence[float],
+    method: str = "CQC",
+    n_modes: Optional[int] = None,
+    damping: float = DAMPING,
+) -> Dict[str, Any]:
+    """
+    Análisis modal espectral de un edificio de corte en una dirección.
+
+    Args:
+        story_weights: Peso sísmico por nivel (kN), de abajo hacia arriba
+        story_stiffnesses: Rigidez lateral de cada entrepiso (kN/m)
+        spectrum_periods: Periodos del espectro de diseño (s)
+        spectrum_sa: Aceleración espectral de diseño (g) en esos periodos
+        method: "CQC" o "SRSS"
+        n_modes: Número de modos, por defecto todos
+        damping: Razón de amortiguamiento para CQC
+
+    Returns:
+        Dict con periodos, participación de masa y respuestas combinadas por nivel: fuerzas (kN),
+        cortes de entrepiso (kN), desplazamientos y derivas (m) y corte basal (kN)
+    """
+    modes = shear_building_modes(story_weights, story_stiffnesses, n_modes)
+    masses, shapes, gamma, omega = modes["masses"], modes["shapes"], modes["participation"], modes["omega"]
+    Sa = np.interp(modes["periods"], spectrum_periods, spectrum_sa) * GRAVITY  # m/s²
+
+    # Respuestas por modo (modos × niveles)
+    displacement = (gamma * Sa / omega**2)[:, None] * shapes.T
+    forces = (gamma * Sa)[:, None] * shapes.T * masses[None, :]
+    shears = np.cumsum(forces[:, ::-1], axis=1)[:, ::-1]
+    drifts = np.diff(displacement, axis=1, prepend=0.0)
+
+    def combine(values: np.ndarray) -> np.ndarray:
+        return combine_modal(values, omega, method, damping)
+
+    cumulative = np.cumsum(modes["massRatios"])
+    required = int(np.searchsorted(cumulative, TARGET_PARTICIPATION - 1e-12) + 1)
+    return {
+        "method": method,
+        "periods": [round(float(value), 4) for value in modes["periods"]],
+        "massRatios": [round(float(value), 4) for value in modes["massRatios"]],
+        "cumulativeMassRatio": round(float(cumulative[-1]), 4),
+        "modesFor90Percent": min(required, omega.size) if cumulative[-1] >= TARGET_PARTICIPATION - 1e-12 else None,
+        "fundamentalPeriod": round(float(modes["periods"][0]), 4),
+        "baseShear": round(float(combine(shears[:, :1])[0]), 3),
+        "floorForces": [round(float(value), 3) for value in combine(forces)],
+        "storyShears": [round(float(value), 3) for value in combine(shears)],
+        "displacements": [round(float(value), 6) for value in combine(displacement)],
+        "drifts": [round(float(value), 6) for value in combine(drifts)],
+    }
@@ -0,0 +1,300 @@
+from __future__ import annotations
+
+import datetime as dt
+import hashlib
+import hmac
+import os
+import uuid
+from abc import ABC, abstractmethod
+from pathlib import Path
+from typing import AsyncIterator
+from urllib.parse import quote
+
+import anyio
+import httpx
+
+from core.asyncio_sync import run_coroutine_sync
+from core.config import (
+    S3_ACCESS_KEY,
+    S3_BUCKET,
+    S3_ENDPOINT_URL,
+    S3_PUBLIC_URL,
+    S3_REGION,
+    S3_SECRET_KEY,
+    STORAGE_BACKEND,
+    UPLOADS_DIR,
+)
+
+STORAGE_CHUNK_SIZE = 1024 * 1024
+_CONTENT_TYPES = {".jpg": "image/jpeg", ".jpeg": "image/jpeg", ".png": "image/png", ".pdf": "application/pdf"}
+
+
+def content_key(digest: str, suffix: str, prefix: str = "photos") -> str:
+    """Clave direccionada por contenido, repartida en dos niveles de subdirectorios (``photos/ab/cd/abcd….jpg``)."""
+    return f"{prefix}/{digest[:2]}/{digest[2:4]}/{digest}{suffix}"
+
+
+def guess_content_type(key: str) -> str:
+    return _CONTENT_TYPES.get(Path(key).suffix.lower(), "application/octet-stream")
+
+
+class StorageBackend(ABC):
+    """Almacenamiento de medios por clave. ``put_file`` consume el archivo local y es idempotente por clave."""
+
+    @abstractmethod
+    async def exists(self, key: str) -> bool: ...
+
+    @abstractmethod
+    async def put_file(self, path: Path, key: str, content_type: str | None = None) -> bool:
+        """Guarda ``path`` bajo ``key`` y borra el archivo local. Devuelve False si la clave ya existía."""
+
+    @abstractmethod
+    async def put_bytes(self, data: bytes, key: str, content_type: str | None = None) -> bool: ...
+
+    @abstractmethod
+    def iter_chunks(self, key: str) -> AsyncIterator[bytes]: ...
+
+    @abstractmethod
+    async def delete(self, key: str) -> None: ...
+
+    @abstractmethod
+    def url(self, key: str) -> str: ...
+
+    @abstractmethod
+    def key_for_url(self, url: str) -> str | None: ...
+
+    async def download(self, key: str, target: Path) -> Path:
+        target.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = target.with_name(f".{target.name}.{uuid.uuid4().hex}.tmp")
+        try:
+            async with await anyio.open_file(tmp_path, "wb") as handle:
+                async for chunk in self.iter_chunks(key):
+                    await handle.write(chunk)
+            os.replace(tmp_path, target)
+        finally:
+            tmp_path.unlink(missing_ok=True)
+        return target
+
+
+class LocalDiskStorage(StorageBackend):
+    def __init__(self, root: Path, public_prefix: str = "/uploads"):
+        self.root = Path(root)
+        self.public_prefix = public_prefix.rstrip("/")
+
+    def path_for(self, key: str) -> Path:
+        base = self.root.resolve()
+        path = (base / key).resolve()
+        if base not in path.parents:
+            raise ValueError(f"Clave inválida: {key}")
+        return path
+
+    async def exists(self, key: str) -> bool:
+        return await anyio.Path(self.path_for(key)).is_file()
+
+    async def put_file(self, path: Path, key: str, content_type: str | None = None) -> bool:
+        target = self.path_for(key)
+        if await anyio.Path(target).is_file():
+            await anyio.Path(path).unlink(missing_ok=True)
+            return False
+        await anyio.Path(target.parent).mkdir(parents=True, exist_ok=True)
+        try:
+            await anyio.to_thread.run_sync(os.replace, path, target)
+        except OSError:
+            # Different filesystem than the staging directory: copy in chunks, then swap in atomically.
+            tmp_path = target.with_name(f".{target.name}.{uuid.uuid4().hex}.tmp")
+            async with await anyio.open_file(path, "rb") as source, await anyio.open_file(tmp_path, "wb") as dest:
+                while chunk := await source.read(STORAGE_CHUNK_SIZE):
+                    await dest.write(chunk)
+            await anyio.to_thread.run_sync(os.replace, tmp_path, target)
+            await anyio.Path(path).unlink(missing_ok=True)
+        return True
+
+    async def put_bytes(self, data: bytes, key: str, content_type: str | None = None) -> bool:
+        target = self.path_for(key)
+        if await anyio.Path(target).is_file():
+            return False
+        await anyio.Path(target.parent).mkdir(parents=True, exist_ok=True)
+        tmp_path = target.with_name(f".{target.name}.{uuid.uuid4().hex}.tmp")
+        await anyio.Path(tmp_path).write_bytes(data)
+        await anyio.to_thread.run_sync(os.replace, tmp_path, target)
+        return True
+
+    async def iter_chunks(self, key: str) -> AsyncIterator[bytes]:
+        async with await anyio.open_file(self.path_for(key), "rb") as handle:
+            while chunk := await handle.read(STORAGE_CHUNK_SIZE):
+                yield chunk
+
+    async def delete(self, key: str) -> None:
+        await anyio.Path(self.path_for(key)).unlink(missing_ok=True)
+
+    def url(self, key: str) -> str:
+        return f"{self.public_prefix}/{key}"
+
+    def key_for_url(self, url: str) -> str | None:
+        prefix = f"{self.public_prefix}/"
+        return url[len(prefix):] if url.startswith(prefix) else None
+
+
+class S3Storage(StorageBackend):
+    """Backend compatible con S3 (AWS, MinIO, R2…) usando path-style y firma SigV4 sobre httpx."""
+
+    def __init__(
+        self,
+        endpoint_url: str,
+        bucket: str,
+        access_key: str,
+        secret_key: str,
+        region: str = "us-east-1",
+        public_url: str | None = None,
+        transport: httpx.AsyncBaseTransport | None = None,
+        timeout: float = 30.0,
+    ):
+        self.endpoint_url = endpoint_url.rstrip("/")
+        self.bucket = bucket
+        self.access_key = access_key
+        self.secret_key = secret_key
+        self.region = region
+        self.public_url = (public_url or f"{self.endpoint_url}/{bucket}").rstrip("/")
+        self.timeout = timeout
+        self._transport = transport
+
+    def _client(self) -> httpx.AsyncClient:
+        # A client per operation: callers may run each operation in a fresh event loop.
+        return httpx.AsyncClient(transport=self._transport, timeout=self.timeout)
+
+    def _object_url(self, key: str) -> str:
+        return f"{self.endpoint_url}/{self.bucket}/{quote(key)}"
+
+    def _signed_headers(self, method: str, url: str, payload_hash: str, extra: dict[str, str] | None = None) -> dict[str, str]:
+        now = dt.datetime.now(dt.timezone.utc)
+        amz_date = now.strftime("%Y%m%dT%H%M%SZ")
+        datestamp = now.strftime("%Y%m%d")
+        parsed = httpx.URL(url)
+        host = parsed.netloc.decode()
+        headers = {"host": host, "x-amz-content-sha256": payload_hash, "x-amz-date": amz_date}
+        headers.update({name.lower(): value for name, value in (extra or {}).items()})
+        signed = sorted(headers)
+        canonical_request = "\n".join(
+            [
+                method,
+                parsed.raw_path.decode().split("?", 1)[0],
+                "",
+                "".join(f"{name}:{headers[name].strip()}\n" for name in signed),
+                ";".join(signed),
+                payload_hash,
+            ]
+        )
+        scope = f"{datestamp}/{self.region}/s3/aws4_request"
+        string_to_sign = "\n".join(
+            ["AWS4-HMAC-SHA256", amz_date, scope, hashlib.sha256(canonical_request.encode()).hexdigest()]
+        )
+        signing_key = f"AWS4{self.secret_key}".encode()
+        for part in (datestamp, self.region, "s3", "aws4_request"):
+            signing_key = hmac.new(signing_key, part.encode(), hashlib.sha256).digest()
+        signature = hmac.new(signing_key, string_to_sign.encode(), hashlib.sha256).hexdigest()
+        headers["authorization"] = (
+            f"AWS4-HMAC-SHA256 Credential={self.access_key}/{scope}, "
+            f"SignedHeaders={';'.join(signed)}, Signature={signature}"
+        )
+        del headers["host"]
+        return headers
+
+    async def exists(self, key: str) -> bool:
+        url = self._object_url(key)
+        async with self._client() as client:
+            response = await client.head(url, headers=self._signed_headers("HEAD", url, _EMPTY_SHA256))
+        if response.status_code == 404:
+            return False
+        response.raise_for_status()
+        return True
+
+    async def put_file(self, path: Path, key: str, content_type: str | None = None) -> bool:
+        if await self.exists(key):
+            await anyio.Path(path).unlink(missing_ok=True)
+            return False
+        size = (await anyio.Path(path).stat()).st_size
+
+        async def body() -> AsyncIterator[bytes]:
+            async with await anyio.open_file(path, "rb") as handle:
+                while chunk := await handle.read(STORAGE_CHUNK_SIZE):
+                    yield chunk
+
+        await self._put(key, body(), "UNSIGNED-PAYLOAD", size, content_type)
+        await anyio.Path(path).unlink(missing_ok=True)
+        return True
+
+    async def put_bytes(self, data: bytes, key: str, content_type: str | None = None) -> bool:
+        if await self.exists(key):
+            return False
+        await self._put(key, data, hashlib.sha256(data).hexdigest(), len(data), content_type)
+        return True
+
+    async def _put(self, key: str, content, payload_hash: str, size: int, content_type: str | None) -> None:
+        url = self._object_url(key)
+        headers = self._signed_headers(
+            "PUT", url, payload_hash, {"content-type": content_type or guess_content_type(key)}
+        )
+        headers["content-length"] = str(size)
+        async with self._client() as client:
+            response = await client.put(url, content=content, headers=headers)
+        response.raise_for_status()
+
+    async def iter_chunks(self, key: str) -> AsyncIterator[bytes]:
+        url = self._object_url(key)
+        async with self._client() as client:
+            async with client.stream("GET", url, headers=self._signed_headers("GET", url, _EMPTY_SHA256)) as response:
+                if response.status_code == 404:
+                    raise FileNotFoundError(key)
+                response.raise_for_status()
+                async for chunk in response.aiter_bytes(STORAGE_CHUNK_SIZE):
+                    yield chunk
+
+    async def delete(self, key: str) -> None:
+        url = self._object_url(key)
+        async with self._client() as client:
+            response = await client.delete(url, headers=self._signed_headers("DELETE", url, _EMPTY_SHA256))
+        if response.status_code not in (204, 404):
+            response.raise_for_status()
+
+    def url(self, key: str) -> str:
+        return f"{self.public_url}/{key}"
+
+    def key_for_url(self, url: str) -> str | None:
+        prefix = f"{self.public_url}/"
+        return url[len(prefix):] if url.startswith(prefix) else None
+
+
+_EMPTY_SHA256 = hashlib.sha256(b"").hexdigest()
+_storage: StorageBackend | None = None
+
+
+def build_storage() -> StorageBackend:
+    if STORAGE_BACKEND == "s3":
+        if not (S3_ENDPOINT_URL and S3_BUCKET):
+            raise RuntimeError("STORAGE_BACKEND=s3 requiere S3_ENDPOINT_URL y S3_BUCKET")
+        return S3Storage(S3_ENDPOINT_URL, S3_BUCKET, S3_ACCESS_KEY, S3_SECRET_KEY, S3_REGION, S3_PUBLIC_URL or None)
+    return LocalDiskStorage(Path(UPLOADS_DIR))
+
+
+def get_storage() -> StorageBackend:
+    global _storage
+    if _storage is None:
+        _storage = build_storage()
+    return _storage
+
+
+def local_media_path(url: str) -> Path | None:
+    """Copia local de un medio guardado en un backend remoto (para derivadas, informes y zips).
+
+    Devuelve None si el backend es el disco local o la URL no le pertenece.
+    """
+    storage = get_storage()
+    if isinstance(storage, LocalDiskStorage):
+        return None
+    key = storage.key_for_url(url)
+    if key is None:
+        return None
+    target = Path(UPLOADS_DIR) / "_remote" / key
+    if not target.exists():
+        run_coroutine_sync(storage.download(key, target))
+    return target
@@ -0,0 +1,294 @@
+"""
+Servicio de análisis de vigas continuas por el método de rigidez.
+Ensambla la matriz de rigidez en banda, la factoriza una sola vez y resuelve la carga muerta y la
+sobrecarga de cada tramo como lados derechos múltiples; las envolventes de alternancia de sobrecarga
+alimentan directamente a los calculadores de vigas de hormigón, acero y madera.
+"""
+import math
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from services.structural_combinations import BEAM_DESIGNERS
+
+SUPPORT_RESTRAINTS = {
+    "pinned": (True, False),
+    "roller": (True, False),
+    "fixed": (True, True),
+    "free": (False, False),
+}
+DEAD_FACTOR = 1.2  # NCh3171 C2a
+LIVE_FACTOR = 1.6
+DEFAULT_STATIONS = 21
+
+
+def banded_cholesky(band: np.ndarray) -> np.ndarray:
+    """
+    Factorización de Cholesky de una matriz simétrica definida positiva almacenada en banda.
+
+    Args:
+        band: Banda inferior por filas, ``band[i, t] = K[i, i - p + t]`` con p = semiancho de banda
+            (la columna p es la diagonal)
+
+    Returns:
+        Factor L en el mismo formato
+
+    Raises:
+        ValueError: Si la matriz no es definida positiva (estructura inestable)
+    """
+    n, width = band.shape
+    p = width - 1
+    factor = np.zeros_like(band, dtype=float)
+    for i in range(n):
+        first = max(0, i - p)  # primera columna de la banda en la fila i
+        for t in range(first - i + p, width):
+            j = i - p + t
+            # Producto de las filas i y j de L sobre sus columnas comunes first..j-1
+            total = band[i, t] - factor[i, first - i + p:t] @ factor[j, first - j + p:p]
+            if t == p:
+                if total <= 1e-12 * max(abs(band[i, p]), 1.0):
+                    raise ValueError("La estructura es inestable: apoyos insuficientes")
+                factor[i, p] = math.sqrt(total)
+            else:
+                factor[i, t] = total / factor[j, p]
+    return factor
+
+
+def banded_solve(factor: np.ndarray, rhs: np.ndarray) -> np.ndarray:
+    """
+    Resuelve K·x = b con el factor de ``banded_cholesky`` para uno o varios lados derechos.
+
+    Args:
+        factor: Factor L en banda
+        rhs: Lados derechos (n,) o (n, casos)
+
+    Returns:
+        Solución con la forma de ``rhs``
+    """
+    n, width = factor.shape
+    p = width - 1
+    x = np.array(rhs, dtype=float)
+    for i in range(n):  # L·y = b
+        start = max(0, i - p)
+        x[i] = (x[i] - factor[i, p - (i - start):p] @ x[start:i]) / factor[i, p]
+    for i in range(n - 1, -1, -1):  # Lᵀ·x = y
+        stop = min(n, i + p + 1)
+        coupling = factor[np.arange(i + 1, stop), p - np.arange(1, stop - i)]
+        x[i] = (x[i] - coupling @ x[i + 1:stop]) / factor[i, p]
+    return x
+
+
+def _element_stiffness(length: float, EI: float) -> np.ndarray:
+    L = length
+    return EI / L**3 * np.array([
+        [12, 6 * L, -12, 6 * L],
+        [6 * L, 4 * L**2, -6 * L, 2 * L**2],
+        [-12, -6 * L, 12, -6 * L],
+        [6 * L, 2 * L**2, -6 * L, 4 * L**2],
+    ])
+
+
+def _fixed_end_reactions(length: float, uniform: float, point_loads: Sequence[Tuple[float, float]]) -> np.ndarray:
+    """Reacciones de empotramiento perfecto [V1, M1, V2, M2] (hacia arriba, antihorario) por cargas hacia abajo."""
+    L = length
+    reactions = np.array([uniform * L / 2, uniform * L**2 / 12, uniform * L / 2, -uniform * L**2 / 12])
+    for a, P in point_loads:
+        b = L - a
+        reactions += P * np.array([b**2 * (3 * a + b) / L**3, a * b**2 / L**2, a**2 * (a + 3 * b) / L**3, -a**2 * b / L**2])
+    return reactions
+
+
+def _normalize_spans(spans: Sequence[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    normalized = []
+    for index, span in enumerate(spans):
+        length = float(span["length"])
+        if length <= 0:
+            raise ValueError(f"El tramo {index + 1} debe tener longitud positiva")
+        point_loads = []
+        for load in span.get("point_loads") or []:
+            position = float(load["position"])
+            if not 0 <= position <= length:
+                raise ValueError(f"Carga puntual fuera del tramo {index + 1}")
+            point_loads.append((position, float(load.get("dead") or 0.0), float(load.get("live") or 0.0)))
+        normalized.append({
+            "length": length,
+            "dead": float(span.get("dead_load") or 0.0),
+            "live": float(span.get("live_load") or 0.0),
+            "point_loads": point_loads,
+            "EI": float(span.get("inertia") or 1.0),
+        })
+    return normalized
+
+
+def analyze_continuous_beam(
+    spans: Sequence[Dict[str, Any]],
+    supports: Optional[Sequence[str]] = None,
+    dead_factor: float = DEAD_FACTOR,
+    live_factor: float = LIVE_FACTOR,
+    stations: int = DEFAULT_STATIONS,
+) -> Dict[str, Any]:
+    """
+    Envolventes de momento y corte de una viga continua con alternancia de sobrecarga.
+
+    La carga muerta y la sobrecarga de cada tramo se resuelven como n + 1 lados derechos sobre una única
+    factorización. Por superposición, la envolvente sobre todas las alternancias posibles en cada estación
+    es γD·D + γL·Σ max(0, Lᵢ) (y su análogo con min), sin enumerar los 2ⁿ patrones.
+
+    Args:
+        spans: Tramos con length (m), dead_load y live_load (kN/m, hacia abajo), point_loads
+            ([{position (m desde el apoyo izquierdo), dead, live (kN)}]) e inertia (relativa, por defecto 1)
+        supports: Apoyo en cada nudo (pinned, roller, fixed o free); por defecto todos simplemente apoyados
+        dead_factor: Factor de mayoración de la carga muerta
+        live_factor: Factor de mayoración de la sobrecarga
+        stations: Estaciones de cálculo por tramo
+
+    Returns:
+        Dict con envolventes mayoradas por tramo (kN·m, kN) y reacciones de apoyo mayoradas (kN)
+    """
+    if not spans:
+        raise ValueError("Debe definir al menos un tramo")
+    members = _normalize_spans(spans)
+    n_spans = len(members)
+    supports = list(supports) if supports is not None else ["pinned"] * (n_spans + 1)
+    if len(supports) != n_spans + 1:
+        raise ValueError("Debe indicar un apoyo por cada nudo (tramos + 1)")
+    unknown = [support for support in supports if support not in SUPPORT_RESTRAINTS]
+    if unknown:
+        raise ValueError(f"Tipo de apoyo no soportado: {unknown[0]}")
+    stations = max(int(stations), 2)
+
+    # Numeración de los grados de libertad libres (desplazamiento y giro por nudo), en orden: banda ≤ 3
+    restrained = np.array([flag for support in supports for flag in SUPPORT_RESTRAINTS[support]])
+    numbering = np.full(restrained.size, -1)
+    numbering[~restrained] = np.arange(int((~restrained).sum()))
+    n_free = int((~restrained).sum())
+    n_cases = n_spans + 1  # caso 0: carga muerta; caso i: sobrecarga solo en el tramo i
+
+    stiffness = [_element_stiffness(member["length"], member["EI"]) for member in members]
+    fixed_end = np.zeros((n_spans, n_cases, 4))
+    for index, member in enumerate(members):
+        fixed_end[index, 0] = _fixed_end_reactions(
+            member["length"], member["dead"], [(a, dead) for a, dead, _ in member["point_loads"]]
+        )
+        fixed_end[index, index + 1] = _fixed_end_reactions(
+            member["length"], member["live"], [(a, live) for a, _, live in member["point_loads"]]
+        )
+
+    displacements = np.zeros((restrained.size, n_cases))
+    if n_free:
+        p = 3
+        band = np.zeros((n_free, p + 1))
+        loads = np.zeros((n_free, n_cases))
+        for index in range(n_spans):
+            dofs = numbering[2 * index:2 * index + 4]
+            for a in range(4):
+                if dofs[a] < 0:
+                    continue
+                loads[dofs[a]] -= fixed_end[index, :, a]
+                for b in range(4):
+                    if 0 <= dofs[b] <= dofs[a]:
+                        band[dofs[a], p - (dofs[a] - dofs[b])] += stiffness[index][a, b]
+        displacements[~restrained] = banded_solve(banded_cholesky(band), loads)
+    elif np.any(np.array(supports) == "free"):
+        raise ValueError("La estructura es inestable: apoyos insuficientes")
+
+    spans_out = []
+    reactions = np.zeros((n_spans + 1, n_cases))
+    for index, member in enumerate(members):
+        L = member["length"]
+        end_forces = displacements[2 * index:2 * index + 4].T @ stiffness[index] + fixed_end[index]  # (casos, 4)
+        reactions[index] += end_forces[:, 0]
+        reactions[index + 1] += end_forces[:, 2]
+
+        x = np.unique(np.concatenate([np.linspace(0, L, stations), [a for a, _, _ in member["point_loads"]]]))
+        uniform = np.zeros(n_cases)
+        uniform[0], uniform[index + 1] = member["dead"], member["live"]
+        moment = -end_forces[:, [1]] + end_forces[:, [0]] * x - uniform[:, None] * x**2 / 2
+        shear = end_forces[:, [0]] - uniform[:, None] * x
+        for a, dead, live in member["point_loads"]:
+            point = np.zeros(n_cases)
+            point[0], point[index + 1] = dead, live
+            moment -= point[:, None] * np.maximum(x - a, 0)
+            shear -= point[:, None] * (x > a)
+
+        moment_max, moment_min = _envelope(moment, dead_factor, live_factor)
+        shear_max, shear_min = _envelope(shear, dead_factor, live_factor)
+        shear_abs = np.maximum(np.abs(shear_max), np.abs(shear_min))
+        spans_out.append({
+            "span": index + 1,
+            "length": L,
+            "positiveMoment": round(float(max(moment_max.max(), 0.0)), 3),
+            "positiveMomentAt": round(float(x[moment_max.argmax()]), 3),
+            "negativeMoment": round(float(max(-moment_min.min(), 0.0)), 3),
+            "negativeMomentAt": round(float(x[moment_min.argmin()]), 3),
+            "maxShear": round(float(shear_abs.max()), 3),
+            "stations": np.round(x, 4).tolist(),
+            "momentMax": np.round(moment_max, 3).tolist(),
+            "momentMin": np.round(moment_min, 3).tolist(),
+            "shearMax": np.round(shear_max, 3).tolist(),
+            "shearMin": np.round(shear_min, 3).tolist(),
+        })
+
+    reaction_max, reaction_min = _envelope(reactions.T, dead_factor, live_factor)
+    return {
+        "spans": spans_out,
+        "reactions": [
+            {"node": node + 1, "support": supports[node], "max": round(float(high), 3), "min": round(float(low), 3)}
+            for node, (high, low) in enumerate(zip(reaction_max, reaction_min))
+        ],
+    }
+
+
+def _envelope(effects: np.ndarray, dead_factor: float, live_factor: float) -> Tuple[np.ndarray, np.ndarray]:
+    """Envolvente mayorada (máx, mín) de efectos (casos, ...) con el caso 0 muerto y los demás sobrecargas."""
+    dead, live = effects[0], effects[1:]
+    return (
+        dead_factor * dead + live_factor * np.clip(live, 0, None).sum(axis=0),
+        dead_factor * dead + live_factor * np.clip(live, None, 0).sum(axis=0),
+    )
+
+
+def design_continuous_beam(
+    spans: Sequence[Dict[str, Any]],
+    element_type: str,
+    params: Dict[str, Any],
+    supports: Optional[Sequence[str]] = None,
+    dead_factor: float = DEAD_FACTOR,
+    live_factor: float = LIVE_FACTOR,
+    stations: int = DEFAULT_STATIONS,
+) -> Dict[str, Any]:
+    """
+    Analiza una viga continua y diseña cada tramo con sus envolventes.
+
+    Args:
+        spans: Tramos (ver ``analyze_continuous_beam``); ``params`` opcional por tramo sobrescribe los comunes
+        element_type: rc_beam, steel_beam o wood_beam
+        params: Argumentos comunes del calculador (sección y materiales, sin esfuerzos ni luz)
+        supports: Apoyo en cada nudo
+        dead_factor: Factor de mayoración de la carga muerta
+        live_factor: Factor de mayoración de la sobrecarga
+        stations: Estaciones de cálculo por tramo
+
+    Returns:
+        Resultado de ``analyze_continuous_beam`` con el diseño de cada tramo en ``spans[i]["design"]``
+    """
+    if element_type not in BEAM_DESIGNERS:
+        raise ValueError(f"Tipo de elemento no soportado: {element_type}")
+    analysis = analyze_continuous_beam(spans, supports, dead_factor, live_factor, stations)
+    for span, result in zip(spans, analysis["spans"]):
+        envelope = {
+            "moment_x_max": result["positiveMoment"],
+            "moment_x_min": -result["negativeMoment"],
+            "shear_y_abs": result["maxShear"],
+        }
+        span_params = {**params, **(span.get("params") or {}), "span": result["length"]}
+        result["design"] = BEAM_DESIGNERS[element_type](span_params, envelope)
+    analysis["passes"] = all(_span_passes(span["design"]) for span in analysis["spans"])
+    return analysis
+
+
+def _span_passes(design: Dict[str, Any]) -> bool:
+    if "passes" in design:
+        return bool(design["passes"])
+    # Hormigón: la armadura de flexión se dimensiona para el momento; queda verificar el corte
+    return design["shearCapacityRatio"] <= 1.0
@@ -0,0 +1,289 @@
+"""
+Servicio de combinaciones de carga según NCh3171.
+Expande las combinaciones de todos los elementos como un producto matricial,
+extrae las envolventes y diseña cada elemento solo con sus casos gobernantes.
+"""
+from functools import lru_cache
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from services.structural_concrete import calculate_concrete_beam, calculate_concrete_column
+from services.structural_steel import calculate_steel_beam, calculate_steel_column
+from services.structural_wood import calculate_wood_beam, calculate_wood_column
+
+
+# Estados de carga de servicio: peso propio, sobrecargas de uso y de techo, nieve, viento y sismo por dirección
+LOAD_CASES = ("D", "L", "Lr", "S", "Wx", "Wy", "Ex", "Ey")
+
+# Esfuerzos por estado de carga (mismos nombres que los argumentos de los calculadores)
+FORCE_COMPONENTS = ("axial_load", "moment_x", "moment_y", "shear_x", "shear_y")
+
+# Combinaciones LRFD de NCh3171. "W" y "E" se expanden a cada dirección (x, y) y signo (±).
+NCH3171_TEMPLATES: Tuple[Tuple[str, Dict[str, float]], ...] = (
+    ("C1", {"D": 1.4}),
+    ("C2a", {"D": 1.2, "L": 1.6, "Lr": 0.5}),
+    ("C2b", {"D": 1.2, "L": 1.6, "S": 0.5}),
+    ("C3a", {"D": 1.2, "Lr": 1.6, "L": 1.0}),
+    ("C3b", {"D": 1.2, "Lr": 1.6, "W": 0.8}),
+    ("C3c", {"D": 1.2, "S": 1.6, "L": 1.0}),
+    ("C3d", {"D": 1.2, "S": 1.6, "W": 0.8}),
+    ("C4a", {"D": 1.2, "W": 1.6, "L": 1.0, "Lr": 0.5}),
+    ("C4b", {"D": 1.2, "W": 1.6, "L": 1.0, "S": 0.5}),
+    ("C5", {"D": 1.2, "E": 1.4, "L": 1.0, "S": 0.2}),
+    ("C6", {"D": 0.9, "W": 1.6}),
+    ("C7", {"D": 0.9, "E": 1.4}),
+)
+
+# Envolventes: (nombre, esfuerzo, criterio). Cada una guarda la combinación que la produce y los esfuerzos concurrentes.
+ENVELOPES: Tuple[Tuple[str, str, str], ...] = (
+    ("max_axial", "axial_load", "max"),
+    ("min_axial", "axial_load", "min"),
+    ("max_moment_x", "moment_x", "max"),
+    ("min_moment_x", "moment_x", "min"),
+    ("max_moment_y", "moment_y", "max"),
+    ("min_moment_y", "moment_y", "min"),
+    ("max_shear_x", "shear_x", "absmax"),
+    ("max_shear_y", "shear_y", "absmax"),
+)
+
+
+def _expand_template(name: str, factors: Dict[str, float]) -> List[Tuple[str, Dict[str, float]]]:
+    lateral = next((case for case in ("W", "E") if case in factors), None)
+    if lateral is None:
+        return [(name, dict(factors))]
+    expanded = []
+    for direction in ("x", "y"):
+        for sign, label in ((1.0, "+"), (-1.0, "-")):
+            combo = {case: factor for case, factor in factors.items() if case != lateral}
+            combo[f"{lateral}{direction}"] = sign * factors[lateral]
+            expanded.append((f"{name} {label}{lateral}{direction}", combo))
+    return expanded
+
+
+def combination_matrix(
+    combinations: Iterable[Tuple[str, Dict[str, float]]],
+    load_cases: Tuple[str, ...] = LOAD_CASES,
+) -> Tuple[Tuple[str, ...], np.ndarray]:
+    """
+    Matriz de factores (combinaciones × estados de carga) a partir de pares (nombre, {estado: factor}).
+
+    Returns:
+        (nombres de las combinaciones, matriz de factores)
+    """
+    index = {case: position for position, case in enumerate(load_cases)}
+    names = []
+    rows = []
+    for name, factors in combinations:
+        row = np.zeros(len(load_cases))
+        for case, factor in factors.items():
+            if case not in index:
+                raise ValueError(f"Estado de carga desconocido en {name}: {case}")
+            row[index[case]] = factor
+        names.append(name)
+        rows.append(row)
+    if not rows:
+        raise ValueError("Debe definir al menos una combinación de carga")
+    return tuple(names), np.vstack(rows)
+
+
+@lru_cache(maxsize=1)
+def nch3171_combinations() -> Tuple[Tuple[str, ...], np.ndarray]:
+    """Combinaciones NCh3171 expandidas por dirección y signo de viento y sismo (matriz de solo lectura)."""
+    expanded = [combo for name, factors in NCH3171_TEMPLATES for combo in _expand_template(name, factors)]
+    names, matrix = combination_matrix(expanded)
+    matrix.setflags(write=False)
+    return names, matrix
+
+
+def loads_array(elements: List[Dict[str, Any]], load_cases: Tuple[str, ...] = LOAD_CASES) -> np.ndarray:
+    """
+    Arreglo (elementos × estados × esfuerzos) a partir de ``element["loads"][estado][esfuerzo]``.
+
+    Los estados y esfuerzos omitidos valen cero.
+    """
+    loads = np.zeros((len(elements), len(load_cases), len(FORCE_COMPONENTS)))
+    index = {case: position for position, case in enumerate(load_cases)}
+    for row, element in enumerate(elements):
+        for case, forces in (element.get("loads") or {}).items():
+            if case not in index:
+                raise ValueError(f"Estado de carga desconocido en {element.get('id', row)}: {case}")
+            loads[row, index[case]] = [forces.get(component) or 0.0 for component in FORCE_COMPONENTS]
+    return loads
+
+
+def factored_forces(loads: np.ndarray, matrix: np.ndarray) -> np.ndarray:
+    """Esfuerzos mayorados (elementos × combinaciones × esfuerzos) como un solo producto matricial."""
+    return np.matmul(matrix, loads)
+
+
+def governing_combinations(factored: np.ndarray) -> np.ndarray:
+    """Índice de la combinación que gobierna cada envolvente de cada elemento (elementos × envolventes)."""
+    governing = np.empty((factored.shape[0], len(ENVELOPES)), dtype=np.intp)
+    for column, (_, component, criterion) in enumerate(ENVELOPES):
+        values = factored[:, :, FORCE_COMPONENTS.index(component)]
+        if criterion == "max":
+            governing[:, column] = values.argmax(axis=1)
+        elif criterion == "min":
+            governing[:, column] = values.argmin(axis=1)
+        else:
+            governing[:, column] = np.abs(values).argmax(axis=1)
+    return governing
+
+
+def load_envelopes(loads: np.ndarray, matrix: np.ndarray) -> Dict[str, np.ndarray]:
+    """
+    Envolventes de esfuerzos de todos los elementos.
+
+    Args:
+        loads: Esfuerzos de servicio (elementos × estados × esfuerzos)
+        matrix: Factores de combinación (combinaciones × estados)
+
+    Returns:
+        Dict con ``governing`` (elementos × envolventes, índice de combinación) y ``forces``
+        (elementos × envolventes × esfuerzos, esfuerzos concurrentes de esa combinación)
+    """
+    factored = factored_forces(loads, matrix)
+    governing = governing_combinations(factored)
+    forces = np.take_along_axis(factored, governing[:, :, None], axis=1)
+    return {"governing": governing, "forces": forces}
+
+
+def _forces_dict(forces: np.ndarray) -> Dict[str, float]:
+    return {component: round(float(value), 3) for component, value in zip(FORCE_COMPONENTS, forces)}
+
+
+def _column_case(calculator: Callable[..., Dict[str, Any]], components: Tuple[str, ...]):
+    def run(params: Dict[str, Any], forces: Dict[str, float]) -> Dict[str, Any]:
+        # Calculators expect moment and shear magnitudes; the axial load keeps its sign (tension < 0).
+        values = {
+            component: forces[component] if component == "axial_load" else abs(forces[component])
+            for component in components
+        }
+        return calculator(**params, **values)
+
+    return run
+
+
+def _concrete_beam_case(params: Dict[str, Any], envelope: Dict[str, float]) -> Dict[str, Any]:
+    return calculate_concrete_beam(
+        positive_moment=max(0.0, envelope["moment_x_max"]),
+        negative_moment=max(0.0, -envelope["moment_x_min"]),
+        max_shear=envelope["shear_y_abs"],
+        **params,
+    )
+
+
+def _beam_case(calculator: Callable[..., Dict[str, Any]]):
+    def run(params: Dict[str, Any], envelope: Dict[str, float]) -> Dict[str, Any]:
+        moment = max(envelope["moment_x_max"], -envelope["moment_x_min"])
+        return calculator(moment=moment, shear=envelope["shear_y_abs"], **params)
+
+    return run
+
+
+def _concrete_column_ratio(result: Dict[str, Any]) -> float:
+    return max(
+        result["axialCapacityRatio"],
+        result["interactionRatio"],
+        result["shearCapacityRatioX"],
+        result["shearCapacityRatioY"],
+    )
+
+
+# Pilares: se diseñan con cada combinación gobernante (esfuerzos concurrentes) y se informa la peor.
+COLUMN_DESIGNERS: Dict[str, Tuple[Callable[..., Dict[str, Any]], Callable[[Dict[str, Any]], float]]] = {
+    "rc_column": (_column_case(calculate_concrete_column, FORCE_COMPONENTS), _concrete_column_ratio),
+    "steel_column": (
+        _column_case(calculate_steel_column, ("axial_load", "moment_x", "moment_y")),
+        lambda result: result["interactionRatio"],
+    ),
+    "wood_column": (_column_case(calculate_wood_column, ("axial_load",)), lambda result: result["utilizationRatio"]),
+}
+
+# Vigas: flexión en torno al eje X (moment_x) con su corte asociado (shear_y), de la envolvente completa.
+BEAM_DESIGNERS: Dict[str, Callable[..., Dict[str, Any]]] = {
+    "rc_beam": _concrete_beam_case,
+    "steel_beam": _beam_case(calculate_steel_beam),
+    "wood_beam": _beam_case(calculate_wood_beam),
+}
+
+
+def design_with_combinations(
+    elements: List[Dict[str, Any]],
+    element_type: Optional[str] = None,
+    combinations: Optional[Dict[str, Dict[str, float]]] = None,
+) -> Dict[str, Any]:
+    """
+    Combina las cargas de servicio de cada elemento y lo diseña con sus casos gobernantes.
+
+    Args:
+        elements: Elementos con ``id``, ``loads`` ({estado: {esfuerzo: valor}}) y ``params``
+            (argumentos del calculador: geometría y materiales)
+        element_type: rc_column, rc_beam, steel_column, steel_beam, wood_column o wood_beam;
+            si es None solo se calculan las envolventes
+        combinations: Combinaciones propias {nombre: {estado: factor}}; por defecto NCh3171
+
+    Returns:
+        Dict con las combinaciones usadas y, por elemento, envolventes y diseño gobernante
+    """
+    if element_type is not None and element_type not in COLUMN_DESIGNERS and element_type not in BEAM_DESIGNERS:
+        raise ValueError(f"Tipo de elemento no soportado: {element_type}")
+    if combinations:
+        names, matrix = combination_matrix(combinations.items())
+    else:
+        names, matrix = nch3171_combinations()
+
+    envelopes = load_envelopes(loads_array(elements), matrix)
+    governing = envelopes["governing"]
+    forces = envelopes["forces"]
+    results = []
+    for row, element in enumerate(elements):
+        cases = [
+            {
+                "envelope": envelope,
+                "combination": names[governing[row, column]],
+                "forces": _forces_dict(forces[row, column]),
+            }
+            for column, (envelope, _, _) in enumerate(ENVELOPES)
+        ]
+        entry: Dict[str, Any] = {"id": element.get("id", str(row)), "governing": cases}
+        if element_type is not None:
+            entry["design"] = design_element(element_type, element.get("params") or {}, cases)
+        results.append(entry)
+    return {"combinations": list(names), "elements": results}
+
+
+def design_element(element_type: str, params: Dict[str, Any], cases: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Diseña un elemento con sus casos gobernantes.
+
+    Args:
+        element_type: Tipo de elemento (clave de COLUMN_DESIGNERS o BEAM_DESIGNERS)
+        params: Argumentos del calculador (geometría y materiales)
+        cases: Casos gobernantes [{envelope, combination, forces}] en el orden de ENVELOPES
+
+    Returns:
+        Dict con la combinación, esfuerzos y resultados del caso que gobierna
+    """
+    if element_type in BEAM_DESIGNERS:
+        by_envelope = {case["envelope"]: case["forces"] for case in cases}
+        envelope = {
+            "moment_x_max": by_envelope["max_moment_x"]["moment_x"],
+            "moment_x_min": by_envelope["min_moment_x"]["moment_x"],
+            "shear_y_abs": abs(by_envelope["max_shear_y"]["shear_y"]),
+        }
+        return {"combination": None, "forces": envelope, "results": BEAM_DESIGNERS[element_type](params, envelope)}
+
+    designer, ratio = COLUMN_DESIGNERS[element_type]
+    worst: Optional[Dict[str, Any]] = None
+    seen: Dict[str, Dict[str, Any]] = {}
+    for case in cases:
+        # Several envelopes often share a combination; each distinct one is designed once.
+        if case["combination"] in seen:
+            continue
+        result = designer(params, case["forces"])
+        seen[case["combination"]] = result
+        if worst is None or ratio(result) > worst["ratio"]:
+            worst = {"combination": case["combination"], "forces": case["forces"], "results": result, "ratio": ratio(result)}
+    return {key: value for key, value in worst.items() if key != "ratio"}
@@ -5,6 +5,8 @@ Implementa diseño de pilares y vigas de hormigón armado.
 import math
 from typing import Dict, Any
 
+from services.structural_interaction import check_column_loads
+
 
 def calculate_concrete_column(
     axial_load: float,
@@ -128,6 +130,13 @@ def calculate_concrete_column(
     num_bars = math.ceil(As_required / bar_area)
     num_bars = max(4, num_bars)  # Mínimo 4 barras
 
+    # Verificación biaxial con la superficie de interacción; se agregan pares de barras hasta cumplir
+    design_loads = [[P / 1000, Mx_design / 1e6, My_design / 1e6]]
+    interaction_ratio = check_column_loads(design_loads, width, depth, fc, fy, num_bars, bar_diameter, cover)[0]
+    while interaction_ratio > 1 and (num_bars + 2) * bar_area <= rho_max * Ag:
+        num_bars += 2
+        interaction_ratio = check_column_loads(design_loads, width, depth, fc, fy, num_bars, bar_diameter, cover)[0]
+
     As_provided = num_bars * bar_area
     rho_provided = As_provided / Ag
 
@@ -177,6 +186,7 @@ def calculate_concrete_column(
     return {
         "axialCapacity": round(Pn_design / 1000, 2),  # kN
         "axialCapacityRatio": round(axial_capacity_ratio, 3),
+        "interactionRatio": round(float(interaction_ratio), 3),
         "longitudinalSteel": {
             "numBars": num_bars,
             "barDiameter": bar_diameter,
@@ -240,6 +250,12 @@ def calculate_concrete_beam(
     stirrup_diameter = 10  # mm
     d = h - cover * 10 - stirrup_diameter - bar_diameter_main / 2
 
+    # Cuantías límite
+    rho_min = max(1.4 / fy, math.sqrt(fc) / (4 * fy))
+    beta1 = 0.85 if fc <= 28 else max(0.65, 0.85 - 0.05 * (fc - 28) / 7)
+    epsilon_t = 0.005  # Deformación de tensión controlada
+    rho_max = 0.85 * beta1 * fc / fy * (0.003 / (0.003 + epsilon_t))
+
     # REFUERZO LONGITUDINAL PARA MOMENTO POSITIVO
     if M_pos > 0:
         # Factor de resistencia
@@ -249,12 +265,6 @@ def calculate_concrete_beam(
         omega_pos = (0.85 * fc / fy) * (1 - math.sqrt(1 - (2 * Ru_pos) / (0.85 * fc)))
         rho_pos = omega_pos * fc / fy
 
-        # Cuantías límite
-        rho_min = max(1.4 / fy, math.sqrt(fc) / (4 * fy))
-        beta1 = 0.85 if fc <= 28 else max(0.65, 0.85 - 0.05 * (fc - 28) / 7)
-        epsilon_t = 0.005  # Deformación de tensión controlada
-        rho_max = 0.85 * beta1 * fc / fy * (0.003 / (0.003 + epsilon_t))
-
         rho_pos = max(rho_min, min(rho_pos, rho_max))
 
         # Área de acero
@@ -273,7 +283,6 @@ def calculate_concrete_beam(
         omega_neg = (0.85 * fc / fy) * (1 - math.sqrt(1 - (2 * Ru_neg) / (0.85 * fc)))
         rho_neg = omega_neg * fc / fy
 
-        rho_min = max(1.4 / fy, math.sqrt(fc) / (4 * fy))
         rho_neg = max(rho_min, min(rho_neg, rho_max))
 
         As_neg = rho_neg * b * d
@@ -1,9 +1,173 @@
 """
 Servicio de cálculo de zapatas de hormigón armado según ACI318.
-Implementa diseño de zapatas aisladas y corridas.
+Implementa diseño de zapatas aisladas y corridas, y cuadros de zapatas agrupadas por tamaño.
 """
 import math
-from typing import Dict, Any
+from typing import Dict, Any, List, Optional
+
+import numpy as np
+
+LOAD_FACTOR = 1.6  # Factor de carga (LRFD) de servicio a diseño
+BAR_DIAMETER = 16  # mm, refuerzo de la zapata
+SIZE_ROUNDING = 0.05  # m, las dimensiones se redondean hacia arriba a múltiplos de 5 cm
+
+
+def required_footing_width(
+    axial_load: Any,
+    moment: Any,
+    soil_bearing_capacity: Any,
+    footing_type: str = "isolated",
+) -> np.ndarray:
+    """
+    Ancho mínimo exacto para que la presión máxima de servicio iguale la capacidad portante.
+
+    Con excentricidad e = M/P dentro del núcleo (e ≤ B/6) la distribución es trapezoidal:
+    aislada cuadrada q = P/B²·(1 + 6e/B), es decir qa·B³ − P·B − 6M = 0 (una raíz positiva, Cardano);
+    corrida por metro q = P/B·(1 + 6e/B), una cuadrática. Fuera del núcleo el contacto es parcial
+    (triangular): q = 2P / (3·B'·(B/2 − e)), también con solución cerrada.
+
+    Args:
+        axial_load: Carga axial de servicio (kN), escalar o arreglo
+        moment: Momento de servicio (kN·m); se usa su valor absoluto
+        soil_bearing_capacity: Capacidad portante del suelo (kPa)
+        footing_type: "isolated" (cuadrada) o "continuous" (por metro lineal)
+
+    Returns:
+        Ancho requerido (m) sin redondear
+    """
+    P = np.asarray(axial_load, dtype=float)
+    M = np.abs(np.asarray(moment, dtype=float))
+    qa = np.asarray(soil_bearing_capacity, dtype=float)
+    if np.any(P <= 0) or np.any(qa <= 0):
+        raise ValueError("La carga axial y la capacidad portante deben ser positivas")
+    e = M / P
+
+    if footing_type == "isolated":
+        # Cúbica reducida B³ + pB + q = 0 con p < 0 y q ≤ 0
+        p = -P / qa
+        q = -6 * M / qa
+        discriminant = (q / 2) ** 2 + (p / 3) ** 3
+        root = np.sqrt(np.maximum(discriminant, 0))
+        cardano = np.cbrt(-q / 2 + root) + np.cbrt(-q / 2 - root)
+        angle = np.arccos(np.clip(3 * q / (2 * p) * np.sqrt(-3 / p), -1, 1)) / 3
+        trigonometric = 2 * np.sqrt(-p / 3) * np.cos(angle)  # mayor de las tres raíces reales
+        B = np.where(discriminant > 0, cardano, trigonometric)
+        B = B - (B**3 + p * B + q) / (3 * B**2 + p)  # un paso de Newton para pulir el redondeo
+        partial_contact = e + np.sqrt(e**2 + 4 * P / (3 * qa))
+    else:
+        B = (P + np.sqrt(P**2 + 24 * qa * M)) / (2 * qa)
+        partial_contact = 2 * e + 4 * P / (3 * qa)
+
+    return np.where(B >= 6 * e, B, partial_contact)
+
+
+def round_up_size(width: Any, step: float = SIZE_ROUNDING) -> np.ndarray:
+    """Redondea hacia arriba a múltiplos de ``step`` (m), tolerando el ruido de punto flotante."""
+    return np.round(np.ceil(np.asarray(width, dtype=float) / step - 1e-9) * step, 3)
+
+
+def footing_checks(
+    width: Any,
+    length: Any,
+    axial_load: Any,
+    moment: Any,
+    column_width: Any,
+    column_depth: Any,
+    soil_bearing_capacity: Any,
+    fc: float,
+    fy: float,
+    footing_type: str = "isolated",
+    footing_depth: float = 60.0,
+    cover: float = 7.5,
+) -> Dict[str, np.ndarray]:
+    """
+    Verificaciones de presión, flexión, punzonamiento y corte de zapatas ya dimensionadas (vectorizado).
+
+    Args:
+        width: Ancho B (m); en zapatas corridas, ancho transversal
+        length: Largo L (m); 1.0 en zapatas corridas (por metro lineal)
+        axial_load: Carga axial de servicio (kN)
+        moment: Momento de servicio (kN·m)
+        column_width: Ancho de columna (cm)
+        column_depth: Profundidad de columna (cm)
+        soil_bearing_capacity: Capacidad portante del suelo (kPa)
+        fc: Resistencia del hormigón (MPa)
+        fy: Límite de fluencia del acero (MPa)
+        footing_type: "isolated" o "continuous"
+        footing_depth: Altura de la zapata (cm)
+        cover: Recubrimiento (cm)
+
+    Returns:
+        Dict de arreglos con presiones (kPa), acero (mm²), espaciamiento (mm) y ratios
+    """
+    B = np.asarray(width, dtype=float)
+    L = np.asarray(length, dtype=float)
+    P = np.asarray(axial_load, dtype=float)
+    M = np.abs(np.asarray(moment, dtype=float))
+    c1 = np.asarray(column_width, dtype=float) * 10  # cm -> mm
+    c2 = np.asarray(column_depth, dtype=float) * 10  # cm -> mm
+    qa = np.asarray(soil_bearing_capacity, dtype=float)
+    h = footing_depth * 10  # cm -> mm
+    d = h - cover * 10 - 10  # Peralte efectivo (mm), asumiendo φ20mm
+    isolated = footing_type == "isolated"
+
+    # PRESIONES EN EL SUELO (servicio): trapezoidal dentro del núcleo, triangular fuera de él
+    A_footing = B * L
+    q_service = P / A_footing
+    bending_dimension = L if isolated else B  # dimensión en la dirección del momento
+    other_dimension = B if isolated else L
+    q_moment = 6 * M / (other_dimension * bending_dimension**2)
+    e = M / P
+    in_kernel = e <= bending_dimension / 6
+    with np.errstate(divide="ignore"):
+        q_partial = 2 * P / (3 * other_dimension * (bending_dimension / 2 - e))
+    q_max = np.where(in_kernel, q_service + q_moment, np.where(e < bending_dimension / 2, q_partial, np.inf))
+    q_min = np.where(in_kernel, np.maximum(q_service - q_moment, 0), 0.0)
+    qu_max = q_max * LOAD_FACTOR
+
+    # FLEXIÓN en la cara de la columna
+    design_width = B if isolated else np.ones_like(B)  # m
+    cantilever = (B - c1 / 1000) / 2  # m
+    Mu_design = qu_max * design_width * cantilever**2 / 2  # kN·m
+    width_design = design_width * 1000  # mm
+    Ru = Mu_design * 1e6 / (0.90 * width_design * d**2)
+    with np.errstate(invalid="ignore"):
+        omega = (0.85 * fc / fy) * (1 - np.sqrt(1 - (2 * Ru) / (0.85 * fc)))  # NaN: altura insuficiente
+    rho_min = max(1.4 / fy, 0.0018)  # ACI318 para losas
+    rho = np.maximum(omega * fc / fy, rho_min)
+    As_required = rho * width_design * d  # mm²
+    bar_area = math.pi * (BAR_DIAMETER / 2) ** 2
+    spacing = np.clip(bar_area * width_design / As_required, 150, 300)
+    spacing = np.floor(spacing / 50) * 50  # mm
+
+    # PUNZONAMIENTO (ACI318 22.6.5), perímetro crítico a d/2 de la cara de la columna
+    phi_v = 0.75
+    bo = 2 * (c1 + d) + 2 * (c2 + d)
+    Av_punch = A_footing - ((c1 + d) * (c2 + d)) / 1e6  # m²
+    Vu_punch = qu_max * Av_punch * 1000  # N
+    Vc = np.minimum.reduce([
+        0.33 * math.sqrt(fc) * bo * d,
+        0.17 * (1 + 2 / 1) * math.sqrt(fc) * bo * d,  # β = 1
+        0.083 * (2 + 4 / 1) * math.sqrt(fc) * bo * d,
+    ])
+    punching_ratio = Vu_punch / (phi_v * Vc)
+
+    # CORTE POR FLEXIÓN a distancia d de la cara de la columna
+    Vu_shear = qu_max * design_width * (cantilever - d / 1000) * 1000  # N
+    shear_ratio = Vu_shear / (phi_v * 0.17 * math.sqrt(fc) * width_design * d)
+
+    soil_pressure_ratio = q_max / qa
+    return {
+        "qMax": q_max,
+        "qMin": q_min,
+        "soilPressureRatio": soil_pressure_ratio,
+        "asRequired": As_required,
+        "spacing": spacing,
+        "punchingShearRatio": punching_ratio,
+        "beamShearRatio": shear_ratio,
+        "flexureOk": ~np.isnan(omega),
+        "passes": (soil_pressure_ratio <= 1.0) & (punching_ratio <= 1.0) & (shear_ratio <= 1.0) & ~np.isnan(omega),
+    }
 
 
 def calculate_footing(
@@ -19,7 +183,7 @@ def calculate_footing(
     static_pressure: float = 0.0,
     dynamic_pressure: float = 0.0,
     seismic_pressure: float = 0.0,
-    footing_depth: float = 60.0,
+    footing_depth: Optional[float] = 60.0,
     cover: float = 7.5,
 ) -> Dict[str, Any]:
     """
@@ -38,243 +202,140 @@ def calculate_footing(
         static_pressure: Empuje estático del suelo (kPa)
         dynamic_pressure: Empuje dinámico del suelo (kPa)
         seismic_pressure: Empuje sísmico del suelo (kPa)
-        footing_depth: Altura de la zapata (cm)
+        footing_depth: Altura de la zapata (cm), 60 si no se indica
         cover: Recubrimiento (cm)
 
     Returns:
         Dict con resultados del diseño
     """
-    # Conversiones
-    P = axial_load  # kN (carga de servicio)
-    M = moment  # kN·m
-    V_applied = shear  # kN
-    c1 = column_width * 10  # cm -> mm
-    c2 = column_depth * 10  # cm -> mm
-    qa = soil_bearing_capacity  # kPa
-    h = footing_depth * 10  # cm -> mm
-    d = h - cover * 10 - 10  # Peralte efectivo (mm), asumiendo φ20mm
-
-    # Factor de carga (LRFD)
-    load_factor = 1.6  # Para diseño
-    Pu = P * load_factor  # kN
-    Mu = M * load_factor  # kN·m
-
-    # DIMENSIONAMIENTO EN PLANTA
-    if footing_type == "isolated":
-        # Zapata aislada cuadrada
-        # Área requerida considerando momento (excentricidad)
-        e = M / P if P > 0 else 0  # m (excentricidad)
-
-        # Para distribución trapezoidal: q = P/A ± M*y/I
-        # Simplificado: requerimos A tal que q_max <= qa
-        # Para zapata cuadrada: A = B²
-        # Con excentricidad: q_max = P/A * (1 + 6e/B)
-
-        # Iteración para encontrar B
-        B_required = math.sqrt(P / qa)  # Estimación inicial sin momento
-
-        for _ in range(10):  # Iteraciones
-            A = B_required ** 2
-            q_max = (P / A) * (1 + 6 * e / B_required) if B_required > 0 else 999
-            if q_max <= qa:
-                break
-            B_required *= 1.1  # Incrementar 10%
-
-        # Redondear hacia arriba a múltiplos de 5cm
-        B = math.ceil(B_required * 20) / 20  # m, múltiplos de 5cm
-        L = B  # Zapata cuadrada
-
-        A_footing = B * L  # m²
-
-    else:  # continuous
-        # Zapata corrida
-        # Ancho requerido por carga axial
-        # Asumiendo carga lineal por metro
-        L = 1.0  # m (por metro lineal)
-
-        # Considerar excentricidad
-        e = M / P if P > 0 else 0  # m
-
-        # Ancho requerido
-        B_required = P / (qa * L) if qa > 0 else 1.0
-
-        # Ajustar por excentricidad
-        if e > 0:
-            B_required = B_required * (1 + 6 * e / B_required)
-
-        # Redondear hacia arriba
-        B = math.ceil(B_required * 20) / 20  # m
-
-        A_footing = B * L  # m²/m
+    if footing_depth is None:
+        footing_depth = 60.0
 
-    # VERIFICACIÓN DE PRESIONES EN EL SUELO
-    # Presión actuante (servicio)
-    q_service = P / A_footing  # kPa
+    # DIMENSIONAMIENTO EN PLANTA: zapata aislada cuadrada o corrida por metro lineal
+    B_required = float(required_footing_width(axial_load, moment, soil_bearing_capacity, footing_type))
+    B = float(round_up_size(B_required))
+    L = B if footing_type == "isolated" else 1.0
 
-    # Presión por excentricidad
-    if footing_type == "isolated":
-        # Zapata cuadrada: I = B*L³/12, y_max = L/2
-        I = B * L**3 / 12
-        y_max = L / 2
-        q_moment = (M * y_max) / I if I > 0 else 0  # kPa
-    else:
-        # Zapata corrida: por metro lineal
-        I = L * B**3 / 12
-        y_max = B / 2
-        q_moment = (M * y_max) / I if I > 0 else 0  # kPa
-
-    q_max = q_service + q_moment  # kPa
-    q_min = q_service - q_moment  # kPa
-
-    # Asegurar que no hay levantamiento
-    if q_min < 0:
-        q_min = 0
-        # Redistribuir presión
-        # El área efectiva se reduce
-
-    soil_pressure_ratio = q_max / qa if qa > 0 else 999
-
-    # PRESIONES DE DISEÑO (FACTORIZADAS)
-    qu_max = q_max * load_factor  # kPa
-
-    # DISEÑO A FLEXIÓN
-    # Momento crítico en la cara de la columna
-    if footing_type == "isolated":
-        # Distancia desde borde a cara de columna
-        cantilever = (B - c1/1000) / 2  # m
-        # Momento último por flexión
-        Mu_design = qu_max * B * cantilever**2 / 2  # kN·m/m
-        width_design = B * 1000  # mm (ancho efectivo)
-    else:
-        # Zapata corrida
-        cantilever = (B - c1/1000) / 2  # m
-        Mu_design = qu_max * 1.0 * cantilever**2 / 2  # kN·m/m
-        width_design = 1000  # mm (por metro)
-
-    # Convertir momento a N·mm
-    Mu_design_nmm = Mu_design * 1e6  # N·mm
-
-    # Factor de reducción
-    phi = 0.90
-
-    # Diseño de refuerzo
-    Ru = Mu_design_nmm / (phi * width_design * d**2)
-
-    # Cuantía requerida
-    omega = (0.85 * fc / fy) * (1 - math.sqrt(1 - (2 * Ru) / (0.85 * fc)))
-    rho = omega * fc / fy
-
-    # Cuantías límite
-    rho_min = max(1.4 / fy, 0.0018)  # ACI318 para losas
-    rho = max(rho, rho_min)
-
-    # Área de acero requerida
-    As_required = rho * width_design * d  # mm²/m
-
-    # Espaciamiento de barras (asumiendo φ16mm)
-    bar_diameter = 16  # mm
-    bar_area = math.pi * (bar_diameter / 2)**2  # mm²
-
-    spacing = (bar_area * width_design) / As_required if As_required > 0 else 300
-    spacing = min(spacing, 300)  # Máximo 300mm
-    spacing = max(spacing, 150)  # Mínimo 150mm
-    spacing = math.floor(spacing / 50) * 50  # Redondear a 50mm
-
-    # Refuerzo en ambas direcciones para zapata aislada
-    if footing_type == "isolated":
-        reinforcement_x = {
-            "barDiameter": bar_diameter,
-            "spacing": spacing,
-            "direction": "X (longitudinal)",
-        }
-        reinforcement_y = {
-            "barDiameter": bar_diameter,
-            "spacing": spacing,
-            "direction": "Y (transversal)",
-        }
-    else:
-        reinforcement_main = {
-            "barDiameter": bar_diameter,
-            "spacing": spacing,
-            "direction": "Principal (transversal)",
-        }
-        # Refuerzo de repartición (20% del principal)
-        spacing_dist = min(300, spacing * 5)
-        reinforcement_distribution = {
-            "barDiameter": 12,
-            "spacing": spacing_dist,
-            "direction": "Repartición (longitudinal)",
-        }
-
-    # VERIFICACIÓN AL PUNZONAMIENTO
-    # Perímetro crítico a d/2 de la cara de la columna
-    bo = 2 * (c1 + d) + 2 * (c2 + d)  # mm
-
-    # Área efectiva en punzonamiento
-    Av_punch = A_footing - ((c1 + d) * (c2 + d)) / 1e6  # m²
-
-    # Fuerza de punzonamiento
-    Vu_punch = qu_max * Av_punch  # kN
-    Vu_punch_N = Vu_punch * 1000  # N
-
-    # Resistencia al punzonamiento (ACI318 22.6.5)
-    phi_v = 0.75
-
-    # La menor de:
-    vc1 = 0.33 * math.sqrt(fc) * bo * d  # N
-    vc2 = (0.17 * (1 + 2 / 1) * math.sqrt(fc)) * bo * d  # N (asumiendo β=1 para columna cuadrada)
-    vc3 = (0.083 * (2 + 4/1) * math.sqrt(fc)) * bo * d  # N
-
-    Vc = min(vc1, vc2, vc3)
-    Vn_punch = phi_v * Vc
-
-    punching_ratio = Vu_punch_N / Vn_punch if Vn_punch > 0 else 999
-
-    # VERIFICACIÓN AL CORTE POR FLEXIÓN
-    # Corte crítico a distancia d de la cara de la columna
-    d_m = d / 1000  # mm -> m
-
-    if footing_type == "isolated":
-        shear_critical_distance = (B - c1/1000) / 2 - d_m  # m
-        Vu_shear = qu_max * B * shear_critical_distance  # kN
-    else:
-        shear_critical_distance = (B - c1/1000) / 2 - d_m  # m
-        Vu_shear = qu_max * 1.0 * shear_critical_distance  # kN
-
-    Vu_shear_N = Vu_shear * 1000  # N
-
-    # Resistencia al corte (ACI318)
-    if footing_type == "isolated":
-        width_shear = B * 1000  # mm
-    else:
-        width_shear = 1000  # mm
-
-    Vc_shear = 0.17 * math.sqrt(fc) * width_shear * d  # N
-    Vn_shear = phi_v * Vc_shear
-
-    shear_ratio = Vu_shear_N / Vn_shear if Vn_shear > 0 else 999
-
-    # Determinar si cumple todos los criterios
-    passes = (soil_pressure_ratio <= 1.0 and punching_ratio <= 1.0 and shear_ratio <= 1.0)
+    checks = footing_checks(
+        B, L, axial_load, moment, column_width, column_depth, soil_bearing_capacity,
+        fc, fy, footing_type, footing_depth, cover,
+    )
+    if not checks["flexureOk"]:
+        raise ValueError("La altura de la zapata es insuficiente para el momento de diseño")
 
     # Calcular acero en cm²/m para el schema
-    as_longitudinal = (As_required / 10000)  # mm²/m -> cm²/m
+    as_longitudinal = float(checks["asRequired"]) / 10000  # mm²/m -> cm²/m
     as_transverse = as_longitudinal  # Para zapata aislada, igual en ambas direcciones
 
     # Resultados según FootingResponse schema
-    result = {
+    return {
         "length": round(L, 3),  # m
         "width": round(B, 3),  # m
-        "depth": round(h / 10, 1),  # cm
-        "soilPressureMax": round(q_max, 2),  # kPa
-        "soilPressureMin": round(q_min, 2),  # kPa
+        "depth": round(footing_depth, 1),  # cm
+        "soilPressureMax": round(float(checks["qMax"]), 2),  # kPa
+        "soilPressureMin": round(float(checks["qMin"]), 2),  # kPa
         "asLongitudinal": round(as_longitudinal, 2),  # cm²/m
         "asTransverse": round(as_transverse, 2),  # cm²/m
-        "barDiameter": float(bar_diameter),  # mm
-        "spacing": float(spacing / 10),  # mm -> cm
-        "punchingShearRatio": round(punching_ratio, 3),
-        "beamShearRatio": round(shear_ratio, 3),
-        "passes": passes,
+        "barDiameter": float(BAR_DIAMETER),  # mm
+        "spacing": float(checks["spacing"]) / 10,  # mm -> cm
+        "punchingShearRatio": round(float(checks["punchingShearRatio"]), 3),
+        "beamShearRatio": round(float(checks["beamShearRatio"]), 3),
+        "passes": bool(checks["passes"]),
     }
 
-    return result
\ No newline at end of file
+
+def design_footing_schedule(
+    reactions: List[Dict[str, Any]],
+    soil_bearing_capacity: float,
+    fc: float,
+    fy: float,
+    footing_type: str = "isolated",
+    footing_depth: float = 60.0,
+    cover: float = 7.5,
+    size_step: float = 0.25,
+) -> Dict[str, Any]:
+    """
+    Cuadro de zapatas para una tabla de reacciones (una fila por columna), en una pasada vectorizada.
+
+    Cada zapata se dimensiona exactamente y se asigna a la familia de tamaño estándar inmediatamente
+    superior (múltiplos de ``size_step``); cada familia se arma con el refuerzo de su zapata más exigida.
+
+    Args:
+        reactions: Filas con id, axial_load, moment, column_width y column_depth (servicio; kN, kN·m, cm)
+        soil_bearing_capacity: Capacidad portante del suelo (kPa)
+        fc: Resistencia del hormigón (MPa)
+        fy: Límite de fluencia del acero (MPa)
+        footing_type: "isolated" o "continuous"
+        footing_depth: Altura de las zapatas (cm)
+        cover: Recubrimiento (cm)
+        size_step: Módulo de las familias de tamaño (m)
+
+    Returns:
+        Dict con las familias ("Z1", "Z2", ...) y la asignación y verificación de cada columna
+    """
+    if not reactions:
+        return {"families": [], "footings": []}
+    if size_step <= 0:
+        raise ValueError("El módulo de tamaño debe ser positivo")
+    ids = [str(row.get("id", index + 1)) for index, row in enumerate(reactions)]
+    P = np.array([row["axial_load"] for row in reactions], dtype=float)
+    M = np.array([row.get("moment") or 0.0 for row in reactions], dtype=float)
+    c1 = np.array([row["column_width"] for row in reactions], dtype=float)
+    c2 = np.array([row.get("column_depth") or row["column_width"] for row in reactions], dtype=float)
+
+    required = required_footing_width(P, M, soil_bearing_capacity, footing_type)
+    B = round_up_size(required, size_step)
+    L = B if footing_type == "isolated" else np.ones_like(B)
+    checks = footing_checks(B, L, P, M, c1, c2, soil_bearing_capacity, fc, fy, footing_type, footing_depth, cover)
+
+    sizes, family_of = np.unique(B, return_inverse=True)
+    count = np.bincount(family_of, minlength=len(sizes))
+    # Zapata gobernante de cada familia: la de mayor acero requerido (inf = altura insuficiente) y,
+    # a igual acero (cuantía mínima), la de mayor presión en el suelo
+    demand = np.where(checks["flexureOk"], checks["asRequired"], np.inf)
+    order = np.lexsort((-checks["qMax"], -demand, family_of))
+    governing = order[np.searchsorted(family_of[order], np.arange(len(sizes)))]
+    worst = {
+        key: np.maximum.reduceat(checks[key][np.argsort(family_of, kind="stable")], np.r_[0, np.cumsum(count)[:-1]])
+        for key in ("soilPressureRatio", "punchingShearRatio", "beamShearRatio")
+    }
+    family_passes = np.bincount(family_of, weights=~checks["passes"], minlength=len(sizes)) == 0
+
+    families = []
+    for index, size in enumerate(sizes):
+        members = np.flatnonzero(family_of == index)
+        lead = governing[index]
+        flexure_ok = bool(checks["flexureOk"][lead])
+        families.append({
+            "mark": f"Z{index + 1}",
+            "length": round(float(L[lead]), 3),
+            "width": round(float(size), 3),
+            "depth": round(footing_depth, 1),
+            "count": int(count[index]),
+            "columns": [ids[member] for member in members],
+            "governingColumn": ids[lead],
+            "asLongitudinal": round(float(checks["asRequired"][lead]) / 10000, 2) if flexure_ok else None,
+            "barDiameter": float(BAR_DIAMETER),
+            "spacing": float(checks["spacing"][lead]) / 10 if flexure_ok else None,
+            "soilPressureRatio": round(float(worst["soilPressureRatio"][index]), 3),
+            "punchingShearRatio": round(float(worst["punchingShearRatio"][index]), 3),
+            "beamShearRatio": round(float(worst["beamShearRatio"][index]), 3),
+            "passes": bool(family_passes[index]),
+        })
+
+    footings = [
+        {
+            "id": ids[row],
+            "mark": f"Z{family_of[row] + 1}",
+            "requiredWidth": round(float(required[row]), 3),
+            "width": round(float(B[row]), 3),
+            "soilPressureMax": round(float(checks["qMax"][row]), 2),
+            "soilPressureMin": round(float(checks["qMin"][row]), 2),
+            "soilPressureRatio": round(float(checks["soilPressureRatio"][row]), 3),
+            "punchingShearRatio": round(float(checks["punchingShearRatio"][row]), 3),
+            "beamShearRatio": round(float(checks["beamShearRatio"][row]), 3),
+            "passes": bool(checks["passes"][row]),
+        }
+        for row in range(len(reactions))
+    ]
+    return {"families": families, "footings": footings}
@@ -0,0 +1,482 @@
+"""
+Servicio de análisis de marcos planos (2D) por el método de rigidez.
+Ensambla la matriz de rigidez en banda (nudos renumerados con Cuthill–McKee inverso), guarda la
+factorización por modelo con clave en el hash de la geometría y reutiliza esa factorización para
+nuevos estados de carga. Los esfuerzos de las barras alimentan en lote a los calculadores de diseño.
+"""
+import hashlib
+import json
+import math
+from collections import deque
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from services.structural_beam_analysis import banded_cholesky, banded_solve
+from services.structural_combinations import (
+    BEAM_DESIGNERS,
+    COLUMN_DESIGNERS,
+    ENVELOPES,
+    FORCE_COMPONENTS,
+    LOAD_CASES,
+    combination_matrix,
+    design_element,
+    load_envelopes,
+    nch3171_combinations,
+)
+from services.structural_steel import STEEL_PROFILES
+from services.structural_wood import WOOD_TYPES
+
+SUPPORT_RESTRAINTS = {
+    "fixed": (True, True, True),
+    "pinned": (True, True, False),
+    "roller": (False, True, False),
+}
+DEFAULT_E = 200000.0  # MPa
+DEFAULT_STATIONS = 11
+MODEL_CACHE_SIZE = 32
+
+
+def _section_properties(member: Dict[str, Any]) -> Tuple[float, float, float]:
+    """
+    (E [kN/m²], A [m²], I [m⁴]) de una barra.
+
+    En orden de prioridad: ``area`` (cm²) e ``inertia`` (cm⁴) explícitos, perfil de acero de ``params``
+    o sección rectangular width × height/depth (cm) de ``params``. E (MPa) se toma de la barra, de
+    ``params``, de fc (4700·√fc) o de la especie de madera; por defecto 200000 MPa.
+    """
+    params = member.get("params") or {}
+    if member.get("area") and member.get("inertia"):
+        A, I = float(member["area"]) / 1e4, float(member["inertia"]) / 1e8
+    elif params.get("profile") in STEEL_PROFILES:
+        props = STEEL_PROFILES[params["profile"]]
+        A, I = props["area"] / 1e6, props["Ix"] / 1e12
+    elif params.get("width") and (params.get("height") or params.get("depth")):
+        b = float(params["width"]) / 100
+        h = float(params.get("height") or params["depth"]) / 100
+        A, I = b * h, b * h**3 / 12
+    else:
+        raise ValueError(f"La barra {member.get('id')} no tiene sección definida")
+
+    if member.get("E"):
+        E = float(member["E"])
+    elif params.get("E"):
+        E = float(params["E"])
+    elif params.get("fc"):
+        E = 4700 * math.sqrt(float(params["fc"]))
+    elif params.get("wood_type") in WOOD_TYPES:
+        E = float(WOOD_TYPES[params["wood_type"]]["E"])
+    else:
+        E = DEFAULT_E
+    return E * 1000, A, I
+
+
+def _geometry(
+    nodes: Sequence[Dict[str, Any]],
+    members: Sequence[Dict[str, Any]],
+    supports: Dict[str, str],
+) -> Dict[str, Any]:
+    """Geometría canónica (solo lo que define la rigidez) a partir de los datos de entrada."""
+    node_ids = [str(node["id"]) for node in nodes]
+    if len(set(node_ids)) != len(node_ids):
+        raise ValueError("Hay nudos con identificador repetido")
+    index = {node_id: position for position, node_id in enumerate(node_ids)}
+    connectivity = []
+    properties = []
+    for member in members:
+        start, end = str(member["start"]), str(member["end"])
+        if start not in index or end not in index:
+            raise ValueError(f"La barra {member.get('id')} referencia un nudo inexistente")
+        if start == end:
+            raise ValueError(f"La barra {member.get('id')} tiene longitud nula")
+        connectivity.append([index[start], index[end]])
+        properties.append(list(_section_properties(member)))
+    restraints = []
+    for node_id, support in supports.items():
+        if str(node_id) not in index:
+            raise ValueError(f"Apoyo en nudo inexistente: {node_id}")
+        if support not in SUPPORT_RESTRAINTS:
+            raise ValueError(f"Tipo de apoyo no soportado: {support}")
+        restraints.append([index[str(node_id)], *SUPPORT_RESTRAINTS[support]])
+    return {
+        "coordinates": [[float(node["x"]), float(node["y"])] for node in nodes],
+        "connectivity": connectivity,
+        "properties": properties,
+        "restraints": sorted(restraints),
+    }
+
+
+def _node_ordering(n_nodes: int, connectivity: np.ndarray) -> np.ndarray:
+    """Posición de cada nudo según Cuthill–McKee inverso (reduce el ancho de banda)."""
+    neighbours: List[set] = [set() for _ in range(n_nodes)]
+    for start, end in connectivity:
+        neighbours[start].add(end)
+        neighbours[end].add(start)
+    degree = [len(adjacent) for adjacent in neighbours]
+    visited = np.zeros(n_nodes, dtype=bool)
+    order: List[int] = []
+    for seed in sorted(range(n_nodes), key=degree.__getitem__):
+        if visited[seed]:
+            continue
+        visited[seed] = True
+        queue = deque([seed])
+        while queue:
+            node = queue.popleft()
+            order.append(node)
+            for adjacent in sorted(neighbours[node], key=degree.__getitem__):
+                if not visited[adjacent]:
+                    visited[adjacent] = True
+                    queue.append(adjacent)
+    position = np.empty(n_nodes, dtype=int)
+    position[order[::-1]] = np.arange(n_nodes)
+    return position
+
+
+class FrameModel:
+    """Marco plano ensamblado y factorizado; se reutiliza para cualquier estado de carga."""
+
+    def __init__(self, geometry: Dict[str, Any], key: str):
+        self.key = key
+        coordinates = np.array(geometry["coordinates"], dtype=float)
+        connectivity = np.array(geometry["connectivity"], dtype=int).reshape(-1, 2)
+        E, A, I = np.array(geometry["properties"], dtype=float).reshape(-1, 3).T
+        self.n_nodes = len(coordinates)
+        self.connectivity = connectivity
+
+        delta = coordinates[connectivity[:, 1]] - coordinates[connectivity[:, 0]]
+        self.lengths = np.hypot(delta[:, 0], delta[:, 1])
+        self.cos = delta[:, 0] / self.lengths
+        self.sin = delta[:, 1] / self.lengths
+        self.local_stiffness = _local_stiffness(E, A, I, self.lengths)
+        self.transforms = _transforms(self.cos, self.sin)
+        global_stiffness = np.einsum("mji,mjk,mkl->mil", self.transforms, self.local_stiffness, self.transforms)
+
+        # Grados de libertad (ux, uy, θz) numerados según el orden de nudos; los restringidos se eliminan
+        position = _node_ordering(self.n_nodes, connectivity)
+        dof_order = (3 * position[:, None] + np.arange(3)).ravel()  # dof global -> posición en la banda
+        restrained = np.zeros(3 * self.n_nodes, dtype=bool)
+        for node, *flags in geometry["restraints"]:
+            restrained[3 * node:3 * node + 3] |= np.array(flags, dtype=bool)
+        self.restrained = restrained
+        free_positions = np.sort(dof_order[~restrained])
+        compact = np.full(3 * self.n_nodes, -1)
+        compact[~restrained] = np.searchsorted(free_positions, dof_order[~restrained])
+        self.numbering = compact
+        self.member_dofs = (3 * connectivity[:, :, None] + np.arange(3)).reshape(-1, 6)
+        self.n_free = int((~restrained).sum())
+        if self.n_free == 0:
+            self.factor = None
+            return
+
+        # Ensamble por tripletas (fila, columna, valor) directamente en la banda inferior
+        dofs = compact[self.member_dofs]
+        rows = np.broadcast_to(dofs[:, :, None], global_stiffness.shape)
+        cols = np.broadcast_to(dofs[:, None, :], global_stiffness.shape)
+        keep = (rows >= 0) & (cols >= 0) & (cols <= rows)
+        rows, cols, values = rows[keep], cols[keep], global_stiffness[keep]
+        p = int((rows - cols).max()) if rows.size else 0
+        band = np.zeros((self.n_free, p + 1))
+        np.add.at(band, (rows, p - (rows - cols)), values)
+        self.bandwidth = p
+        self.factor = banded_cholesky(band)
+
+    def solve(self, loads: np.ndarray) -> np.ndarray:
+        """Desplazamientos (3·nudos, casos) para cargas equivalentes en nudos (3·nudos, casos)."""
+        displacements = np.zeros_like(loads, dtype=float)
+        if self.factor is None:
+            return displacements
+        free = ~self.restrained
+        rhs = np.zeros((self.n_free, loads.shape[1]))
+        rhs[self.numbering[free]] = loads[free]
+        displacements[free] = banded_solve(self.factor, rhs)[self.numbering[free]]
+        return displacements
+
+
+def _local_stiffness(E: np.ndarray, A: np.ndarray, I: np.ndarray, L: np.ndarray) -> np.ndarray:
+    k = np.zeros((len(L), 6, 6))
+    axial = E * A / L
+    k[:, 0, 0] = k[:, 3, 3] = axial
+    k[:, 0, 3] = k[:, 3, 0] = -axial
+    bending = E * I / L**3
+    block = np.array([[12, 6, -12, 6], [6, 4, -6, 2], [-12, -6, 12, -6], [6, 2, -6, 4]], dtype=float)
+    powers = np.array([[0, 1, 0, 1], [1, 2, 1, 2], [0, 1, 0, 1], [1, 2, 1, 2]])
+    flexural = bending[:, None, None] * block * L[:, None, None] ** powers
+    index = np.array([1, 2, 4, 5])
+    k[:, index[:, None], index] = flexural
+    return k
+
+
+def _transforms(cos: np.ndarray, sin: np.ndarray) -> np.ndarray:
+    T = np.zeros((len(cos), 6, 6))
+    for offset in (0, 3):
+        T[:, offset, offset] = T[:, offset + 1, offset + 1] = cos
+        T[:, offset, offset + 1] = sin
+        T[:, offset + 1, offset] = -sin
+        T[:, offset + 2, offset + 2] = 1.0
+    return T
+
+
+@lru_cache(maxsize=MODEL_CACHE_SIZE)
+def _cached_model(key: str, geometry_json: str) -> FrameModel:
+    return FrameModel(json.loads(geometry_json), key)
+
+
+def frame_model(
+    nodes: Sequence[Dict[str, Any]],
+    members: Sequence[Dict[str, Any]],
+    supports: Dict[str, str],
+) -> FrameModel:
+    """
+    Modelo factorizado de un marco; se reutiliza mientras no cambien geometría, secciones ni apoyos.
+
+    Args:
+        nodes: Nudos con id, x e y (m)
+        members: Barras con id, start, end y sección (ver ``_section_properties``)
+        supports: Tipo de apoyo por id de nudo (fixed, pinned o roller)
+
+    Returns:
+        FrameModel compartido por todas las llamadas con la misma geometría
+    """
+    geometry_json = json.dumps(_geometry(nodes, members, supports), sort_keys=True)
+    key = hashlib.sha256(geometry_json.encode()).hexdigest()[:16]
+    return _cached_model(key, geometry_json)
+
+
+def _load_vectors(
+    model: FrameModel,
+    nodes: Sequence[Dict[str, Any]],
+    members: Sequence[Dict[str, Any]],
+    load_cases: Dict[str, Dict[str, Any]],
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Cargas en nudos (3·nudos, casos) y carga uniforme w por barra (barras, casos)."""
+    node_index = {str(node["id"]): position for position, node in enumerate(nodes)}
+    member_index = {str(member.get("id", position)): position for position, member in enumerate(members)}
+    nodal = np.zeros((3 * model.n_nodes, len(load_cases)))
+    uniform = np.zeros((len(members), len(load_cases)))
+    for case, (name, loads) in enumerate(load_cases.items()):
+        for load in loads.get("nodal") or []:
+            if str(load["node"]) not in node_index:
+                raise ValueError(f"Carga en nudo inexistente ({name}): {load['node']}")
+            node = node_index[str(load["node"])]
+            nodal[3 * node:3 * node + 3, case] += [load.get("fx") or 0.0, load.get("fy") or 0.0, load.get("mz") or 0.0]
+        for load in loads.get("members") or []:
+            if str(load["member"]) not in member_index:
+                raise ValueError(f"Carga en barra inexistente ({name}): {load['member']}")
+            uniform[member_index[str(load["member"])], case] += load.get("w") or 0.0
+    return nodal, uniform
+
+
+def _solve_frame(
+    nodes: Sequence[Dict[str, Any]],
+    members: Sequence[Dict[str, Any]],
+    supports: Dict[str, str],
+    load_cases: Dict[str, Dict[str, Any]],
+    stations: int,
+) -> Dict[str, Any]:
+    """Desplazamientos, reacciones y esfuerzos en estaciones (barras, casos, estaciones) de todos los estados."""
+    if not load_cases:
+        raise ValueError("Debe definir al menos un estado de carga")
+    stations = max(int(stations), 2)
+    model = frame_model(nodes, members, supports)
+    nodal, uniform = _load_vectors(model, nodes, members, load_cases)
+
+    # Reacciones de empotramiento locales por carga uniforme transversal w (hacia -y local)
+    L = model.lengths[:, None]
+    zeros = np.zeros_like(uniform)
+    fixed_end = np.stack(
+        [zeros, uniform * L / 2, uniform * L**2 / 12, zeros, uniform * L / 2, -uniform * L**2 / 12], axis=-1
+    )  # (barras, casos, 6)
+    equivalent = nodal.copy()
+    np.add.at(equivalent, model.member_dofs, -np.einsum("mji,mcj->mic", model.transforms, fixed_end))
+    displacements = model.solve(equivalent)
+
+    local_displacements = np.einsum("mij,mjc->mci", model.transforms, displacements[model.member_dofs])
+    end_forces = np.einsum("mij,mcj->mci", model.local_stiffness, local_displacements) + fixed_end
+    # Reacción = fuerzas que los nudos ejercen sobre las barras (globales) menos la carga aplicada en el nudo
+    reactions = -nodal
+    np.add.at(reactions, model.member_dofs, np.einsum("mji,mcj->mic", model.transforms, end_forces))
+
+    x = model.lengths[:, None] * np.linspace(0, 1, stations)[None, :]  # (barras, estaciones)
+    shear = end_forces[:, :, [1]] - uniform[:, :, None] * x[:, None, :]
+    moment = -end_forces[:, :, [2]] + end_forces[:, :, [1]] * x[:, None, :] - uniform[:, :, None] * x[:, None, :] ** 2 / 2
+    axial = np.broadcast_to(end_forces[:, :, [0]], moment.shape)  # compresión positiva
+    return {
+        "model": model,
+        "displacements": displacements,
+        "reactions": reactions,
+        "axial": axial,
+        "shear": shear,
+        "moment": moment,
+    }
+
+
+def analyze_frame(
+    nodes: Sequence[Dict[str, Any]],
+    members: Sequence[Dict[str, Any]],
+    supports: Dict[str, str],
+    load_cases: Dict[str, Dict[str, Any]],
+    stations: int = DEFAULT_STATIONS,
+) -> Dict[str, Any]:
+    """
+    Análisis lineal de un marco plano para varios estados de carga con una sola factorización.
+
+    Args:
+        nodes: Nudos con id, x e y (m)
+        members: Barras con id, start, end y sección
+        supports: Tipo de apoyo por id de nudo
+        load_cases: {estado: {"nodal": [{node, fx, fy (kN), mz (kN·m)}], "members": [{member, w (kN/m)}]}},
+            con w uniforme transversal hacia -y local (gravitacional en vigas dibujadas de izquierda a derecha)
+        stations: Estaciones de cálculo por barra
+
+    Returns:
+        Dict con la clave del modelo, desplazamientos (m, rad), reacciones (kN, kN·m) y esfuerzos por barra
+        y estado (axial con compresión positiva, corte máximo y momentos)
+    """
+    return _analysis_output(_solve_frame(nodes, members, supports, load_cases, stations), nodes, members, supports, list(load_cases))
+
+
+def _analysis_output(
+    solution: Dict[str, Any],
+    nodes: Sequence[Dict[str, Any]],
+    members: Sequence[Dict[str, Any]],
+    supports: Dict[str, str],
+    names: List[str],
+) -> Dict[str, Any]:
+    model = solution["model"]
+    displacements, reactions = solution["displacements"], solution["reactions"]
+    axial, shear, moment = solution["axial"], solution["shear"], solution["moment"]
+    node_index = {str(node["id"]): position for position, node in enumerate(nodes)}
+
+    def nodal_values(values: np.ndarray, node: int, case: int, digits: int) -> List[float]:
+        return [round(float(value), digits) for value in values[3 * node:3 * node + 3, case]]
+
+    return {
+        "modelKey": model.key,
+        "cases": names,
+        "displacements": {
+            name: {node_id: nodal_values(displacements, node, case, 6) for node_id, node in node_index.items()}
+            for case, name in enumerate(names)
+        },
+        "reactions": {
+            name: {str(node_id): nodal_values(reactions, node_index[str(node_id)], case, 3) for node_id in supports}
+            for case, name in enumerate(names)
+        },
+        "members": [
+            {
+                "id": str(member.get("id", position)),
+                "length": round(float(model.lengths[position]), 4),
+                "cases": {
+                    name: {
+                        "axial": round(float(axial[position, case, 0]), 3),
+                        "maxShear": round(float(np.abs(shear[position, case]).max()), 3),
+                        "momentMax": round(float(moment[position, case].max()), 3),
+                        "momentMin": round(float(moment[position, case].min()), 3),
+                        "momentStart": round(float(moment[position, case, 0]), 3),
+                        "momentEnd": round(float(moment[position, case, -1]), 3),
+                    }
+                    for case, name in enumerate(names)
+                },
+            }
+            for position, member in enumerate(members)
+        ],
+    }
+
+
+def _station_cases(
+    forces: np.ndarray,
+    governing: np.ndarray,
+    names: Sequence[str],
+) -> List[List[Dict[str, Any]]]:
+    """
+    Casos gobernantes por barra: para cada envolvente, la estación y combinación más desfavorables.
+
+    Args:
+        forces: Esfuerzos concurrentes (barras, estaciones, envolventes, esfuerzos)
+        governing: Índice de combinación (barras, estaciones, envolventes)
+        names: Nombres de las combinaciones
+    """
+    members = np.arange(forces.shape[0])
+    cases: List[List[Dict[str, Any]]] = [[] for _ in members]
+    for column, (envelope, component, criterion) in enumerate(ENVELOPES):
+        values = forces[:, :, column, FORCE_COMPONENTS.index(component)]
+        if criterion == "max":
+            station = values.argmax(axis=1)
+        elif criterion == "min":
+            station = values.argmin(axis=1)
+        else:
+            station = np.abs(values).argmax(axis=1)
+        chosen = forces[members, station, column]
+        combination = governing[members, station, column]
+        for member in members:
+            cases[member].append({
+                "envelope": envelope,
+                "combination": names[combination[member]],
+                "forces": {name: round(float(value), 3) for name, value in zip(FORCE_COMPONENTS, chosen[member])},
+            })
+    return cases
+
+
+def design_frame(
+    nodes: Sequence[Dict[str, Any]],
+    members: Sequence[Dict[str, Any]],
+    supports: Dict[str, str],
+    load_cases: Dict[str, Dict[str, Any]],
+    combinations: Optional[Dict[str, Dict[str, float]]] = None,
+    stations: int = DEFAULT_STATIONS,
+) -> Dict[str, Any]:
+    """
+    Analiza un marco plano y diseña en lote sus barras con las combinaciones de carga.
+
+    Los estados de carga deben llamarse como los de NCh3171 (D, L, Lr, S, Wx, Wy, Ex, Ey). Los esfuerzos
+    de todas las estaciones se combinan en una sola operación matricial; cada barra con ``type``
+    (rc_column, rc_beam, steel_column, steel_beam, wood_column o wood_beam) se diseña con ``params`` y sus
+    casos gobernantes, con la longitud de la barra como luz o altura si ``params`` no la indica.
+
+    Args:
+        nodes: Nudos con id, x e y (m)
+        members: Barras con id, start, end, sección, type y params
+        supports: Tipo de apoyo por id de nudo
+        load_cases: Cargas de servicio por estado (ver ``analyze_frame``)
+        combinations: Combinaciones propias {nombre: {estado: factor}}; por defecto NCh3171
+        stations: Estaciones de cálculo por barra
+
+    Returns:
+        Resultado de ``analyze_frame`` con ``design`` en cada barra que tenga tipo
+    """
+    for member in members:
+        element_type = member.get("type")
+        if element_type is not None and element_type not in COLUMN_DESIGNERS and element_type not in BEAM_DESIGNERS:
+            raise ValueError(f"Tipo de elemento no soportado: {element_type}")
+    unknown = [name for name in load_cases if name not in LOAD_CASES]
+    if unknown:
+        raise ValueError(f"Estado de carga desconocido: {unknown[0]}")
+    if combinations:
+        names, matrix = combination_matrix(combinations.items())
+    else:
+        names, matrix = nch3171_combinations()
+
+    solution = _solve_frame(nodes, members, supports, load_cases, stations)
+    analysis = _analysis_output(solution, nodes, members, supports, list(load_cases))
+    n_members, _, n_stations = solution["moment"].shape
+
+    # (barras·estaciones, estados NCh3171, esfuerzos): flexión en el plano como moment_x con su corte shear_y
+    loads = np.zeros((n_members, n_stations, len(LOAD_CASES), len(FORCE_COMPONENTS)))
+    case_index = [LOAD_CASES.index(name) for name in load_cases]
+    loads[:, :, case_index, FORCE_COMPONENTS.index("axial_load")] = solution["axial"].transpose(0, 2, 1)
+    loads[:, :, case_index, FORCE_COMPONENTS.index("moment_x")] = solution["moment"].transpose(0, 2, 1)
+    loads[:, :, case_index, FORCE_COMPONENTS.index("shear_y")] = solution["shear"].transpose(0, 2, 1)
+    envelopes = load_envelopes(loads.reshape(n_members * n_stations, len(LOAD_CASES), -1), matrix)
+    forces = envelopes["forces"].reshape(n_members, n_stations, len(ENVELOPES), -1)
+    governing = envelopes["governing"].reshape(n_members, n_stations, len(ENVELOPES))
+    cases = _station_cases(forces, governing, names)
+
+    for position, (member, result) in enumerate(zip(members, analysis["members"])):
+        element_type = member.get("type")
+        if element_type is None:
+            continue
+        length_key = "span" if element_type in BEAM_DESIGNERS else "length"
+        params = {length_key: result["length"], **(member.get("params") or {})}
+        result["design"] = design_element(element_type, params, cases[position])
+    analysis["combinations"] = list(names)
+    return analysis
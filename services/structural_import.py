@@ -0,0 +1,409 @@
+"""
+Importación masiva de tablas de elementos (CSV/XLSX exportados desde ETABS/SAP).
+
+El archivo se lee por bloques de filas (``pandas.read_csv(chunksize=...)`` o ``openpyxl`` en modo
+``read_only``), de modo que la memoria queda acotada por ``IMPORT_CHUNK_ROWS`` y no por el tamaño del
+archivo. Cada fila se valida con el schema de elemento de los lotes (``SteelColumnMember``, ...), cada
+bloque se diseña con los calculadores vectorizados y los resultados se insertan en ``calc_runs`` en
+lotes. El avance de cada importación queda en ``import_jobs``.
+"""
+import logging
+import math
+import os
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+
+import pandas as pd
+from fastapi import UploadFile
+from openpyxl import load_workbook
+from pydantic import BaseModel, ValidationError
+
+from api.schemas.structural_calcs import SteelBeamMember, SteelColumnMember, WoodBeamMember, WoodColumnMember
+from services.media_service import STAGING_DIR
+from services.runs_service import save_runs
+from services.structural_steel import STEEL_PROFILES
+from services.structural_steel_tables import check_steel_beams, check_steel_columns, result_rows
+from services.structural_wood import WOOD_TYPES
+from services.structural_wood_tables import design_wood_beams, design_wood_columns
+
+logger = logging.getLogger(__name__)
+
+IMPORT_CHUNK_ROWS = int(os.environ.get("IMPORT_CHUNK_ROWS", "5000"))
+UPLOAD_CHUNK_SIZE = 1024 * 1024
+MAX_IMPORT_FILE_SIZE = int(os.environ.get("MAX_IMPORT_FILE_SIZE", str(200 * 1024 * 1024)))
+INSERT_BATCH_ROWS = 500
+MAX_REPORTED_ERRORS = 200
+MAX_TRACKED_JOBS = 200
+
+
+def _steel_columns(members: Sequence[SteelColumnMember], options: Dict[str, float]) -> List[Dict[str, Any]]:
+    results = check_steel_columns(
+        [member.profile_name for member in members],
+        [member.axial_load for member in members],
+        [member.moment_x for member in members],
+        [member.moment_y for member in members],
+        [member.length for member in members],
+        options.get("fy", 250.0),
+        options.get("E", 200000.0),
+        [member.kx for member in members],
+        [member.ky for member in members],
+    )
+    return result_rows(results, [member.id for member in members])
+
+
+def _steel_beams(members: Sequence[SteelBeamMember], options: Dict[str, float]) -> List[Dict[str, Any]]:
+    results = check_steel_beams(
+        [member.profile_name for member in members],
+        [member.moment for member in members],
+        [member.shear for member in members],
+        [member.span for member in members],
+        options.get("fy", 250.0),
+        options.get("E", 200000.0),
+        [member.lb if member.lb is not None else member.span for member in members],
+    )
+    return result_rows(results, [member.id for member in members])
+
+
+def _wood_columns(members: Sequence[WoodColumnMember], options: Dict[str, float]) -> List[Dict[str, Any]]:
+    elements = [
+        {
+            "axial_load": member.axial_load,
+            "width": member.width,
+            "depth": member.depth,
+            "length": member.length,
+            "wood_type": member.wood_type,
+            "custom_fc": member.fc,
+            "custom_E": member.E,
+            "moisture_factor": member.moisture_factor,
+            "duration_factor": member.duration_factor,
+            "Kx": member.k_factor,
+            "Ky": member.k_factor,
+        }
+        for member in members
+    ]
+    return [{"id": member.id, **result} for member, result in zip(members, design_wood_columns(elements))]
+
+
+def _wood_beams(members: Sequence[WoodBeamMember], options: Dict[str, float]) -> List[Dict[str, Any]]:
+    elements = [
+        {
+            "moment": member.moment,
+            "shear": member.shear,
+            "width": member.width,
+            "height": member.height,
+            "span": member.span,
+            "wood_type": member.wood_type,
+            "custom_fm": member.fm,
+            "custom_fv": member.fv,
+            "custom_E": member.E,
+            "moisture_factor": member.moisture_factor,
+            "duration_factor": member.duration_factor,
+        }
+        for member in members
+    ]
+    return [{"id": member.id, **result} for member, result in zip(members, design_wood_beams(elements))]
+
+
+def _catalogue_profile(member: BaseModel) -> Optional[str]:
+    if member.profile_name not in STEEL_PROFILES:
+        return f"Perfil no encontrado en el catálogo: {member.profile_name}"
+    return None
+
+
+def _wood_material(strengths: Sequence[str]) -> Callable[[BaseModel], Optional[str]]:
+    """Verificación de material de madera: tipo del catálogo o todas las propiedades personalizadas."""
+
+    def check(member: BaseModel) -> Optional[str]:
+        if member.wood_type in WOOD_TYPES or all(getattr(member, name) for name in strengths):
+            return None
+        if member.wood_type:
+            return f"Tipo de madera no encontrado: {member.wood_type}"
+        return f"Debe indicar woodType o las propiedades {', '.join(strengths)}"
+
+    return check
+
+
+# Tipo de elemento -> (schema de fila, diseño vectorizado del bloque, verificación adicional por fila)
+IMPORTERS: Dict[str, Tuple[type, Callable[..., List[Dict[str, Any]]], Optional[Callable[[BaseModel], Optional[str]]]]] = {
+    "steel_column": (SteelColumnMember, _steel_columns, _catalogue_profile),
+    "steel_beam": (SteelBeamMember, _steel_beams, _catalogue_profile),
+    "wood_column": (WoodColumnMember, _wood_columns, _wood_material(("fc", "E"))),
+    "wood_beam": (WoodBeamMember, _wood_beams, _wood_material(("fm", "fv", "E"))),
+}
+
+
+def _is_blank(value: Any) -> bool:
+    if value is None:
+        return True
+    if isinstance(value, float) and math.isnan(value):
+        return True
+    return isinstance(value, str) and not value.strip()
+
+
+def _row_fields(row: Dict[str, Any]) -> Dict[str, Any]:
+    """Celdas no vacías de una fila como texto; pydantic convierte los números y aplica los defaults."""
+    return {str(name).strip(): str(value).strip() for name, value in row.items() if name is not None and not _is_blank(value)}
+
+
+def _csv_chunks(path: Path, chunk_rows: int) -> Iterator[Tuple[List[Dict[str, Any]], int]]:
+    """
+    Bloques de filas del CSV con la posición en bytes alcanzada (aproximada, por el buffer del lector).
+
+    Las líneas en blanco se conservan como filas vacías para que los números de fila coincidan con el archivo.
+    """
+    with open(path, "rb") as handle:
+        reader = pd.read_csv(
+            handle,
+            chunksize=chunk_rows,
+            dtype=str,
+            skipinitialspace=True,
+            skip_blank_lines=False,
+            encoding_errors="replace",
+        )
+        for frame in reader:
+            yield frame.to_dict("records"), handle.tell()
+
+
+def _xlsx_chunks(path: Path, chunk_rows: int) -> Iterator[Tuple[List[Dict[str, Any]], int]]:
+    """Bloques de filas de la primera hoja; la posición se estima con las filas leídas sobre el total de la hoja."""
+    size = path.stat().st_size
+    try:
+        workbook = load_workbook(path, read_only=True, data_only=True)
+    except Exception as exc:
+        raise ValueError(f"No se pudo leer el archivo XLSX: {exc}") from exc
+    try:
+        sheet = workbook.active
+        total_rows = sheet.max_row or 0
+        rows = sheet.iter_rows(values_only=True)
+        header = next(rows, None)
+        if header is None:
+            return
+        read = 1
+        chunk: List[Dict[str, Any]] = []
+        for values in rows:
+            chunk.append(dict(zip(header, values)))
+            read += 1
+            if len(chunk) >= chunk_rows:
+                yield chunk, size * min(read, total_rows) // total_rows if total_rows else 0
+                chunk = []
+        if chunk:
+            yield chunk, size
+    finally:
+        workbook.close()
+
+
+def validate_rows(
+    rows: Sequence[Dict[str, Any]], element_type: str, first_row: int = 2
+) -> Tuple[List[Tuple[int, BaseModel]], List[Dict[str, Any]]]:
+    """
+    Valida las filas de un bloque con el schema del tipo de elemento.
+
+    Los encabezados pueden ser los alias (``profileName``) o los nombres de campo (``profile_name``). Las
+    filas sin ningún valor se reportan como error.
+
+    Args:
+        rows: Filas del bloque como dicts encabezado -> valor
+        element_type: Tipo de elemento (ver ``IMPORTERS``)
+        first_row: Número de fila en el archivo de la primera fila del bloque (la 1 es el encabezado)
+
+    Returns:
+        (filas válidas como (número de fila, modelo), errores como {"row", "errors"})
+    """
+    schema, _, check = IMPORTERS[element_type]
+    valid: List[Tuple[int, BaseModel]] = []
+    errors: List[Dict[str, Any]] = []
+    for offset, row in enumerate(rows):
+        number = first_row + offset
+        fields = _row_fields(row)
+        if not fields:
+            errors.append({"row": number, "errors": ["Fila vacía"]})
+            continue
+        try:
+            member = schema.model_validate(fields)
+        except ValidationError as exc:
+            messages = [f"{'.'.join(str(part) for part in error['loc'])}: {error['msg']}" for error in exc.errors()]
+            errors.append({"row": number, "errors": messages})
+            continue
+        problem = check(member) if check else None
+        if problem:
+            errors.append({"row": number, "errors": [problem]})
+            continue
+        valid.append((number, member))
+    return valid, errors
+
+
+def _design_block(
+    design: Callable[..., List[Dict[str, Any]]], valid: List[Tuple[int, BaseModel]], options: Dict[str, float]
+) -> Tuple[List[Tuple[int, BaseModel]], List[Dict[str, Any]], List[Dict[str, Any]]]:
+    """Diseña el bloque completo; si el calculador rechaza alguna fila, repite fila a fila y la reporta como error."""
+    try:
+        return valid, design([member for _, member in valid], options), []
+    except ValueError:
+        pass
+    designed: List[Tuple[int, BaseModel]] = []
+    results: List[Dict[str, Any]] = []
+    errors: List[Dict[str, Any]] = []
+    for number, member in valid:
+        try:
+            result = design([member], options)[0]
+        except ValueError as exc:
+            errors.append({"row": number, "errors": [str(exc)]})
+            continue
+        designed.append((number, member))
+        results.append(result)
+    return designed, results, errors
+
+
+class ImportJobs:
+    """Registro en memoria del avance de las importaciones (las más antiguas se descartan)."""
+
+    def __init__(self, max_jobs: int = MAX_TRACKED_JOBS):
+        self.max_jobs = max_jobs
+        self._jobs: OrderedDict[str, Dict[str, Any]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def create(self, element_type: str, filename: str, total_bytes: int) -> Dict[str, Any]:
+        job = {
+            "job_id": uuid.uuid4().hex,
+            "element_type": element_type,
+            "filename": filename,
+            "status": "pending",
+            "error": None,
+            "total_bytes": total_bytes,
+            "processed_bytes": 0,
+            "rows": 0,
+            "designed": 0,
+            "saved": 0,
+            "failed": 0,
+            "not_passing": 0,
+            "errors": [],
+            "submitted_at": time.time(),
+        }
+        with self._lock:
+            self._jobs[job["job_id"]] = job
+            while len(self._jobs) > self.max_jobs:
+                self._jobs.popitem(last=False)
+        return dict(job)
+
+    def update(self, job_id: str, **changes: Any) -> None:
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None:
+                return
+            errors = changes.pop("errors", None)
+            job.update(changes)
+            if errors:
+                room = MAX_REPORTED_ERRORS - len(job["errors"])
+                job["errors"].extend(errors[: max(room, 0)])
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None:
+                return None
+            snapshot = dict(job, errors=list(job["errors"]))
+        total = snapshot["total_bytes"]
+        snapshot["progress"] = 1.0 if snapshot["status"] == "done" else round(snapshot["processed_bytes"] / total, 3) if total else 0.0
+        return snapshot
+
+
+import_jobs = ImportJobs()
+
+
+def import_element_table(
+    path: Path,
+    filename: str,
+    element_type: str,
+    project_id: str,
+    user_id: str,
+    options: Optional[Dict[str, float]] = None,
+    job_id: Optional[str] = None,
+    chunk_rows: int = IMPORT_CHUNK_ROWS,
+    jobs: ImportJobs = import_jobs,
+) -> Dict[str, Any]:
+    """
+    Importa, diseña y guarda en historial una tabla de elementos, bloque a bloque.
+
+    Las filas inválidas no detienen la importación: quedan en ``errors`` (hasta ``MAX_REPORTED_ERRORS``)
+    con su número de fila. Cada fila válida se guarda como un cálculo de ``calc_runs``.
+
+    Args:
+        path: Archivo en disco (CSV o XLSX, según la extensión de ``filename``)
+        filename: Nombre original del archivo
+        element_type: steel_column, steel_beam, wood_column o wood_beam
+        project_id: Proyecto al que se asocian los cálculos
+        user_id: Usuario que importa
+        options: Parámetros comunes del lote (``fy`` y ``E`` para acero)
+        job_id: Trabajo de ``jobs`` a actualizar; si es None se crea uno
+        chunk_rows: Filas por bloque
+
+    Returns:
+        Estado final del trabajo
+    """
+    if element_type not in IMPORTERS:
+        raise ValueError(f"Tipo de elemento no soportado para importación: {element_type}")
+    path = Path(path)
+    if job_id is None:
+        job_id = jobs.create(element_type, filename, path.stat().st_size)["job_id"]
+    _, design, _ = IMPORTERS[element_type]
+    options = options or {}
+    counts = {"rows": 0, "designed": 0, "saved": 0, "failed": 0, "not_passing": 0}
+    jobs.update(job_id, status="running")
+    try:
+        reader = _xlsx_chunks if Path(filename).suffix.lower() in {".xlsx", ".xlsm"} else _csv_chunks
+        for rows, position in reader(path, chunk_rows):
+            valid, errors = validate_rows(rows, element_type, first_row=counts["rows"] + 2)
+            counts["rows"] += len(rows)
+            counts["failed"] += len(errors)
+            if valid:
+                valid, results, design_errors = _design_block(design, valid, options)
+                errors = sorted(errors + design_errors, key=lambda error: error["row"])
+                counts["failed"] += len(design_errors)
+                members = [member for _, member in valid]
+                records = [
+                    (member.model_dump(by_alias=True, exclude_none=True), result)
+                    for member, result in zip(members, results)
+                ]
+                for start in range(0, len(records), INSERT_BATCH_ROWS):
+                    batch = records[start : start + INSERT_BATCH_ROWS]
+                    counts["saved"] += len(save_runs(project_id, user_id, element_type, batch))
+                counts["designed"] += len(results)
+                counts["not_passing"] += sum(
+                    1 for result in results if result.get("passes") is False or result.get("checkStatus") == "No cumple"
+                )
+            jobs.update(job_id, processed_bytes=position, errors=errors, **counts)
+    except Exception as exc:
+        jobs.update(job_id, status="error", error=str(exc), finished_at=time.time(), **counts)
+        raise
+    jobs.update(job_id, status="done", finished_at=time.time(), **counts)
+    return jobs.get(job_id)
+
+
+async def stage_upload(file: UploadFile, max_size: int = MAX_IMPORT_FILE_SIZE) -> Path:
+    """Copia el archivo subido a staging por bloques, sin cargarlo completo en memoria."""
+    STAGING_DIR.mkdir(parents=True, exist_ok=True)
+    staging_path = STAGING_DIR / f"import-{uuid.uuid4().hex}"
+    size = 0
+    with open(staging_path, "wb") as staging:
+        while chunk := await file.read(UPLOAD_CHUNK_SIZE):
+            size += len(chunk)
+            if size > max_size:
+                staging.close()
+                staging_path.unlink(missing_ok=True)
+                raise ValueError(f"El archivo supera el máximo de {max_size // (1024 * 1024)} MB")
+            staging.write(chunk)
+    return staging_path
+
+
+def run_import_job(job_id: str, path: Path, filename: str, element_type: str, project_id: str, user_id: str, options: Dict[str, float]) -> None:
+    """Ejecuta una importación en segundo plano; el resultado o el error quedan en ``import_jobs``."""
+    try:
+        import_element_table(path, filename, element_type, project_id, user_id, options, job_id=job_id)
+    except Exception as exc:
+        logger.warning("Import %s of %s failed: %s", job_id, filename, exc)
+    finally:
+        Path(path).unlink(missing_ok=True)
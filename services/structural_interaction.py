@@ -0,0 +1,328 @@
+"""
+Superficie de interacción biaxial P–Mx–My de pilares de hormigón armado (ACI318).
+Integra la sección por fibras para cada eje neutro, guarda la superficie en caché
+por sección y verifica lotes de solicitaciones con un test vectorizado de pertenencia.
+"""
+import math
+from dataclasses import dataclass, field
+from functools import lru_cache
+from typing import Any, Dict, List, Tuple
+
+import numpy as np
+
+EPSILON_CU = 0.003  # Deformación última del hormigón
+STEEL_E = 200000.0  # MPa
+CONCRETE_FIBERS = 20  # Fibras de hormigón por lado
+NEUTRAL_AXIS_ANGLES = 36  # Orientaciones del eje neutro (cada 10°)
+# Profundidades del eje neutro relativas a la altura de la sección en cada orientación
+NEUTRAL_AXIS_DEPTHS = np.concatenate([np.geomspace(0.02, 1.0, 24), np.linspace(1.15, 4.0, 8)])
+AZIMUTH_SECTORS = 36  # Sectores del plano de momentos para preseleccionar triángulos
+_RAY_CHUNK = 2048
+
+
+def beta1(fc: float) -> float:
+    """Factor del bloque de compresión equivalente (ACI318 22.2.2.4.3)."""
+    return 0.85 if fc <= 28 else max(0.65, 0.85 - 0.05 * (fc - 28) / 7)
+
+
+def perimeter_layout(num_bars: int, width: float, depth: float) -> Tuple[int, int]:
+    """
+    Reparte ``num_bars`` barras en el perímetro, proporcional a cada lado.
+
+    Con un número impar de barras queda una sobrante (``perimeter_extra``), que ``bar_positions``
+    agrega a la cara superior.
+
+    Returns:
+        (barras por cara de ancho ``width``, barras por cara de alto ``depth``), esquinas incluidas en ambas
+    """
+    extra = max(0, num_bars - 4)
+    pairs = extra // 2
+    along_width = min(math.ceil(extra * width / (width + depth) / 2), pairs)
+    return 2 + along_width, 2 + pairs - along_width
+
+
+def perimeter_extra(num_bars: int, bars_x: int, bars_y: int) -> int:
+    """Barras de ``num_bars`` que no caben en el reparto simétrico de ``perimeter_layout`` (0 o 1)."""
+    return max(0, num_bars - (2 * bars_x + 2 * bars_y - 4))
+
+
+def bar_positions(
+    width: float, depth: float, cover: float, bars_x: int, bars_y: int, bar_diameter: float, extra_bars: int = 0
+) -> np.ndarray:
+    """
+    Coordenadas (mm, origen en el centroide) de las barras en el perímetro; dimensiones en mm.
+
+    La cara superior lleva ``bars_x + extra_bars`` barras, repartidas de esquina a esquina.
+    """
+    x_edge = width / 2 - cover - bar_diameter / 2
+    y_edge = depth / 2 - cover - bar_diameter / 2
+    xs = np.linspace(-x_edge, x_edge, bars_x)
+    ys = np.linspace(-y_edge, y_edge, bars_y)
+    positions = {(round(x, 6), round(-y_edge, 6)) for x in xs}
+    positions |= {(round(x, 6), round(y_edge, 6)) for x in np.linspace(-x_edge, x_edge, bars_x + extra_bars)}
+    positions |= {(round(x, 6), round(y, 6)) for y in ys for x in (-x_edge, x_edge)}
+    return np.array(sorted(positions))
+
+
+@dataclass(frozen=True)
+class InteractionSurface:
+    """Superficie φPn–φMnx–φMny (kN, kN·m) triangulada; compresión positiva."""
+
+    points: np.ndarray  # (n, 3)
+    triangles: np.ndarray  # (m, 3) índices de ``points``
+    phi_pn_max: float
+    phi_pn_tension: float
+    _scale: np.ndarray = field(init=False, repr=False, compare=False)
+    _edges: Tuple[np.ndarray, np.ndarray, np.ndarray] = field(init=False, repr=False, compare=False)
+    _sectors: Tuple[np.ndarray, ...] = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self):
+        # P and M are scaled to comparable magnitudes so the ray test is well conditioned.
+        scale = np.abs(self.points).max(axis=0)
+        scale[scale == 0] = 1.0
+        scaled = self.points / scale
+        v0 = scaled[self.triangles[:, 0]]
+        edges = (v0, scaled[self.triangles[:, 1]] - v0, scaled[self.triangles[:, 2]] - v0)
+        object.__setattr__(self, "_scale", scale)
+        object.__setattr__(self, "_edges", edges)
+        object.__setattr__(self, "_sectors", _azimuth_sectors(scaled[:, 1:], self.triangles))
+
+    def capacity_ratios(self, loads: np.ndarray) -> np.ndarray:
+        """
+        Razón demanda/capacidad de cada solicitación (P, Mx, My) a lo largo del rayo desde el origen.
+
+        Un valor ≤ 1 indica que la solicitación está dentro de la superficie.
+        """
+        directions = np.atleast_2d(np.asarray(loads, dtype=float)) / self._scale
+        sector = _sector_of(directions[:, 1:])
+        ratios = np.zeros(len(directions))
+        order = np.argsort(sector, kind="stable")
+        bounds = np.searchsorted(sector[order], np.arange(AZIMUTH_SECTORS + 1))
+        v0, e1, e2 = self._edges
+        for index in range(AZIMUTH_SECTORS):
+            rows = order[bounds[index]:bounds[index + 1]]
+            candidates = self._sectors[index]
+            for start in range(0, len(rows), _RAY_CHUNK):
+                chunk = rows[start:start + _RAY_CHUNK]
+                ratios[chunk] = _ray_ratios(directions[chunk], v0[candidates], e1[candidates], e2[candidates])
+        return ratios
+
+    def contains(self, loads: np.ndarray) -> np.ndarray:
+        return self.capacity_ratios(loads) <= 1.0
+
+
+def _sector_of(moments: np.ndarray) -> np.ndarray:
+    azimuth = np.arctan2(moments[:, 1], moments[:, 0]) % (2 * math.pi)
+    return np.minimum((azimuth / (2 * math.pi) * AZIMUTH_SECTORS).astype(int), AZIMUTH_SECTORS - 1)
+
+
+def _azimuth_sectors(moments: np.ndarray, triangles: np.ndarray) -> Tuple[np.ndarray, ...]:
+    """
+    Triángulos candidatos por sector de azimut del plano de momentos.
+
+    Un rayo sólo puede cortar triángulos cuyo arco de azimut contiene el suyo; los que rodean el eje P
+    (vértices con momento nulo o arco amplio) son candidatos en todos los sectores.
+    """
+    width = 2 * math.pi / AZIMUTH_SECTORS
+    magnitude = np.hypot(moments[:, 0], moments[:, 1])
+    azimuth = np.arctan2(moments[:, 1], moments[:, 0])[triangles]
+    # Arc relative to the first vertex, unwrapped to (-π, π].
+    relative = (azimuth - azimuth[:, :1] + math.pi) % (2 * math.pi) - math.pi
+    low = (azimuth[:, 0] + relative.min(axis=1)) % (2 * math.pi)
+    high = low + relative.max(axis=1) - relative.min(axis=1)
+    polar = (magnitude[triangles] < 1e-9).any(axis=1) | (high - low > math.pi / 2)
+    sectors = []
+    for index in range(AZIMUTH_SECTORS):
+        start, end = index * width - 1e-9, (index + 1) * width + 1e-9
+        # Arcs that cross 2π are also compared shifted back by one turn.
+        overlaps = ((low <= end) & (high >= start)) | ((low - 2 * math.pi <= end) & (high - 2 * math.pi >= start))
+        sectors.append(np.flatnonzero(overlaps | polar))
+    return tuple(sectors)
+
+
+def _ray_ratios(directions: np.ndarray, v0: np.ndarray, e1: np.ndarray, e2: np.ndarray) -> np.ndarray:
+    """Möller–Trumbore desde el origen contra los triángulos dados: razón = 1 / t del corte más cercano."""
+    # With the ray origin fixed at 0 every triple product is d · (per-triangle vector): three matmuls.
+    s = -v0
+    a = directions @ np.cross(e2, e1).T
+    valid = np.abs(a) > 1e-12
+    f = np.divide(1.0, a, out=np.zeros_like(a), where=valid)
+    u = f * (directions @ np.cross(e2, s).T)
+    q = np.cross(s, e1)
+    v = f * (directions @ q.T)
+    t = f * np.einsum("tk,tk->t", e2, q)
+    tolerance = 1e-9
+    hit = valid & (u >= -tolerance) & (v >= -tolerance) & (u + v <= 1 + tolerance) & (t > 0)
+    nearest = np.where(hit, t, np.inf).min(axis=1)
+    ratios = np.where(np.isfinite(nearest), 1.0 / nearest, np.inf)
+    ratios[~np.any(directions, axis=1)] = 0.0
+    return ratios
+
+
+@lru_cache(maxsize=128)
+def interaction_surface(
+    width: float,
+    depth: float,
+    cover: float,
+    bars_x: int,
+    bars_y: int,
+    bar_diameter: float,
+    fc: float,
+    fy: float,
+    extra_bars: int = 0,
+) -> InteractionSurface:
+    """
+    Superficie de interacción de diseño de una sección rectangular con estribos.
+
+    Args:
+        width: Ancho de la sección (cm)
+        depth: Largo de la sección (cm)
+        cover: Recubrimiento (cm)
+        bars_x: Barras por cara de ancho (esquinas incluidas)
+        bars_y: Barras por cara de largo (esquinas incluidas)
+        bar_diameter: Diámetro de las barras (mm)
+        fc: Resistencia del hormigón (MPa)
+        fy: Límite de fluencia del acero (MPa)
+        extra_bars: Barras adicionales en la cara superior (número de barras impar)
+
+    Returns:
+        InteractionSurface con sus arreglos de solo lectura (se comparte entre llamadas)
+    """
+    b = width * 10
+    h = depth * 10
+    fiber_x = (np.arange(CONCRETE_FIBERS) + 0.5) * b / CONCRETE_FIBERS - b / 2
+    fiber_y = (np.arange(CONCRETE_FIBERS) + 0.5) * h / CONCRETE_FIBERS - h / 2
+    concrete = np.array([(x, y) for x in fiber_x for y in fiber_y])
+    concrete_area = b * h / CONCRETE_FIBERS**2
+    bars = bar_positions(b, h, cover * 10, bars_x, bars_y, bar_diameter, extra_bars)
+    bar_area = math.pi * (bar_diameter / 2) ** 2
+    As = bar_area * len(bars)
+
+    angles = np.linspace(0, 2 * math.pi, NEUTRAL_AXIS_ANGLES, endpoint=False)
+    directions = np.stack([np.cos(angles), np.sin(angles)], axis=1)  # hacia la fibra más comprimida
+    corners = np.array([(-b / 2, -h / 2), (b / 2, -h / 2), (b / 2, h / 2), (-b / 2, h / 2)])
+    top = (corners @ directions.T).max(axis=0)  # (angles,)
+    section_depth = top - (corners @ directions.T).min(axis=0)
+    c = NEUTRAL_AXIS_DEPTHS[None, :] * section_depth[:, None]  # (angles, depths)
+
+    # Distance of every fiber and bar from the most compressed edge, per orientation.
+    concrete_dist = top[:, None] - directions @ concrete.T  # (angles, fibers)
+    bar_dist = top[:, None] - directions @ bars.T  # (angles, bars)
+
+    block = beta1(fc) * c[:, :, None]
+    concrete_stress = np.where(concrete_dist[:, None, :] <= block, 0.85 * fc, 0.0)
+    bar_strain = EPSILON_CU * (c[:, :, None] - bar_dist[:, None, :]) / c[:, :, None]
+    bar_stress = np.clip(bar_strain * STEEL_E, -fy, fy)
+    bar_stress -= np.where(bar_dist[:, None, :] <= block, 0.85 * fc, 0.0)  # concrete displaced by the bars
+
+    concrete_force = concrete_stress * concrete_area
+    bar_force = bar_stress * bar_area
+    Pn = concrete_force.sum(axis=2) + bar_force.sum(axis=2)
+    Mnx = concrete_force @ concrete[:, 1] + bar_force @ bars[:, 1]
+    Mny = concrete_force @ concrete[:, 0] + bar_force @ bars[:, 0]
+
+    # φ por deformación neta de tracción del acero extremo (ACI318 21.2.2)
+    epsilon_y = fy / STEEL_E
+    epsilon_t = -bar_strain.min(axis=2)
+    phi = np.clip(0.65 + 0.25 * (epsilon_t - epsilon_y) / (0.005 - epsilon_y), 0.65, 0.90)
+
+    P0 = 0.85 * fc * (b * h - As) + fy * As
+    phi_pn_max = 0.65 * 0.80 * P0
+    phi_pn = np.minimum(phi * Pn, phi_pn_max)
+    ring_points = np.stack([phi_pn / 1e3, phi * Mnx / 1e6, phi * Mny / 1e6], axis=2)  # (angles, depths, 3)
+
+    phi_pn_tension = -0.90 * fy * As
+    points = np.vstack(
+        [ring_points.reshape(-1, 3), [[phi_pn_tension / 1e3, 0.0, 0.0], [phi_pn_max / 1e3, 0.0, 0.0]]]
+    )
+    points.setflags(write=False)
+    triangles = _triangulate(NEUTRAL_AXIS_ANGLES, len(NEUTRAL_AXIS_DEPTHS))
+    triangles.setflags(write=False)
+    return InteractionSurface(points, triangles, phi_pn_max / 1e3, phi_pn_tension / 1e3)
+
+
+def _triangulate(n_angles: int, n_depths: int) -> np.ndarray:
+    """Triángulos de la malla (orientación periódica × profundidad) cerrada con un polo en cada extremo."""
+    index = np.arange(n_angles * n_depths).reshape(n_angles, n_depths)
+    following = np.roll(index, -1, axis=0)
+    a, b = index[:, :-1], index[:, 1:]
+    c, d = following[:, :-1], following[:, 1:]
+    quads = np.concatenate([np.stack([a, c, b], axis=-1), np.stack([b, c, d], axis=-1)]).reshape(-1, 3)
+    tension_pole, compression_pole = n_angles * n_depths, n_angles * n_depths + 1
+    tension_cap = np.stack([index[:, 0], following[:, 0], np.full(n_angles, tension_pole)], axis=1)
+    compression_cap = np.stack([index[:, -1], following[:, -1], np.full(n_angles, compression_pole)], axis=1)
+    return np.vstack([quads, tension_cap, compression_cap])
+
+
+def column_surface(
+    width: float,
+    depth: float,
+    fc: float,
+    fy: float,
+    num_bars: int,
+    bar_diameter: float = 20,
+    cover: float = 4.0,
+) -> InteractionSurface:
+    """Superficie de una sección con ``num_bars`` barras repartidas en el perímetro (``perimeter_layout``)."""
+    bars_x, bars_y = perimeter_layout(num_bars, width, depth)
+    extra_bars = perimeter_extra(num_bars, bars_x, bars_y)
+    return interaction_surface(
+        float(width), float(depth), float(cover), bars_x, bars_y, float(bar_diameter), float(fc), float(fy), extra_bars
+    )
+
+
+def check_column_loads(
+    loads: np.ndarray,
+    width: float,
+    depth: float,
+    fc: float,
+    fy: float,
+    num_bars: int,
+    bar_diameter: float = 20,
+    cover: float = 4.0,
+) -> np.ndarray:
+    """Razones demanda/capacidad de un lote de solicitaciones (P kN, Mx kN·m, My kN·m) sobre una sección."""
+    surface = column_surface(width, depth, fc, fy, num_bars, bar_diameter, cover)
+    return surface.capacity_ratios(np.asarray(loads, dtype=float))
+
+
+def check_column_interaction(
+    loads: List[List[float]],
+    width: float,
+    depth: float,
+    fc: float,
+    fy: float,
+    num_bars: int,
+    bar_diameter: float = 20,
+    cover: float = 4.0,
+) -> Dict[str, Any]:
+    """
+    Verificación biaxial de un lote de solicitaciones sobre una sección de pilar.
+
+    Args:
+        loads: Solicitaciones [P (kN, compresión positiva), Mx (kN·m), My (kN·m)]
+        width: Ancho de la sección (cm)
+        depth: Largo de la sección (cm)
+        fc: Resistencia del hormigón (MPa)
+        fy: Límite de fluencia del acero (MPa)
+        num_bars: Número de barras en el perímetro
+        bar_diameter: Diámetro de barras (mm)
+        cover: Recubrimiento (cm)
+
+    Returns:
+        Dict con la razón por solicitación, la gobernante y los límites axiales de la superficie
+    """
+    points = np.asarray(loads, dtype=float)
+    if points.ndim != 2 or points.shape[1] != 3:
+        raise ValueError("Cada solicitación debe ser [P, Mx, My]")
+    surface = column_surface(width, depth, fc, fy, num_bars, bar_diameter, cover)
+    ratios = surface.capacity_ratios(points)
+    governing = int(np.argmax(ratios))
+    return {
+        "ratios": np.round(ratios, 4).tolist(),
+        "maxRatio": round(float(ratios[governing]), 4),
+        "governingIndex": governing,
+        "phiPnMax": round(surface.phi_pn_max, 2),
+        "phiPnTension": round(surface.phi_pn_tension, 2),
+        "passes": bool(ratios[governing] <= 1.0),
+    }
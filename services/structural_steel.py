@@ -97,7 +97,7 @@ def calculate_steel_column(
     lambda_max = max(lambda_x, lambda_y)
 
     # Límite de esbeltez elástica
-    lambda_c = math.pi * math.sqrt(E / fy)
+    lambda_c = 4.71 * math.sqrt(E / fy)  # AISC360 E3-2/E3-3 (Fy/Fe = 2.25)
 
     # CAPACIDAD A COMPRESIÓN (AISC360 E3)
     if lambda_max <= lambda_c:
@@ -124,12 +124,12 @@ def calculate_steel_column(
     Lr = math.pi * ry * math.sqrt(E / (0.7 * fy))  # Límite inelástico
 
     # Resistencia a flexión eje mayor (X)
+    Cb = 1.0  # Factor de modificación (conservador)
     if Lb <= Lp:
         # Zona plástica
         Mnx = Mpx
     elif Lb <= Lr:
         # Zona inelástica
-        Cb = 1.0  # Factor de modificación (conservador)
         Mnx = Cb * (Mpx - (Mpx - 0.7 * fy * (Zx * 0.9)) * ((Lb - Lp) / (Lr - Lp)))
         Mnx = min(Mnx, Mpx)
     else:
@@ -258,7 +258,7 @@ def calculate_steel_beam(
     elif Lb_mm <= Lr:
         # Zona inelástica
         Cb = 1.0  # Factor de modificación de momento (conservador para momento uniforme)
-        Mn = Cb * (Mp - (Mp - 0.7 * fy * Zx) * ((Lb_mm - Lp) / (Lr - Lp)))
+        Mn = Cb * (Mp - (Mp - 0.7 * fy * (Zx * 0.9)) * ((Lb_mm - Lp) / (Lr - Lp)))
         Mn = min(Mn, Mp)
     else:
         # Pandeo elástico lateral-torsional
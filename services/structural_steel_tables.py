@@ -0,0 +1,278 @@
+"""
+Tablas de capacidad de perfiles de acero según AISC360.
+Precalcula φPn(L) y φMn(Lb) de cada perfil del catálogo en una grilla fina de longitudes,
+las guarda en archivos NumPy mapeados en memoria y verifica lotes de elementos por interpolación.
+"""
+import hashlib
+import json
+import math
+import os
+import tempfile
+import threading
+import uuid
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Dict, List, Mapping, Optional, Sequence
+
+import numpy as np
+
+from services.structural_steel import STEEL_PROFILES
+
+STEEL_TABLE_DIR = Path(os.environ.get("STEEL_TABLE_DIR", Path(tempfile.gettempdir()) / "structapp_steel_tables"))
+LENGTH_STEP = 0.025  # m
+LENGTH_MAX = 30.0  # m; más allá todas las curvas están en régimen elástico (∝ 1/L²)
+TABLE_VERSION = "1"  # Subir al cambiar las fórmulas: invalida los archivos en disco
+
+# Curvas por perfil, en el orden del eje 1 de la tabla (kN y kN·m, ya multiplicadas por φ)
+CURVES = ("pn_x", "pn_y", "column_mn_x", "beam_mn")
+_CURVE_INDEX = {name: index for index, name in enumerate(CURVES)}
+PHI_C = 0.90
+PHI_B = 0.90
+PHI_V = 0.90
+
+_write_lock = threading.Lock()
+
+
+def length_grid() -> np.ndarray:
+    return np.arange(round(LENGTH_MAX / LENGTH_STEP) + 1) * LENGTH_STEP
+
+
+def _compression_curve(effective_length: np.ndarray, r: float, A: float, fy: float, E: float) -> np.ndarray:
+    """φPn (kN) según AISC360 E3 para longitudes efectivas en mm (misma formulación que ``calculate_steel_column``)."""
+    slenderness = effective_length / r
+    lambda_c = 4.71 * math.sqrt(E / fy)
+    with np.errstate(divide="ignore"):
+        Fe = math.pi**2 * E / slenderness**2
+        Fcr = np.where(slenderness <= lambda_c, 0.658 ** (fy / Fe) * fy, 0.877 * Fe)
+    return PHI_C * Fcr * A / 1000
+
+
+def _flexure_curve(Lb: np.ndarray, ry: float, Zx: float, fy: float, E: float) -> np.ndarray:
+    """φMn (kN·m) según AISC360 F2 simplificado, con Cb = 1 y Sx ≈ 0.9·Zx."""
+    Mp = Zx * fy
+    Lp = 1.76 * ry * math.sqrt(E / fy)
+    Lr = math.pi * ry * math.sqrt(E / (0.7 * fy))
+    inelastic = Mp - (Mp - 0.7 * fy * Zx * 0.9) * ((Lb - Lp) / (Lr - Lp))
+    with np.errstate(divide="ignore"):
+        elastic = (math.pi**2 * E) / (Lb / ry) ** 2 * (Zx * 0.9)
+    Mn = np.where(Lb <= Lp, Mp, np.where(Lb <= Lr, inelastic, elastic))
+    return PHI_B * np.minimum(Mn, Mp) / 1e6
+
+
+def _profile_curves(props: Mapping[str, float], fy: float, E: float, lengths_mm: np.ndarray) -> np.ndarray:
+    A, Ix, Iy, Zx = props["area"], props["Ix"], props["Iy"], props["Zx"]
+    rx = math.sqrt(Ix / A)
+    ry = math.sqrt(Iy / A)
+    ry_beam = math.sqrt(Ix / A) * 0.25  # Aproximación de calculate_steel_beam
+    return np.stack(
+        [
+            _compression_curve(lengths_mm, rx, A, fy, E),
+            _compression_curve(lengths_mm, ry, A, fy, E),
+            _flexure_curve(lengths_mm, ry, Zx, fy, E),
+            _flexure_curve(lengths_mm, ry_beam, Zx, fy, E),
+        ]
+    )
+
+
+def _shear_capacity(props: Mapping[str, float], fy: float, E: float) -> float:
+    """φVn (kN) según AISC360 G2, igual que ``calculate_steel_beam``."""
+    kv = 5.0
+    lambda_w = (props["d"] / props["tw"]) / math.sqrt(E / fy)
+    lambda_pw = 1.10 * math.sqrt(kv * E / fy)
+    lambda_rw = 1.37 * math.sqrt(kv * E / fy)
+    if lambda_w <= lambda_pw:
+        Cv = 1.0
+    elif lambda_w <= lambda_rw:
+        Cv = lambda_pw / lambda_w
+    else:
+        Cv = (1.51 * kv * E) / (fy * lambda_w**2)
+    return PHI_V * 0.6 * fy * props["d"] * props["tw"] * Cv / 1000
+
+
+class SteelCapacityTables:
+    """Curvas de capacidad de un catálogo para un par (fy, E); la tabla principal es de solo lectura."""
+
+    def __init__(self, profiles: Mapping[str, Mapping[str, float]], fy: float, E: float, table: np.ndarray):
+        self.names = list(profiles)
+        self.index = {name: position for position, name in enumerate(self.names)}
+        self.fy = fy
+        self.E = E
+        self.table = table  # (perfiles, curvas, longitudes)
+        self.Ix = np.array([profiles[name]["Ix"] for name in self.names], dtype=float)
+        self.mn_y = np.array([PHI_B * profiles[name]["Zy"] * fy / 1e6 for name in self.names])
+        self.vn = np.array([_shear_capacity(profiles[name], fy, E) for name in self.names])
+
+    def profile_indices(self, profiles: Sequence[str]) -> np.ndarray:
+        names, inverse = np.unique(np.asarray(profiles, dtype=str), return_inverse=True)
+        missing = [name for name in names if name not in self.index]
+        if missing:
+            raise ValueError(f"Perfiles no encontrados en el catálogo: {', '.join(missing[:5])}")
+        return np.array([self.index[name] for name in names], dtype=int)[inverse]
+
+    def lookup(self, curve: str, indices: np.ndarray, lengths: np.ndarray) -> np.ndarray:
+        """Interpolación lineal de la curva en ``lengths`` (m); sobre LENGTH_MAX escala elásticamente con 1/L²."""
+        lengths = np.asarray(lengths, dtype=float)
+        if np.any(lengths < 0):
+            raise ValueError("Las longitudes deben ser positivas")
+        values = self.table[:, _CURVE_INDEX[curve], :]
+        last = values.shape[1] - 1
+        position = np.minimum(lengths, LENGTH_MAX) / LENGTH_STEP
+        lower = np.minimum(position.astype(int), last - 1)
+        fraction = position - lower
+        result = values[indices, lower] * (1 - fraction) + values[indices, lower + 1] * fraction
+        beyond = lengths > LENGTH_MAX
+        if np.any(beyond):
+            result = np.where(beyond, values[indices, last] * (LENGTH_MAX / np.maximum(lengths, LENGTH_MAX)) ** 2, result)
+        return result
+
+
+def _catalogue_digest(profiles: Mapping[str, Mapping[str, float]], fy: float, E: float) -> str:
+    payload = json.dumps(
+        {"profiles": profiles, "fy": fy, "E": E, "step": LENGTH_STEP, "max": LENGTH_MAX, "version": TABLE_VERSION},
+        sort_keys=True,
+    )
+    return hashlib.sha256(payload.encode()).hexdigest()[:16]
+
+
+def _load_or_build(profiles: Mapping[str, Mapping[str, float]], fy: float, E: float) -> np.ndarray:
+    target = STEEL_TABLE_DIR / f"steel-{_catalogue_digest(profiles, fy, E)}.npy"
+    if not target.exists():
+        lengths_mm = length_grid() * 1000
+        table = np.stack([_profile_curves(props, fy, E, lengths_mm) for props in profiles.values()])
+        with _write_lock:
+            STEEL_TABLE_DIR.mkdir(parents=True, exist_ok=True)
+            tmp_path = target.with_name(f".{target.name}.{uuid.uuid4().hex}.tmp")
+            try:
+                with open(tmp_path, "wb") as handle:
+                    np.save(handle, table)
+                os.replace(tmp_path, target)
+            finally:
+                tmp_path.unlink(missing_ok=True)
+    return np.load(target, mmap_mode="r")
+
+
+@lru_cache(maxsize=32)
+def _cached_tables(catalogue_json: str, fy: float, E: float) -> SteelCapacityTables:
+    profiles = json.loads(catalogue_json)
+    return SteelCapacityTables(profiles, fy, E, _load_or_build(profiles, fy, E))
+
+
+def capacity_tables(
+    fy: float,
+    E: float = 200000,
+    catalogue: Optional[Mapping[str, Mapping[str, float]]] = None,
+) -> SteelCapacityTables:
+    """
+    Tablas de capacidad de un catálogo (por defecto ``STEEL_PROFILES``) para un acero.
+
+    Se construyen la primera vez que se piden y quedan en disco (mapeadas en memoria) y en memoria
+    por proceso; un cambio en el catálogo, fy, E o la grilla genera un archivo nuevo.
+    """
+    catalogue = STEEL_PROFILES if catalogue is None else catalogue
+    return _cached_tables(json.dumps(catalogue, sort_keys=True), float(fy), float(E))
+
+
+def check_steel_columns(
+    profiles: Sequence[str],
+    axial_load: Any,
+    moment_x: Any,
+    moment_y: Any,
+    length: Any,
+    fy: float,
+    E: float = 200000,
+    Kx: Any = 1.0,
+    Ky: Any = 1.0,
+    catalogue: Optional[Mapping[str, Mapping[str, float]]] = None,
+) -> Dict[str, np.ndarray]:
+    """
+    Verificación AISC360 H1 de un lote de pilares con perfiles del catálogo.
+
+    Args:
+        profiles: Perfil de cada pilar
+        axial_load: Carga axial (kN), escalar o por pilar
+        moment_x: Momento eje X (kN·m)
+        moment_y: Momento eje Y (kN·m)
+        length: Altura de cada pilar (m)
+        fy: Límite de fluencia del acero (MPa)
+        E: Módulo de elasticidad (MPa)
+        Kx: Factor de longitud efectiva eje X
+        Ky: Factor de longitud efectiva eje Y
+
+    Returns:
+        Dict de arreglos: pn, mnX, mnY (kN, kN·m), interactionRatio y passes
+    """
+    tables = capacity_tables(fy, E, catalogue)
+    indices = tables.profile_indices(profiles)
+    P, Mx, My, L, Kx, Ky = np.broadcast_arrays(
+        *(np.asarray(value, dtype=float) for value in (axial_load, moment_x, moment_y, length, Kx, Ky)), indices
+    )[:6]
+    Pc = np.minimum(tables.lookup("pn_x", indices, Kx * L), tables.lookup("pn_y", indices, Ky * L))
+    Mcx = tables.lookup("column_mn_x", indices, L)
+    Mcy = tables.mn_y[indices]
+    axial_ratio = P / Pc
+    flexure = Mx / Mcx + My / Mcy
+    interaction = np.where(axial_ratio >= 0.2, axial_ratio + 8 / 9 * flexure, P / (2 * Pc) + flexure)
+    return {
+        "pn": Pc,
+        "mnX": Mcx,
+        "mnY": Mcy,
+        "interactionRatio": interaction,
+        "passes": interaction <= 1.0,
+    }
+
+
+def check_steel_beams(
+    profiles: Sequence[str],
+    moment: Any,
+    shear: Any,
+    span: Any,
+    fy: float,
+    E: float = 200000,
+    Lb: Any = None,
+    catalogue: Optional[Mapping[str, Mapping[str, float]]] = None,
+) -> Dict[str, np.ndarray]:
+    """
+    Verificación AISC360 F2/G2 y deflexión L/360 de un lote de vigas con perfiles del catálogo.
+
+    Args:
+        profiles: Perfil de cada viga
+        moment: Momento máximo (kN·m)
+        shear: Cortante máximo (kN)
+        span: Luz (m)
+        fy: Límite de fluencia del acero (MPa)
+        E: Módulo de elasticidad (MPa)
+        Lb: Longitud sin arriostrar lateral (m); si None usa span
+
+    Returns:
+        Dict de arreglos: mn, vn, flexureRatio, shearRatio, deflection (cm), deflectionRatio y passes
+    """
+    tables = capacity_tables(fy, E, catalogue)
+    indices = tables.profile_indices(profiles)
+    M, V, L = np.broadcast_arrays(*(np.asarray(value, dtype=float) for value in (moment, shear, span)), indices)[:3]
+    unbraced = L if Lb is None else np.broadcast_to(np.asarray(Lb, dtype=float), L.shape)
+    Mr = tables.lookup("beam_mn", indices, unbraced)
+    Vr = tables.vn[indices]
+    # Deflexión de servicio de calculate_steel_beam: w = 8M/L² / 1.6, δ = 5wL⁴/(384EI)
+    L_mm = L * 1000
+    w_service = 8 * M * 1e6 / L_mm**2 / 1.6
+    deflection = 5 * w_service * L_mm**4 / (384 * E * tables.Ix[indices])
+    flexure_ratio = M / Mr
+    shear_ratio = V / Vr
+    return {
+        "mn": Mr,
+        "vn": Vr,
+        "flexureRatio": flexure_ratio,
+        "shearRatio": shear_ratio,
+        "deflection": deflection / 10,
+        "deflectionRatio": deflection / (L_mm / 360),
+        "passes": (flexure_ratio <= 1.0) & (shear_ratio <= 1.0),
+    }
+
+
+def result_rows(results: Dict[str, np.ndarray], ids: Sequence[Optional[str]]) -> List[Dict[str, Any]]:
+    """Convierte los arreglos de un lote en una fila por elemento (capacidades con 2 decimales, ratios con 3)."""
+    columns = {
+        name: values.tolist() if values.dtype == bool else np.round(values, 3 if "Ratio" in name else 2).tolist()
+        for name, values in results.items()
+    }
+    return [{"id": member_id, **{name: values[i] for name, values in columns.items()}} for i, member_id in enumerate(ids)]
@@ -0,0 +1,203 @@
+"""
+Tablas de factor de estabilidad y diseño masivo de madera según NCh1198.
+Precalcula Cp(λ) por especie/grado y factores de humedad y duración, y diseña lotes de pilares
+y vigas evaluando una sola vez cada combinación distinta de datos.
+"""
+import math
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from services.structural_wood import WOOD_TYPES
+
+FS = 2.25  # Factor de seguridad NCh1198 (compresión, flexión y corte)
+C_SAWN = 0.8  # Factor c para madera aserrada
+SLENDERNESS_STEP = 0.05
+SLENDERNESS_MAX = 400.0
+SLENDERNESS_LIMIT = 50  # Límite recomendado de esbeltez
+
+COLUMN_FIELDS = (
+    "axial_load", "width", "depth", "length", "wood_type", "custom_fc", "custom_E",
+    "moisture_factor", "duration_factor", "Kx", "Ky",
+)
+BEAM_FIELDS = (
+    "moment", "shear", "width", "height", "span", "wood_type", "custom_fm", "custom_fv", "custom_E",
+    "moisture_factor", "duration_factor",
+)
+_DEFAULTS = {"moisture_factor": 1.0, "duration_factor": 1.0, "Kx": 1.0, "Ky": 1.0}
+
+
+def _stability_factor(ratio: np.ndarray) -> np.ndarray:
+    """Cp de NCh1198 5.3.6 para FcE / fc_adm (igual que ``calculate_wood_column``)."""
+    half = (1 + ratio) / (2 * C_SAWN)
+    with np.errstate(invalid="ignore"):
+        Cp = half - np.sqrt(half**2 - ratio / C_SAWN)
+    return np.where(ratio >= 10, 1.0, np.clip(Cp, 0, 1.0))
+
+
+@lru_cache(maxsize=256)
+def stability_curve(fc: float, E: float, moisture_factor: float = 1.0, duration_factor: float = 1.0) -> Tuple[float, np.ndarray]:
+    """
+    Curva Cp(λ) de un material y sus factores de modificación.
+
+    Cp vale 1 hasta la esbeltez λ₀ en que FcE / fc_adm = 10 y allí salta a la ecuación de estabilidad,
+    por lo que la curva se tabula desde λ₀ (nodo exacto) para no interpolar a través del salto.
+
+    Returns:
+        (λ₀, valores de Cp en λ₀ + k·SLENDERNESS_STEP hasta SLENDERNESS_MAX), arreglo de solo lectura
+    """
+    fc_adm = fc * moisture_factor * duration_factor / FS
+    start = math.sqrt(C_SAWN * math.pi**2 * E / (10 * fc_adm))
+    count = max(2, math.ceil((SLENDERNESS_MAX - start) / SLENDERNESS_STEP) + 1)
+    slenderness = start + np.arange(count) * SLENDERNESS_STEP
+    curve = _stability_factor(C_SAWN * math.pi**2 * E / slenderness**2 / fc_adm)
+    curve[0] = _stability_factor(np.array(10 - 1e-12))  # rama de la ecuación en λ₀
+    curve.setflags(write=False)
+    return start, curve
+
+
+def stability_factors(slenderness: np.ndarray, fc: float, E: float, moisture_factor: float, duration_factor: float) -> np.ndarray:
+    """Cp interpolado en la curva tabulada; fuera de la tabla se evalúa la ecuación directamente."""
+    start, curve = stability_curve(float(fc), float(E), float(moisture_factor), float(duration_factor))
+    position = (slenderness - start) / SLENDERNESS_STEP
+    lower = np.clip(position.astype(int), 0, len(curve) - 2)
+    fraction = position - lower
+    Cp = curve[lower] * (1 - fraction) + curve[lower + 1] * fraction
+    beyond = position > len(curve) - 1
+    if np.any(beyond):
+        fc_adm = fc * moisture_factor * duration_factor / FS
+        Cp[beyond] = _stability_factor(C_SAWN * math.pi**2 * E / slenderness[beyond] ** 2 / fc_adm)
+    return np.where(slenderness <= start, 1.0, Cp)
+
+
+def _material(element: Dict[str, Any], strengths: Sequence[str]) -> Tuple[str, Tuple[float, ...]]:
+    wood_type = element.get("wood_type")
+    if wood_type and wood_type in WOOD_TYPES:
+        props = WOOD_TYPES[wood_type]
+        return wood_type, tuple(float(props[name]) for name in strengths)
+    custom = tuple(element.get(f"custom_{name}") for name in strengths)
+    if all(custom):
+        return "Madera personalizada", tuple(float(value) for value in custom)
+    raise ValueError("Debe proporcionar un tipo de madera o propiedades personalizadas")
+
+
+def _deduplicate(elements: Sequence[Dict[str, Any]], fields: Sequence[str]) -> Tuple[List[Dict[str, Any]], np.ndarray]:
+    """Elementos distintos (por sus datos de diseño) e índice de cada elemento en esa lista."""
+    unique: Dict[tuple, int] = {}
+    inverse = np.empty(len(elements), dtype=int)
+    for position, element in enumerate(elements):
+        key = tuple(element.get(name, _DEFAULTS.get(name)) for name in fields)
+        inverse[position] = unique.setdefault(key, len(unique))
+    return [dict(zip(fields, key)) for key in unique], inverse
+
+
+def _fan_out(rows: List[Dict[str, Any]], inverse: np.ndarray) -> List[Dict[str, Any]]:
+    return [dict(rows[index]) for index in inverse]
+
+
+def _group_by_material(elements: List[Dict[str, Any]], strengths: Sequence[str]) -> Dict[tuple, np.ndarray]:
+    groups: Dict[tuple, List[int]] = {}
+    for position, element in enumerate(elements):
+        name, values = _material(element, strengths)
+        key = (name, values, float(element["moisture_factor"]), float(element["duration_factor"]))
+        groups.setdefault(key, []).append(position)
+    return {key: np.array(positions) for key, positions in groups.items()}
+
+
+def _column(elements: List[Dict[str, Any]], name: str) -> np.ndarray:
+    return np.array([element[name] for element in elements], dtype=float)
+
+
+def design_wood_columns(elements: Sequence[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    Diseño NCh1198 de un lote de pilares; mismos argumentos y resultados que ``calculate_wood_column``.
+
+    Los elementos con datos idénticos se evalúan una sola vez y por material, en forma vectorizada.
+
+    Args:
+        elements: Argumentos de ``calculate_wood_column`` por pilar
+
+    Returns:
+        Lista de resultados en el orden de ``elements``
+    """
+    unique, inverse = _deduplicate(elements, COLUMN_FIELDS)
+    rows: List[Optional[Dict[str, Any]]] = [None] * len(unique)
+    for (wood_name, (fc, E), moisture, duration), positions in _group_by_material(unique, ("fc", "E")).items():
+        group = [unique[index] for index in positions]
+        P = _column(group, "axial_load") * 1000
+        b = _column(group, "width") * 10
+        d = _column(group, "depth") * 10
+        L = _column(group, "length") * 1000
+        A = b * d
+        lambda_x = _column(group, "Kx") * L / (d / math.sqrt(12))
+        lambda_y = _column(group, "Ky") * L / (b / math.sqrt(12))
+        Cp = stability_factors(np.maximum(lambda_x, lambda_y), fc, E, moisture, duration)
+        fc_adm = fc * moisture * duration / FS * Cp
+        Pc = fc_adm * A
+        with np.errstate(divide="ignore"):
+            capacity_ratio = np.where(Pc > 0, P / Pc, 999)
+        for offset, index in enumerate(positions):
+            rows[index] = {
+                "woodType": wood_name,
+                "area": round(float(A[offset]), 2),
+                "pn": round(float(Pc[offset]) / 1000, 2),
+                "utilizationRatio": round(float(capacity_ratio[offset]), 3),
+                "slendernessX": round(float(lambda_x[offset]), 2),
+                "slendernessY": round(float(lambda_y[offset]), 2),
+                "stabilityFactor": round(float(Cp[offset]), 3),
+                "isSlender": bool(max(lambda_x[offset], lambda_y[offset]) > SLENDERNESS_LIMIT),
+                "allowableStress": round(float(fc_adm[offset]), 2),
+                "checkStatus": "OK" if capacity_ratio[offset] <= 1.0 else "No cumple",
+            }
+    return _fan_out(rows, inverse)
+
+
+def design_wood_beams(elements: Sequence[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    Diseño NCh1198 de un lote de vigas; mismos argumentos y resultados que ``calculate_wood_beam``.
+
+    Args:
+        elements: Argumentos de ``calculate_wood_beam`` por viga
+
+    Returns:
+        Lista de resultados en el orden de ``elements``
+    """
+    unique, inverse = _deduplicate(elements, BEAM_FIELDS)
+    rows: List[Optional[Dict[str, Any]]] = [None] * len(unique)
+    for (wood_name, (fm, fv, E), moisture, duration), positions in _group_by_material(unique, ("fm", "fv", "E")).items():
+        group = [unique[index] for index in positions]
+        M = _column(group, "moment") * 1e6
+        V = _column(group, "shear") * 1000
+        b = _column(group, "width") * 10
+        h = _column(group, "height") * 10
+        L = _column(group, "span") * 1000
+        A = b * h
+        I = b * h**3 / 12
+        W = b * h**2 / 6
+        # Pandeo lateral simplificado: λb = L / b (viga no arriostrada en toda su luz)
+        lambda_b = L / b
+        CL = np.where(lambda_b > 50, np.maximum(0.5, 1.0 - 0.01 * (lambda_b - 50)), 1.0)
+        fm_adm = fm * moisture * duration / FS * CL
+        fv_adm = fv * moisture * duration / FS
+        flexure_ratio = M / W / fm_adm
+        shear_ratio = 1.5 * V / A / fv_adm
+        delta = 5 * (8 * M / L**2 / 1.6) * L**4 / (384 * E * I)
+        deflection_ratio = delta / (L / 300)
+        passes = (flexure_ratio <= 1.0) & (shear_ratio <= 1.0) & (deflection_ratio <= 1.0)
+        for offset, index in enumerate(positions):
+            element = group[offset]
+            rows[index] = {
+                "woodType": wood_name,
+                "section": f"{element['width']}x{element['height']} cm",
+                "mn": round(float(fm_adm[offset] * W[offset]) / 1e6, 2),
+                "vn": round(float(fv_adm * A[offset]) / 1000, 2),
+                "utilizationRatio": round(float(max(flexure_ratio[offset], shear_ratio[offset])), 3),
+                "flexureRatio": round(float(flexure_ratio[offset]), 3),
+                "shearRatio": round(float(shear_ratio[offset]), 3),
+                "deflection": round(float(delta[offset]) / 10, 2),
+                "deflectionRatio": round(float(deflection_ratio[offset]), 3),
+                "passes": bool(passes[offset]),
+                "checkStatus": "OK" if passes[offset] else "No cumple",
+            }
+    return _fan_out(rows, inverse)
@@ -297,3 +297,262 @@ def test_update_document(monkeypatch):
 
     assert response.status_code == 200
     assert response.json()["id"] == "doc-1"
+
+
+def test_get_project_inspection_risk(monkeypatch):
+    sample = {
+        "project_id": "proj-1",
+        "inspections": [
+            {
+                "rank": 1,
+                "id": "insp-1",
+                "structure_name": "Nave principal",
+                "location": "Nivel 1",
+                "inspection_date": "2024-11-11",
+                "overall_condition": "observacion",
+                "damage_count": 2,
+                "high_severity_count": 1,
+                "max_damage_score": 5.46,
+                "deterministic_score": 31.5,
+            }
+        ],
+        "damages": [],
+    }
+    captured: dict = {}
+
+    def fake_rank(project_id, top_damages):
+        captured.update(project_id=project_id, top_damages=top_damages)
+        return sample
+
+    monkeypatch.setattr("api.routers.inspections.rank_project_inspection_risk", fake_rank)
+
+    response = client.get("/projects/proj-1/inspection-risk?top_damages=5", headers=_auth_headers())
+
+    assert response.status_code == 200
+    assert response.json()["inspections"][0]["rank"] == 1
+    assert captured == {"project_id": "proj-1", "top_damages": 5}
+
+
+def test_bulk_upload_damage_photos_reports_per_file_status(tmp_path, monkeypatch):
+    import io
+    from concurrent.futures import ThreadPoolExecutor
+
+    from PIL import Image
+
+    from services.photo_pipeline import PhotoPipeline
+
+    monkeypatch.chdir(tmp_path)
+    pipeline = PhotoPipeline(executor=ThreadPoolExecutor(max_workers=2))
+    monkeypatch.setattr("api.routers.inspections.photo_pipeline", pipeline)
+    monkeypatch.setattr(
+        "api.routers.inspections.get_project_inspection_damage",
+        lambda damage_id: {"id": damage_id, "project_id": "proj-1", "inspection_id": "insp-1"},
+    )
+    inserted: list = []
+
+    def fake_insert(rows):
+        inserted.append(rows)
+        return [{"id": f"photo-{index}", **row} for index, row in enumerate(rows)]
+
+    monkeypatch.setattr("api.routers.inspections.create_project_inspection_damage_photos", fake_insert)
+
+    buffer = io.BytesIO()
+    Image.new("RGB", (1600, 1200), (10, 20, 30)).save(buffer, format="JPEG")
+    files = [
+        ("files", ("a.jpg", buffer.getvalue(), "image/jpeg")),
+        ("files", ("roto.jpg", b"not an image", "image/jpeg")),
+        ("files", ("b.jpg", buffer.getvalue(), "image/jpeg")),
+    ]
+
+    response = client.post("/inspection-damages/dmg-1/photos/bulk", files=files, headers=_auth_headers())
+    pipeline.shutdown()
+
+    assert response.status_code == 200
+    body = response.json()
+    assert (body["uploaded"], body["failed"]) == (2, 1)
+    assert [result["status"] for result in body["results"]] == ["ok", "error", "ok"]
+    assert body["results"][1]["error"]
+    assert body["results"][2]["photo"]["id"] == "photo-1"
+    assert len(inserted) == 1 and len(inserted[0]) == 2
+    assert all((tmp_path / row["photo_url"].lstrip("/")).exists() for row in inserted[0])
+    assert not list((tmp_path / "uploads" / "_staging").iterdir())
+
+
+def test_failed_damage_photo_removes_its_row(tmp_path, monkeypatch):
+    from concurrent.futures import ThreadPoolExecutor
+
+    from services.photo_pipeline import PhotoPipeline
+
+    monkeypatch.chdir(tmp_path)
+    pipeline = PhotoPipeline(executor=ThreadPoolExecutor(max_workers=1))
+    monkeypatch.setattr("api.routers.inspections.photo_pipeline", pipeline)
+    monkeypatch.setattr(
+        "api.routers.inspections.get_project_inspection_damage",
+        lambda damage_id: {"id": damage_id, "project_id": "proj-1", "inspection_id": "insp-1"},
+    )
+    monkeypatch.setattr(
+        "api.routers.inspections.create_project_inspection_damage_photo", lambda row: {"id": "photo-1", **row}
+    )
+    deleted: list = []
+    monkeypatch.setattr("api.routers.inspections.delete_project_inspection_damage_photo", deleted.append)
+
+    response = client.post(
+        "/inspection-damages/dmg-1/photos",
+        files={"file": ("roto.jpg", b"not an image", "image/jpeg")},
+        headers=_auth_headers(),
+    )
+    pipeline.shutdown()
+
+    assert response.status_code == 200
+    assert pipeline.get_job(response.json()["job_id"])["status"] == "error"
+    assert deleted == ["photo-1"]
+    assert not list((tmp_path / "uploads" / "_staging").iterdir())
+
+
+def test_get_inspection_full_supports_conditional_get(monkeypatch):
+    tree = {
+        "id": "insp-1",
+        "project_id": "proj-1",
+        "structure_name": "Nave principal",
+        "location": "Nivel 1",
+        "inspection_date": "2024-11-11",
+        "inspector": "Ana",
+        "overall_condition": "observacion",
+        "summary": "Resumen",
+        "updated_at": "2024-11-12T10:00:00+00:00",
+        "damages": [
+            {
+                "id": "dmg-1",
+                "project_id": "proj-1",
+                "inspection_id": "insp-1",
+                "structure": "Viga",
+                "damage_type": "Fisura",
+                "damage_cause": "Sobrecarga",
+                "severity": "Alta",
+                "photos": [{"id": "ph-1", "damage_id": "dmg-1", "photo_url": "/uploads/photos/a.jpg"}],
+            }
+        ],
+        "tests": [],
+        "documents": [],
+    }
+    calls = {"tree": 0}
+
+    def fake_tree(inspection_id):
+        calls["tree"] += 1
+        return tree
+
+    monkeypatch.setattr("api.routers.inspections.get_project_inspection_tree", fake_tree)
+    monkeypatch.setattr(
+        "api.routers.inspections.get_project_inspection_updated_at", lambda inspection_id: tree["updated_at"]
+    )
+
+    first = client.get("/inspections/insp-1/full", headers=_auth_headers())
+    assert first.status_code == 200
+    assert first.json()["damages"][0]["photos"][0]["id"] == "ph-1"
+    etag = first.headers["etag"]
+
+    cached = client.get("/inspections/insp-1/full", headers={**_auth_headers(), "If-None-Match": etag})
+    assert cached.status_code == 304
+    assert calls["tree"] == 1
+
+    tree["updated_at"] = "2024-11-13T08:00:00+00:00"
+    changed = client.get("/inspections/insp-1/full", headers={**_auth_headers(), "If-None-Match": etag})
+    assert changed.status_code == 200
+    assert changed.headers["etag"] != etag
+
+
+def test_get_project_inspection_analytics(monkeypatch):
+    captured: dict = {}
+
+    def fake_analytics(project_id, refresh):
+        captured.update(project_id=project_id, refresh=refresh)
+        return {
+            "project_id": project_id,
+            "inspection_count": 1,
+            "total_damages": 2,
+            "heatmaps": {"structure_severity": {"rows": ["Viga"], "columns": ["Alta"], "values": [[2]]}},
+            "time_series": {"periods": ["2024-01"], "series": {"Alta": [2]}, "total": [2]},
+            "breakdowns": {"severity": {"Alta": 2}},
+            "refreshed_at": 1700000000.0,
+        }
+
+    monkeypatch.setattr("api.routers.inspections.project_inspection_analytics", fake_analytics)
+
+    response = client.get("/projects/proj-1/inspection-analytics?refresh=true", headers=_auth_headers())
+
+    assert response.status_code == 200
+    assert response.json()["heatmaps"]["structure_severity"]["values"] == [[2]]
+    assert captured == {"project_id": "proj-1", "refresh": True}
+
+
+def test_get_project_critical_damages_passes_limit(monkeypatch):
+    damage = {
+        "id": "dmg-1",
+        "project_id": "proj-1",
+        "inspection_id": "insp-1",
+        "structure": "Muro eje A",
+        "damage_type": "Fisura",
+        "damage_cause": "Estructural",
+        "severity": "Muy Alta",
+        "severity_rank": 4,
+        "deterministic_score": 15.6,
+    }
+    calls = []
+
+    def fake_list(project_id, limit, inspection_id):
+        calls.append((project_id, limit, inspection_id))
+        return [damage]
+
+    monkeypatch.setattr("api.routers.inspections.list_project_critical_damages", fake_list)
+
+    response = client.get("/projects/proj-1/critical-damages?limit=5", headers=_auth_headers())
+
+    assert response.status_code == 200
+    assert calls == [("proj-1", 5, None)]
+    body = response.json()
+    assert body[0]["severity_rank"] == 4
+    assert body[0]["deterministic_score"] == 15.6
+    assert client.get("/projects/proj-1/critical-damages?limit=0", headers=_auth_headers()).status_code == 422
+
+
+def test_sync_project_inspections_returns_outcome(monkeypatch):
+    calls = []
+
+    def fake_sync(project_id, client_id, changes):
+        calls.append((project_id, client_id, changes))
+        return {
+            "applied": [{"entity": "damage", "id": "dmg-1", "op": "create", "version": {"tablet-a": 2}}],
+            "skipped": [],
+            "conflicts": [
+                {
+                    "entity": "inspection",
+                    "id": "insp-1",
+                    "op": "update",
+                    "reason": "concurrent",
+                    "server_version": {"tablet-b": 1},
+                    "server_record": {"id": "insp-1"},
+                }
+            ],
+            "affected_inspections": ["insp-1"],
+        }
+
+    monkeypatch.setattr("api.routers.inspections.sync_inspection_changes", fake_sync)
+
+    response = client.post(
+        "/projects/proj-1/inspections/sync",
+        json={
+            "client_id": "tablet-a",
+            "changes": [
+                {"entity": "damage", "op": "create", "id": "dmg-1", "version": {"tablet-a": 2}, "data": {}},
+                {"entity": "inspection", "op": "update", "id": "insp-1", "version": {"tablet-a": 1}},
+            ],
+        },
+        headers=_auth_headers(),
+    )
+
+    assert response.status_code == 200
+    body = response.json()
+    assert body["conflicts"][0]["reason"] == "concurrent"
+    assert body["affected_inspections"] == ["insp-1"]
+    assert calls[0][:2] == ("proj-1", "tablet-a")
+    assert [change["entity"] for change in calls[0][2]] == ["damage", "inspection"]
@@ -0,0 +1,55 @@
+import io
+
+import pytest
+from fastapi.testclient import TestClient
+from PIL import Image
+
+from api.main import app
+
+client = TestClient(app)
+
+
+@pytest.fixture
+def stored_photo(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    photo_dir = tmp_path / "uploads" / "inspections" / "proj-1" / "insp-1"
+    photo_dir.mkdir(parents=True)
+    Image.new("RGB", (1024, 768), (200, 10, 10)).save(photo_dir / "foto.jpg", format="JPEG")
+    return "inspections/proj-1/insp-1/foto.jpg"
+
+
+def test_thumbnail_variant_is_generated_and_cached(stored_photo, tmp_path):
+    response = client.get(f"/media/{stored_photo}?variant=thumb", headers={"Accept": "image/webp,image/*"})
+
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "image/webp"
+    assert "immutable" in response.headers["cache-control"]
+    assert response.headers["vary"] == "Accept"
+    assert Image.open(io.BytesIO(response.content)).size == (320, 240)
+    assert len(list((tmp_path / "uploads" / "_derivatives").rglob("*-thumb.webp"))) == 1
+
+    cached = client.get(
+        f"/media/{stored_photo}?variant=thumb",
+        headers={"Accept": "image/webp", "If-None-Match": response.headers["etag"]},
+    )
+    assert cached.status_code == 304
+
+
+def test_jpeg_fallback_without_modern_accept(stored_photo):
+    response = client.get(f"/media/{stored_photo}?variant=medium", headers={"Accept": "*/*"})
+
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "image/jpeg"
+    assert Image.open(io.BytesIO(response.content)).size == (640, 480)
+
+
+def test_rejects_paths_outside_uploads(stored_photo):
+    response = client.get("/media/..%2F..%2Fetc%2Fpasswd")
+
+    assert response.status_code == 404
+
+
+def test_rejects_unknown_variant(stored_photo):
+    response = client.get(f"/media/{stored_photo}?variant=huge")
+
+    assert response.status_code == 400
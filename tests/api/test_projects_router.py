@@ -0,0 +1,82 @@
+import pytest
+from fastapi.testclient import TestClient
+
+from api.main import app
+from api.dependencies import get_user_id
+from core.cache import TTLCache
+
+client = TestClient(app)
+
+
+@pytest.fixture(autouse=True)
+def override_user_dependency():
+    app.dependency_overrides[get_user_id] = lambda: "test-user"
+    yield
+    app.dependency_overrides.pop(get_user_id, None)
+
+
+def _auth_headers():
+    return {"Authorization": "Bearer test-token"}
+
+
+def test_get_project_summary_returns_page(monkeypatch):
+    page = {
+        "items": [
+            {
+                "project_id": "proj-1",
+                "name": "Edificio Los Robles",
+                "status": "in_design",
+                "is_archived": False,
+                "budget": 1000000,
+                "total_tasks": 4,
+                "completed_tasks": 1,
+                "pending_tasks": 3,
+                "overdue_tasks": 0,
+                "completion_pct": 25.0,
+                "next_task_start": "2024-11-01",
+                "next_task_due": "2024-11-15",
+                "payments_facturado": 500000,
+                "payments_pagado": 200000,
+                "payments_saldo": 300000,
+            }
+        ],
+        "total": 1,
+        "limit": 20,
+        "offset": 0,
+    }
+    captured: dict = {}
+
+    def fake_fetch(user_id, archived=None, limit=50, offset=0):
+        captured.update(user_id=user_id, archived=archived, limit=limit, offset=offset)
+        return page
+
+    monkeypatch.setattr("api.routers.projects.fetch_project_summaries", fake_fetch)
+
+    response = client.get("/projects/summary?limit=20&archived=false", headers=_auth_headers())
+
+    assert response.status_code == 200
+    body = response.json()
+    assert body["total"] == 1
+    assert body["items"][0]["completion_pct"] == 25.0
+    assert captured == {"user_id": "test-user", "archived": False, "limit": 20, "offset": 0}
+
+
+def test_get_project_summary_rejects_large_limit():
+    response = client.get("/projects/summary?limit=1000", headers=_auth_headers())
+
+    assert response.status_code == 422
+
+
+def test_ttl_cache_expires_and_invalidates(monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr("core.cache.time.monotonic", lambda: now[0])
+    cache = TTLCache(ttl=10)
+    calls = []
+    loader = lambda: calls.append(1) or len(calls)
+
+    assert cache.get_or_set(("user-a", 1), loader) == 1
+    assert cache.get_or_set(("user-a", 1), loader) == 1
+    now[0] += 11
+    assert cache.get_or_set(("user-a", 1), loader) == 2
+    cache.invalidate(lambda key: key[0] == "user-a")
+    assert cache.get_or_set(("user-a", 1), loader) == 3
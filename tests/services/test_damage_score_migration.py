@@ -0,0 +1,18 @@
+import re
+from pathlib import Path
+
+from services.inspection_scoring import DEFAULT_WEIGHTS
+
+MIGRATION = Path(__file__).resolve().parents[2] / "migrations" / "20261019_server_side_damage_scores.sql"
+_ROW = re.compile(r"\('(severity|cause|damage_type)', '([^']+)', ([\d.]+), (\d+)\)")
+
+
+def test_trigger_weights_match_python_defaults():
+    rows = _ROW.findall(MIGRATION.read_text(encoding="utf-8"))
+    seeded: dict[str, list[tuple[str, float]]] = {}
+    for kind, keyword, weight, position in sorted(rows, key=lambda row: (row[0], int(row[3]))):
+        seeded.setdefault(kind, []).append((keyword, float(weight)))
+
+    for kind in ("severity", "cause", "damage_type"):
+        # Order matters: the first matching keyword wins, both in SQL and in Python.
+        assert seeded[kind] == list(getattr(DEFAULT_WEIGHTS, kind).items())
@@ -0,0 +1,78 @@
+from services.inspection_analytics import ProjectDamageAnalytics
+
+
+def _damage(damage_id, inspection_id, structure, severity, damage_type="Fisura", cause="Corrosión", location="Nivel 1"):
+    return {
+        "id": damage_id,
+        "inspection_id": inspection_id,
+        "structure": structure,
+        "location": location,
+        "damage_type": damage_type,
+        "damage_cause": cause,
+        "severity": severity,
+    }
+
+
+INSPECTIONS = [
+    {"id": "i1", "inspection_date": "2024-01-15", "updated_at": "v1"},
+    {"id": "i2", "inspection_date": "2024-03-02", "updated_at": "v1"},
+]
+DAMAGES = [
+    _damage("d1", "i1", "Viga", "Alta"),
+    _damage("d2", "i1", "Viga", "Leve", location=None),
+    _damage("d3", "i2", "Columna", "Muy Alta", damage_type="Desprendimiento"),
+    _damage("d4", "i2", "Viga", "Alta"),
+]
+
+
+def _build():
+    analytics = ProjectDamageAnalytics("proj-1")
+    changed, removed = analytics.changed_inspections(INSPECTIONS)
+    analytics.apply(INSPECTIONS, DAMAGES, changed, removed)
+    return analytics
+
+
+def test_heatmaps_and_series_follow_severity_order():
+    result = _build().result()
+
+    heatmap = result["heatmaps"]["structure_severity"]
+    assert heatmap["rows"] == ["Viga", "Columna"]
+    assert heatmap["columns"] == ["Leve", "Alta", "Muy Alta"]
+    assert heatmap["values"] == [[1, 2, 0], [0, 0, 1]]
+    assert result["time_series"] == {
+        "periods": ["2024-01", "2024-03"],
+        "series": {"Leve": [1, 0], "Alta": [1, 1], "Muy Alta": [0, 1]},
+        "total": [2, 2],
+    }
+    assert result["breakdowns"]["location"] == {"Nivel 1": 3, "Sin especificar": 1}
+    assert result["total_damages"] == 4
+
+
+def test_incremental_refresh_matches_full_rebuild():
+    analytics = _build()
+    inspections = [
+        {"id": "i2", "inspection_date": "2024-04-01", "updated_at": "v2"},
+        {"id": "i3", "inspection_date": "2024-04-20", "updated_at": "v1"},
+    ]
+    damages_i2 = [_damage("d3", "i2", "Columna", "Media", damage_type="Desprendimiento")]
+    damages_i3 = [_damage("d5", "i3", "Losa", "Alta", cause="Humedad")]
+
+    changed, removed = analytics.changed_inspections(inspections)
+    assert (changed, removed) == ({"i2", "i3"}, {"i1"})
+    analytics.apply(inspections, damages_i2 + damages_i3, changed, removed)
+
+    rebuilt = ProjectDamageAnalytics("proj-1")
+    rebuilt.apply(inspections, damages_i2 + damages_i3, {"i2", "i3"}, set())
+    incremental = analytics.result()
+    full = rebuilt.result()
+    incremental.pop("refreshed_at")
+    full.pop("refreshed_at")
+    assert incremental == full
+    assert incremental["time_series"]["periods"] == ["2024-04"]
+    assert incremental["total_damages"] == 2
+
+
+def test_unchanged_inspections_skip_work():
+    analytics = _build()
+
+    assert analytics.changed_inspections(INSPECTIONS) == (set(), set())
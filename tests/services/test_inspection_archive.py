@@ -0,0 +1,123 @@
+import io
+import zipfile
+
+from PIL import Image
+
+import services.inspection_archive_service as archive_service
+
+
+def _setup(tmp_path, monkeypatch, damages):
+    monkeypatch.chdir(tmp_path)
+    photo_dir = tmp_path / "uploads" / "inspections" / "proj-1" / "insp-1"
+    photo_dir.mkdir(parents=True)
+    Image.new("RGB", (64, 48), (200, 10, 10)).save(photo_dir / "a.jpg", format="JPEG")
+    Image.new("RGB", (64, 48), (10, 200, 10)).save(photo_dir / "b.png", format="PNG")
+    inspection = {
+        "id": "insp-1",
+        "project_id": "proj-1",
+        "structure_name": "Nave",
+        "summary": None,
+        "photos": ["/uploads/inspections/proj-1/insp-1/a.jpg", "/uploads/../secret.jpg"],
+    }
+    monkeypatch.setattr(archive_service, "get_project_inspection", lambda inspection_id: inspection)
+    monkeypatch.setattr(archive_service, "list_project_inspection_damages", lambda project_id, inspection_id: damages)
+    monkeypatch.setattr(archive_service, "list_project_inspection_tests", lambda project_id, inspection_id: [])
+    monkeypatch.setattr(archive_service, "list_project_inspection_documents", lambda project_id, inspection_id: [])
+
+
+def test_archive_streams_entries_and_reuses_cache(tmp_path, monkeypatch):
+    damages = [
+        {
+            "id": "dmg-1",
+            "structure": "Viga",
+            "severity": "Alta",
+            "photos": [{"photo_url": "/uploads/inspections/proj-1/insp-1/b.png"}],
+        }
+    ]
+    _setup(tmp_path, monkeypatch, damages)
+
+    cache_path, stream = archive_service.prepare_inspection_archive("insp-1")
+    chunks = list(stream)
+
+    assert len(chunks) > 1
+    payload = b"".join(chunks)
+    assert cache_path.read_bytes() == payload
+    with zipfile.ZipFile(io.BytesIO(payload)) as archive:
+        infos = {info.filename: info for info in archive.infolist()}
+        assert archive.read("inspection.pdf").startswith(b"%PDF")
+    assert set(infos) == {"inspection.pdf", "metadata.json", "photos/a.jpg", "damages/dmg-1/b.png"}
+    assert infos["photos/a.jpg"].compress_type == zipfile.ZIP_STORED
+    assert infos["damages/dmg-1/b.png"].compress_type == zipfile.ZIP_STORED
+    assert infos["metadata.json"].compress_type == zipfile.ZIP_DEFLATED
+
+    again_path, again_stream = archive_service.prepare_inspection_archive("insp-1")
+    assert again_path == cache_path
+    assert again_stream is None
+
+
+def test_archive_cache_changes_with_content_and_removes_stale(tmp_path, monkeypatch):
+    damages = [{"id": "dmg-1", "structure": "Viga", "severity": "Alta", "photos": []}]
+    _setup(tmp_path, monkeypatch, damages)
+    legacy = tmp_path / "uploads" / "inspections" / "proj-1" / "insp-1" / "archives" / "insp-1-old.zip"
+    legacy.parent.mkdir()
+    legacy.write_bytes(b"old")
+
+    first = archive_service.create_inspection_archive("insp-1")
+    damages[0]["severity"] = "Leve"
+    second = archive_service.create_inspection_archive("insp-1")
+
+    assert first != second
+    assert second.exists()
+    assert not first.exists()
+    assert not legacy.exists()
+    assert [path.name for path in archive_service.ARCHIVE_CACHE_DIR.iterdir()] == [second.name]
+
+
+def test_interrupted_stream_leaves_no_partial_archive(tmp_path, monkeypatch):
+    _setup(tmp_path, monkeypatch, [])
+
+    cache_path, stream = archive_service.prepare_inspection_archive("insp-1")
+    next(stream)
+    stream.close()
+
+    assert not cache_path.exists()
+    assert list(archive_service.ARCHIVE_CACHE_DIR.iterdir()) == []
+
+
+def test_archive_includes_photos_from_s3(tmp_path, monkeypatch):
+    import asyncio
+
+    import httpx
+
+    import services.storage as storage_module
+    from services.storage import S3Storage, content_key
+
+    objects: dict[str, bytes] = {}
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        if request.method == "PUT":
+            objects[request.url.path] = await request.aread()
+            return httpx.Response(200)
+        if request.url.path not in objects:
+            return httpx.Response(404)
+        return httpx.Response(200, content=objects[request.url.path])
+
+    storage = S3Storage("http://minio.local:9000", "media", "minio", "secret", transport=httpx.MockTransport(handler))
+    monkeypatch.setattr(storage_module, "_storage", storage)
+    buffer = io.BytesIO()
+    Image.new("RGB", (32, 32), (0, 0, 200)).save(buffer, format="JPEG")
+    key = content_key("ab" * 32, ".jpg")
+    asyncio.run(storage.put_bytes(buffer.getvalue(), key))
+    damages = [
+        {
+            "id": "dmg-1",
+            "photos": [{"photo_url": storage.url(key)}, {"photo_url": storage.url(content_key("cd" * 32, ".jpg"))}],
+        }
+    ]
+    _setup(tmp_path, monkeypatch, damages)
+
+    path = archive_service.create_inspection_archive("insp-1")
+
+    with zipfile.ZipFile(path) as archive:
+        assert archive.read(f"damages/dmg-1/{key.rsplit('/', 1)[1]}") == buffer.getvalue()
+        assert len([name for name in archive.namelist() if name.startswith("damages/")]) == 1
@@ -0,0 +1,101 @@
+from PIL import Image
+
+import services.inspection_report as report
+
+
+def _bundle(tmp_path):
+    photo_dir = tmp_path / "uploads" / "inspections" / "proj-1" / "insp-1"
+    photo_dir.mkdir(parents=True, exist_ok=True)
+    Image.new("RGB", (3000, 2000), (180, 40, 40)).save(photo_dir / "a.jpg", format="JPEG")
+    return {
+        "inspection": {"id": "insp-1", "project_id": "proj-1", "structure_name": "Nave <A> & B", "summary": "Línea 1\nLínea 2"},
+        "damages": [
+            {
+                "id": "dmg-1",
+                "structure": "Viga",
+                "severity": "Alta",
+                "damage_type": "Fisura",
+                "photos": [{"photo_url": "/uploads/inspections/proj-1/insp-1/a.jpg"}],
+            }
+        ],
+        "tests": [{"test_type": "Esclerometría", "result_summary": "OK"}],
+        "documents": [],
+    }
+
+
+def _count_builds(monkeypatch):
+    calls: list[str] = []
+
+    def wrap(name, builder):
+        def counted(data):
+            calls.append(name)
+            return builder(data)
+
+        return counted
+
+    monkeypatch.setattr(report, "SECTIONS", tuple((name, key, wrap(name, builder)) for name, key, builder in report.SECTIONS))
+    report._section_cache.invalidate()
+    return calls
+
+
+def test_report_embeds_downscaled_photos_and_is_served_from_cache(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    calls = _count_builds(monkeypatch)
+    bundle = _bundle(tmp_path)
+
+    first = report.render_inspection_report(bundle)
+    second = report.render_inspection_report(bundle)
+
+    assert first == second
+    assert first.read_bytes().startswith(b"%PDF")
+    assert b"/Subtype /Image" in first.read_bytes()
+    assert calls == ["header", "damages", "tests", "documents"]
+    derivatives = list((tmp_path / "uploads" / "_derivatives").rglob("*.jpg"))
+    assert len(derivatives) == 1
+    with Image.open(derivatives[0]) as derivative:
+        assert derivative.width <= 640
+    assert not list(report.REPORT_CACHE_DIR.glob("*.tmp"))
+
+
+def test_changed_section_rebuilds_only_that_section(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    calls = _count_builds(monkeypatch)
+    bundle = _bundle(tmp_path)
+
+    first = report.render_inspection_report(bundle)
+    bundle["tests"][0]["result_summary"] = "Resistencia baja"
+    second = report.render_inspection_report(bundle)
+
+    assert first != second
+    assert not first.exists()
+    assert calls == ["header", "damages", "tests", "documents", "tests"]
+
+
+def test_photo_that_appears_later_produces_a_new_report(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    _count_builds(monkeypatch)
+    bundle = _bundle(tmp_path)
+    pending = tmp_path / "uploads" / "inspections" / "proj-1" / "insp-1" / "b.jpg"
+    bundle["damages"][0]["photos"].append({"photo_url": "/uploads/inspections/proj-1/insp-1/b.jpg"})
+
+    first = report.render_inspection_report(bundle)
+    images_before = first.read_bytes().count(b"/Subtype /Image")
+    Image.new("RGB", (1200, 900), (40, 40, 180)).save(pending, format="JPEG")
+    second = report.render_inspection_report(bundle)
+
+    assert first != second and not first.exists()
+    assert (images_before, second.read_bytes().count(b"/Subtype /Image")) == (1, 2)
+
+
+def test_cached_sections_build_fresh_flowables(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    calls = _count_builds(monkeypatch)
+    bundle = _bundle(tmp_path)
+
+    first = report.render_inspection_report(bundle)
+    first.unlink()
+    second = report.render_inspection_report(bundle)
+
+    assert second.read_bytes().startswith(b"%PDF")
+    assert calls == ["header", "damages", "tests", "documents"]
+    assert all(isinstance(spec, tuple) for spec in report._section_cache.get(("damages", report.report_hash(bundle)[1][1][1])))
@@ -0,0 +1,79 @@
+import random
+
+from services.inspection_risk import KeywordMatcher, rank_project_inspections
+from services.inspection_scoring import (
+    DEFAULT_WEIGHTS,
+    calculate_inspection_deterministic_score,
+    score_damage_deterministic,
+)
+
+CAUSES = [
+    "Sobrecarga gravitacional sostenida",
+    "Corrosión inducida por cloruros",
+    "corrosion estructural avanzada",
+    "Deformacion por filtracion y mantenimiento",
+    "falla estructural",
+    "",
+    None,
+]
+TYPES = [
+    "Fisura longitudinal en vigas",
+    "Desprendimiento de recubrimiento",
+    "asentamiento con fisura y corrosion",
+    "golpes",
+    "otro desgaste",
+    "Pandeo local en perfiles",
+    None,
+]
+EXTENTS = ["15", "15 cm", "80%", "", None, 250, 12.5, "abc"]
+SEVERITIES = ["Leve", "Media", "Alta", "Muy Alta", None]
+
+
+def _random_damages(rng: random.Random, inspection_ids: list[str], count: int) -> list[dict]:
+    return [
+        {
+            "id": f"dmg-{index}",
+            "inspection_id": rng.choice(inspection_ids),
+            "structure": "Elemento",
+            "location": "Eje",
+            "damage_type": rng.choice(TYPES),
+            "damage_cause": rng.choice(CAUSES),
+            "severity": rng.choice(SEVERITIES),
+            "extent": rng.choice(EXTENTS),
+        }
+        for index in range(count)
+    ]
+
+
+def test_keyword_matcher_prefers_dictionary_order():
+    matcher = KeywordMatcher(DEFAULT_WEIGHTS.cause)
+
+    # "corrosion" precedes "mantenimiento" in the weights even though it appears later in the text.
+    assert matcher.factor("mantenimiento deficiente y corrosion") == DEFAULT_WEIGHTS.cause["corrosion"]
+    assert matcher.factor("sin coincidencias") == 1.0
+
+
+def test_project_ranking_matches_per_damage_functions():
+    rng = random.Random(7)
+    inspections = [{"id": f"insp-{index}", "structure_name": f"Bloque {index}"} for index in range(12)]
+    damages = _random_damages(rng, [item["id"] for item in inspections[:-1]], 400)
+
+    inspection_table, damage_table = rank_project_inspections(inspections, damages)
+
+    expected_damage_scores = {damage["id"]: score_damage_deterministic(damage) for damage in damages}
+    assert dict(zip(damage_table["id"], damage_table["deterministic_score"])) == expected_damage_scores
+    for row in inspection_table.to_dict(orient="records"):
+        own = [damage for damage in damages if damage["inspection_id"] == row["id"]]
+        assert row["deterministic_score"] == calculate_inspection_deterministic_score(own)
+        assert row["damage_count"] == len(own)
+
+    scores = inspection_table["deterministic_score"].tolist()
+    assert scores == sorted(scores, reverse=True)
+    assert inspection_table["rank"].tolist() == list(range(1, len(inspections) + 1))
+
+
+def test_project_ranking_handles_empty_project():
+    inspection_table, damage_table = rank_project_inspections([{"id": "insp-1"}], [])
+
+    assert inspection_table["deterministic_score"].tolist() == [0.0]
+    assert damage_table.empty
@@ -0,0 +1,118 @@
+import threading
+
+from services.inspection_scoring_queue import InspectionScoringQueue
+
+
+def test_schedule_coalesces_updates_per_inspection():
+    calls: list[tuple[str, set[str]]] = []
+    queue = InspectionScoringQueue(lambda inspection_id, damage_ids: calls.append((inspection_id, damage_ids)), window=60)
+
+    for index in range(50):
+        queue.schedule("insp-1", [f"dmg-{index}"])
+    queue.schedule("insp-2")
+    queue.flush()
+
+    assert len(calls) == 2
+    processed = dict(calls)
+    assert processed["insp-1"] == {f"dmg-{index}" for index in range(50)}
+    assert processed["insp-2"] == set()
+    assert queue.pending() == {}
+
+
+def test_worker_processes_after_window():
+    done = threading.Event()
+    calls: list[str] = []
+
+    def processor(inspection_id, damage_ids):
+        calls.append(inspection_id)
+        done.set()
+
+    queue = InspectionScoringQueue(processor, window=0.05, max_delay=0.2)
+    queue.schedule("insp-1", ["dmg-1"])
+    queue.schedule("insp-1", ["dmg-2"])
+
+    assert done.wait(2)
+    assert calls == ["insp-1"]
+
+
+def test_processor_errors_do_not_stop_the_queue():
+    calls: list[str] = []
+
+    def processor(inspection_id, damage_ids):
+        calls.append(inspection_id)
+        if inspection_id == "insp-1":
+            raise RuntimeError("boom")
+
+    queue = InspectionScoringQueue(processor, window=60)
+    queue.schedule("insp-1")
+    queue.schedule("insp-2")
+    queue.flush()
+
+    assert calls == ["insp-1", "insp-2"]
+
+
+class _FakeTable:
+    def __init__(self, rows, writes, name):
+        self.rows, self.writes, self.name = rows, writes, name
+        self.filters, self.payload = {}, None
+
+    def select(self, *args):
+        return self
+
+    def update(self, payload):
+        self.payload = payload
+        return self
+
+    def upsert(self, payload):
+        raise AssertionError("full rows must not be written back")
+
+    def eq(self, key, value):
+        self.filters[key] = value
+        return self
+
+    def limit(self, count):
+        return self
+
+    def execute(self):
+        if self.payload is not None:
+            self.writes.append((self.name, self.filters, self.payload))
+            return type("Response", (), {"data": []})()
+        rows = [row for row in self.rows.get(self.name, []) if all(row.get(k) == v for k, v in self.filters.items())]
+        return type("Response", (), {"data": rows})()
+
+
+def test_recompute_writes_only_score_columns(monkeypatch):
+    from services import inspections_service
+
+    rows = {
+        "project_inspections": [{"id": "insp-1", "structure_name": "Bodega"}],
+        "project_inspection_damages": [
+            {"id": "dmg-1", "inspection_id": "insp-1", "damage_type": "Fisura", "version_vector": {"srv": 3}},
+            {"id": "dmg-2", "inspection_id": "insp-1", "damage_type": "Corrosión"},
+        ],
+    }
+    writes: list = []
+    calls: list = []
+    client = type(
+        "Client",
+        (),
+        {
+            "table": lambda self, name: _FakeTable(rows, writes, name),
+            "rpc": lambda self, name, params: calls.append((name, params)) or _FakeTable(rows, writes, name),
+        },
+    )()
+    monkeypatch.setattr(inspections_service, "supa", lambda: client)
+    monkeypatch.setattr(inspections_service, "supa_service", lambda: client)
+    monkeypatch.setattr(
+        inspections_service, "evaluate_damages_with_llm", lambda damages: {"dmg-1": {"llm_score": 4, "reason": "r"}}
+    )
+    monkeypatch.setattr(inspections_service, "evaluate_inspection_with_llm", lambda inspection, damages: {"llm_score": 2})
+
+    inspections_service._recompute_inspection_scores("insp-1", {"dmg-1"})
+
+    assert not [write for write in writes if write[0] == "project_inspection_damages"]
+    assert [name for name, _ in calls] == ["apply_damage_llm_scores"]
+    scores = calls[0][1]["p_scores"]
+    assert [score["id"] for score in scores] == ["dmg-1"]
+    assert set(scores[0]) == {"id", "llm_score", "llm_reason", "llm_payload", "score_updated_at"}
+    assert (scores[0]["llm_score"], scores[0]["llm_reason"]) == (4, "r")
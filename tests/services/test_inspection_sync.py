@@ -0,0 +1,143 @@
+import pytest
+
+from services import inspection_sync
+from services.inspection_sync import compare_versions, plan_changeset
+
+INSPECTION = {
+    "id": "insp-1",
+    "project_id": "proj-1",
+    "structure_name": "Nave principal",
+    "location": "Nivel 1",
+    "inspection_date": "2024-11-11",
+    "inspector": "Jane Doe",
+    "overall_condition": "operativa",
+    "summary": "Sin hallazgos",
+    "photos": [],
+    "version_vector": {"tablet-a": 1},
+}
+DAMAGE = {
+    "project_id": "proj-1",
+    "inspection_id": "insp-1",
+    "structure": "Muro eje A",
+    "damage_type": "Fisura",
+    "damage_cause": "Estructural",
+    "severity": "Alta",
+}
+
+
+def test_compare_versions():
+    assert compare_versions({"a": 2}, {"a": 1}) == "after"
+    assert compare_versions({"a": 1}, {"a": 1, "b": 1}) == "before"
+    assert compare_versions({"a": 2}, {"a": 1, "b": 1}) == "concurrent"
+    assert compare_versions({}, {}) == "equal"
+
+
+def test_plan_applies_creates_skips_replays_and_reports_conflicts():
+    existing = {
+        "inspection": {"insp-1": INSPECTION},
+        "damage": {"dmg-old": {**DAMAGE, "id": "dmg-old", "version_vector": {"tablet-b": 3}}},
+    }
+    changes = [
+        {"entity": "damage", "op": "create", "id": "dmg-1", "version": {"tablet-a": 2}, "data": DAMAGE},
+        {"entity": "damage_photo", "op": "create", "id": "ph-1", "version": {"tablet-a": 3},
+         "data": {"project_id": "proj-1", "inspection_id": "x", "damage_id": "dmg-1", "photo_url": "/uploads/a.jpg"}},
+        {"entity": "inspection", "op": "update", "id": "insp-1", "version": {"tablet-a": 1}, "data": {"summary": "Otra"}},
+        {"entity": "damage", "op": "update", "id": "dmg-old", "version": {"tablet-a": 4}, "data": {"severity": "Leve"}},
+        {"entity": "damage", "op": "create", "id": "dmg-2", "version": {"tablet-a": 5}, "data": {**DAMAGE, "severity": "Grave"}},
+        {"entity": "test", "op": "create", "id": "t-1", "version": {"tablet-a": 6}, "data": {"inspection_id": "insp-9"}},
+    ]
+
+    plan = plan_changeset("proj-1", "tablet-a", changes, existing)
+
+    assert [(item["entity"], item["id"]) for item in plan.applied] == [("damage", "dmg-1"), ("damage_photo", "ph-1")]
+    assert [item["id"] for item in plan.skipped] == ["insp-1"]
+    assert [(item["id"], item["reason"]) for item in plan.conflicts] == [
+        ("dmg-old", "concurrent"),
+        ("dmg-2", "invalid"),
+        ("t-1", "missing_parent"),
+    ]
+    assert plan.conflicts[0]["server_version"] == {"tablet-b": 3}
+    photo = plan.upserts["damage_photo"]["ph-1"]
+    assert photo["inspection_id"] == "insp-1"
+    assert photo["version_vector"] == {"tablet-a": 3}
+    assert plan.scoring == {"insp-1": {"dmg-1"}}
+
+
+def test_plan_deletes_and_drops_scoring_for_deleted_inspections():
+    existing = {"inspection": {"insp-1": INSPECTION}}
+    changes = [
+        {"entity": "damage", "op": "create", "id": "dmg-1", "version": {"tablet-a": 2}, "data": DAMAGE},
+        {"entity": "inspection", "op": "delete", "id": "insp-1", "version": {"tablet-a": 3}},
+        {"entity": "damage", "op": "update", "id": "dmg-1", "version": {"tablet-a": 4}, "data": {"severity": "Leve"}},
+        {"entity": "document", "op": "delete", "id": "doc-gone", "version": {"tablet-a": 5}},
+    ]
+
+    plan = plan_changeset("proj-1", "tablet-a", changes, existing)
+
+    assert plan.deletes == {"inspection": ["insp-1"]}
+    assert [item["id"] for item in plan.skipped] == ["doc-gone"]
+    assert [(item["id"], item["reason"]) for item in plan.conflicts] == [("dmg-1", "missing_parent")]
+    assert plan.scoring == {}
+
+
+def test_sync_schedules_scoring_once_per_inspection(monkeypatch):
+    scheduled = []
+    applied = []
+    monkeypatch.setattr(inspection_sync, "load_sync_state", lambda changes: {"inspection": {"insp-1": INSPECTION}})
+    monkeypatch.setattr(inspection_sync, "apply_sync_plan", applied.append)
+    monkeypatch.setattr(
+        inspection_sync.scoring_queue, "schedule", lambda inspection_id, damage_ids: scheduled.append((inspection_id, set(damage_ids)))
+    )
+    changes = [
+        {"entity": "damage", "op": "create", "id": f"dmg-{index}", "version": {"tablet-a": index + 2}, "data": DAMAGE}
+        for index in range(5)
+    ]
+
+    result = inspection_sync.sync_inspection_changes("proj-1", "tablet-a", changes)
+
+    assert len(result["applied"]) == 5
+    assert result["affected_inspections"] == ["insp-1"]
+    assert scheduled == [("insp-1", {f"dmg-{index}" for index in range(5)})]
+    assert len(applied[0].upserts["damage"]) == 5
+
+
+def test_server_side_edits_conflict_with_stale_changesets():
+    # The bump_server_version trigger adds {"server": n} whenever a regular endpoint edits the row.
+    existing = {"inspection": {"insp-1": {**INSPECTION, "version_vector": {"tablet-a": 1, "server": 1}}}}
+    stale = [{"entity": "inspection", "op": "update", "id": "insp-1", "version": {"tablet-a": 2}, "data": {"summary": "x"}}]
+    fresh = [{"entity": "inspection", "op": "update", "id": "insp-1", "version": {"tablet-a": 2, "server": 1}, "data": {"summary": "x"}}]
+
+    assert [item["reason"] for item in plan_changeset("proj-1", "tablet-a", stale, existing).conflicts] == ["concurrent"]
+    assert [item["id"] for item in plan_changeset("proj-1", "tablet-a", fresh, existing).applied] == ["insp-1"]
+    with pytest.raises(ValueError):
+        inspection_sync.sync_inspection_changes("proj-1", inspection_sync.SERVER_REPLICA, stale)
+
+
+def test_upserts_carry_only_client_editable_columns():
+    scored = {
+        **DAMAGE,
+        "id": "dmg-1",
+        "version_vector": {"tablet-a": 1},
+        "llm_score": 0.8,
+        "llm_reason": "Fisura activa",
+        "score_updated_at": "2024-11-12T10:00:00+00:00",
+        "created_at": "2024-11-11T09:00:00+00:00",
+        "updated_at": "2024-11-12T10:00:00+00:00",
+    }
+    existing = {"inspection": {"insp-1": INSPECTION}, "damage": {"dmg-1": scored}}
+    changes = [
+        {"entity": "damage", "op": "update", "id": "dmg-1", "version": {"tablet-a": 2},
+         "data": {"severity": "Leve", "llm_score": 0.1, "updated_at": "2020-01-01T00:00:00+00:00"}},
+        {"entity": "damage", "op": "create", "id": "dmg-2", "version": {"tablet-a": 3},
+         "data": {**DAMAGE, "color": "rojo"}},
+    ]
+
+    plan = plan_changeset("proj-1", "tablet-a", changes, existing)
+
+    row = plan.upserts["damage"]["dmg-1"]
+    assert row["severity"] == "Leve" and row["version_vector"] == {"tablet-a": 2}
+    assert not set(row) & {"llm_score", "llm_reason", "score_updated_at", "created_at", "updated_at"}
+    assert set(row) <= set(inspection_sync.SYNC_ENTITIES["damage"].columns) | {"id", "version_vector"}
+    assert [(item["id"], item["reason"], item["detail"]) for item in plan.conflicts] == [
+        ("dmg-2", "invalid", "Columnas no editables: color")
+    ]
@@ -0,0 +1,200 @@
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+from openai import OpenAI
+
+from services import inspection_scoring
+from services.llm_cache import LLMScoreCache, make_cache_key
+from services.llm_client import BoundedAsyncLLMClient
+
+
+class _StubState:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.requests = 0
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.fail_next = 0
+        self.delay = 0.0
+
+
+def _completion(content: str) -> dict:
+    return {
+        "id": "chatcmpl-stub",
+        "object": "chat.completion",
+        "created": 0,
+        "model": "stub-model",
+        "choices": [{"index": 0, "message": {"role": "assistant", "content": content}, "finish_reason": "stop"}],
+        "usage": {"prompt_tokens": 1, "completion_tokens": 1, "total_tokens": 2},
+    }
+
+
+def _reply_for(body: dict) -> str:
+    user_content = body["messages"][-1]["content"]
+    for line in user_content.splitlines():
+        if line.startswith("["):
+            items = json.loads(line)
+            return json.dumps({"results": [{"id": item["id"], "score": 42, "reason": "lote"} for item in items]})
+    return json.dumps({"score": 55, "reason": "individual"})
+
+
+@pytest.fixture
+def stub_llm():
+    state = _StubState()
+
+    class Handler(BaseHTTPRequestHandler):
+        def log_message(self, *args):
+            pass
+
+        def do_POST(self):
+            body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+            with state.lock:
+                state.requests += 1
+                state.in_flight += 1
+                state.max_in_flight = max(state.max_in_flight, state.in_flight)
+                fail = state.fail_next > 0
+                if fail:
+                    state.fail_next -= 1
+            try:
+                time.sleep(state.delay)
+                if fail:
+                    payload, code = {"error": {"message": "stub failure"}}, 500
+                else:
+                    payload, code = _completion(_reply_for(body)), 200
+                data = json.dumps(payload).encode()
+                self.send_response(code)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+            finally:
+                with state.lock:
+                    state.in_flight -= 1
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    state.base_url = f"http://127.0.0.1:{server.server_address[1]}/v1"
+    yield state
+    server.shutdown()
+    server.server_close()
+
+
+def _messages(text: str):
+    return [{"role": "user", "content": text}]
+
+
+def test_async_client_bounds_concurrency(stub_llm):
+    stub_llm.delay = 0.05
+    client = BoundedAsyncLLMClient("test-key", "stub-model", base_url=stub_llm.base_url, max_concurrency=3)
+
+    outputs = client.complete_many_sync([_messages(f"daño {index}") for index in range(10)])
+
+    assert len(outputs) == 10
+    assert all(json.loads(output)["score"] == 55 for output in outputs)
+    assert stub_llm.max_in_flight <= 3
+
+
+def test_parallel_calls_share_one_limit_and_client(stub_llm):
+    stub_llm.delay = 0.05
+    client = BoundedAsyncLLMClient("test-key", "stub-model", base_url=stub_llm.base_url, max_concurrency=2)
+    outputs: list = []
+    callers = [
+        threading.Thread(target=lambda: outputs.extend(client.complete_many_sync([_messages("daño")] * 4)))
+        for _ in range(3)
+    ]
+
+    for caller in callers:
+        caller.start()
+    for caller in callers:
+        caller.join()
+    sdk_client = client._client
+    client.complete_many_sync([_messages("daño")])
+    assert sdk_client is not None and client._client is sdk_client
+    client.close()
+
+    assert len(outputs) == 12 and stub_llm.max_in_flight <= 2
+    assert client._client is None
+    assert stub_llm.requests == 13
+
+
+def test_async_client_retries_server_errors(stub_llm):
+    stub_llm.fail_next = 2
+    client = BoundedAsyncLLMClient("test-key", "stub-model", base_url=stub_llm.base_url, max_retries=2, backoff=0.01)
+
+    outputs = client.complete_many_sync([_messages("daño")])
+
+    assert json.loads(outputs[0])["score"] == 55
+    assert stub_llm.requests == 3
+
+
+def test_async_client_returns_error_after_retries(stub_llm):
+    stub_llm.fail_next = 5
+    client = BoundedAsyncLLMClient("test-key", "stub-model", base_url=stub_llm.base_url, max_retries=1, backoff=0.01)
+
+    outputs = client.complete_many_sync([_messages("daño")])
+
+    assert isinstance(outputs[0], Exception)
+    assert stub_llm.requests == 2
+
+
+def _damage(index: int, **extra) -> dict:
+    return {
+        "id": f"dmg-{index}",
+        "structure": "Viga V1",
+        "location": f"Eje {index}",
+        "damage_type": "Fisura longitudinal en vigas",
+        "damage_cause": "Sobrecarga gravitacional sostenida",
+        "severity": "Media",
+        "extent": "10",
+        "comments": "",
+        **extra,
+    }
+
+
+def test_batched_damage_scores_are_cached_by_payload(stub_llm, tmp_path, monkeypatch):
+    monkeypatch.setattr(inspection_scoring, "LLM_BATCH_SIZE", 2)
+    monkeypatch.setattr(inspection_scoring, "_score_cache", LLMScoreCache(tmp_path / "scores.sqlite3", ttl=60))
+    monkeypatch.setattr(
+        inspection_scoring, "_llm_client", OpenAI(api_key="test-key", base_url=stub_llm.base_url, max_retries=0)
+    )
+    monkeypatch.setattr(
+        inspection_scoring,
+        "_async_llm_client",
+        BoundedAsyncLLMClient("test-key", inspection_scoring.LLM_MODEL, base_url=stub_llm.base_url),
+    )
+    damages = [_damage(index) for index in range(5)]
+
+    first = inspection_scoring.evaluate_damages_with_llm(damages)
+    assert stub_llm.requests == 3
+    assert {result["llm_score"] for result in first.values()} == {42.0}
+
+    # Fields outside the LLM payload (scores, timestamps) must not trigger a new evaluation.
+    rescored = [{**damage, "llm_score": 42.0, "score_updated_at": "2024-11-11"} for damage in damages]
+    inspection_scoring.evaluate_damages_with_llm(rescored)
+    assert stub_llm.requests == 3
+
+    damages[0]["comments"] = "Fisura creció"
+    inspection_scoring.evaluate_damages_with_llm(damages)
+    assert stub_llm.requests == 4
+
+    single = inspection_scoring.evaluate_damage_with_llm(damages[1])
+    assert single["llm_score"] == 42.0
+    assert stub_llm.requests == 4
+
+
+def test_score_cache_expires_entries(tmp_path, monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr("services.llm_cache.time.time", lambda: now[0])
+    cache = LLMScoreCache(tmp_path / "scores.sqlite3", ttl=30)
+    key = make_cache_key("damage", {"severity": "Alta"}, "stub-model")
+
+    cache.set(key, {"llm_score": 70.0, "reason": "ok", "raw": None})
+    assert cache.get(key)["llm_score"] == 70.0
+    assert make_cache_key("damage", {"severity": "Alta"}, "other-model") != key
+
+    now[0] += 31
+    assert cache.get(key) is None
@@ -0,0 +1,101 @@
+import asyncio
+import io
+from concurrent.futures import ThreadPoolExecutor
+
+from PIL import Image
+from starlette.datastructures import UploadFile
+
+from services.media_service import render_photo
+from services.photo_pipeline import PhotoPipeline
+
+
+def _jpeg_bytes(size=(4000, 3000), orientation=None) -> bytes:
+    image = Image.new("RGB", size, (120, 80, 40))
+    buffer = io.BytesIO()
+    exif = Image.Exif()
+    if orientation:
+        exif[0x0112] = orientation
+    image.save(buffer, format="JPEG", quality=90, exif=exif.tobytes())
+    return buffer.getvalue()
+
+
+def test_render_photo_downscales_and_applies_exif_orientation(tmp_path):
+    target = tmp_path / "out.jpg"
+
+    size = render_photo(io.BytesIO(_jpeg_bytes(orientation=6)), target, max_width=1024, max_height=768)
+
+    # Orientation 6 rotates the 4000x3000 landscape into a 3000x4000 portrait.
+    assert size == (576, 768)
+    with Image.open(target) as stored:
+        assert stored.size == (576, 768)
+        assert stored.format == "JPEG"
+    assert not list(tmp_path.glob(".*.tmp"))
+
+
+def test_pipeline_returns_pending_url_and_reports_progress(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    pipeline = PhotoPipeline(executor=ThreadPoolExecutor(max_workers=2))
+    uploads = [
+        UploadFile(io.BytesIO(_jpeg_bytes((1600, 1200 + index))), filename=f"foto{index}.jpg") for index in range(3)
+    ]
+
+    jobs = [asyncio.run(pipeline.submit(upload)) for upload in uploads]
+    pipeline.shutdown()
+
+    assert all(job["status"] == "pending" for job in jobs)
+    assert all(job["url"].startswith("/uploads/photos/") for job in jobs)
+    progress = pipeline.progress([job["job_id"] for job in jobs])
+    assert progress["total"] == 3
+    assert progress["finished"] == 3
+    assert progress["failed"] == 0
+    for job in jobs:
+        assert (tmp_path / job["url"].lstrip("/")).exists()
+    assert not list((tmp_path / "uploads" / "_staging").iterdir())
+
+
+def test_pipeline_marks_invalid_images_as_error(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    pipeline = PhotoPipeline(executor=ThreadPoolExecutor(max_workers=1))
+
+    job = asyncio.run(pipeline.submit(UploadFile(io.BytesIO(b"not an image"), filename="x.jpg")))
+    pipeline.shutdown()
+
+    finished = pipeline.get_job(job["job_id"])
+    assert finished["status"] == "error"
+    assert finished["error"]
+
+
+def test_failure_callbacks_run_once_even_when_registered_late(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    pipeline = PhotoPipeline(executor=ThreadPoolExecutor(max_workers=1))
+    failed = []
+
+    broken = asyncio.run(pipeline.submit(UploadFile(io.BytesIO(b"not an image"), filename="x.jpg")))
+    good = asyncio.run(pipeline.submit(UploadFile(io.BytesIO(_jpeg_bytes((800, 600))), filename="y.jpg")))
+    pipeline.shutdown()
+    pipeline.on_failure(broken["job_id"], lambda job: failed.append(job["job_id"]))
+    pipeline.on_failure(good["job_id"], lambda job: failed.append(job["job_id"]))
+
+    assert failed == [broken["job_id"]]
+    assert not list((tmp_path / "uploads" / "_staging").iterdir())
+
+
+def test_identical_uploads_are_stored_once(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    pipeline = PhotoPipeline(executor=ThreadPoolExecutor(max_workers=1))
+    data = _jpeg_bytes((1600, 1200))
+
+    async def upload_twice():
+        first = await pipeline.submit(UploadFile(io.BytesIO(data), filename="a.jpg"))
+        await pipeline.wait_for([first["job_id"]])
+        second = await pipeline.submit(UploadFile(io.BytesIO(data), filename="copia.jpg"))
+        return first, second
+
+    first, second = asyncio.run(upload_twice())
+    pipeline.shutdown()
+
+    assert second["url"] == first["url"]
+    assert second["status"] == "done"
+    assert second["deduplicated"] is True
+    assert len(list((tmp_path / "uploads" / "photos").rglob("*.jpg"))) == 1
+    assert not list((tmp_path / "uploads" / "_staging").iterdir())
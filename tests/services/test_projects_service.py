@@ -0,0 +1,78 @@
+from types import SimpleNamespace
+
+import pytest
+
+import services.projects_service as projects_module
+from core.cache import TTLCache
+from services.projects_service import fetch_dashboard_totals, fetch_projects, invalidate_project_summaries
+
+
+class _FakeQuery:
+    def __init__(self, client, name):
+        self.client = client
+        self.name = name
+
+    def __getattr__(self, method):
+        def call(*args, **kwargs):
+            self.client.calls.append((self.name, method, args))
+            return self
+
+        return call
+
+    def execute(self):
+        return SimpleNamespace(data=self.client.tables[self.name])
+
+
+class _FakeClient:
+    def __init__(self, data=None, tables=None):
+        self.data = data
+        self.tables = tables or {}
+        self.calls = []
+
+    def table(self, name):
+        if name not in self.tables:
+            raise AssertionError(f"unexpected table {name}")
+        return _FakeQuery(self, name)
+
+    def rpc(self, name, params):
+        self.calls.append((name, params))
+        return SimpleNamespace(execute=lambda: SimpleNamespace(data=self.data))
+
+
+@pytest.fixture(autouse=True)
+def fresh_cache(monkeypatch):
+    monkeypatch.setattr(projects_module, "_summary_cache", TTLCache(ttl=60))
+
+
+def test_dashboard_totals_come_from_one_aggregate(monkeypatch):
+    row = {"project_count": 250, "budget": "9000000.00", "invoiced": "3500000.00", "paid": "-20000.00",
+           "pending_tasks": 12, "overdue_tasks": 3}
+    client = _FakeClient([row])
+    monkeypatch.setattr(projects_module, "supa", lambda: client)
+
+    totals = fetch_dashboard_totals("u1")
+
+    assert totals == {"project_count": 250, "budget": 9000000.0, "invoiced": 3500000.0, "paid": -20000.0,
+                      "pending_tasks": 12, "overdue_tasks": 3}
+    assert client.calls == [("project_dashboard_totals", {"p_user_id": "u1", "p_archived": False})]
+    fetch_dashboard_totals("u1")
+    assert len(client.calls) == 1
+    invalidate_project_summaries("u1")
+    fetch_dashboard_totals("u1")
+    assert len(client.calls) == 2
+
+
+def test_projects_read_totals_from_the_aggregate_table(monkeypatch):
+    client = _FakeClient(tables={
+        "projects": [{"id": "p1", "name": "Nave"}, {"id": "p2", "name": "Bodega"}],
+        "project_payment_totals": [{"project_id": "p1", "facturado": "1200.50", "pagado": "200", "saldo": "1000.50"}],
+    })
+    monkeypatch.setattr(projects_module, "supa", lambda: client)
+
+    projects = fetch_projects(archived=False)
+
+    assert [(p["payments_facturado"], p["payments_pagado"], p["payments_saldo"]) for p in projects] == [
+        (1200.5, 200.0, 1000.5),
+        (0.0, 0.0, 0.0),
+    ]
+    assert ("project_payment_totals", "in_", ("project_id", ["p1", "p2"])) in client.calls
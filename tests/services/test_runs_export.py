@@ -0,0 +1,114 @@
+import gzip
+import io
+import zipfile
+
+import pandas as pd
+import pyarrow as pa
+import pytest
+
+import services.runs_export as export_module
+from services.runs_export import export_runs, export_watermark, flatten_runs, iter_record_batches, iter_run_pages
+
+
+def _run(index, element_type="steel_beam", **result):
+    return {
+        "id": f"r{index:03d}",
+        "project_id": "p1",
+        "created_by": "u1",
+        "element_type": element_type,
+        "input_json": {"moment": 10 + index, "profileName": "W8x10"},
+        "result_json": {"flexureRatio": 0.5, "passes": True, "forces": {"shear": 3}, **result},
+        "is_critical": index == 0,
+        "created_at": "2026-10-01T10:00:00+00:00",
+        "updated_at": f"2026-10-01T10:00:{index:02d}.5+00:00",
+    }
+
+
+@pytest.fixture
+def stored(monkeypatch):
+    runs = [_run(index) for index in range(5)] + [_run(5, "wood_column", checkStatus="OK")]
+    calls = []
+
+    def list_runs_page(project_id, since, after, element_type, limit, until):
+        calls.append(after)
+        rows = [run for run in runs if since is None or pd.Timestamp(run["updated_at"]) >= pd.Timestamp(since)]
+        rows = [run for run in rows if until is None or pd.Timestamp(run["updated_at"]) < pd.Timestamp(until)]
+        if element_type:
+            rows = [run for run in rows if run["element_type"] == element_type]
+        if after:
+            rows = [run for run in rows if (run["updated_at"], run["id"]) > after]
+        return rows[:limit]
+
+    monkeypatch.setattr(export_module, "list_runs_page", list_runs_page)
+    return runs, calls
+
+
+def test_flatten_gives_typed_columns():
+    frame = flatten_runs([_run(0), _run(1, flexureRatio=1, note=[1, 2])])
+
+    assert str(frame["input.moment"].dtype) == "Float64"
+    assert str(frame["result.flexureRatio"].dtype) == "Float64"  # enteros y decimales JSON en un solo tipo
+    assert str(frame["result.passes"].dtype) == "boolean"
+    assert frame["result.forces.shear"].tolist() == [3.0, 3.0]
+    assert frame["result.note"].tolist()[1] == "[1, 2]" and frame["result.note"].isna().tolist()[0]
+    assert str(frame["updated_at"].dtype) == "datetime64[ns, UTC]"
+
+
+def test_pages_are_keyed(stored):
+    runs, calls = stored
+    pages = list(iter_run_pages("p1", page_size=2))
+
+    assert [[run["id"] for run in page] for page in pages] == [["r000", "r001"], ["r002", "r003"], ["r004", "r005"]]
+    assert calls[:3] == [None, (runs[1]["updated_at"], "r001"), (runs[3]["updated_at"], "r003")]
+    assert len(calls) == 4  # la última página llena obliga a pedir una más, vacía
+
+
+def test_incremental_csv_export_per_element_type(tmp_path, stored):
+    runs, _ = stored
+    summary = export_runs("p1", tmp_path / "full.zip", export_format="csv", page_size=4)
+
+    assert summary["rows"] == {"steel_beam": 5, "wood_column": 1}
+    assert summary["files"] == ["steel_beam/part-00000.csv.gz", "steel_beam/part-00001.csv.gz", "wood_column/part-00000.csv.gz"]
+    with zipfile.ZipFile(tmp_path / "full.zip") as archive:
+        wood = pd.read_csv(io.BytesIO(gzip.decompress(archive.read("wood_column/part-00000.csv.gz"))))
+    assert wood["result.checkStatus"].tolist() == ["OK"]
+    assert "result.checkStatus" in wood and "input.moment" in wood
+
+    assert pd.Timestamp(summary["watermark"]) < pd.Timestamp.now(tz="UTC")
+    changes = export_runs("p1", tmp_path / "delta.zip", since=summary["watermark"], export_format="csv")
+    assert changes["rows"] == {} and changes["watermark"] >= summary["watermark"]
+    changes = export_runs("p1", tmp_path / "delta.zip", since=runs[3]["updated_at"], export_format="csv")
+    assert changes["rows"] == {"steel_beam": 2, "wood_column": 1}  # la marca de agua es inclusiva
+
+
+def test_watermark_lags_behind_late_commits(tmp_path, stored):
+    runs, _ = stored
+    now = pd.Timestamp("2026-10-01T10:10:00+00:00").to_pydatetime()
+    late = _run(6)
+    late["updated_at"] = "2026-10-01T10:08:00+00:00"  # transacción abierta antes del corte, confirmada después
+    runs.append(late)
+
+    first = export_runs("p1", tmp_path / "a.zip", export_format="csv", until=export_watermark(now))
+    assert first["watermark"] == "2026-10-01T10:05:00+00:00"
+    assert first["rows"] == {"steel_beam": 5, "wood_column": 1}
+
+    later = export_watermark(now + export_module.EXPORT_SAFETY_LAG)
+    second = export_runs("p1", tmp_path / "b.zip", since=first["watermark"], export_format="csv", until=later)
+    assert second["rows"] == {"steel_beam": 1} and second["watermark"] == later
+
+
+def test_parquet_and_arrow_exports_round_trip(tmp_path, stored):
+    export_runs("p1", tmp_path / "runs.zip", element_type="steel_beam")
+    export_runs("p1", tmp_path / "runs-arrow.zip", export_format="arrow")
+
+    with zipfile.ZipFile(tmp_path / "runs.zip") as archive:
+        frame = pd.read_parquet(io.BytesIO(archive.read("steel_beam/part-00000.parquet")), dtype_backend="numpy_nullable")
+    assert len(frame) == 5 and str(frame["result.passes"].dtype) == "boolean"
+    with zipfile.ZipFile(tmp_path / "runs-arrow.zip") as archive:
+        table = pa.ipc.open_file(pa.BufferReader(archive.read("wood_column/part-00000.arrow"))).read_all()
+    assert table.column("result.checkStatus").to_pylist() == ["OK"]
+    assert "input.moment" in table.column_names and "result.passes" in table.column_names
+
+    batches = list(iter_record_batches("p1", page_size=10))
+    assert [(kind, batch.num_rows) for kind, batch in batches] == [("steel_beam", 5), ("wood_column", 1)]
+    assert batches[0][1].schema.field("input.moment").type == pa.float64()
@@ -0,0 +1,67 @@
+import math
+
+import numpy as np
+import pytest
+
+from services.design_bases_service import calculate_seismic_base
+from services.seismic_modal import GRAVITY, modal_spectrum_response, shear_building_modes
+
+
+def test_two_story_building_matches_closed_form():
+    weight, stiffness = 981.0, 40000.0
+    modes = shear_building_modes([weight, weight], [stiffness, stiffness])
+    mass = weight / GRAVITY
+
+    expected = np.sqrt(np.array([3 - math.sqrt(5), 3 + math.sqrt(5)]) / 2 * stiffness / mass)
+    np.testing.assert_allclose(modes["omega"], expected, rtol=1e-12)
+    np.testing.assert_allclose(modes["shapes"][1] / modes["shapes"][0], [(1 + math.sqrt(5)) / 2, (1 - math.sqrt(5)) / 2])
+
+
+def test_tall_building_modes_match_dense_solver():
+    rng = np.random.default_rng(4)
+    weights = rng.uniform(3000, 8000, 150)
+    stiffnesses = np.sort(rng.uniform(1e6, 5e6, 150))[::-1]
+    modes = shear_building_modes(weights, stiffnesses)
+
+    masses = weights / GRAVITY
+    K = np.diag(stiffnesses + np.append(stiffnesses[1:], 0)) - np.diag(stiffnesses[1:], 1) - np.diag(stiffnesses[1:], -1)
+    expected = np.linalg.eigvalsh(K / np.sqrt(np.outer(masses, masses)))
+    np.testing.assert_allclose(modes["omega"] ** 2, expected, rtol=1e-10)
+    shapes = modes["shapes"]
+    np.testing.assert_allclose(shapes.T @ (masses[:, None] * shapes), np.eye(150), atol=1e-8)
+    np.testing.assert_allclose(K @ shapes, masses[:, None] * shapes * modes["omega"] ** 2, rtol=1e-6, atol=1e-3)
+    assert modes["massRatios"].sum() == pytest.approx(1.0)
+
+
+def test_single_story_spectrum_response_and_combinations():
+    response = modal_spectrum_response([981.0], [4000.0], [0.0, 5.0], [0.3, 0.3], method="SRSS")
+    assert response["baseShear"] == pytest.approx(981.0 * 0.3)
+    assert response["periods"][0] == pytest.approx(2 * math.pi / math.sqrt(4000.0 / 100.0), abs=1e-4)
+
+    weights, stiffnesses = [2000.0] * 40, [3e6] * 40
+    periods = np.linspace(0, 5, 51)
+    sa = 0.4 / (1 + periods)
+    srss = modal_spectrum_response(weights, stiffnesses, periods, sa, method="SRSS")
+    cqc = modal_spectrum_response(weights, stiffnesses, periods, sa, method="CQC")
+    assert cqc["baseShear"] == pytest.approx(srss["baseShear"], rel=0.05)  # modos bien separados
+    assert srss["storyShears"][0] == srss["baseShear"]
+    assert srss["modesFor90Percent"] <= 5
+
+
+def test_seismic_base_uses_modal_periods_when_missing():
+    stories = 12
+    result = calculate_seismic_base(
+        "Categoría II", "3", "Suelo C", 7, 12 * 4000, None, None, 11,
+        [3.0] * stories, [4000.0] * stories, [2e6] * stories, [1.5e6] * stories,
+    )
+    assert result["tx"] == result["modal"]["x"]["fundamentalPeriod"]
+    assert result["ty"] > result["tx"]
+    assert len(result["modal"]["y"]["storyShears"]) == stories
+
+    manual = calculate_seismic_base(
+        "Categoría II", "3", "Suelo C", 7, 12 * 4000, result["tx"], result["ty"], 11, [3.0] * stories, [4000.0] * stories
+    )
+    assert manual["Qbasx"] == pytest.approx(result["Qbasx"], rel=1e-4)  # periodos redondeados
+    assert manual["modal"] is None
+    with pytest.raises(ValueError):
+        calculate_seismic_base("Categoría II", "3", "Suelo C", 7, 1000, None, 0.5, 11, [3.0], [1000.0])
@@ -0,0 +1,110 @@
+import asyncio
+
+import httpx
+import pytest
+
+import services.storage as storage_module
+from services.storage import LocalDiskStorage, S3Storage, content_key
+
+
+class FakeS3:
+    """Stand-in tipo MinIO: guarda objetos en memoria y exige firma SigV4 en cada solicitud."""
+
+    def __init__(self):
+        self.objects: dict[str, bytes] = {}
+        self.puts = 0
+
+    async def handler(self, request: httpx.Request) -> httpx.Response:
+        auth = request.headers.get("authorization", "")
+        if not auth.startswith("AWS4-HMAC-SHA256 Credential=minio/") or "x-amz-date" not in request.headers:
+            return httpx.Response(403)
+        path = request.url.path
+        if request.method == "PUT":
+            self.puts += 1
+            self.objects[path] = await request.aread()
+            return httpx.Response(200)
+        if path not in self.objects:
+            return httpx.Response(404)
+        if request.method == "DELETE":
+            del self.objects[path]
+            return httpx.Response(204)
+        if request.method == "HEAD":
+            return httpx.Response(200, headers={"content-length": str(len(self.objects[path]))})
+        return httpx.Response(200, content=self.objects[path])
+
+
+def _s3(fake: FakeS3) -> S3Storage:
+    return S3Storage(
+        "http://minio.local:9000",
+        "media",
+        "minio",
+        "minio-secret",
+        transport=httpx.MockTransport(fake.handler),
+    )
+
+
+def test_content_key_shards_by_digest():
+    assert content_key("abcdef0123", ".jpg") == "photos/ab/cd/abcdef0123.jpg"
+
+
+def test_local_storage_moves_files_and_deduplicates(tmp_path):
+    storage = LocalDiskStorage(tmp_path / "store")
+    key = content_key("ab" * 32, ".jpg")
+
+    async def scenario():
+        first = tmp_path / "first.jpg"
+        first.write_bytes(b"jpeg-bytes")
+        second = tmp_path / "second.jpg"
+        second.write_bytes(b"jpeg-bytes")
+        created = [await storage.put_file(first, key), await storage.put_file(second, key)]
+        chunks = [chunk async for chunk in storage.iter_chunks(key)]
+        return created, first, second, b"".join(chunks)
+
+    created, first, second, content = asyncio.run(scenario())
+
+    assert created == [True, False]
+    assert not first.exists() and not second.exists()
+    assert content == b"jpeg-bytes"
+    assert storage.url(key) == f"/uploads/{key}"
+    assert storage.key_for_url(storage.url(key)) == key
+    with pytest.raises(ValueError):
+        storage.path_for("../escape.jpg")
+
+
+def test_s3_storage_against_stand_in(tmp_path):
+    fake = FakeS3()
+    storage = _s3(fake)
+    key = content_key("cd" * 32, ".jpg")
+
+    async def scenario():
+        source = tmp_path / "photo.jpg"
+        source.write_bytes(b"x" * 3_000_000)
+        duplicate = tmp_path / "dup.jpg"
+        duplicate.write_bytes(b"x" * 3_000_000)
+        created = [await storage.put_file(source, key), await storage.put_file(duplicate, key)]
+        downloaded = await storage.download(key, tmp_path / "copy.jpg")
+        exists_before = await storage.exists(key)
+        await storage.delete(key)
+        return created, downloaded, exists_before, await storage.exists(key)
+
+    created, downloaded, exists_before, exists_after = asyncio.run(scenario())
+
+    assert created == [True, False]
+    assert fake.puts == 1
+    assert downloaded.read_bytes() == b"x" * 3_000_000
+    assert exists_before and not exists_after
+    assert storage.url(key) == f"http://minio.local:9000/media/{key}"
+
+
+def test_remote_media_is_cached_locally_for_readers(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    fake = FakeS3()
+    storage = _s3(fake)
+    monkeypatch.setattr(storage_module, "_storage", storage)
+    key = content_key("ef" * 32, ".jpg")
+    asyncio.run(storage.put_bytes(b"remote-photo", key))
+
+    path = storage_module.local_media_path(storage.url(key))
+
+    assert path.read_bytes() == b"remote-photo"
+    assert storage_module.local_media_path("/uploads/other.jpg") is None
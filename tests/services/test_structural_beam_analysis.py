@@ -0,0 +1,64 @@
+import numpy as np
+import pytest
+
+from services.structural_beam_analysis import (
+    analyze_continuous_beam,
+    banded_cholesky,
+    banded_solve,
+    design_continuous_beam,
+)
+from services.structural_concrete import calculate_concrete_beam
+
+
+def test_banded_solver_matches_dense_solution():
+    rng = np.random.default_rng(1)
+    n, p = 40, 3
+    dense = np.zeros((n, n))
+    for offset in range(1, p + 1):
+        values = rng.uniform(-1, 1, n - offset)
+        dense += np.diag(values, offset) + np.diag(values, -offset)
+    dense += np.diag(np.abs(dense).sum(axis=1) + 1)
+    band = np.array([[dense[i, i - p + t] if i - p + t >= 0 else 0.0 for t in range(p + 1)] for i in range(n)])
+    rhs = rng.uniform(-1, 1, (n, 5))
+
+    np.testing.assert_allclose(banded_solve(banded_cholesky(band), rhs), np.linalg.solve(dense, rhs))
+
+
+def test_two_equal_spans_match_tabulated_coefficients():
+    w, L = 10.0, 6.0
+    dead = analyze_continuous_beam([{"length": L, "dead_load": w}] * 2, dead_factor=1, live_factor=1)
+    live = analyze_continuous_beam([{"length": L, "live_load": w}] * 2, dead_factor=1, live_factor=1, stations=601)
+
+    assert dead["spans"][0]["negativeMoment"] == pytest.approx(w * L**2 / 8, abs=1e-3)
+    assert [r["max"] for r in dead["reactions"]] == pytest.approx([0.375 * w * L, 1.25 * w * L, 0.375 * w * L])
+    # Sobrecarga alternada: solo un tramo cargado gobierna el momento positivo (0.0957 wL²)
+    assert live["spans"][0]["positiveMoment"] == pytest.approx(0.0957 * w * L**2, rel=1e-3)
+    assert live["reactions"][0]["min"] == pytest.approx(-w * L / 16)
+
+
+def test_fixed_ends_and_point_loads():
+    result = analyze_continuous_beam(
+        [{"length": 6.0, "dead_load": 10.0, "point_loads": [{"position": 2.0, "dead": 30.0}]}],
+        supports=["fixed", "fixed"],
+        dead_factor=1,
+    )
+    span = result["spans"][0]
+
+    assert span["momentMin"][0] == pytest.approx(-(10 * 36 / 12 + 30 * 2 * 16 / 36), abs=1e-3)
+    assert span["momentMin"][-1] == pytest.approx(-(10 * 36 / 12 + 30 * 2**2 * 4 / 36), abs=1e-3)
+    with pytest.raises(ValueError):
+        analyze_continuous_beam([{"length": 3.0, "dead_load": 10.0}], supports=["pinned", "free"])
+
+
+def test_envelopes_feed_beam_calculators():
+    spans = [{"length": 5.0, "dead_load": 12.0, "live_load": 8.0}] * 3
+    section = {"width": 25, "height": 50, "fc": 25, "fy": 420}
+    result = design_continuous_beam(spans, "rc_beam", section)
+    middle = result["spans"][1]
+
+    assert middle["design"] == calculate_concrete_beam(
+        middle["positiveMoment"], middle["negativeMoment"], middle["maxShear"], span=5.0, **section
+    )
+    assert result["passes"]
+    with pytest.raises(ValueError):
+        design_continuous_beam(spans, "rc_column", section)
@@ -0,0 +1,101 @@
+import time
+
+import numpy as np
+import pytest
+
+from services.structural_combinations import (
+    ENVELOPES,
+    LOAD_CASES,
+    design_with_combinations,
+    factored_forces,
+    load_envelopes,
+    nch3171_combinations,
+)
+from services.structural_steel import calculate_steel_column
+
+COLUMN = {
+    "id": "P1",
+    "loads": {
+        "D": {"axial_load": 300.0, "moment_x": 10.0, "moment_y": 4.0},
+        "L": {"axial_load": 120.0, "moment_x": 6.0},
+        "Ex": {"axial_load": 40.0, "moment_x": 55.0, "shear_x": 30.0},
+    },
+    "params": {"length": 3.5, "fy": 345, "profile": "W310x97"},
+}
+
+
+def test_nch3171_expands_lateral_cases_by_direction_and_sign():
+    names, matrix = nch3171_combinations()
+
+    assert len(names) == matrix.shape[0] == 33
+    assert matrix.shape[1] == len(LOAD_CASES)
+    row = matrix[names.index("C7 -Ey")]
+    assert row[LOAD_CASES.index("D")] == 0.9
+    assert row[LOAD_CASES.index("Ey")] == -1.4
+    assert not matrix.flags.writeable
+
+
+def test_envelopes_match_explicit_loop():
+    rng = np.random.default_rng(7)
+    loads = rng.normal(size=(50, len(LOAD_CASES), 5))
+    _, matrix = nch3171_combinations()
+
+    envelopes = load_envelopes(loads, matrix)
+
+    expected = np.array([[matrix[k] @ loads[e] for k in range(matrix.shape[0])] for e in range(50)])
+    np.testing.assert_allclose(factored_forces(loads, matrix), expected)
+    max_axial = ENVELOPES.index(("max_axial", "axial_load", "max"))
+    assert (envelopes["governing"][:, max_axial] == expected[:, :, 0].argmax(axis=1)).all()
+    np.testing.assert_allclose(envelopes["forces"][:, max_axial, 0], expected[:, :, 0].max(axis=1))
+
+
+def test_envelopes_for_ten_thousand_elements_are_fast():
+    rng = np.random.default_rng(0)
+    loads = rng.normal(size=(10_000, len(LOAD_CASES), 5))
+    matrix = rng.uniform(0, 1.6, size=(60, len(LOAD_CASES)))
+
+    start = time.perf_counter()
+    envelopes = load_envelopes(loads, matrix)
+    elapsed = time.perf_counter() - start
+
+    assert envelopes["forces"].shape == (10_000, len(ENVELOPES), 5)
+    assert elapsed < 1.0
+
+
+def test_column_is_designed_with_worst_governing_case():
+    result = design_with_combinations([COLUMN], "steel_column")
+
+    element = result["elements"][0]
+    design = element["design"]
+    forces = design["forces"]
+    worst = calculate_steel_column(
+        axial_load=forces["axial_load"],
+        moment_x=abs(forces["moment_x"]),
+        moment_y=abs(forces["moment_y"]),
+        **COLUMN["params"],
+    )
+    assert design["results"] == worst
+    for case in element["governing"]:
+        other = calculate_steel_column(
+            axial_load=case["forces"]["axial_load"],
+            moment_x=abs(case["forces"]["moment_x"]),
+            moment_y=abs(case["forces"]["moment_y"]),
+            **COLUMN["params"],
+        )
+        assert other["interactionRatio"] <= worst["interactionRatio"]
+    assert design["combination"].startswith("C5 +Ex")
+
+
+def test_custom_combinations_and_beam_envelope():
+    beam = {
+        "id": "V1",
+        "loads": {"D": {"moment_x": 40.0, "shear_y": 25.0}, "L": {"moment_x": 30.0, "shear_y": 18.0}},
+        "params": {"width": 25, "height": 50, "span": 6.0, "fc": 25, "fy": 420},
+    }
+
+    result = design_with_combinations([beam], "rc_beam", {"U1": {"D": 1.2, "L": 1.6}, "U2": {"D": 1.4}})
+
+    assert result["combinations"] == ["U1", "U2"]
+    assert result["elements"][0]["design"]["forces"]["moment_x_max"] == pytest.approx(96.0)
+    with pytest.raises(ValueError):
+        design_with_combinations([beam], "rc_beam", {"U1": {"X": 1.0}})
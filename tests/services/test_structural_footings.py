@@ -0,0 +1,77 @@
+import math
+
+import numpy as np
+import pytest
+
+from services.structural_footings import (
+    calculate_footing,
+    design_footing_schedule,
+    footing_checks,
+    required_footing_width,
+)
+
+
+def _service_pressure(B, P, M, footing_type):
+    L = B if footing_type == "isolated" else 1.0
+    return footing_checks(B, L, P, M, 40, 40, 200, 25, 420, footing_type)["qMax"]
+
+
+@pytest.mark.parametrize("footing_type", ["isolated", "continuous"])
+def test_required_width_makes_max_pressure_equal_bearing_capacity(footing_type):
+    rng = np.random.default_rng(3)
+    P = rng.uniform(50, 3000, 500)
+    M = P * rng.uniform(0, 0.6, 500)  # incluye excentricidades fuera del núcleo
+    B = required_footing_width(P, M, 200, footing_type)
+
+    assert np.any(M / P > B / 6)
+    np.testing.assert_allclose(_service_pressure(B, P, M, footing_type), 200, rtol=1e-9)
+
+
+def test_partial_contact_uses_triangular_distribution():
+    P, M, qa = 400.0, 200.0, 150.0
+    B = float(required_footing_width(P, M, qa, "isolated"))
+    e = M / P
+
+    assert B < 6 * e
+    assert B == pytest.approx(e + math.sqrt(e**2 + 4 * P / (3 * qa)))
+    assert 2 * P / (3 * B * (B / 2 - e)) == pytest.approx(qa)
+
+
+def test_calculate_footing_uses_smallest_rounded_size():
+    result = calculate_footing(900, 120, 0, 40, 40, 200, 25, 420, footing_depth=None)
+    smaller = _service_pressure(result["width"] - 0.05, 900, 120, "isolated")
+
+    assert result["soilPressureMax"] <= 200
+    assert smaller > 200
+    assert result["depth"] == 60.0
+    with pytest.raises(ValueError):
+        calculate_footing(-10, 0, 0, 40, 40, 200, 25, 420)
+
+
+def test_schedule_groups_footings_into_size_families():
+    reactions = [
+        {"id": "C1", "axial_load": 500, "moment": 10, "column_width": 40, "column_depth": 40},
+        {"id": "C2", "axial_load": 520, "moment": 0, "column_width": 40, "column_depth": 40},
+        {"id": "C3", "axial_load": 1500, "moment": 80, "column_width": 50, "column_depth": 50},
+        {"id": "C4", "axial_load": 480, "moment": 25, "column_width": 40, "column_depth": 40},
+    ]
+    schedule = design_footing_schedule(reactions, 200, 25, 420)
+    families = schedule["families"]
+
+    assert [family["mark"] for family in families] == ["Z1", "Z2"]
+    assert families[0]["columns"] == ["C1", "C2", "C4"]
+    assert families[1]["columns"] == ["C3"]
+    assert families[0]["width"] < families[1]["width"]
+    assert all(round(family["width"] / 0.25, 6).is_integer() for family in families)
+    for footing in schedule["footings"]:
+        single = calculate_footing(
+            next(r["axial_load"] for r in reactions if r["id"] == footing["id"]),
+            next(r["moment"] for r in reactions if r["id"] == footing["id"]),
+            0, 40, 40, 200, 25, 420,
+        )
+        assert footing["width"] >= single["width"]
+        assert footing["soilPressureRatio"] <= 1.0
+    governing = families[0]["governingColumn"]
+    assert max(f["soilPressureMax"] for f in schedule["footings"] if f["mark"] == "Z1") == next(
+        f["soilPressureMax"] for f in schedule["footings"] if f["id"] == governing
+    )
@@ -0,0 +1,95 @@
+import numpy as np
+import pytest
+
+import services.structural_frame_analysis as frame_module
+from services.structural_combinations import design_with_combinations
+from services.structural_frame_analysis import analyze_frame, design_frame, frame_model
+
+SECTION = {"area": 100.0, "inertia": 10000.0, "E": 200000.0}
+
+
+@pytest.fixture(autouse=True)
+def clear_models():
+    frame_module._cached_model.cache_clear()
+    yield
+    frame_module._cached_model.cache_clear()
+
+
+def _portal(column=None, beam=None):
+    nodes = [{"id": "A", "x": 0, "y": 0}, {"id": "B", "x": 0, "y": 3}, {"id": "C", "x": 6, "y": 3}, {"id": "D", "x": 6, "y": 0}]
+    members = [
+        {"id": "c1", "start": "A", "end": "B", **(column or SECTION)},
+        {"id": "b1", "start": "B", "end": "C", **(beam or SECTION)},
+        {"id": "c2", "start": "D", "end": "C", **(column or SECTION)},
+    ]
+    return nodes, members, {"A": "fixed", "D": "fixed"}
+
+
+def test_fixed_fixed_beam_matches_closed_form():
+    nodes = [{"id": 1, "x": 0, "y": 0}, {"id": 2, "x": 6, "y": 0}]
+    result = analyze_frame(
+        nodes, [{"id": "b", "start": 1, "end": 2, **SECTION}], {"1": "fixed", "2": "fixed"},
+        {"D": {"members": [{"member": "b", "w": 10}]}},
+    )
+    forces = result["members"][0]["cases"]["D"]
+
+    assert forces["momentStart"] == forces["momentEnd"] == pytest.approx(-30.0)
+    assert forces["momentMax"] == pytest.approx(15.0)
+    assert result["reactions"]["D"]["1"] == pytest.approx([0.0, 30.0, 30.0])
+
+
+def test_portal_frame_is_in_equilibrium():
+    nodes, members, supports = _portal()
+    result = analyze_frame(
+        nodes, members, supports,
+        {"D": {"members": [{"member": "b1", "w": 10}]}, "Ex": {"nodal": [{"node": "B", "fx": 20}]}},
+    )
+    gravity = np.array(list(result["reactions"]["D"].values()))
+    lateral = np.array(list(result["reactions"]["Ex"].values()))
+
+    assert gravity[:, 1].sum() == pytest.approx(60.0)
+    assert gravity[:, 0].sum() == pytest.approx(0.0, abs=1e-9)
+    assert lateral[:, 0].sum() == pytest.approx(-20.0)
+    column = result["members"][0]["cases"]["D"]
+    assert column["momentEnd"] == result["members"][1]["cases"]["D"]["momentStart"]
+
+
+def test_factorization_is_reused_for_same_geometry(monkeypatch):
+    nodes, members, supports = _portal()
+    first = frame_model(nodes, members, supports)
+    monkeypatch.setattr(frame_module, "banded_cholesky", lambda band: pytest.fail("refactorized"))
+
+    result = analyze_frame(nodes, members, supports, {"L": {"members": [{"member": "b1", "w": 4}]}})
+    assert frame_model(nodes, members, supports) is first
+    assert result["modelKey"] == first.key
+    stiffer = [dict(member, inertia=20000.0) for member in members]
+    with pytest.raises(pytest.fail.Exception):
+        frame_model(nodes, stiffer, supports)
+
+
+def test_member_forces_feed_design_with_combinations():
+    column = {"type": "rc_column", "params": {"width": 40, "depth": 40, "fc": 25, "fy": 420}}
+    beam = {"type": "rc_beam", "params": {"width": 25, "height": 50, "fc": 25, "fy": 420}}
+    nodes, members, supports = _portal(column, beam)
+    loads = {"D": {"members": [{"member": "b1", "w": 10}]}, "L": {"members": [{"member": "b1", "w": 5}]}}
+    result = design_frame(nodes, members, supports, loads, stations=101)
+    analysis = analyze_frame(nodes, members, supports, loads, stations=101)
+
+    beam_forces = analysis["members"][1]["cases"]
+    expected = design_with_combinations(
+        [{
+            "id": "b1",
+            "loads": {
+                case: {"moment_x": forces["momentStart"], "shear_y": forces["maxShear"]}
+                for case, forces in beam_forces.items()
+            },
+            "params": {"span": 6.0, **beam["params"]},
+        }],
+        "rc_beam",
+    )["elements"][0]["design"]
+    design = result["members"][1]["design"]
+    assert design["forces"]["moment_x_min"] == pytest.approx(expected["forces"]["moment_x_min"], abs=1e-3)
+    assert design["forces"]["shear_y_abs"] == pytest.approx(expected["forces"]["shear_y_abs"], abs=1e-3)
+    assert "interactionRatio" in result["members"][0]["design"]["results"]
+    with pytest.raises(ValueError):
+        design_frame(nodes, members, supports, {"Dead": loads["D"]})
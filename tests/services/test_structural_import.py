@@ -0,0 +1,143 @@
+import pytest
+
+import services.structural_import as import_module
+import services.structural_steel_tables as tables_module
+from services.structural_import import ImportJobs, import_element_table
+from services.structural_steel import STEEL_PROFILES
+from services.structural_steel_tables import check_steel_columns, result_rows
+from services.structural_wood_tables import design_wood_beams
+
+
+@pytest.fixture(autouse=True)
+def saved(tmp_path, monkeypatch):
+    monkeypatch.setattr(tables_module, "STEEL_TABLE_DIR", tmp_path)
+    tables_module._cached_tables.cache_clear()
+    inserts = []
+
+    def save_runs(project_id, user_id, element_type, runs):
+        inserts.append((project_id, user_id, element_type, list(runs)))
+        return [{"id": str(index)} for index, _ in enumerate(runs)]
+
+    monkeypatch.setattr(import_module, "save_runs", save_runs)
+    yield inserts
+    tables_module._cached_tables.cache_clear()
+
+
+def test_steel_columns_are_imported_in_chunks(tmp_path, saved):
+    profiles = list(STEEL_PROFILES)[:3]
+    lines = ["id,profileName,axialLoad,momentX,length,kx"]
+    for index in range(23):
+        lines.append(f"C{index},{profiles[index % 3]},{100 + 10 * index},{5 + index},3.5,")
+    lines[5] = "C4,NO-EXISTE,100,5,3.5,"
+    lines[9] = "C8,,100,5,-3,"
+    path = tmp_path / "columnas.csv"
+    path.write_text("\n".join(lines) + "\n")
+    jobs = ImportJobs()
+
+    job = import_element_table(path, "columnas.csv", "steel_column", "p1", "u1", {"fy": 345}, chunk_rows=5, jobs=jobs)
+
+    assert job["status"] == "done" and job["progress"] == 1.0
+    assert (job["rows"], job["saved"], job["failed"]) == (23, 21, 2)
+    assert [error["row"] for error in job["errors"]] == [6, 10]
+    assert len(job["errors"][1]["errors"]) == 2  # perfil faltante y altura negativa
+    assert [len(runs) for *_, runs in saved] == [4, 4, 5, 5, 3]
+
+    inputs, result = saved[1][3][0]
+    assert inputs["profileName"] == profiles[5 % 3] and inputs["kx"] == 1.0
+    expected = result_rows(check_steel_columns([profiles[2]], 150, 10, 0, 3.5, 345), ["C5"])[0]
+    assert result == expected
+
+
+def test_wood_beams_accept_field_names_and_report_errors(tmp_path, saved):
+    path = tmp_path / "vigas.csv"
+    path.write_text(
+        "id,moment,shear,width,height,span,wood_type\n"
+        "V1,4.5,6,9,24,4,Pino radiata C24\n"
+        "V2,abc,6,9,24,4,Pino radiata C24\n"
+    )
+
+    job = import_element_table(path, "vigas.csv", "wood_beam", "p1", "u1", jobs=ImportJobs())
+
+    assert (job["saved"], job["failed"]) == (1, 1)
+    assert job["errors"][0]["row"] == 3 and job["errors"][0]["errors"][0].startswith("moment")
+    expected = design_wood_beams([{
+        "moment": 4.5, "shear": 6.0, "width": 9.0, "height": 24.0, "span": 4.0, "wood_type": "Pino radiata C24",
+        "custom_fm": None, "custom_fv": None, "custom_E": None, "moisture_factor": 1.0, "duration_factor": 1.0,
+    }])[0]
+    assert saved[0][3][0][1] == {"id": "V1", **expected}
+    with pytest.raises(ValueError):
+        import_element_table(path, "vigas.csv", "rc_beam", "p1", "u1", jobs=ImportJobs())
+
+
+def test_wood_rows_without_a_known_material_are_row_errors(tmp_path, saved, monkeypatch):
+    path = tmp_path / "pilares.csv"
+    path.write_text(
+        "id,axialLoad,width,depth,length,woodType,fc,E\n"
+        "P1,20,14,14,2.4,Pino radiata C24,,\n"
+        "P2,20,14,14,2.4,,,\n"
+        "P3,20,14,14,2.4,Ébano,,\n"
+        "P4,20,14,14,2.4,Ébano,9,9000\n"
+    )
+
+    job = import_element_table(path, "pilares.csv", "wood_column", "p1", "u1", jobs=ImportJobs())
+
+    assert job["status"] == "done" and (job["saved"], job["failed"]) == (2, 2)
+    assert [error["row"] for error in job["errors"]] == [3, 4]
+    assert "Ébano" in job["errors"][1]["errors"][0]
+
+    # Sin la verificación por fila, un rechazo del calculador tampoco detiene el bloque.
+    schema, design, _ = import_module.IMPORTERS["wood_column"]
+    monkeypatch.setitem(import_module.IMPORTERS, "wood_column", (schema, design, None))
+    job = import_element_table(path, "pilares.csv", "wood_column", "p1", "u1", jobs=ImportJobs())
+
+    assert job["status"] == "done" and (job["saved"], job["failed"]) == (2, 2)
+    assert [error["row"] for error in job["errors"]] == [3, 4]
+
+
+def test_blank_lines_keep_file_row_numbers(tmp_path, saved):
+    path = tmp_path / "vigas.csv"
+    path.write_text(
+        "id,moment,shear,width,height,span,wood_type\n"
+        "V1,4.5,6,9,24,4,Pino radiata C24\n"
+        "\n"
+        "V2,abc,6,9,24,4,Pino radiata C24\n"
+        "V3,4.5,6,9,24,4,Pino radiata C24\n"
+    )
+
+    job = import_element_table(path, "vigas.csv", "wood_beam", "p1", "u1", chunk_rows=2, jobs=ImportJobs())
+
+    assert (job["rows"], job["saved"], job["failed"]) == (4, 2, 2)
+    assert job["errors"] == [{"row": 3, "errors": ["Fila vacía"]}, {"row": 4, "errors": job["errors"][1]["errors"]}]
+    assert job["errors"][1]["errors"][0].startswith("moment")
+
+
+def test_xlsx_rows_are_numbered_like_the_sheet(tmp_path, saved):
+    from openpyxl import Workbook
+
+    profiles = list(STEEL_PROFILES)[:2]
+    workbook = Workbook()
+    sheet = workbook.active
+    sheet.append(["id", "profileName", "moment", "shear", "span"])
+    sheet.append(["B1", profiles[0], 20, 10, 5])
+    sheet.append([])
+    sheet.append(["B2", profiles[1], 25, 12, -5])
+    sheet.append(["B3", profiles[1], 25, 12, 5])
+    workbook.save(tmp_path / "vigas.xlsx")
+
+    job = import_element_table(tmp_path / "vigas.xlsx", "vigas.xlsx", "steel_beam", "p1", "u1", jobs=ImportJobs())
+
+    assert job["status"] == "done" and (job["saved"], job["failed"]) == (2, 2)
+    assert [error["row"] for error in job["errors"]] == [3, 4]
+    assert [inputs["id"] for inputs, _ in saved[0][3]] == ["B1", "B3"]
+
+
+def test_failed_import_is_recorded(tmp_path):
+    path = tmp_path / "tabla.xlsx"
+    path.write_bytes(b"PK")
+    jobs = ImportJobs()
+    job_id = jobs.create("steel_beam", "tabla.xlsx", 2)["job_id"]
+
+    with pytest.raises(ValueError):
+        import_element_table(path, "tabla.xlsx", "steel_beam", "p1", "u1", job_id=job_id, jobs=jobs)
+    assert jobs.get(job_id)["status"] == "error"
+    assert "XLSX" in jobs.get(job_id)["error"]
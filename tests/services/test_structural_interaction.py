@@ -0,0 +1,87 @@
+import math
+
+import numpy as np
+
+from api.schemas.structural_calcs import ConcreteColumnResponse
+from services.structural_concrete import calculate_concrete_column
+from services.structural_interaction import (
+    _ray_ratios,
+    bar_positions,
+    check_column_interaction,
+    column_surface,
+    interaction_surface,
+    perimeter_extra,
+    perimeter_layout,
+)
+
+
+def test_pure_axial_limits_match_aci_closed_form():
+    surface = column_surface(40, 40, 25, 420, 8)
+    As = 8 * math.pi * 10**2
+    P0 = 0.85 * 25 * (400 * 400 - As) + 420 * As
+
+    assert math.isclose(surface.phi_pn_max, 0.65 * 0.80 * P0 / 1e3)
+    assert math.isclose(surface.phi_pn_tension, -0.90 * 420 * As / 1e3)
+    ratios = surface.capacity_ratios([[surface.phi_pn_max, 0, 0], [surface.phi_pn_tension / 2, 0, 0]])
+    assert np.allclose(ratios, [1.0, 0.5])
+
+
+def test_square_section_is_symmetric_and_cached():
+    interaction_surface.cache_clear()
+    surface = column_surface(40, 40, 25, 420, 8)
+    ratios = surface.capacity_ratios([[800, 120, 0], [800, 0, 120], [800, -120, 0], [800, 0, -120]])
+
+    assert np.allclose(ratios, ratios[0], rtol=1e-6)
+    assert column_surface(40, 40, 25, 420, 8) is surface
+    assert interaction_surface.cache_info().hits == 1
+    assert not surface.points.flags.writeable
+
+
+def test_sector_pruning_matches_brute_force():
+    surface = column_surface(30, 60, 30, 420, 10, bar_diameter=16)
+    loads = np.random.default_rng(3).normal(size=(3000, 3)) * [1500, 150, 150]
+    v0, e1, e2 = surface._edges
+
+    expected = _ray_ratios(loads / surface._scale, v0, e1, e2)
+    assert np.array_equal(surface.capacity_ratios(loads), expected)
+    assert np.isfinite(expected).all()
+
+
+def test_more_steel_enlarges_the_surface():
+    loads = [[1200, 180, 90], [-300, 40, 0]]
+    light = check_column_interaction(loads, 40, 40, 25, 420, 4)
+    heavy = check_column_interaction(loads, 40, 40, 25, 420, 12)
+
+    assert all(h < l for h, l in zip(heavy["ratios"], light["ratios"]))
+    assert perimeter_layout(12, 40, 40) == (4, 4)
+    assert heavy["governingIndex"] == 0
+
+
+def test_odd_bar_counts_are_laid_out_exactly():
+    for num_bars in (4, 5, 6, 7, 12, 21):
+        bars_x, bars_y = perimeter_layout(num_bars, 30, 60)
+        bars = bar_positions(300, 600, 40, bars_x, bars_y, 20, perimeter_extra(num_bars, bars_x, bars_y))
+        assert len(bars) == num_bars
+
+    As = 21 * math.pi * 10**2
+    assert math.isclose(column_surface(30, 60, 25, 420, 21).phi_pn_tension, -0.90 * 420 * As / 1e3)
+
+
+def test_column_design_adds_bars_until_the_interaction_check_passes():
+    result = calculate_concrete_column(
+        axial_load=900, moment_x=220, moment_y=160, shear_x=20, shear_y=20,
+        width=40, depth=40, length=3, fc=25, fy=420,
+    )
+
+    assert result["interactionRatio"] <= 1.0
+    assert result["longitudinalSteel"]["numBars"] > 4
+
+
+def test_results_saved_before_the_interaction_check_still_validate():
+    result = calculate_concrete_column(
+        axial_load=400, moment_x=40, moment_y=20, shear_x=20, shear_y=20,
+        width=40, depth=40, length=3, fc=25, fy=420,
+    )
+    result.pop("interactionRatio")
+
+    assert ConcreteColumnResponse.model_validate(result).interaction_ratio is None
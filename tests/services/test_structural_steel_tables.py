@@ -0,0 +1,84 @@
+import numpy as np
+import pytest
+
+import services.structural_steel_tables as tables_module
+from services.structural_steel import STEEL_PROFILES, calculate_steel_beam, calculate_steel_column
+from services.structural_steel_tables import capacity_tables, check_steel_beams, check_steel_columns
+
+
+@pytest.fixture(autouse=True)
+def table_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(tables_module, "STEEL_TABLE_DIR", tmp_path)
+    tables_module._cached_tables.cache_clear()
+    yield tmp_path
+    tables_module._cached_tables.cache_clear()
+
+
+def _members(count, seed=5):
+    rng = np.random.default_rng(seed)
+    return {
+        "profiles": rng.choice(list(STEEL_PROFILES), count),
+        "axial": rng.uniform(50, 3000, count),
+        "moment": rng.uniform(5, 300, count),
+        "minor": rng.uniform(0, 60, count),
+        "length": rng.uniform(0.5, 40, count),
+        "k": rng.uniform(0.5, 2.0, count),
+    }
+
+
+def test_column_lookups_match_calculator():
+    m = _members(200)
+    batch = check_steel_columns(m["profiles"], m["axial"], m["moment"], m["minor"], m["length"], 345, Kx=m["k"])
+
+    for i in range(200):
+        expected = calculate_steel_column(
+            m["axial"][i], m["moment"][i], m["minor"][i], m["length"][i], 345, profile=m["profiles"][i], Kx=m["k"][i]
+        )
+        assert batch["pn"][i] == pytest.approx(expected["pn"], rel=5e-3)
+        assert batch["mnX"][i] == pytest.approx(expected["mnX"], rel=5e-3)
+        assert batch["interactionRatio"][i] == pytest.approx(expected["interactionRatio"], rel=5e-3, abs=1e-3)
+        assert bool(batch["passes"][i]) == expected["passes"] or abs(expected["interactionRatio"] - 1) < 5e-3
+
+
+def test_beam_lookups_match_calculator():
+    m = _members(200, seed=9)
+    shear = m["axial"] / 10
+    batch = check_steel_beams(m["profiles"], m["moment"], shear, m["length"], 345, Lb=m["length"] * m["k"] / 2)
+
+    for i in range(200):
+        expected = calculate_steel_beam(
+            m["moment"][i], shear[i], m["length"][i], 345, profile=m["profiles"][i], Lb=m["length"][i] * m["k"][i] / 2
+        )
+        for key in ("mn", "vn", "flexureRatio", "shearRatio", "deflectionRatio"):
+            assert batch[key][i] == pytest.approx(expected[key], rel=5e-3, abs=5e-3)  # salida redondeada
+
+
+def test_tables_are_memory_mapped_and_reused_from_disk(table_dir, monkeypatch):
+    first = capacity_tables(345)
+    assert isinstance(first.table, np.memmap)
+    assert not first.table.flags.writeable
+    assert len(list(table_dir.glob("steel-*.npy"))) == 1
+
+    tables_module._cached_tables.cache_clear()
+    monkeypatch.setattr(tables_module, "_profile_curves", lambda *args: pytest.fail("table rebuilt"))
+    again = capacity_tables(345)
+    assert np.array_equal(again.table, first.table)
+    assert capacity_tables(345) is again
+
+
+def test_loaded_catalogue_and_unknown_profiles():
+    catalogue = {"CUSTOM": dict(STEEL_PROFILES["W250x73"])}
+    custom = check_steel_columns(["CUSTOM"], 500, 20, 0, 4.0, 345, catalogue=catalogue)
+    standard = check_steel_columns(["W250x73"], 500, 20, 0, 4.0, 345)
+
+    assert custom["interactionRatio"][0] == standard["interactionRatio"][0]
+    with pytest.raises(ValueError):
+        check_steel_columns(["W999x1"], 500, 20, 0, 4.0, 345)
+
+
+def test_lengths_beyond_grid_scale_elastically():
+    tables = capacity_tables(345)
+    indices = tables.profile_indices(["W310x97", "W310x97"])
+    at_max, doubled = tables.lookup("pn_y", indices, [tables_module.LENGTH_MAX, 2 * tables_module.LENGTH_MAX])
+
+    assert doubled == pytest.approx(at_max / 4)
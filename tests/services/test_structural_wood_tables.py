@@ -0,0 +1,80 @@
+import math
+
+import numpy as np
+import pytest
+
+import services.structural_wood_tables as wood_tables
+from services.structural_wood import WOOD_TYPES, calculate_wood_beam, calculate_wood_column
+from services.structural_wood_tables import design_wood_beams, design_wood_columns, stability_curve, stability_factors
+
+
+def test_batch_results_match_single_element_calculators():
+    rng = np.random.default_rng(11)
+    types = list(WOOD_TYPES)
+    columns = [
+        {
+            "axial_load": float(rng.uniform(1, 60)),
+            "width": float(rng.choice([4.5, 9.0, 14.0])),
+            "depth": float(rng.choice([9.0, 14.0, 19.0])),
+            "length": float(rng.uniform(1.0, 6.0)),
+            "wood_type": str(rng.choice(types)),
+            "moisture_factor": float(rng.choice([1.0, 0.8])),
+            "duration_factor": float(rng.choice([1.0, 1.15])),
+            "Ky": float(rng.choice([0.5, 1.0])),
+        }
+        for _ in range(300)
+    ]
+    beams = [
+        {
+            "moment": float(rng.uniform(0.1, 8)),
+            "shear": float(rng.uniform(0.5, 8)),
+            "width": float(rng.choice([4.5, 9.0])),
+            "height": float(rng.choice([14.0, 19.0, 24.0])),
+            "span": float(rng.uniform(1.5, 5.0)),
+            "wood_type": str(rng.choice(types)),
+            "duration_factor": float(rng.choice([1.0, 1.15])),
+        }
+        for _ in range(300)
+    ]
+
+    assert design_wood_columns(columns) == [calculate_wood_column(**column) for column in columns]
+    assert design_wood_beams(beams) == [calculate_wood_beam(**beam) for beam in beams]
+
+
+def test_identical_elements_are_evaluated_once(monkeypatch):
+    evaluated = []
+    original = wood_tables.stability_factors
+
+    def counting(slenderness, *args):
+        evaluated.append(len(slenderness))
+        return original(slenderness, *args)
+
+    monkeypatch.setattr(wood_tables, "stability_factors", counting)
+    stud = {"axial_load": 8.0, "width": 4.5, "depth": 9.0, "length": 2.4, "wood_type": "Pino radiata C24"}
+    other = {**stud, "wood_type": "Roble"}
+    results = design_wood_columns([stud] * 500 + [other] * 200 + [{**stud, "Kx": 1.0}])
+
+    assert sorted(evaluated) == [1, 1]
+    assert results[0] == results[499] == results[-1]
+    assert results[0] is not results[1]
+    assert results[500]["woodType"] == "Roble"
+
+
+def test_stability_curve_keeps_the_jump_at_its_start():
+    props = WOOD_TYPES["Pino radiata"]
+    start, curve = stability_curve(props["fc"], props["E"])
+
+    assert stability_curve(props["fc"], props["E"]) is stability_curve(props["fc"], props["E"])
+    assert not curve.flags.writeable
+    below, above = stability_factors(np.array([start, start + 1e-6]), props["fc"], props["E"], 1.0, 1.0)
+    assert below == 1.0
+    assert above == pytest.approx(curve[0], abs=1e-6)
+    assert above < 0.99
+    far = stability_factors(np.array([600.0]), props["fc"], props["E"], 1.0, 1.0)[0]
+    ratio = 0.8 * math.pi**2 * props["E"] / 600.0**2 / (props["fc"] / 2.25)
+    assert far == pytest.approx((1 + ratio) / 1.6 - math.sqrt(((1 + ratio) / 1.6) ** 2 - ratio / 0.8))
+
+
+def test_unknown_material_is_rejected():
+    with pytest.raises(ValueError):
+        design_wood_columns([{"axial_load": 1.0, "width": 9.0, "depth": 9.0, "length": 2.0, "wood_type": "Balsa"}])